@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+차트 일괄 렌더러 (헤드리스, 프로세스 풀)
+- 입력: (슬라이스, 빈도 테이블, 스타일) 작업 목록
+- 처리:
+    1) 작업별 지문(빈도 데이터 + 스타일 + 렌더러 버전)을 계산해 이전 렌더와 같으면 건너뜀
+    2) 남은 작업을 Agg 백엔드 프로세스 풀에서 병렬 렌더 (plt.show() 호출 없음)
+    3) 폰트 캐시는 부모 프로세스에서 한 번 만들고 모든 워커가 같은 MPLCONFIGDIR로 재사용
+- 출력: 슬라이스별 막대 그래프 / 워드클라우드 PNG + 렌더 매니페스트
+        (platform × country × month × 감정 슬라이스 기준)
+"""
+
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from term_frequency import (
+    CSV_PATH,
+    FREQ_PATH,
+    MONTH_COL,
+    NEG_VALUE,
+    POS_VALUE,
+    SENT_COL,
+    dimension_name,
+    get_frequency_tables,
+)
+
+# ===== 1. 설정 =====
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+RENDER_DIR = BASE_DIR / "charts"
+MPLCONFIG_DIR = BASE_DIR / ".mplconfig"
+MANIFEST_NAME = ".render_manifest.json"
+
+# 렌더 방식이 바뀌면 올려서 전체 재렌더
+RENDER_VERSION = 1
+
+FONT_FAMILY = "AppleGothic"
+FONT_PATH = "/System/Library/Fonts/AppleGothic.ttf"
+
+SLICE_DIMENSION = ("platform", "country", MONTH_COL, SENT_COL)
+TOP_N = 30
+
+SENTIMENT_STYLES = {
+    POS_VALUE: {"color": "#4CAF50", "colormap": "Greens"},
+    NEG_VALUE: {"color": "#F44336", "colormap": "Reds"},
+}
+
+
+@dataclass
+class RenderJob:
+    slice_key: str
+    kind: str  # "bar" / "wordcloud"
+    frequencies: list[tuple[str, int]]
+    output_file: str
+    style: dict = field(default_factory=dict)
+
+    def fingerprint(self) -> str:
+        payload = json.dumps(
+            [RENDER_VERSION, self.kind, self.frequencies, self.style],
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ===== 2. 그리기 (pyplot 전역 상태 없이 Figure 객체 사용) =====
+def draw_bar(freq_data, title, output_file, color, dpi=300):
+    """단어 빈도 막대 그래프"""
+    from matplotlib.figure import Figure
+
+    words = [w for w, c in freq_data]
+    counts = [c for w, c in freq_data]
+
+    fig = Figure(figsize=(10, 10))
+    ax = fig.subplots()
+    ax.barh(words[::-1], counts[::-1], color=color, edgecolor="white", linewidth=0.7)
+    ax.set_title(title, fontsize=16, fontweight="bold", pad=20)
+    ax.set_xlabel("빈도수", fontsize=12)
+    ax.set_ylabel("단어", fontsize=12)
+    ax.grid(axis="x", alpha=0.3, linestyle="--")
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=dpi, bbox_inches="tight")
+
+
+def draw_wordcloud(frequencies, output_file, colormap, font_path=FONT_PATH, max_words=200):
+    """빈도 테이블 → 워드클라우드 PNG"""
+    from wordcloud import WordCloud
+
+    wc = WordCloud(
+        font_path=font_path,
+        width=1600,
+        height=800,
+        background_color="white",
+        colormap=colormap,
+        max_words=max_words,
+        relative_scaling=0.3,
+        min_font_size=10,
+    ).generate_from_frequencies(dict(frequencies))
+    wc.to_file(output_file)
+
+
+def render_job(job: RenderJob) -> str:
+    Path(job.output_file).parent.mkdir(parents=True, exist_ok=True)
+    if job.kind == "bar":
+        draw_bar(job.frequencies, job.style.get("title", job.slice_key), job.output_file,
+                 job.style.get("color", "#5B8FF9"), job.style.get("dpi", 300))
+    elif job.kind == "wordcloud":
+        draw_wordcloud(job.frequencies, job.output_file, job.style.get("colormap", "viridis"),
+                       job.style.get("font_path", FONT_PATH), job.style.get("max_words", 200))
+    else:
+        raise ValueError(f"알 수 없는 차트 종류입니다: {job.kind}")
+    return job.output_file
+
+
+# ===== 3. 프로세스 풀 =====
+def configure_matplotlib(mplconfig_dir: str):
+    os.environ["MPLBACKEND"] = "Agg"
+    os.environ.setdefault("MPLCONFIGDIR", mplconfig_dir)
+    import matplotlib
+
+    matplotlib.use("Agg")
+    matplotlib.rcParams["font.family"] = FONT_FAMILY
+    matplotlib.rcParams["axes.unicode_minus"] = False
+
+
+def warm_font_cache(mplconfig_dir: Path = MPLCONFIG_DIR) -> str:
+    """
+    폰트 목록 캐시(fontlist-*.json)를 미리 만들어 워커들이 재사용하도록 함
+    반환: FONT_FAMILY 로 실제 쓰일 폰트 파일 경로 (없으면 matplotlib 기본 폰트 경로 + 경고)
+    """
+    mplconfig_dir.mkdir(parents=True, exist_ok=True)
+    configure_matplotlib(str(mplconfig_dir))
+    from matplotlib import font_manager  # import 시 캐시 생성/로드
+
+    return font_manager.findfont(FONT_FAMILY)
+
+
+def _load_manifest(path: Path) -> dict:
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return {}
+
+
+def _save_manifest(path: Path, manifest: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(path)
+
+
+def render_jobs(
+    jobs: list[RenderJob],
+    manifest_path: Path = RENDER_DIR / MANIFEST_NAME,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> dict:
+    """
+    변경된 작업만 프로세스 풀에서 렌더한다.
+    반환: {"rendered": n, "skipped": n, "failed": {output_file: error}}
+    """
+    manifest = _load_manifest(manifest_path)
+    pending = [
+        job for job in jobs
+        if force or manifest.get(job.output_file) != job.fingerprint() or not Path(job.output_file).exists()
+    ]
+    skipped = len(jobs) - len(pending)
+    print(f"[INFO] 렌더 작업 {len(jobs)}개 중 {skipped}개 변경 없음 → {len(pending)}개 렌더")
+
+    failed: dict[str, str] = {}
+    if pending:
+        warm_font_cache()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=configure_matplotlib,
+            initargs=(str(MPLCONFIG_DIR),),
+        ) as pool:
+            futures = {pool.submit(render_job, job): job for job in pending}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    future.result()
+                    manifest[job.output_file] = job.fingerprint()
+                except Exception as exc:
+                    failed[job.output_file] = str(exc)
+                    manifest.pop(job.output_file, None)
+                    print(f"[WARN] 렌더 실패: {job.output_file} ({exc})")
+        _save_manifest(manifest_path, manifest)
+
+    return {"rendered": len(pending) - len(failed), "skipped": skipped, "failed": failed}
+
+
+# ===== 4. 슬라이스별 작업 생성 =====
+def _safe_name(value: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", value).strip("_") or "empty"
+
+
+def build_slice_jobs(
+    tables,
+    dimension=SLICE_DIMENSION,
+    out_dir: Path = RENDER_DIR,
+    top_n: int = TOP_N,
+    kinds=("bar", "wordcloud"),
+) -> list[RenderJob]:
+    """빈도 테이블의 슬라이스마다 막대 그래프 / 워드클라우드 작업 생성 (감정 값이 슬라이스 마지막 항목)"""
+    jobs = []
+    for slice_key, counter in sorted(tables.get(dimension_name(dimension), {}).items()):
+        if not counter:
+            continue
+        sentiment = slice_key.rsplit("|", 1)[-1]
+        style = SENTIMENT_STYLES.get(sentiment, {"color": "#5B8FF9", "colormap": "Blues"})
+        label = slice_key.replace("|", " / ")
+        stem = out_dir / _safe_name(slice_key.replace("|", "__"))
+
+        if "bar" in kinds:
+            jobs.append(RenderJob(
+                slice_key=slice_key,
+                kind="bar",
+                frequencies=counter.most_common(top_n),
+                output_file=f"{stem}_top{top_n}.png",
+                style={"title": f"{label} 단어 TOP {top_n}", "color": style["color"], "dpi": 300},
+            ))
+        if "wordcloud" in kinds:
+            jobs.append(RenderJob(
+                slice_key=slice_key,
+                kind="wordcloud",
+                frequencies=counter.most_common(200),
+                output_file=f"{stem}_wordcloud.png",
+                style={"colormap": style["colormap"], "font_path": FONT_PATH, "max_words": 200},
+            ))
+    return jobs
+
+
+def main():
+    from instrumentation import set_rows, track_stage
+
+    with track_stage("charts_slices"):
+        tables = get_frequency_tables(CSV_PATH, FREQ_PATH, dimensions=(SENT_COL, SLICE_DIMENSION))
+        jobs = build_slice_jobs(tables)
+        result = render_jobs(jobs)
+        set_rows(rows_in=len(jobs), rows_out=result["rendered"])
+    print(f"[INFO] 렌더 완료: {result['rendered']}개, 건너뜀: {result['skipped']}개, 실패: {len(result['failed'])}개")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+# -*- coding: utf-8 -*-
+"""
+종단간 규모 벤치마크 (합성 리뷰 10k / 100k / 1M)
+- 입력: synthetic_reviews.py 로 규모별 통합 CSV 생성 (같은 인자면 재사용)
+- 처리: 규모마다 별도 작업 폴더(VREW_BASE_DIR)에서 실제 단계를 서브프로세스로 실행
+    · preprocess (+ tokenize)            : 정제 / Okt 토큰화
+    · sentiment (+ inference)            : 소형 로컬 모델 (bench_sentiment.build_tiny_model, 오프라인)
+    · bar (+ frequency / render / ngram) : 빈도 집계 + 막대 그래프
+    · wordcloud                          : 워드클라우드 렌더 (빈도 테이블 재사용)
+  각 단계의 wall / CPU / 행 수 / peak RSS 는 instrumentation 이 남긴 perf/latest.json 에서 읽음
+- 출력: bench_out/scale/scale_bench_<시각>.json
+        bench_out/scale/scaling.png (log-log 규모 곡선)
+        단계별 규모 지수 (wall ∝ n^k, k≈1 이면 선형)
+
+사용 예)
+    python bench_scale.py                                   # 10k / 100k / 1M 전체
+    python bench_scale.py --sizes 10000 100000 --stages preprocess bar
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from synthetic_reviews import write_synthetic_csv
+
+# ===== 1. 설정 =====
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+SCALE_DIR = BASE_DIR / "bench_out" / "scale"
+CLI_PATH = Path(__file__).resolve().parent / "vrew_cli.py"
+
+SIZES = (10_000, 100_000, 1_000_000)
+STAGE_ARGS = {
+    "preprocess": ["preprocess"],
+    "sentiment": ["sentiment", "--no-lang-routing", "--rescore"],
+    "bar": ["charts", "--only", "bar"],
+    "wordcloud": ["charts", "--only", "wordcloud"],
+}
+STAGE_TIMEOUT_SEC = 6 * 3600
+
+
+# ===== 2. 준비 =====
+def workdir(n: int) -> Path:
+    return SCALE_DIR / f"n{n}"
+
+
+def ensure_tiny_model(sample_csv: Path, sample_size: int = 10_000) -> Path:
+    """합성 리뷰 본문으로 어휘집을 만든 소형 ELECTRA (가중치 무작위, 속도 측정 전용)"""
+    from bench_sentiment import TINY_MODEL_DIR, build_tiny_model
+
+    texts = pd.read_csv(sample_csv, usecols=["content"], nrows=sample_size)["content"].fillna("").astype(str).tolist()
+    return build_tiny_model(TINY_MODEL_DIR, texts)
+
+
+# ===== 3. 실행 =====
+def run_stage(stage: str, base_dir: Path, model_dir: Optional[Path] = None) -> dict:
+    """VREW_BASE_DIR=base_dir 로 단계 실행 → perf/latest.json 의 단계 지표 + 프로세스 wall(import 포함)"""
+    args = list(STAGE_ARGS[stage])
+    if stage == "sentiment" and model_dir is not None:
+        args += ["--model", str(model_dir)]
+    env = {**os.environ, "VREW_BASE_DIR": str(base_dir)}
+    perf_path = base_dir / "perf" / "latest.json"
+    perf_path.unlink(missing_ok=True)
+
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, str(CLI_PATH), *args], env=env, capture_output=True, text=True,
+                          timeout=STAGE_TIMEOUT_SEC)
+    elapsed = time.perf_counter() - started
+    (base_dir / "logs").mkdir(exist_ok=True)
+    (base_dir / "logs" / f"{stage}.log").write_text(proc.stdout + proc.stderr, encoding="utf-8")
+
+    result = {"stage": stage, "process_wall_sec": round(elapsed, 3), "returncode": proc.returncode, "metrics": []}
+    if perf_path.exists():
+        result["metrics"] = json.loads(perf_path.read_text(encoding="utf-8"))["stages"]
+    if proc.returncode != 0:
+        result["error"] = (proc.stderr or proc.stdout).strip().splitlines()[-1:] or ["(출력 없음)"]
+    return result
+
+
+def run_size(n: int, stages: list[str], seed: int, model_dir: Optional[Path]) -> list[dict]:
+    base_dir = workdir(n)
+    t0 = time.perf_counter()
+    write_synthetic_csv(base_dir / "vrew_reviews_combined.csv", n, seed)
+    generate_sec = time.perf_counter() - t0
+
+    rows = []
+    for stage in stages:
+        print(f"[BENCH] n={n:,} {stage} 실행...")
+        result = run_stage(stage, base_dir, model_dir)
+        if result["returncode"] != 0:
+            print(f"⚠️ n={n:,} {stage} 실패: {result.get('error')} (로그: {base_dir / 'logs' / f'{stage}.log'})")
+        for m in result["metrics"]:
+            rows.append({
+                "n": n,
+                "stage": stage,
+                "step": m["name"],
+                "parent": m["parent"],
+                "wall_sec": m["wall_sec"],
+                "cpu_sec": m["cpu_sec"],
+                "rows_in": m["rows_in"],
+                "rows_out": m["rows_out"],
+                "rows_per_sec": m["rows_per_sec"],
+                "peak_rss_mb": m["peak_rss_mb"],
+                "status": m["status"],
+            })
+        rows.append({"n": n, "stage": stage, "step": f"{stage}:process", "parent": None,
+                     "wall_sec": result["process_wall_sec"], "status": "ok" if result["returncode"] == 0 else "error"})
+    rows.append({"n": n, "stage": "generate", "step": "generate", "parent": None,
+                 "wall_sec": round(generate_sec, 3), "status": "ok"})
+    return rows
+
+
+# ===== 4. 규모 곡선 =====
+def scaling_exponents(df: pd.DataFrame) -> pd.DataFrame:
+    """단계별 log(wall) = k·log(n) + c 적합. k≈1 선형, k>1 이면 규모가 커질수록 행당 비용 증가"""
+    out = []
+    for step, group in df[df["status"] == "ok"].groupby("step"):
+        group = group[group["wall_sec"] > 0]
+        if group["n"].nunique() < 2:
+            continue
+        k, _ = np.polyfit(np.log(group["n"]), np.log(group["wall_sec"]), 1)
+        largest = group.loc[group["n"].idxmax()]
+        out.append({"step": step, "exponent": round(float(k), 3),
+                    "us_per_row_at_max_n": round(largest["wall_sec"] / largest["n"] * 1e6, 2)})
+    return pd.DataFrame(out, columns=["step", "exponent", "us_per_row_at_max_n"])
+
+
+def plot_scaling(df: pd.DataFrame, path: Path):
+    from batch_render import configure_matplotlib
+
+    configure_matplotlib(str(BASE_DIR / ".mplconfig"))
+    import matplotlib.pyplot as plt
+
+    fig, (ax_wall, ax_rate) = plt.subplots(1, 2, figsize=(13, 5))
+    ok = df[(df["status"] == "ok") & ~df["step"].str.endswith(":process")]
+    for step, group in ok.groupby("step"):
+        group = group.sort_values("n")
+        ax_wall.plot(group["n"], group["wall_sec"], marker="o", label=step)
+        ax_rate.plot(group["n"], group["n"] / group["wall_sec"], marker="o", label=step)
+    for ax, title, ylabel in ((ax_wall, "단계별 wall 시간", "초"), (ax_rate, "단계별 처리량", "리뷰/초")):
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_title(title)
+        ax.set_xlabel("리뷰 수")
+        ax.set_ylabel(ylabel)
+        ax.grid(True, which="both", alpha=0.3)
+    ax_wall.legend(fontsize=8)
+    fig.tight_layout()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(path, dpi=150)
+    plt.close(fig)
+    print(f"[INFO] 규모 곡선 저장 → {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 리뷰 규모별 종단간 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--stages", nargs="+", default=list(STAGE_ARGS), choices=list(STAGE_ARGS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--model", type=Path, default=None, help="감정분석 모델 경로 (기본: 소형 로컬 모델 생성)")
+    parser.add_argument("--output", type=Path, default=None, help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    sizes = sorted(args.sizes)
+    model_dir = args.model
+    if "sentiment" in args.stages and model_dir is None:
+        sample = write_synthetic_csv(workdir(sizes[0]) / "vrew_reviews_combined.csv", sizes[0], args.seed)
+        model_dir = ensure_tiny_model(sample)
+
+    rows = []
+    for n in sizes:
+        rows += run_size(n, args.stages, args.seed, model_dir)
+    df = pd.DataFrame(rows)
+    exponents = scaling_exponents(df)
+
+    print("\n=== 단계별 wall 시간 (초) ===")
+    print(df.pivot_table(index="step", columns="n", values="wall_sec", aggfunc="first").to_string())
+    print("\n=== 규모 지수 (wall ∝ n^k) ===")
+    print(exponents.to_string(index=False))
+
+    stamp = f"{datetime.now():%Y%m%d_%H%M%S}"
+    output = args.output or SCALE_DIR / f"scale_bench_{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "sizes": sizes,
+        "stages": args.stages,
+        "seed": args.seed,
+        "model": str(model_dir) if model_dir else None,
+        "cpu_count": os.cpu_count(),
+        "results": df.replace({np.nan: None}).to_dict("records"),
+        "scaling": exponents.to_dict("records"),
+    }
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"[INFO] 벤치마크 결과 저장 → {output}")
+    plot_scaling(df, SCALE_DIR / "scaling.png")
+
+
+if __name__ == "__main__":
+    main()
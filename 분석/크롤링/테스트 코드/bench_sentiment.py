@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+
+# -*- coding: utf-8 -*-
+"""
+감정분석 추론 벤치마크
+- 입력: 실제 리뷰 텍스트 (기본: sentiment_analysis.INPUT_PATH) → 길이 분포 그대로 재표본
+- 처리: batch_size × max_len × thread 수 × backend 조합마다 predict_batch 실행
+        조합마다 새 프로세스(spawn)에서 모델을 로드해 측정 → peak RSS 가 앞선 조합의 최고치에 묻히지 않음
+- 출력: 리뷰/초, 배치 지연시간 p50/p99, 조합별 peak RSS, 모델 로드 시간 (JSON)
+
+오프라인 실행:
+    python bench_sentiment.py --tiny-model        # 같은 구조(ELECTRA)의 작은 모델을 로컬에서 생성해 사용
+    python bench_sentiment.py --batch-sizes 16 32 48 64 --threads 1 4 --backends eager int8
+"""
+
+import argparse
+import copy
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import torch
+
+from sentiment_analysis import (
+    BASE_DIR,
+    INPUT_PATH,
+    MODEL_NAME,
+    load_model_and_tokenizer,
+    predict_batch,
+    resolve_label_indices,
+)
+
+BENCH_DIR = BASE_DIR / "bench_out"
+TINY_MODEL_DIR = BENCH_DIR / "tiny-koelectra"
+BACKENDS = ("eager", "int8", "compile")
+
+SPECIAL_TOKENS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+
+
+# ============================================================
+# 1. 입력 텍스트 (실제 길이 분포)
+# ============================================================
+def load_texts(path: Path, sample_size: Optional[int], seed: int) -> list[str]:
+    df = pd.read_csv(path)
+    column = "review_text" if "review_text" in df.columns else "content"
+    texts = df[column].fillna("").astype(str).tolist()
+    if not texts:
+        raise ValueError(f"리뷰 텍스트가 비어 있습니다: {path}")
+    if sample_size:
+        rng = random.Random(seed)
+        texts = rng.choices(texts, k=sample_size)
+    return texts
+
+
+# ============================================================
+# 2. 오프라인용 소형 모델 생성
+# ============================================================
+def build_tiny_model(out_dir: Path, texts: list[str], vocab_size: int = 8000) -> Path:
+    """
+    KoELECTRA와 같은 구조(ElectraForSequenceClassification + WordPiece)의 작은 모델을
+    리뷰 텍스트로 만든 어휘집으로 생성한다. 가중치는 무작위이므로 속도 측정 전용.
+    """
+    from transformers import ElectraConfig, ElectraForSequenceClassification, ElectraTokenizer
+
+    if (out_dir / "config.json").exists():
+        return out_dir
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    chars = sorted({ch for text in texts for ch in text if not ch.isspace()})
+    words = Counter(word for text in texts for word in text.split())
+    vocab = list(SPECIAL_TOKENS)
+    vocab += chars
+    vocab += [f"##{ch}" for ch in chars]
+    seen = set(vocab)
+    for word, _ in words.most_common():
+        if len(vocab) >= vocab_size:
+            break
+        if word not in seen:
+            vocab.append(word)
+            seen.add(word)
+
+    vocab_file = out_dir / "vocab.txt"
+    vocab_file.write_text("\n".join(vocab) + "\n", encoding="utf-8")
+    tokenizer = ElectraTokenizer(str(vocab_file), do_lower_case=False, model_max_length=512)
+    tokenizer.save_pretrained(out_dir)
+
+    config = ElectraConfig(
+        vocab_size=len(vocab),
+        embedding_size=64,
+        hidden_size=128,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=256,
+        max_position_embeddings=512,
+        num_labels=2,
+        id2label={0: "negative", 1: "positive"},
+        label2id={"negative": 0, "positive": 1},
+    )
+    torch.manual_seed(0)
+    ElectraForSequenceClassification(config).save_pretrained(out_dir)
+    print(f"[INFO] 소형 벤치마크 모델 생성 → {out_dir}")
+    return out_dir
+
+
+# ============================================================
+# 3. 백엔드 준비
+# ============================================================
+def prepare_backend(model, device, backend: str):
+    if backend == "eager":
+        return model, device
+    if backend == "int8":
+        cpu = torch.device("cpu")
+        quantized = torch.quantization.quantize_dynamic(copy.deepcopy(model).to(cpu), {torch.nn.Linear}, dtype=torch.qint8)
+        return quantized, cpu
+    if backend == "compile":
+        return torch.compile(model), device
+    raise ValueError(f"지원하지 않는 backend입니다: {backend} (가능: {', '.join(BACKENDS)})")
+
+
+# ============================================================
+# 4. 측정
+# ============================================================
+def peak_rss_mb() -> float:
+    """프로세스 수명 전체의 최고 RSS (조합별 값이 되도록 _run_isolated 의 새 프로세스 안에서 읽음)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB 단위
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile_ms(values: list[float], pct: float) -> float:
+    return round(float(np.percentile(values, pct)) * 1000.0, 3)
+
+
+def run_case(
+    texts: list[str],
+    tokenizer,
+    model,
+    device,
+    pos_idx: int,
+    batch_size: int,
+    max_len: int,
+    warmup_batches: int = 1,
+) -> dict:
+    for start in range(0, min(len(texts), warmup_batches * batch_size), batch_size):
+        predict_batch(texts[start:start + batch_size], tokenizer, model, device, pos_idx,
+                      batch_size=batch_size, max_len=max_len, show_progress=False)
+
+    batch_latencies = []
+    started = time.perf_counter()
+    for start in range(0, len(texts), batch_size):
+        t0 = time.perf_counter()
+        predict_batch(texts[start:start + batch_size], tokenizer, model, device, pos_idx,
+                      batch_size=batch_size, max_len=max_len, show_progress=False)
+        batch_latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "reviews": len(texts),
+        "elapsed_sec": round(elapsed, 4),
+        "reviews_per_sec": round(len(texts) / elapsed, 2) if elapsed > 0 else None,
+        "batch_latency_ms": {
+            "p50": percentile_ms(batch_latencies, 50),
+            "p99": percentile_ms(batch_latencies, 99),
+        },
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def _case_worker(
+    texts: list[str],
+    model_name: str,
+    backend: str,
+    n_threads: int,
+    max_len: int,
+    batch_size: int,
+) -> dict:
+    """새 프로세스 안에서: 모델 로드 → 백엔드 준비 → 측정 (ru_maxrss = 이 조합만의 최고치)"""
+    torch.set_num_threads(n_threads)
+    load_started = time.perf_counter()
+    tokenizer, model, device = load_model_and_tokenizer(model_name)
+    load_sec = time.perf_counter() - load_started
+    _, pos_idx = resolve_label_indices(model)
+    model, device = prepare_backend(model, device, backend)
+    ready_mb = peak_rss_mb()
+
+    result = run_case(texts, tokenizer, model, device, pos_idx, batch_size, max_len)
+    result["device"] = str(device)
+    result["model_load_sec"] = round(load_sec, 3)
+    result["peak_rss_before_run_mb"] = round(ready_mb, 1)  # 모델 로드 + 백엔드 준비까지
+    return result
+
+
+def _run_isolated(*args) -> dict:
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_case_worker, *args).result()
+
+
+def run_benchmark(
+    texts: list[str],
+    model_name: str,
+    batch_sizes: list[int],
+    max_lens: list[int],
+    threads: list[int],
+    backends: list[str],
+) -> dict:
+    lengths = np.array([len(text) for text in texts])
+    results = []
+    for backend in backends:
+        for n_threads in threads:
+            for max_len in max_lens:
+                for batch_size in batch_sizes:
+                    case = {
+                        "backend": backend,
+                        "threads": n_threads,
+                        "max_len": max_len,
+                        "batch_size": batch_size,
+                    }
+                    case.update(_run_isolated(texts, model_name, backend, n_threads, max_len, batch_size))
+                    print(
+                        f"[BENCH] {backend:8s} threads={n_threads:<3d} max_len={max_len:<4d} "
+                        f"batch={batch_size:<4d} → {case['reviews_per_sec']} reviews/s, "
+                        f"p50={case['batch_latency_ms']['p50']}ms p99={case['batch_latency_ms']['p99']}ms "
+                        f"peak={case['peak_rss_mb']}MB"
+                    )
+                    results.append(case)
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "model": model_name,
+        "model_load_sec": min((case["model_load_sec"] for case in results), default=None),
+        "environment": {
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "input": {
+            "reviews": len(texts),
+            "chars_p50": int(np.percentile(lengths, 50)),
+            "chars_p90": int(np.percentile(lengths, 90)),
+            "chars_max": int(lengths.max()),
+        },
+        "results": results,
+    }
+
+
+# ============================================================
+# main
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="감정분석 추론 벤치마크")
+    parser.add_argument("--input", type=Path, default=INPUT_PATH, help="리뷰 CSV (review_text 또는 content 컬럼)")
+    parser.add_argument("--sample-size", type=int, default=None, help="길이 분포를 유지한 채 재표본할 리뷰 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--model", default=None, help="모델 이름 또는 로컬 경로 (기본: MODEL_NAME)")
+    parser.add_argument("--tiny-model", action="store_true", help="로컬에서 생성한 소형 모델 사용 (오프라인)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 32, 48, 64])
+    parser.add_argument("--max-lens", type=int, nargs="+", default=[128])
+    parser.add_argument("--threads", type=int, nargs="+", default=[torch.get_num_threads()])
+    parser.add_argument("--backends", nargs="+", default=["eager"], choices=BACKENDS)
+    parser.add_argument("--output", type=Path, default=None, help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    texts = load_texts(args.input, args.sample_size, args.seed)
+    print(f"[INFO] 벤치마크 입력: {len(texts):,}건")
+
+    if args.tiny_model:
+        model_name = str(build_tiny_model(TINY_MODEL_DIR, texts))
+    else:
+        model_name = args.model or MODEL_NAME
+
+    report = run_benchmark(texts, model_name, args.batch_sizes, args.max_lens, args.threads, args.backends)
+
+    output = args.output or BENCH_DIR / f"sentiment_bench_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"[INFO] 벤치마크 결과 저장 → {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+희소 문서-단어 행렬 기반 특징어 분석
+- 입력: sentiment_out/reviews_with_sentiment.csv (+ tokens_str 있으면 그대로 사용)
+- 처리:
+    1) 토큰화된 리뷰로 scipy CSR 문서-단어 행렬을 한 번만 생성
+    2) TF-IDF (벡터 연산) → 슬라이스별 평균 TF-IDF (리뷰 안에서의 비중, 빈도 보조 지표)
+    3) 두 슬라이스(기본: 부정 vs 긍정) 간 log-odds ratio + informative Dirichlet prior
+       (Monroe et al., 2008 "Fightin' Words") → z-score 순으로 특징어 추출
+- 출력: 슬라이스별 특징어 표 (CSV)
+
+빈도 TOP 30과 달리 양쪽에 고르게 나오는 일반어는 z-score가 0 근처로 눌리므로
+불용어(text_normalization 의 domain 그룹)를 손으로 늘리지 않아도 된다.
+"""
+
+import argparse
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from term_frequency import CSV_PATH, NEG_VALUE, POS_VALUE, SENT_COL, TEXT_COL, tokenize_many
+
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+OUTPUT_PATH = BASE_DIR / "sentiment_out" / "distinguishing_terms.csv"
+
+TOKENS_COL = "tokens_str"
+
+
+# ===== 1. 문서-단어 행렬 =====
+def document_tokens(df: pd.DataFrame) -> list[list[str]]:
+    """tokens_str 컬럼이 있으면 그대로, 없으면 공용 토크나이저 사용"""
+    if TOKENS_COL in df.columns:
+        return [t.split() if isinstance(t, str) else [] for t in df[TOKENS_COL].tolist()]
+    return tokenize_many(df[TEXT_COL].tolist())
+
+
+def build_dtm(docs: list[list[str]], min_df: int = 1) -> tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    토큰 리스트 → CSR 행렬 (행: 리뷰, 열: 단어, 값: 빈도)
+    indptr/indices 배열을 한 번에 채운 뒤 sum_duplicates로 같은 단어를 합친다.
+    """
+    vocab: dict[str, int] = {}
+    indptr = np.zeros(len(docs) + 1, dtype=np.int64)
+    indices: list[int] = []
+    for row, tokens in enumerate(docs):
+        for token in tokens:
+            indices.append(vocab.setdefault(token, len(vocab)))
+        indptr[row + 1] = len(indices)
+
+    data = np.ones(len(indices), dtype=np.int32)
+    X = sparse.csr_matrix(
+        (data, np.asarray(indices, dtype=np.int64), indptr),
+        shape=(len(docs), len(vocab)),
+    )
+    X.sum_duplicates()
+    terms = np.empty(len(vocab), dtype=object)
+    for token, idx in vocab.items():
+        terms[idx] = token
+
+    if min_df > 1:
+        df_counts = np.diff(X.tocsc().indptr)
+        keep = np.flatnonzero(df_counts >= min_df)
+        X = X[:, keep]
+        terms = terms[keep]
+    return X.tocsr(), terms
+
+
+# ===== 2. 점수 =====
+def tfidf(X: sparse.csr_matrix, sublinear_tf: bool = True) -> sparse.csr_matrix:
+    """smooth idf + L2 정규화 TF-IDF (행렬 연산만 사용)"""
+    n_docs = X.shape[0]
+    df_counts = np.bincount(X.indices, minlength=X.shape[1])
+    idf = np.log((1 + n_docs) / (1 + df_counts)) + 1.0
+
+    W = X.astype(np.float64)
+    if sublinear_tf:
+        W.data = 1.0 + np.log(W.data)
+    W = W @ sparse.diags(idf)
+    norms = np.sqrt(np.asarray(W.multiply(W).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ W
+
+
+def log_odds_dirichlet(
+    X: sparse.csr_matrix,
+    mask_a: np.ndarray,
+    mask_b: np.ndarray,
+    prior_scale: Optional[float] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    슬라이스 A vs B log-odds ratio (informative Dirichlet prior = 전체 코퍼스 빈도)
+    반환: (delta, z-score) — z > 0 이면 A 쪽 특징어
+    """
+    y_all = np.asarray(X.sum(axis=0)).ravel().astype(np.float64)
+    y_a = np.asarray(X[mask_a].sum(axis=0)).ravel().astype(np.float64)
+    y_b = np.asarray(X[mask_b].sum(axis=0)).ravel().astype(np.float64)
+
+    # prior 총량은 기본적으로 어휘 수 (단어당 평균 1 pseudo-count)
+    a0 = float(prior_scale if prior_scale is not None else len(y_all))
+    alpha = a0 * y_all / max(y_all.sum(), 1.0)
+    alpha = np.maximum(alpha, 1e-9)
+
+    n_a, n_b = y_a.sum(), y_b.sum()
+    delta = (
+        np.log((y_a + alpha) / (n_a + a0 - y_a - alpha))
+        - np.log((y_b + alpha) / (n_b + a0 - y_b - alpha))
+    )
+    variance = 1.0 / (y_a + alpha) + 1.0 / (y_b + alpha)
+    return delta, delta / np.sqrt(variance)
+
+
+def distinguishing_terms(
+    X: sparse.csr_matrix,
+    terms: np.ndarray,
+    mask_a: np.ndarray,
+    mask_b: np.ndarray,
+    top_n: int = 30,
+) -> pd.DataFrame:
+    """양쪽 방향 상위 top_n 특징어 (z-score 내림차순 / 오름차순) + 슬라이스별 평균 TF-IDF"""
+    delta, z = log_odds_dirichlet(X, mask_a, mask_b)
+    count_a = np.asarray(X[mask_a].sum(axis=0)).ravel()
+    count_b = np.asarray(X[mask_b].sum(axis=0)).ravel()
+    W = tfidf(X)
+    tfidf_a = np.asarray(W[mask_a].mean(axis=0)).ravel() if mask_a.any() else np.zeros(X.shape[1])
+    tfidf_b = np.asarray(W[mask_b].mean(axis=0)).ravel() if mask_b.any() else np.zeros(X.shape[1])
+
+    order = np.argsort(z)
+    picks = np.concatenate([order[::-1][:top_n], order[:top_n]])
+    return pd.DataFrame({
+        "term": terms[picks],
+        "side": ["A"] * min(top_n, len(order)) + ["B"] * min(top_n, len(order)),
+        "z_score": z[picks],
+        "log_odds": delta[picks],
+        "count_a": count_a[picks],
+        "count_b": count_b[picks],
+        "tfidf_a": tfidf_a[picks],
+        "tfidf_b": tfidf_b[picks],
+    })
+
+
+def slice_mask(df: pd.DataFrame, **conditions) -> np.ndarray:
+    """slice_mask(df, Sentiment_label="부정", platform="googleplay") → bool 배열"""
+    mask = np.ones(len(df), dtype=bool)
+    for column, value in conditions.items():
+        mask &= (df[column].astype(str) == str(value)).to_numpy()
+    return mask
+
+
+def main():
+    parser = argparse.ArgumentParser(description="슬라이스 간 특징어 (log-odds, Dirichlet prior)")
+    parser.add_argument("--input", default=CSV_PATH)
+    parser.add_argument("--a", nargs="*", default=[f"{SENT_COL}={NEG_VALUE}"], help="슬라이스 A 조건 (col=value)")
+    parser.add_argument("--b", nargs="*", default=[f"{SENT_COL}={POS_VALUE}"], help="슬라이스 B 조건 (col=value)")
+    parser.add_argument("--top-n", type=int, default=30)
+    parser.add_argument("--min-df", type=int, default=2)
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input)
+    X, terms = build_dtm(document_tokens(df), min_df=args.min_df)
+    print(f"[INFO] 문서-단어 행렬: {X.shape[0]:,} × {X.shape[1]:,} (nnz={X.nnz:,})")
+
+    cond_a = dict(item.split("=", 1) for item in args.a)
+    cond_b = dict(item.split("=", 1) for item in args.b)
+    result = distinguishing_terms(X, terms, slice_mask(df, **cond_a), slice_mask(df, **cond_b), args.top_n)
+
+    print(f"\nA({cond_a}) 특징어:")
+    print(result[result["side"] == "A"].head(15).to_string(index=False))
+    print(f"\nB({cond_b}) 특징어:")
+    print(result[result["side"] == "B"].head(15).to_string(index=False))
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    result.to_csv(args.output, index=False, encoding="utf-8-sig")
+    print(f"\n[INFO] 특징어 저장 → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,503 @@
+# -*- coding: utf-8 -*-
+"""
+감정 드리프트 / 릴리스 이상 감지 (스트리밍, 메모리 상한 고정)
+- 입력: 감정분석이 끝난 리뷰 배치 (streaming_pipeline.py 의 페이지, 또는 리뷰 저장소의 바뀐 행)
+- 상태: (platform, country, version) 구간별 지수 감쇠 통계 — 리뷰 수와 상관없이 구간당 크기 고정
+    · Sentiment_score / rating : 감쇠 가중 합 S0, S1, S2 (평균·분산) + 유효 표본 수 S0² / Σw²
+    · 부정 비율                : 부정 라벨 지시변수의 감쇠 평균
+    · 부정 리뷰 상위 단어      : ngram_sketch.SpaceSaving (감쇠 시 count 를 같은 비율로 축소)
+    · (platform, country) 채널마다 버전 번호가 가장 높은 MAX_VERSIONS 개만 유지 (낮은 버전 구간은 제거)
+      크롤러는 최신 리뷰부터 주므로 도착 순서가 아니라 버전 번호(3.10.0 > 3.9.2)로 정렬
+- 감지: 채널에 새 version 이 나타나면 번호상 직전 버전을 기준선으로 두고, 새 버전의 유효 표본이
+        MIN_REVIEWS 이상이 된 배치부터 CHECK_UNTIL 까지 매 배치 검정
+    · 점수 / 별점 평균 : Welch z 검정 (양측)
+    · 부정 비율        : 두 비율 z 검정 (합동 비율)
+    · 부정 단어        : 단어 비중 증가 단측 z 검정 (후보 수로 Bonferroni 보정)
+  배치 갱신은 구간별 numpy 연산만 (과거 리뷰를 다시 읽지 않음)
+- 출력: 알림 → sentiment_out/drift_alerts.jsonl (한 줄에 하나) + 선택적으로 queue.Queue
+        상태 → sentiment_out/drift_state.json (다음 실행에서 이어서 갱신)
+
+사용 예)
+    python drift_detector.py                  # 리뷰 저장소에서 지난 실행 이후 점수가 바뀐 리뷰만 반영
+    python drift_detector.py --csv sentiment_out/reviews_with_sentiment.csv --reset
+"""
+
+import argparse
+import json
+import math
+import os
+import queue
+import re
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import instrumented, set_rows
+from ngram_sketch import SpaceSaving
+from term_frequency import NEG_VALUE, SENT_COL, TEXT_COL, tokenize_many
+
+# ===== 1. 설정 =====
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+STATE_PATH = BASE_DIR / "sentiment_out" / "drift_state.json"
+ALERTS_PATH = BASE_DIR / "sentiment_out" / "drift_alerts.jsonl"
+STORE_CONSUMER = "drift_detector"
+
+SCORE_COL = "Sentiment_score"
+RATING_COL = "rating"
+VERSION_COLS = ("version", "appVersion")
+TOKENS_COL = "tokens_str"
+
+HALF_LIFE_REVIEWS = 500     # 구간별 가중치가 절반이 되는 리뷰 수
+MAX_VERSIONS = 5            # 채널별로 유지하는 최근 버전 수
+TERM_K = 100                # 구간별 부정 단어 후보 수
+MIN_REVIEWS = 30            # 새 버전 검정을 시작하는 유효 표본 수
+CHECK_UNTIL = 1000          # 새 버전은 이 리뷰 수까지만 검정 (이후는 다음 버전의 기준선 후보)
+ALPHA = 1e-3                # 유의수준
+MIN_TERM_COUNT = 5          # 부정 단어 알림 최소 (감쇠) 빈도
+
+
+# ===== 2. 감쇠 통계 =====
+def _decay_weights(n: int, decay: float) -> np.ndarray:
+    """배치 안 i 번째 리뷰 가중치 decay^(n-1-i) (마지막 리뷰가 1)"""
+    return decay ** np.arange(n - 1, -1, -1, dtype=np.float64)
+
+
+class DecayedMoments:
+    """지수 감쇠 가중 평균 / 분산 / 유효 표본 수 (상수 메모리)"""
+
+    __slots__ = ("s0", "s1", "s2", "w2")
+
+    def __init__(self, s0: float = 0.0, s1: float = 0.0, s2: float = 0.0, w2: float = 0.0):
+        self.s0, self.s1, self.s2, self.w2 = s0, s1, s2, w2
+
+    def update(self, values: np.ndarray, weights: np.ndarray, carry: float):
+        """carry = decay^n (배치 이전 상태에 곱할 감쇠). NaN 값은 가중치 0"""
+        valid = ~np.isnan(values)
+        w = np.where(valid, weights, 0.0)
+        x = np.where(valid, values, 0.0)
+        self.s0 = carry * self.s0 + float(w.sum())
+        self.s1 = carry * self.s1 + float((w * x).sum())
+        self.s2 = carry * self.s2 + float((w * x * x).sum())
+        self.w2 = carry * carry * self.w2 + float((w * w).sum())
+
+    @property
+    def n_eff(self) -> float:
+        return self.s0 * self.s0 / self.w2 if self.w2 > 0 else 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.s1 / self.s0 if self.s0 > 0 else math.nan
+
+    @property
+    def var(self) -> float:
+        if self.s0 <= 0:
+            return math.nan
+        return max(self.s2 / self.s0 - self.mean ** 2, 0.0)
+
+    def to_list(self) -> list[float]:
+        return [self.s0, self.s1, self.s2, self.w2]
+
+
+class DecayedTerms(SpaceSaving):
+    """Space-Saving 상위 단어 + 지수 감쇠 (모든 count 를 같은 비율로 줄이므로 순위는 유지)"""
+
+    def __init__(self, k: int = TERM_K):
+        super().__init__(k)
+        self.total = 0.0
+
+    def decay(self, factor: float):
+        if factor == 1.0:
+            return
+        self.counts = {item: count * factor for item, count in self.counts.items()}
+        self.errors = {item: error * factor for item, error in self.errors.items()}
+        self._heap = [(count * factor, item) for count, item in self._heap]
+        self.total *= factor
+
+    def update_many(self, counts: Counter):
+        for item, count in counts.items():
+            self.update(item, count)
+        self.total += sum(counts.values())
+
+    def share(self, item: str) -> tuple[float, float]:
+        """(하한 count, 전체 count) — count - error 는 실제 빈도의 하한"""
+        return self.counts.get(item, 0.0) - self.errors.get(item, 0.0), self.total
+
+
+class SegmentStats:
+    """(platform, country, version) 한 구간의 감쇠 통계"""
+
+    def __init__(self, decay: float, term_k: int = TERM_K):
+        self.decay = decay
+        self.score = DecayedMoments()
+        self.rating = DecayedMoments()
+        self.negative = DecayedMoments()
+        self.terms = DecayedTerms(term_k)
+        self.n_seen = 0
+        self.alerted: list[str] = []
+
+    def update(self, scores: np.ndarray, ratings: np.ndarray, negative: np.ndarray, neg_terms: Counter):
+        n = len(scores)
+        weights = _decay_weights(n, self.decay)
+        carry = self.decay ** n
+        self.score.update(scores, weights, carry)
+        self.rating.update(ratings, weights, carry)
+        self.negative.update(negative, weights, carry)
+        # 단어는 배치 단위로 감쇠 (배치 안 순서는 무시)
+        self.terms.decay(carry)
+        self.terms.update_many(neg_terms)
+        self.n_seen += n
+
+    def to_dict(self) -> dict:
+        return {
+            "score": self.score.to_list(),
+            "rating": self.rating.to_list(),
+            "negative": self.negative.to_list(),
+            "terms": [self.terms.counts, self.terms.errors, self.terms.total],
+            "n_seen": self.n_seen,
+            "alerted": self.alerted,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, decay: float, term_k: int = TERM_K) -> "SegmentStats":
+        seg = cls(decay, term_k)
+        seg.score = DecayedMoments(*data["score"])
+        seg.rating = DecayedMoments(*data["rating"])
+        seg.negative = DecayedMoments(*data["negative"])
+        counts, errors, total = data["terms"]
+        seg.terms.counts, seg.terms.errors, seg.terms.total = dict(counts), dict(errors), total
+        seg.terms._heap = sorted((count, item) for item, count in seg.terms.counts.items())
+        seg.n_seen = data["n_seen"]
+        seg.alerted = list(data["alerted"])
+        return seg
+
+
+# ===== 3. 검정 =====
+def _p_two_sided(z: float) -> float:
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+def _p_greater(z: float) -> float:
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def welch_z(new: DecayedMoments, base: DecayedMoments) -> Optional[float]:
+    if new.n_eff < 2 or base.n_eff < 2:
+        return None
+    se = math.sqrt(new.var / new.n_eff + base.var / base.n_eff)
+    return (new.mean - base.mean) / se if se > 0 else None
+
+
+def proportion_z(new: DecayedMoments, base: DecayedMoments) -> Optional[float]:
+    n1, n0 = new.n_eff, base.n_eff
+    if n1 < 1 or n0 < 1:
+        return None
+    pooled = (new.mean * n1 + base.mean * n0) / (n1 + n0)
+    se = math.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n0))
+    return (new.mean - base.mean) / se if se > 0 else None
+
+
+def rising_terms(new: DecayedTerms, base: DecayedTerms, alpha: float = ALPHA,
+                 min_count: float = MIN_TERM_COUNT) -> list[dict]:
+    """새 버전 부정 리뷰에서 비중이 유의하게 늘어난 단어 (Space-Saving 하한 count 사용)"""
+    if new.total <= 0 or base.total <= 0 or not new.counts:
+        return []
+    threshold = alpha / len(new.counts)
+    out = []
+    for item, _, _ in new.top(new.k):
+        c1, n1 = new.share(item)
+        if c1 < min_count:
+            continue
+        # 기준선에서 후보 밖으로 밀려난 단어는 최소 count 이하였으므로 그 값을 상한으로 사용
+        c0 = base.counts.get(item, base.min_count())
+        p1, p0 = c1 / n1, c0 / base.total
+        pooled = (c1 + c0) / (n1 + base.total)
+        se = math.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / base.total))
+        if se <= 0:
+            continue
+        z = (p1 - p0) / se
+        if _p_greater(z) < threshold:
+            out.append({"term": item, "share": round(p1, 4), "baseline_share": round(p0, 4), "z": round(z, 2)})
+    return out
+
+
+# ===== 4. 감지기 =====
+_VERSION_NUMBER = re.compile(r"\d+")
+
+
+def version_key(version: str) -> tuple:
+    """"3.10.0" → ((3, 10, 0), "3.10.0") — 숫자 부분 비교, 숫자가 없는 버전은 가장 낮게"""
+    return tuple(int(part) for part in _VERSION_NUMBER.findall(version)), version
+
+
+def _version_series(df: pd.DataFrame) -> pd.Series:
+    version = pd.Series("", index=df.index, dtype="object")
+    for col in VERSION_COLS:
+        if col in df.columns:
+            values = df[col].fillna("").astype(str).str.strip()
+            version = version.where(version != "", values)
+    return version
+
+
+def _numeric(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+
+
+def _negative_terms(df: pd.DataFrame, negative: np.ndarray) -> Counter:
+    counts = Counter()
+    neg = df[negative > 0]
+    if TOKENS_COL in neg.columns:
+        for tokens in neg[TOKENS_COL].fillna("").astype(str):
+            counts.update(set(tokens.split()))
+    else:
+        text_col = TEXT_COL if TEXT_COL in neg.columns else "content"
+        for tokens in tokenize_many(neg[text_col].tolist()):
+            counts.update(set(tokens))
+    return counts
+
+
+class JsonlAlertSink:
+    """알림을 JSONL 파일에 한 줄씩 추가 (tail -f 로 확인 가능)"""
+
+    def __init__(self, path: Path = ALERTS_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def __call__(self, alert: dict):
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(alert, ensure_ascii=False) + "\n")
+
+
+class DriftDetector:
+    """
+    detector = DriftDetector(sinks=[JsonlAlertSink(), alert_queue.put])
+    alerts = detector.update(scored_df)   # 배치마다 호출
+    detector.save()
+    """
+
+    def __init__(
+        self,
+        half_life: float = HALF_LIFE_REVIEWS,
+        max_versions: int = MAX_VERSIONS,
+        term_k: int = TERM_K,
+        sinks: Optional[Iterable[Callable[[dict], None]]] = None,
+    ):
+        self.half_life = half_life
+        self.decay = 0.5 ** (1.0 / half_life)
+        self.max_versions = max_versions
+        self.term_k = term_k
+        self.sinks = list(sinks) if sinks is not None else [JsonlAlertSink()]
+        # (platform, country) → 버전 번호 오름차순 목록 / 구간 통계
+        self.versions: dict[tuple[str, str], list[str]] = {}
+        self.segments: dict[tuple[str, str, str], SegmentStats] = {}
+        self.last_update_ms = 0.0
+
+    def _segment(self, platform: str, country: str, version: str) -> Optional[SegmentStats]:
+        """
+        구간 통계 (없으면 생성). 채널이 꽉 찼는데 유지 중인 버전보다 번호가 낮은 버전
+        (이미 제거된 예전 버전의 늦게 도착한 리뷰 등) 이면 None → 반영하지 않음
+        """
+        key = (platform, country, version)
+        if key not in self.segments:
+            if version:
+                history = self.versions.setdefault((platform, country), [])
+                if len(history) >= self.max_versions and version_key(version) < version_key(history[0]):
+                    return None
+                history.append(version)
+                history.sort(key=version_key)
+                for old in history[:-self.max_versions]:
+                    self.segments.pop((platform, country, old), None)
+                del history[:-self.max_versions]
+            self.segments[key] = SegmentStats(self.decay, self.term_k)
+        return self.segments[key]
+
+    def _baseline(self, platform: str, country: str, version: str) -> Optional[SegmentStats]:
+        """같은 채널에서 번호상 version 바로 아래인, 표본이 충분한 버전"""
+        history = self.versions.get((platform, country), [])
+        if version not in history:
+            return None
+        for prev in reversed(history[:history.index(version)]):
+            seg = self.segments.get((platform, country, prev))
+            if seg is not None and seg.score.n_eff >= MIN_REVIEWS:
+                return seg
+        return None
+
+    def update(self, df: pd.DataFrame) -> list[dict]:
+        """점수가 붙은 리뷰 배치 반영 → 이번 배치에서 새로 발생한 알림"""
+        started = time.perf_counter()
+        if df.empty or SENT_COL not in df.columns:
+            return []
+        df = df[df[SENT_COL].notna()]
+        frame = pd.DataFrame({
+            "platform": df["platform"].fillna("").astype(str) if "platform" in df.columns else "",
+            "country": df["country"].fillna("").astype(str) if "country" in df.columns else "",
+            "version": _version_series(df),
+        }, index=df.index)
+        scores = _numeric(df, SCORE_COL)
+        ratings = _numeric(df, RATING_COL)
+        negative = (df[SENT_COL].astype(str) == NEG_VALUE).to_numpy(dtype=np.float64)
+
+        alerts = []
+        for (platform, country, version), idx in frame.groupby(["platform", "country", "version"], sort=False).indices.items():
+            seg = self._segment(platform, country, version)
+            if seg is None:
+                continue
+            seg.update(scores[idx], ratings[idx], negative[idx], _negative_terms(df.iloc[idx], negative[idx]))
+            if version:
+                alerts += self._check(platform, country, version, seg)
+
+        for alert in alerts:
+            for sink in self.sinks:
+                sink(alert)
+        self.last_update_ms = (time.perf_counter() - started) * 1000
+        return alerts
+
+    def _check(self, platform: str, country: str, version: str, seg: SegmentStats) -> list[dict]:
+        if seg.score.n_eff < MIN_REVIEWS or seg.n_seen > CHECK_UNTIL:
+            return []
+        base = self._baseline(platform, country, version)
+        if base is None:
+            return []
+
+        history = self.versions[(platform, country)]
+        baseline_version = next(v for v in history if self.segments.get((platform, country, v)) is base)
+        found = []
+        for metric, new_stats, base_stats, test in (
+            ("sentiment_score", seg.score, base.score, welch_z),
+            ("rating", seg.rating, base.rating, welch_z),
+            ("negative_rate", seg.negative, base.negative, proportion_z),
+        ):
+            if metric in seg.alerted:
+                continue
+            z = test(new_stats, base_stats)
+            if z is None or _p_two_sided(z) >= ALPHA:
+                continue
+            found.append({
+                "metric": metric,
+                "value": round(new_stats.mean, 4),
+                "baseline": round(base_stats.mean, 4),
+                "z": round(z, 2),
+                "p_value": _p_two_sided(z),
+            })
+
+        terms = [t for t in rising_terms(seg.terms, base.terms) if f"term:{t['term']}" not in seg.alerted]
+        if terms:
+            found.append({"metric": "negative_terms", "terms": terms})
+
+        alerts = []
+        for item in found:
+            seg.alerted += [f"term:{t['term']}" for t in item["terms"]] if item["metric"] == "negative_terms" else [item["metric"]]
+            alerts.append({
+                "detected_at": datetime.now().isoformat(timespec="seconds"),
+                "platform": platform,
+                "country": country,
+                "version": version,
+                "baseline_version": baseline_version,
+                "n_eff": round(seg.score.n_eff, 1),
+                "baseline_n_eff": round(base.score.n_eff, 1),
+                **item,
+            })
+        return alerts
+
+    # ----- 저장 / 로드 -----
+    def save(self, path: Path = STATE_PATH, cursor: Optional[int] = None):
+        state = {
+            "half_life": self.half_life,
+            "max_versions": self.max_versions,
+            "term_k": self.term_k,
+            "store_cursor": cursor,
+            "versions": [[platform, country, history] for (platform, country), history in self.versions.items()],
+            "segments": [[*key, seg.to_dict()] for key, seg in self.segments.items()],
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(path)
+        print(f"[INFO] 드리프트 상태 저장 → {path} (구간 {len(self.segments):,}개)")
+
+    @classmethod
+    def load(cls, path: Path = STATE_PATH, sinks: Optional[Iterable[Callable[[dict], None]]] = None) -> "DriftDetector":
+        """저장된 상태가 없으면 새 감지기"""
+        if not path.exists():
+            return cls(sinks=sinks)
+        state = json.loads(path.read_text(encoding="utf-8"))
+        detector = cls(state["half_life"], state["max_versions"], state["term_k"], sinks=sinks)
+        # 예전 상태 파일은 도착 순서로 저장됐으므로 버전 번호 순으로 다시 정렬
+        detector.versions = {(platform, country): sorted(history, key=version_key)
+                             for platform, country, history in state["versions"]}
+        for platform, country, version, data in state["segments"]:
+            detector.segments[(platform, country, version)] = SegmentStats.from_dict(data, detector.decay, detector.term_k)
+        return detector
+
+
+# ===== 5. 실행 =====
+def consume_store(detector: DriftDetector, reset: bool = False) -> int:
+    """리뷰 저장소에서 이 감지기가 마지막으로 읽은 뒤 감정 라벨이 붙거나 바뀐 리뷰만 반영"""
+    from review_store import commit_cursor, connect, read_changes
+
+    conn = connect()
+    try:
+        if reset:
+            commit_cursor(conn, STORE_CONSUMER, 0)
+        changes, upto = read_changes(conn, STORE_CONSUMER)
+        changes = changes[changes[SENT_COL].notna()]
+        detector.update(changes)
+        commit_cursor(conn, STORE_CONSUMER, upto)
+    finally:
+        conn.close()
+    print(f"[INFO] 리뷰 저장소 변경분 {len(changes):,}건 반영 ({detector.last_update_ms:.1f}ms)")
+    return len(changes)
+
+
+def mark_store_consumed(conn) -> int:
+    """streaming_pipeline.py 처럼 페이지를 직접 반영한 경우 저장소 커서를 최신으로 (중복 반영 방지)"""
+    from review_store import commit_cursor, latest_version
+
+    version = latest_version(conn)
+    commit_cursor(conn, STORE_CONSUMER, version)
+    return version
+
+
+@instrumented("drift")
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="감정 드리프트 / 릴리스 이상 감지")
+    parser.add_argument("--csv", type=Path, default=None, help="저장소 대신 점수 CSV 를 배치로 흘려보냄")
+    parser.add_argument("--batch-rows", type=int, default=500)
+    parser.add_argument("--reset", action="store_true", help="저장된 상태를 버리고 처음부터")
+    args = parser.parse_args(argv)
+
+    alert_queue: "queue.Queue[dict]" = queue.Queue()
+    sinks = [JsonlAlertSink(), alert_queue.put]
+    detector = DriftDetector(sinks=sinks) if args.reset else DriftDetector.load(sinks=sinks)
+
+    if args.csv:
+        elapsed, rows = [], 0
+        for chunk in pd.read_csv(args.csv, chunksize=args.batch_rows, dtype={"version": str, "appVersion": str}):
+            detector.update(chunk)
+            elapsed.append(detector.last_update_ms)
+            rows += len(chunk)
+        if elapsed:
+            print(f"[INFO] 배치 {len(elapsed):,}개, 배치당 평균 {np.mean(elapsed):.1f}ms / 최대 {np.max(elapsed):.1f}ms")
+    else:
+        rows = consume_store(detector, reset=args.reset)
+    detector.save()
+    # 출력 행 = 새 알림 수
+    set_rows(rows_in=rows, rows_out=alert_queue.qsize())
+
+    if alert_queue.empty():
+        print("✓ 새 알림 없음")
+    while not alert_queue.empty():
+        alert = alert_queue.get()
+        print(f"⚠️ [{alert['platform']}/{alert['country']}] {alert['baseline_version']} → {alert['version']}: "
+              f"{alert['metric']} {json.dumps({k: v for k, v in alert.items() if k in ('value', 'baseline', 'z', 'terms')}, ensure_ascii=False)}")
+    print(f"[INFO] 알림 기록 → {ALERTS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+감정분석 성능 평가 (벡터화 + 부트스트랩 신뢰구간)
+- 입력: 정답(true_label)이 채워진 라벨링 파일 + 예측 컬럼 1개 이상 (pred_label, Sentiment_label, pred_* ...)
+- 처리:
+    1) 라벨 표기 통일: 긍정/부정, POS/NEG, positive/negative, 1/0 → 긍정 / 부정
+    2) 지표: accuracy, precision / recall / F1 (부정 = 양성 클래스), macro F1
+       예측이 없는 행(빈 값 / 미분석)은 오답으로 계산하고 모델별 개수를 n_missing 으로 보고
+    3) 부트스트랩 신뢰구간: (n_boot × n) 인덱스 행렬 한 번으로 모든 재표본 지표를 계산 (파이썬 루프 없음)
+    4) 슬라이스: 전체 / platform / country / 리뷰 길이 구간
+       불확실성 샘플(selection == "uncertainty", 0.5 근처로 골라 지표가 낮게 편향)은 대표 지표에서 빼고
+       subset="uncertainty" 로 따로 보고
+    5) 여러 모델·백엔드 예측을 같은 재표본 인덱스로 비교 → F1 차이의 신뢰구간
+- 출력: sentiment_out/eval_report.csv
+
+사용 예)
+    python evaluation.py --pred pred_label pred_int8 --n-boot 5000
+"""
+
+import argparse
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from keyword_trends import review_key
+from term_frequency import NEG_VALUE, POS_VALUE, SENT_COL, TEXT_COL
+
+# ===== 1. 설정 =====
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+LABELING_PATH = BASE_DIR / "reviews_for_labeling.csv"
+REPORT_PATH = BASE_DIR / "sentiment_out" / "eval_report.csv"
+
+TRUE_COL = "true_label"
+PRED_COLS = ("pred_label", SENT_COL)
+SLICE_COLS = ("platform", "country", "length_bucket")
+LENGTH_BINS = (0, 20, 50, 100, 200, np.inf)
+LENGTH_LABELS = ("~20자", "20~50자", "50~100자", "100~200자", "200자~")
+
+N_BOOT = 2000
+CI_LEVEL = 0.95
+BOOT_CHUNK = 500            # 인덱스 행렬을 이 개수의 재표본씩 나눠 메모리 제한
+MIN_SLICE_SIZE = 20
+
+LABEL_ALIASES = {
+    POS_VALUE: POS_VALUE, "pos": POS_VALUE, "positive": POS_VALUE, "1": POS_VALUE, "p": POS_VALUE,
+    NEG_VALUE: NEG_VALUE, "neg": NEG_VALUE, "negative": NEG_VALUE, "0": NEG_VALUE, "n": NEG_VALUE,
+}
+METRICS = ("accuracy", "precision", "recall", "f1", "macro_f1")
+REPORT_COLS = ["subset", "model", "slice", "value", "n", "n_missing", "metric", "score", "ci_low", "ci_high"]
+
+# labeling_sampler 의 후보 선정 방식 컬럼 (uncertainty 행은 모델이 헷갈리는 리뷰만 모은 것 → 추정용 아님)
+SELECTION_COL = "selection"
+UNCERTAINTY_SELECTION = "uncertainty"
+ESTIMATE_SUBSET = "estimate"
+
+
+# ===== 2. 라벨 정리 =====
+def normalize_labels(values) -> np.ndarray:
+    """여러 표기를 긍정 / 부정으로 통일, 알 수 없는 값은 빈 문자열"""
+    series = pd.Series(values).astype(str).str.strip()
+    lowered = series.str.lower()
+    mapped = lowered.map(LABEL_ALIASES)
+    mapped = mapped.fillna(series.map(LABEL_ALIASES))
+    return mapped.fillna("").to_numpy(dtype=object)
+
+
+def split_by_selection(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(지표 추정용 행, 불확실성 샘플 행) — selection 컬럼이 없으면 전부 추정용"""
+    if SELECTION_COL not in df.columns:
+        return df, df.iloc[:0]
+    uncertain = (df[SELECTION_COL].fillna("").astype(str) == UNCERTAINTY_SELECTION).to_numpy()
+    return df[~uncertain], df[uncertain]
+
+
+def add_length_bucket(df: pd.DataFrame) -> pd.DataFrame:
+    lengths = df[TEXT_COL].fillna("").astype(str).str.len() if TEXT_COL in df.columns else pd.Series(0, index=df.index)
+    df["length_bucket"] = pd.cut(lengths, bins=LENGTH_BINS, labels=LENGTH_LABELS, right=False).astype(str)
+    return df
+
+
+# ===== 3. 벡터화 지표 =====
+def _metrics_from_counts(tp, fp, fn, tn) -> dict[str, np.ndarray]:
+    """혼동행렬 칸(스칼라 또는 배열) → 지표. 분모 0은 0으로 처리"""
+    tp, fp, fn, tn = (np.asarray(x, dtype=np.float64) for x in (tp, fp, fn, tn))
+
+    def ratio(a, b):
+        return np.divide(a, b, out=np.zeros_like(a), where=b > 0)
+
+    precision = ratio(tp, tp + fp)
+    recall = ratio(tp, tp + fn)
+    f1 = ratio(2 * tp, 2 * tp + fp + fn)
+    f1_pos = ratio(2 * tn, 2 * tn + fn + fp)  # 긍정 클래스 F1 (macro 용)
+    return {
+        "accuracy": ratio(tp + tn, tp + fp + fn + tn),
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "macro_f1": (f1 + f1_pos) / 2,
+    }
+
+
+def _outcome_codes(y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    """
+    0=TN, 1=FP, 2=FN, 3=TP (부정 = 양성)
+    예측이 없는 행("" — 미분석 등)은 정답의 반대 라벨로 간주해 오답(FP / FN) 처리
+    (빼고 계산하면 모델마다 평가 행이 달라져 짝지은 비교가 깨지고, 긍정으로 세면 점수가 부풀려짐)
+    """
+    true_neg = y_true == NEG_VALUE
+    pred_neg = np.where(y_pred == "", ~true_neg, y_pred == NEG_VALUE)
+    return true_neg.astype(np.int8) * 2 + pred_neg.astype(np.int8)
+
+
+def point_metrics(codes: np.ndarray) -> dict[str, float]:
+    tn, fp, fn, tp = np.bincount(codes, minlength=4)
+    return {k: float(v) for k, v in _metrics_from_counts(tp, fp, fn, tn).items()}
+
+
+def bootstrap_index(n: int, n_boot: int = N_BOOT, seed: int = 42) -> np.ndarray:
+    """(n_boot, n) 재표본 인덱스 행렬 — 모델끼리 같은 행렬을 공유해 짝지은 비교"""
+    return np.random.default_rng(seed).integers(0, n, size=(n_boot, n), dtype=np.int32)
+
+
+def bootstrap_metrics(codes: np.ndarray, index: np.ndarray) -> dict[str, np.ndarray]:
+    """재표본별 지표 배열 (길이 n_boot). 혼동행렬 칸 수는 (codes[index] == k).sum(axis=1)"""
+    counts = np.empty((4, len(index)), dtype=np.int64)
+    for start in range(0, len(index), BOOT_CHUNK):
+        sample = codes[index[start:start + BOOT_CHUNK]]
+        for k in range(4):
+            counts[k, start:start + len(sample)] = (sample == k).sum(axis=1)
+    tn, fp, fn, tp = counts
+    return _metrics_from_counts(tp, fp, fn, tn)
+
+
+def confidence_interval(samples: np.ndarray, level: float = CI_LEVEL) -> tuple[float, float]:
+    alpha = (1 - level) / 2
+    low, high = np.quantile(samples, [alpha, 1 - alpha])
+    return float(low), float(high)
+
+
+# ===== 4. 보고서 =====
+def evaluate_frame(
+    df: pd.DataFrame,
+    pred_cols: list[str],
+    true_col: str = TRUE_COL,
+    slice_cols: tuple[str, ...] = SLICE_COLS,
+    n_boot: int = N_BOOT,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """
+    모델(예측 컬럼) × 슬라이스 × 지표별 점추정 + 신뢰구간
+    첫 번째 예측 컬럼을 기준으로 나머지 모델의 F1 차이(짝지은 부트스트랩)도 함께 계산
+    """
+    df = add_length_bucket(df.copy())
+    y_true = normalize_labels(df[true_col])
+    labeled = y_true != ""
+    df, y_true = df.loc[labeled].reset_index(drop=True), y_true[labeled]
+    preds = {col: normalize_labels(df[col]) for col in pred_cols}
+
+    if df.empty:
+        return pd.DataFrame(columns=REPORT_COLS[1:])
+
+    slices = [("전체", "전체", np.ones(len(df), dtype=bool))]
+    for col in slice_cols:
+        if col not in df.columns:
+            continue
+        values = df[col].fillna("").astype(str)
+        for value in sorted(values.unique()):
+            mask = (values == value).to_numpy()
+            if mask.sum() >= MIN_SLICE_SIZE:
+                slices.append((col, value, mask))
+
+    rows = []
+    for slice_col, slice_value, mask in slices:
+        n = int(mask.sum())
+        index = bootstrap_index(n, n_boot, seed)
+        base_boot = None
+        for i, col in enumerate(pred_cols):
+            codes = _outcome_codes(y_true[mask], preds[col][mask])
+            n_missing = int((preds[col][mask] == "").sum())
+            point = point_metrics(codes)
+            boot = bootstrap_metrics(codes, index)
+            for metric in METRICS:
+                low, high = confidence_interval(boot[metric])
+                rows.append((col, slice_col, slice_value, n, n_missing, metric, point[metric], low, high))
+            if i == 0:
+                base_boot, base_point = boot, point
+            else:
+                diff = boot["f1"] - base_boot["f1"]
+                low, high = confidence_interval(diff)
+                rows.append((col, slice_col, slice_value, n, n_missing, f"f1_diff_vs_{pred_cols[0]}",
+                             point["f1"] - base_point["f1"], low, high))
+
+    return pd.DataFrame(rows, columns=REPORT_COLS[1:])
+
+
+def attach_predictions(gold: pd.DataFrame, path: Path, name: str, label_col: str = SENT_COL) -> pd.DataFrame:
+    """다른 모델/백엔드 결과 CSV의 라벨을 리뷰 키 기준으로 붙임 → pred_<name> 컬럼"""
+    other = pd.read_csv(path)
+    labels = dict(zip((review_key(row) for row in other.to_dict("records")), other[label_col]))
+    gold = gold.copy()
+    gold[f"pred_{name}"] = [labels.get(review_key(row), "") for row in gold.to_dict("records")]
+    return gold
+
+
+def default_pred_cols(df: pd.DataFrame) -> list[str]:
+    cols = [col for col in PRED_COLS if col in df.columns]
+    cols += [col for col in df.columns if col.startswith("pred_") and col not in cols]
+    return cols
+
+
+def print_report(report: pd.DataFrame, slice_name: str = "전체"):
+    view = report[report["slice"] == slice_name].copy()
+    view["result"] = view.apply(lambda r: f"{r.score:.3f} [{r.ci_low:.3f}, {r.ci_high:.3f}]", axis=1)
+    print(view.pivot_table(index=["value", "metric"], columns="model", values="result", aggfunc="first").to_string())
+
+
+def run_report(
+    labeling_path: Path = LABELING_PATH,
+    pred_cols: Optional[list[str]] = None,
+    extra: Optional[dict[str, Path]] = None,
+    n_boot: int = N_BOOT,
+    output_path: Path = REPORT_PATH,
+) -> pd.DataFrame:
+    df = pd.read_csv(labeling_path)
+    for name, path in (extra or {}).items():
+        df = attach_predictions(df, Path(path), name)
+    pred_cols = pred_cols or default_pred_cols(df)
+    if not pred_cols:
+        raise ValueError(f"예측 컬럼이 없습니다: {', '.join(PRED_COLS)} 또는 pred_* 컬럼이 필요합니다.")
+
+    estimate, uncertain = split_by_selection(df)
+    report = evaluate_frame(estimate, pred_cols, n_boot=n_boot)
+    report.insert(0, "subset", ESTIMATE_SUBSET)
+    # 불확실성 샘플은 전체 지표만 (슬라이스로 나누면 표본이 너무 작음)
+    uncertain_report = evaluate_frame(uncertain, pred_cols, slice_cols=(), n_boot=n_boot)
+    uncertain_report.insert(0, "subset", UNCERTAINTY_SELECTION)
+
+    overall = report[report["slice"] == "전체"]
+    if overall.empty:
+        print("⚠️ 지표 추정용(불확실성 샘플 제외) 정답 라벨이 없습니다 → 층화 샘플에 라벨을 채워 주세요.")
+    else:
+        print(f"[INFO] 평가 대상: {int(overall['n'].iloc[0]):,}건 (불확실성 샘플 {len(uncertain):,}건 제외),"
+              f" 모델: {', '.join(pred_cols)}")
+    for model, n_missing in overall.groupby("model", sort=False)["n_missing"].first().items():
+        if n_missing:
+            print(f"⚠️ {model}: 예측 없음(빈 값 / 미분석) {int(n_missing):,}건 → 오답으로 계산")
+    for slice_name in ("전체",) + SLICE_COLS:
+        if (report["slice"] == slice_name).any():
+            print(f"\n=== {slice_name} ===")
+            print_report(report, slice_name)
+    if not uncertain_report.empty:
+        print("\n=== 불확실성 샘플 (참고용, 점수 0.5 근처로 골라 대표 지표보다 낮게 나옴) ===")
+        print_report(uncertain_report)
+    report = pd.concat([report, uncertain_report], ignore_index=True)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    report.to_csv(output_path, index=False, encoding="utf-8-sig")
+    print(f"\n[INFO] 평가 보고서 저장 → {output_path}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="감정분석 평가 (부트스트랩 신뢰구간 + 슬라이스)")
+    parser.add_argument("--input", type=Path, default=LABELING_PATH)
+    parser.add_argument("--pred", nargs="*", default=None, help="비교할 예측 컬럼 (기본: pred_label / Sentiment_label / pred_*)")
+    parser.add_argument("--extra", nargs="*", default=[], help="추가 모델 결과 name=csv경로 (리뷰 키로 결합)")
+    parser.add_argument("--n-boot", type=int, default=N_BOOT)
+    parser.add_argument("--output", type=Path, default=REPORT_PATH)
+    args = parser.parse_args()
+
+    extra = dict(item.split("=", 1) for item in args.extra)
+    run_report(args.input, args.pred, extra, args.n_boot, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+단계별 성능 계측 (모든 단계 공용)
+- track_stage("이름") 컨텍스트 / @instrumented("이름") 데코레이터로 감싸면 기록:
+    · wall / CPU 시간, 입력·출력 행 수, 초당 행 수
+    · peak RSS (프로세스 최대 상주 메모리), 단계 동안 늘어난 peak RSS
+    · tracemalloc 상위 할당 위치 (VREW_TRACEMALLOC=1 일 때만, 오버헤드 큼)
+    · 카운터: 크롤러 요청 수 / 오류 수 / 수신 바이트 등 (count("requests") 형태로 누적)
+- 가장 바깥 단계가 끝날 때마다 실행 보고서 갱신 (보고서 저장 실패는 경고만, 단계 결과에 영향 없음)
+    · JSON: BASE_DIR/perf/run_<시각>_<pid>.json (+ latest.json)
+    · fork 된 작업자 프로세스는 부모의 단계 기록을 물려받지 않고 자기 단계만 자기 run ID 로 기록
+    · Prometheus textfile: VREW_PROM_TEXTFILE 경로가 있으면 node_exporter textfile 형식으로 기록
+- cProfile: VREW_PROFILE_STAGE=<단계 이름> 이면 해당 단계만 BASE_DIR/perf/<단계>_<시각>.prof 로 덤프
+
+사용 예)
+    from instrumentation import count, instrumented, set_rows, track_stage
+
+    @instrumented("preprocess")
+    def main():
+        ...
+        set_rows(rows_in=len(df))
+        with track_stage("tokenize", rows_in=len(df)) as stage:
+            ...
+            stage.rows_out = len(tokens)
+"""
+
+import functools
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+# ===== 1. 설정 =====
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+PERF_DIR = BASE_DIR / "perf"
+
+TRACEMALLOC_ENABLED = os.environ.get("VREW_TRACEMALLOC", "") == "1"
+PROFILE_STAGE = os.environ.get("VREW_PROFILE_STAGE", "")
+PROM_TEXTFILE = os.environ.get("VREW_PROM_TEXTFILE", "")
+TRACEMALLOC_TOP = 10
+
+
+@dataclass
+class StageMetrics:
+    name: str
+    parent: Optional[str] = None
+    started_at: str = ""
+    wall_sec: float = 0.0
+    cpu_sec: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    rows_per_sec: Optional[float] = None
+    peak_rss_mb: float = 0.0
+    rss_growth_mb: float = 0.0
+    status: str = "ok"
+    counters: dict = field(default_factory=dict)
+    top_allocations: list = field(default_factory=list)
+
+
+# 실행(프로세스) 단위 수집기 — fork 로 복사된 상태는 _own_state() 가 pid 를 보고 비움
+_PID = os.getpid()
+_RUN_ID: Optional[str] = None
+_STAGES: list[StageMetrics] = []
+_STACK: list[StageMetrics] = []
+
+
+def _own_state():
+    """fork 된 자식 프로세스면 부모에게서 복사된 단계 기록 / run ID 를 버림"""
+    global _PID, _RUN_ID
+    if os.getpid() != _PID:
+        _PID, _RUN_ID = os.getpid(), None
+        _STAGES.clear()
+        _STACK.clear()
+
+
+def run_id() -> str:
+    """보고서를 쓰는 프로세스 기준 run ID (처음 필요할 때 정함)"""
+    global _RUN_ID
+    _own_state()
+    if _RUN_ID is None:
+        _RUN_ID = f"{datetime.now():%Y%m%d_%H%M%S}_{os.getpid()}"
+    return _RUN_ID
+
+
+# ===== 2. 측정 도구 =====
+def peak_rss_mb() -> float:
+    """프로세스 최대 RSS (Linux: KB, macOS: bytes 단위 보정)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 ** 2) if sys.platform == "darwin" else peak / 1024
+
+
+def _cpu_seconds() -> float:
+    """현재 프로세스 + 종료된 자식 프로세스(프로세스 풀 작업자) CPU 시간"""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def current_stage() -> Optional[StageMetrics]:
+    _own_state()
+    return _STACK[-1] if _STACK else None
+
+
+def set_rows(rows_in: Optional[int] = None, rows_out: Optional[int] = None):
+    """진행 중인 단계의 입력/출력 행 수 기록"""
+    stage = current_stage()
+    if stage is None:
+        return
+    if rows_in is not None:
+        stage.rows_in = int(rows_in)
+    if rows_out is not None:
+        stage.rows_out = int(rows_out)
+
+
+def count(name: str, value: float = 1):
+    """진행 중인 단계(와 바깥 단계들)의 카운터 누적 — 예) count("requests"), count("bytes", len(body))"""
+    _own_state()
+    for stage in _STACK:
+        stage.counters[name] = stage.counters.get(name, 0) + value
+
+
+@contextmanager
+def track_stage(name: str, rows_in: Optional[int] = None, rows_out: Optional[int] = None):
+    parent = current_stage()
+    stage = StageMetrics(
+        name=name,
+        parent=parent.name if parent else None,
+        started_at=datetime.now().isoformat(timespec="seconds"),
+        rows_in=rows_in,
+        rows_out=rows_out,
+    )
+    _STACK.append(stage)
+
+    profiler = None
+    if PROFILE_STAGE == name:
+        import cProfile
+
+        profiler = cProfile.Profile()
+    own_tracemalloc = TRACEMALLOC_ENABLED and not tracemalloc.is_tracing()
+    if own_tracemalloc:
+        tracemalloc.start(5)
+
+    rss_before = peak_rss_mb()
+    wall_start, cpu_start = time.perf_counter(), _cpu_seconds()
+    if profiler:
+        profiler.enable()
+    try:
+        yield stage
+    except BaseException:
+        stage.status = "error"
+        raise
+    finally:
+        if profiler:
+            profiler.disable()
+        stage.wall_sec = round(time.perf_counter() - wall_start, 4)
+        stage.cpu_sec = round(_cpu_seconds() - cpu_start, 4)
+        stage.peak_rss_mb = round(peak_rss_mb(), 1)
+        stage.rss_growth_mb = round(stage.peak_rss_mb - rss_before, 1)
+        rows = stage.rows_out if stage.rows_out is not None else stage.rows_in
+        if rows and stage.wall_sec > 0:
+            stage.rows_per_sec = round(rows / stage.wall_sec, 1)
+
+        if TRACEMALLOC_ENABLED and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            stage.top_allocations = [
+                {"where": str(stat.traceback[0]), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:TRACEMALLOC_TOP]
+            ]
+            if own_tracemalloc:
+                tracemalloc.stop()
+        if profiler:
+            PERF_DIR.mkdir(parents=True, exist_ok=True)
+            prof_path = PERF_DIR / f"{name}_{datetime.now():%Y%m%d_%H%M%S}.prof"
+            profiler.dump_stats(prof_path)
+            print(f"[PERF] cProfile 저장 → {prof_path}")
+
+        _STACK.pop()
+        _STAGES.append(stage)
+        print(
+            f"[PERF] {name}: wall {stage.wall_sec:.2f}s, cpu {stage.cpu_sec:.2f}s, "
+            f"rows {stage.rows_in}→{stage.rows_out}, peak RSS {stage.peak_rss_mb:.0f}MB"
+        )
+        if not _STACK:
+            try:
+                write_report()
+            except Exception as exc:  # 보고서 저장 실패가 단계 예외를 가리거나 결과를 망치지 않도록
+                print(f"⚠️ [PERF] 실행 보고서 저장 실패: {exc}")
+
+
+def instrumented(name: str):
+    """main() 같은 단계 진입 함수를 track_stage 로 감싸는 데코레이터"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track_stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ===== 3. 보고서 =====
+def run_report() -> dict:
+    return {
+        "run_id": run_id(),
+        "pid": os.getpid(),
+        "argv": sys.argv,
+        "written_at": datetime.now().isoformat(timespec="seconds"),
+        "stages": [asdict(stage) for stage in _STAGES],
+    }
+
+
+def _prom_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def prometheus_text(report: dict) -> str:
+    """node_exporter textfile collector 형식 (단계별 마지막 측정값)"""
+    gauges = {
+        "vrew_stage_wall_seconds": ("wall_sec", "단계 wall-clock 시간"),
+        "vrew_stage_cpu_seconds": ("cpu_sec", "단계 CPU 시간"),
+        "vrew_stage_rows_in": ("rows_in", "입력 행 수"),
+        "vrew_stage_rows_out": ("rows_out", "출력 행 수"),
+        "vrew_stage_rows_per_second": ("rows_per_sec", "초당 처리 행 수"),
+        "vrew_stage_peak_rss_megabytes": ("peak_rss_mb", "프로세스 최대 RSS"),
+    }
+    latest = {stage["name"]: stage for stage in report["stages"]}
+    lines = []
+    for metric, (key, help_text) in gauges.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} gauge")
+        for name, stage in latest.items():
+            if stage[key] is not None:
+                lines.append(f'{metric}{{stage="{_prom_escape(name)}"}} {stage[key]}')
+    lines.append("# HELP vrew_stage_counter 단계별 카운터 (요청 수, 바이트 등)")
+    lines.append("# TYPE vrew_stage_counter gauge")
+    for name, stage in latest.items():
+        for counter, value in stage["counters"].items():
+            lines.append(f'vrew_stage_counter{{stage="{_prom_escape(name)}",counter="{_prom_escape(counter)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def write_report(perf_dir: Path = PERF_DIR, prom_path: Optional[str] = None) -> Path:
+    report = run_report()
+    perf_dir.mkdir(parents=True, exist_ok=True)
+    path = perf_dir / f"run_{report['run_id']}.json"
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    for target in (path, perf_dir / "latest.json"):
+        # 프로세스마다 다른 임시 파일 (병렬 작업자가 같은 latest.json.tmp 를 덮어쓰지 않게)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        tmp.replace(target)
+
+    prom_path = prom_path or PROM_TEXTFILE
+    if prom_path:
+        prom_file = Path(prom_path)
+        prom_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = prom_file.with_name(f"{prom_file.name}.{os.getpid()}.tmp")
+        tmp.write_text(prometheus_text(report), encoding="utf-8")
+        tmp.replace(prom_file)
+    print(f"[PERF] 실행 보고서 저장 → {path}")
+    return path
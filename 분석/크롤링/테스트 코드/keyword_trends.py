@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+월별 키워드 추이 집계 뷰 (증분 유지)
+- 입력: sentiment_out/reviews_with_sentiment.csv (감정 라벨)
+        + vrew_reviews_tokens.csv 의 tokens_str (브류 리뷰 뜯어보기.py 토큰)
+- 저장: SQLite 집계 테이블 (month, platform, country, sentiment, token) → count
+- 처리:
+    1) 새 리뷰만 delta로 합산 (UPSERT). 이미 반영된 리뷰는 감정 라벨 / 월 / 토큰이 바뀐 경우에만
+       예전 기여분을 빼고 새 값을 더함 (리뷰별 기여분은 ingested_reviews 에 보관)
+    2) top-k / 월별 시계열 조회는 인덱스가 걸린 집계 테이블만 읽음
+    3) 추이 그래프는 집계 테이블 조회 결과로 바로 그림
+
+사용 예)
+    python keyword_trends.py                       # 새 리뷰 반영
+    python keyword_trends.py --trend 자막 오류 내보내기 --sentiment 부정
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from instrumentation import instrumented, set_rows
+from term_frequency import MONTH_COL, SENT_COL, TEXT_COL, add_month_column, tokenize
+
+# ===== 1. 설정 =====
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+SENTIMENT_PATH = BASE_DIR / "sentiment_out" / "reviews_with_sentiment.csv"
+TOKENS_PATH = BASE_DIR / "vrew_reviews_tokens.csv"
+TRENDS_DB_PATH = BASE_DIR / "sentiment_out" / "keyword_trends.sqlite"
+TREND_PLOT_PATH = BASE_DIR / "keyword_trend.png"
+
+TOKENS_COL = "tokens_str"
+KEY_COLS = ("platform", "country", "review_id", "reviewId")
+
+# 리뷰 ID 로 보지 않는 값 (기존 전처리가 구글플레이 행의 review_id 를 0 으로 채움)
+MISSING_IDS = frozenset({"", "0", "nan", "none", "null", "<na>"})
+
+# 키 규칙 / 스키마가 바뀌면 올림 → 예전 집계는 버리고 다시 만듦
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trend_counts (
+    month     TEXT NOT NULL,
+    platform  TEXT NOT NULL,
+    country   TEXT NOT NULL,
+    sentiment TEXT NOT NULL,
+    token     TEXT NOT NULL,
+    count     INTEGER NOT NULL,
+    PRIMARY KEY (month, platform, country, sentiment, token)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_trend_token ON trend_counts (token, month);
+CREATE INDEX IF NOT EXISTS idx_trend_month ON trend_counts (month, sentiment);
+CREATE TABLE IF NOT EXISTS ingested_reviews (
+    review_key TEXT PRIMARY KEY,
+    month      TEXT NOT NULL,
+    platform   TEXT NOT NULL,
+    country    TEXT NOT NULL,
+    sentiment  TEXT NOT NULL,
+    tokens     TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+# ===== 2. 저장소 =====
+def connect(path: Path = TRENDS_DB_PATH) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        # 예전 키(구글플레이 review_id 0 충돌)로 쌓인 집계는 되돌릴 수 없으므로 새로 집계
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS trend_counts")
+            conn.execute("DROP TABLE IF EXISTS ingested_reviews")
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+
+def clean_review_id(value) -> str:
+    """
+    리뷰 ID 정리 (review_store 저장소 키와 같은 규칙)
+    - CSV 를 거치며 float 이 된 숫자 ID (1234.0 / "1234.0") → "1234"
+    - 0 · 빈 값 · NaN · pd.NA → "" (ID 없음 → 다음 후보 컬럼 / 해시로)
+    """
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ""
+        if value.is_integer():
+            value = int(value)
+    text = str(value).strip()
+    if text.endswith(".0") and text[:-2].isdigit():
+        text = text[:-2]
+    return "" if text.lower() in MISSING_IDS else text
+
+
+def review_key(row: dict) -> str:
+    """플랫폼 + 리뷰 ID (review_id → reviewId 순), ID가 없으면 날짜/본문 해시"""
+    for col in ("review_id", "reviewId"):
+        review_id = clean_review_id(row.get(col))
+        if review_id:
+            return f"{row.get('platform', '')}:{review_id}"
+    raw = f"{row.get('platform', '')}|{row.get(MONTH_COL, '')}|{row.get(TEXT_COL, '')}"
+    return "h:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _row_tokens(row: dict) -> list[str]:
+    tokens = row.get(TOKENS_COL)
+    if isinstance(tokens, str) and tokens.strip():
+        return tokens.split()
+    return tokenize(row.get(TEXT_COL, ""))
+
+
+def merge_reviews(conn: sqlite3.Connection, df: pd.DataFrame) -> int:
+    """
+    새 리뷰는 (month, platform, country, sentiment, token) 단위로 합산해 UPSERT,
+    이미 반영된 리뷰는 라벨 / 월 / 토큰이 바뀐 경우에만 예전 기여분을 빼고 새로 더함.
+    반환: 새로 반영한 리뷰 수
+    """
+    if MONTH_COL not in df.columns:
+        df = add_month_column(df.copy())
+
+    rows = df.to_dict("records")
+    keys = [review_key(row) for row in rows]
+
+    stored: dict[str, tuple] = {}
+    cursor = conn.cursor()
+    unique_keys = list(dict.fromkeys(keys))
+    for start in range(0, len(unique_keys), 500):
+        chunk = unique_keys[start:start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        cursor.execute(
+            f"SELECT review_key, month, platform, country, sentiment, tokens"
+            f" FROM ingested_reviews WHERE review_key IN ({placeholders})",
+            chunk,
+        )
+        stored.update((key, tuple(rest)) for key, *rest in cursor.fetchall())
+
+    delta: Counter = Counter()
+    upserts = []
+    added = changed = 0
+    done: set[str] = set()
+    for key, row in zip(keys, rows):
+        if key in done:  # 같은 입력 안의 중복 키는 첫 행만
+            continue
+        done.add(key)
+        dims = (
+            str(row.get(MONTH_COL) or ""),
+            str(row.get("platform") or ""),
+            str(row.get("country") or ""),
+            str(row.get(SENT_COL) or ""),
+        )
+        tokens = " ".join(_row_tokens(row))
+        old = stored.get(key)
+        if old == dims + (tokens,):
+            continue
+        if old is not None:
+            for token, n in Counter(old[4].split()).items():
+                delta[old[:4] + (token,)] -= n
+            changed += 1
+        else:
+            added += 1
+        for token, n in Counter(tokens.split()).items():
+            delta[dims + (token,)] += n
+        upserts.append((key,) + dims + (tokens,))
+
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO trend_counts (month, platform, country, sentiment, token, count)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (month, platform, country, sentiment, token)
+            DO UPDATE SET count = count + excluded.count
+            """,
+            [key + (n,) for key, n in delta.items() if n],
+        )
+        if changed:
+            conn.execute("DELETE FROM trend_counts WHERE count <= 0")
+        conn.executemany(
+            """
+            INSERT INTO ingested_reviews (review_key, month, platform, country, sentiment, tokens)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (review_key) DO UPDATE SET
+                month = excluded.month, platform = excluded.platform, country = excluded.country,
+                sentiment = excluded.sentiment, tokens = excluded.tokens
+            """,
+            upserts,
+        )
+
+    print(f"[INFO] 키워드 추이 반영: 신규 리뷰 {added:,}건, 변경 리뷰 {changed:,}건, 갱신 셀 {len(delta):,}개")
+    return added
+
+
+# ===== 3. 조회 =====
+def _where(filters: dict) -> tuple[str, list]:
+    clauses, params = [], []
+    for column in ("platform", "country", "sentiment"):
+        value = filters.get(column)
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if filters.get("start_month"):
+        clauses.append("month >= ?")
+        params.append(filters["start_month"])
+    if filters.get("end_month"):
+        clauses.append("month <= ?")
+        params.append(filters["end_month"])
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def top_k(conn: sqlite3.Connection, k: int = 30, **filters) -> list[tuple[str, int]]:
+    """필터(platform, country, sentiment, start_month, end_month) 범위의 상위 k개 토큰"""
+    where, params = _where(filters)
+    cursor = conn.execute(
+        f"SELECT token, SUM(count) AS n FROM trend_counts{where} GROUP BY token ORDER BY n DESC LIMIT ?",
+        params + [k],
+    )
+    return [(token, int(n)) for token, n in cursor.fetchall()]
+
+
+def time_series(conn: sqlite3.Connection, tokens: list[str], **filters) -> pd.DataFrame:
+    """토큰별 월간 언급 수 (index: month, columns: token)"""
+    where, params = _where(filters)
+    placeholders = ",".join("?" * len(tokens))
+    token_clause = f"token IN ({placeholders})"
+    where = f"{where} AND {token_clause}" if where else f" WHERE {token_clause}"
+    cursor = conn.execute(
+        f"SELECT month, token, SUM(count) FROM trend_counts{where} GROUP BY month, token ORDER BY month",
+        params + list(tokens),
+    )
+    frame = pd.DataFrame(cursor.fetchall(), columns=["month", "token", "count"])
+    if frame.empty:
+        return pd.DataFrame(columns=list(tokens))
+    return frame.pivot(index="month", columns="token", values="count").reindex(columns=list(tokens)).fillna(0).astype(int)
+
+
+def plot_trend(series: pd.DataFrame, title: str, output_file=TREND_PLOT_PATH):
+    """월별 추이 선 그래프 (헤드리스)"""
+    from batch_render import warm_font_cache
+
+    if series.empty:
+        print(f"⚠️ 표시할 데이터가 없습니다: {title}")
+        return
+
+    warm_font_cache()
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    for token in series.columns:
+        ax.plot(series.index, series[token], marker="o", label=token)
+    ax.set_title(title, fontsize=14, fontweight="bold")
+    ax.set_xlabel("월")
+    ax.set_ylabel("언급 수")
+    ax.grid(alpha=0.3, linestyle="--")
+    ax.legend()
+    ax.tick_params(axis="x", rotation=45)
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=150)
+    print(f"✓ 저장 완료 → {output_file}")
+
+
+# ===== 4. 입력 결합 =====
+def load_scored_reviews(
+    sentiment_path: Path = SENTIMENT_PATH,
+    tokens_path: Optional[Path] = TOKENS_PATH,
+) -> pd.DataFrame:
+    """감정 결과에 토큰(tokens_str)을 리뷰 키 기준으로 붙인다 (토큰 파일이 없으면 본문에서 토큰화)"""
+    df = pd.read_csv(sentiment_path)
+    if tokens_path is None or not Path(tokens_path).exists() or TOKENS_COL in df.columns:
+        return df
+
+    tokens = pd.read_csv(tokens_path, usecols=lambda c: c in set(KEY_COLS) | {TOKENS_COL})
+    join_cols = [c for c in KEY_COLS if c in df.columns and c in tokens.columns]
+    if not join_cols:
+        return df
+    tokens = tokens.drop_duplicates(subset=join_cols)
+    for col in join_cols:
+        df[col] = df[col].astype(str)
+        tokens[col] = tokens[col].astype(str)
+    return df.merge(tokens, on=join_cols, how="left")
+
+
+@instrumented("keyword_trends")
+def main():
+    parser = argparse.ArgumentParser(description="월별 키워드 추이 집계 뷰")
+    parser.add_argument("--trend", nargs="*", default=None, help="추이를 그릴 토큰 목록")
+    parser.add_argument("--sentiment", default=None)
+    parser.add_argument("--platform", default=None)
+    parser.add_argument("--country", default=None)
+    parser.add_argument("--no-merge", action="store_true", help="새 리뷰 반영 없이 조회만")
+    args = parser.parse_args()
+
+    conn = connect()
+    if not args.no_merge:
+        df = load_scored_reviews()
+        set_rows(rows_in=len(df), rows_out=merge_reviews(conn, df))
+
+    filters = {"sentiment": args.sentiment, "platform": args.platform, "country": args.country}
+    print("TOP 10:", top_k(conn, 10, **filters))
+
+    if args.trend:
+        series = time_series(conn, args.trend, **filters)
+        print(series.to_string())
+        plot_trend(series, f"키워드 월별 추이 ({args.sentiment or '전체'})")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
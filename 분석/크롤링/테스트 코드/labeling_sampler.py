@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+라벨링 후보 선정 + 정답 세트 관리
+- 입력: sentiment_out/reviews_with_sentiment.csv (Sentiment_score = 긍정 확률, lazy_dataset 으로 필요한 컬럼만 읽음)
+- 처리:
+    1) 후보 선정
+       · uncertainty: Sentiment_score 가 0.5 에 가까운 리뷰 (모델이 헷갈리는 리뷰 → 오류를 빨리 찾음)
+       · stratified : platform / country / rating 층별 비례 무작위 (지표 추정용, 편향 없음)
+       · 두 방식을 uncertainty_share 비율로 섞어서 사용
+    2) 이미 정답 세트에 있거나 라벨링 파일에 남아 있는 리뷰, 같은 본문 중복은 제외
+    3) 라벨링 파일은 덮어쓰지 않고 새 후보만 뒤에 추가 (이미 채운 true_label 보존)
+    4) 채워진 true_label 은 정답 세트(gold_labels.csv)에 리뷰 키 기준으로 병합
+    5) 목표 신뢰구간 폭에 필요한 라벨 수 추정
+- 출력: reviews_for_labeling.csv, sentiment_out/gold_labels.csv
+"""
+
+import argparse
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from evaluation import LABELING_PATH, SELECTION_COL, TRUE_COL, UNCERTAINTY_SELECTION, normalize_labels
+from instrumentation import set_rows
+from keyword_trends import review_key
+from lazy_dataset import scan
+from term_frequency import CSV_PATH, SENT_COL, TEXT_COL
+
+# ===== 1. 설정 =====
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+GOLD_PATH = BASE_DIR / "sentiment_out" / "gold_labels.csv"
+
+SCORE_COL = "Sentiment_score"
+PRED_COL = "pred_label"
+KEY_COL = "review_key"
+STRATA = ("platform", "country", "rating")
+UNCERTAINTY_SHARE = 0.5
+EXPORT_COLS = (KEY_COL, "platform", "country", "rating", "version", "appVersion",
+               TEXT_COL, PRED_COL, SCORE_COL, SELECTION_COL, TRUE_COL)
+# 후보 선정에 필요한 컬럼 (review_key 는 month 없이 계산해야 기존 정답 세트 키와 같음)
+READ_COLS = ("platform", "country", "rating", "version", "appVersion", "review_id", "reviewId",
+             TEXT_COL, SENT_COL, SCORE_COL)
+
+
+# ===== 2. 후보 선정 =====
+def _text_key(texts: pd.Series) -> pd.Series:
+    return texts.fillna("").astype(str).str.lower().str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def prepare_pool(df: pd.DataFrame, exclude_keys: set[str]) -> pd.DataFrame:
+    """리뷰 키 부여 → 제외 키 / 빈 본문 / 같은 본문 중복 제거"""
+    df = df.copy()
+    df[KEY_COL] = [review_key(row) for row in df.to_dict("records")]
+    df["_text_key"] = _text_key(df[TEXT_COL])
+    df = df[(df["_text_key"] != "") & ~df[KEY_COL].isin(exclude_keys)]
+    return df.drop_duplicates(subset=[KEY_COL]).drop_duplicates(subset=["_text_key"])
+
+
+def uncertainty_sample(pool: pd.DataFrame, n: int) -> pd.DataFrame:
+    margin = (pd.to_numeric(pool[SCORE_COL], errors="coerce") - 0.5).abs()
+    return pool.loc[margin.nsmallest(n).index]
+
+
+def stratified_sample(pool: pd.DataFrame, n: int, strata=STRATA, seed: int = 42) -> pd.DataFrame:
+    """층 크기에 비례해 배분 (largest remainder), 층 안에서는 무작위"""
+    strata = [col for col in strata if col in pool.columns]
+    if not strata or n >= len(pool):
+        return pool.sample(min(n, len(pool)), random_state=seed)
+
+    groups = pool.groupby(strata, dropna=False, sort=True)
+    sizes = groups.size().to_numpy()
+    quota = sizes / sizes.sum() * n
+    alloc = np.floor(quota).astype(int)
+    alloc[np.argsort(alloc - quota)[: n - int(alloc.sum())]] += 1
+
+    # groupby 순회 순서 = size() 순서 (sort=True)
+    picks = [
+        group.sample(min(int(k), len(group)), random_state=seed)
+        for k, (_, group) in zip(alloc, groups)
+        if k > 0
+    ]
+    return pd.concat(picks) if picks else pool.iloc[:0]
+
+
+def select_candidates(
+    df: pd.DataFrame,
+    n: int,
+    exclude_keys: set[str] = frozenset(),
+    uncertainty_share: float = UNCERTAINTY_SHARE,
+    seed: int = 42,
+) -> pd.DataFrame:
+    pool = prepare_pool(df, exclude_keys)
+    n_uncertain = int(round(n * uncertainty_share))
+    uncertain = uncertainty_sample(pool, n_uncertain).assign(**{SELECTION_COL: UNCERTAINTY_SELECTION})
+    rest = pool.drop(index=uncertain.index)
+    stratified = stratified_sample(rest, n - len(uncertain), seed=seed).assign(**{SELECTION_COL: "stratified"})
+    return pd.concat([uncertain, stratified]).drop(columns="_text_key")
+
+
+# ===== 3. 라벨링 파일 / 정답 세트 =====
+def _read_keyed(path: Path) -> pd.DataFrame:
+    if not path.exists():
+        return pd.DataFrame(columns=list(EXPORT_COLS))
+    df = pd.read_csv(path, dtype={KEY_COL: str, TRUE_COL: str})
+    if KEY_COL not in df.columns:
+        df[KEY_COL] = [review_key(row) for row in df.to_dict("records")]
+    if TRUE_COL not in df.columns:
+        df[TRUE_COL] = ""
+    return df
+
+
+def _write_atomic(df: pd.DataFrame, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    df.to_csv(tmp, index=False, encoding="utf-8-sig")
+    tmp.replace(path)
+
+
+def export_for_labeling(candidates: pd.DataFrame, path: Path = LABELING_PATH) -> int:
+    """기존 라벨링 파일 뒤에 새 후보만 추가 (이미 있는 행과 true_label 은 그대로). 반환: 추가 건수"""
+    existing = _read_keyed(path)
+    new = candidates.rename(columns={SENT_COL: PRED_COL})
+    new = new[~new[KEY_COL].isin(set(existing[KEY_COL]))].copy()
+    new[TRUE_COL] = ""
+    new = new[[col for col in EXPORT_COLS if col in new.columns]]
+    _write_atomic(pd.concat([existing, new], ignore_index=True), path)
+    print(f"✅ '{path}' 에 라벨링 후보 {len(new):,}건 추가 (기존 {len(existing):,}건 보존, true_label 을 채우면 됨)")
+    return len(new)
+
+
+def merge_labels(labeling_path: Path = LABELING_PATH, gold_path: Path = GOLD_PATH) -> pd.DataFrame:
+    """
+    채워진 true_label 을 정답 세트에 병합 (같은 리뷰는 최근 라벨로 갱신)
+    긍정/부정으로 읽히지 않는 라벨(중립 등)은 정답 세트에서 빼고 값별 건수를 경고로 출력
+    """
+    labeled = _read_keyed(labeling_path)
+    raw = labeled[TRUE_COL].fillna("").astype(str).str.strip()
+    labeled[TRUE_COL] = normalize_labels(raw)
+    unknown = raw[(raw != "") & (labeled[TRUE_COL] == "")]
+    if len(unknown):
+        counts = ", ".join(f"'{value}' {n:,}건" for value, n in unknown.value_counts().items())
+        print(f"⚠️ 긍정/부정이 아닌 라벨 {len(unknown):,}건은 정답 세트에서 제외: {counts}")
+    labeled = labeled[labeled[TRUE_COL] != ""]
+
+    gold = _read_keyed(gold_path)
+    gold = pd.concat([gold, labeled], ignore_index=True).drop_duplicates(subset=[KEY_COL], keep="last")
+    _write_atomic(gold, gold_path)
+    print(f"[INFO] 정답 세트 병합: 라벨 {len(labeled):,}건 반영 → 총 {len(gold):,}건 ({gold_path})")
+    return gold
+
+
+# ===== 4. 필요 라벨 수 =====
+def required_labels(p: float, half_width: float, level: float = 0.95) -> int:
+    """비율 지표 p 를 ±half_width 로 추정하는 데 필요한 표본 수 (정규 근사)"""
+    z = {0.9: 1.645, 0.95: 1.96, 0.99: 2.576}.get(level, 1.96)
+    p = min(max(p, 0.01), 0.99)
+    return math.ceil(z * z * p * (1 - p) / (half_width * half_width))
+
+
+def labeling_status(gold: pd.DataFrame, half_width: float = 0.03) -> dict:
+    stratified = gold[gold.get(SELECTION_COL, pd.Series("", index=gold.index)) != UNCERTAINTY_SELECTION]
+    if stratified.empty or PRED_COL not in stratified.columns:
+        return {"labeled": len(gold), "stratified": 0, "required": required_labels(0.5, half_width)}
+    accuracy = float((normalize_labels(stratified[PRED_COL]) == stratified[TRUE_COL].to_numpy()).mean())
+    required = required_labels(accuracy, half_width)
+    return {"labeled": len(gold), "stratified": len(stratified), "accuracy": accuracy,
+            "required": required, "remaining": max(required - len(stratified), 0)}
+
+
+def sample_for_labeling(
+    n: int = 300,
+    input_path=CSV_PATH,
+    labeling_path: Path = LABELING_PATH,
+    gold_path: Path = GOLD_PATH,
+    uncertainty_share: float = UNCERTAINTY_SHARE,
+) -> int:
+    """정답 세트에 병합 → 정답/대기 중인 리뷰를 제외하고 n건 선정 → 라벨링 파일에 추가"""
+    gold = merge_labels(labeling_path, gold_path) if Path(labeling_path).exists() else _read_keyed(gold_path)
+    pending = _read_keyed(labeling_path)
+    exclude = set(gold[KEY_COL]) | set(pending[KEY_COL])
+
+    df = scan(input_path).select(list(READ_COLS)).collect()
+    candidates = select_candidates(df, n, exclude, uncertainty_share)
+    added = export_for_labeling(candidates, labeling_path)
+    set_rows(rows_in=len(df), rows_out=added)
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="라벨링 후보 선정 / 정답 세트 병합")
+    parser.add_argument("-n", type=int, default=300, help="추가할 후보 수")
+    parser.add_argument("--uncertainty-share", type=float, default=UNCERTAINTY_SHARE,
+                        help="불확실성 샘플 비율 (나머지는 층화 무작위)")
+    parser.add_argument("--merge-only", action="store_true", help="라벨 병합과 현황만 출력")
+    parser.add_argument("--half-width", type=float, default=0.03, help="목표 신뢰구간 반폭 (정확도 기준)")
+    args = parser.parse_args()
+
+    if args.merge_only:
+        gold = merge_labels()
+    else:
+        sample_for_labeling(args.n, uncertainty_share=args.uncertainty_share)
+        gold = _read_keyed(GOLD_PATH)
+
+    status = labeling_status(gold, args.half_width)
+    print(f"[INFO] 라벨링 현황: {status}")
+
+
+if __name__ == "__main__":
+    main()
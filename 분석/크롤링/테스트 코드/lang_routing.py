@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+언어별 감정분석 라우팅
+- 처리:
+    1) 문자 체계(한글/가나/한자/라틴) 비율로 리뷰 언어를 일괄 판별 (pandas 벡터 연산)
+       한글이 한 글자라도 있으면 ko (국내 스토어 리뷰에 섞인 영어 감탄사 때문에 en 으로 빠지지 않게)
+       글자로 판별이 안 되면 구글플레이 lang 컬럼 → 스토어 국가 순으로 힌트 사용
+    2) LANG_MODELS에 모델이 지정된 언어는 해당 모델로 추론
+       (언어별로 길이순 정렬된 배치를 따로 구성)
+    3) 모델이 없는 언어는 추론하지 않고 SKIP_LABEL로 표시
+       (한국어 모델로 점수를 내고 싶으면 FALLBACK_MODEL = DEFAULT_MODEL 로 명시적으로 켬,
+        CLI: --fallback-default-model)
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+import sentiment_analysis
+from sentiment_analysis import load_model_and_tokenizer, predict_batch, resolve_label_indices
+
+# 기본 감정 모델 자리표시자: 추론 시점의 sentiment_analysis.MODEL_NAME 으로 바뀜
+# (import 시점에 모델 이름을 박아 두면 CLI --model 로 바꾼 모델이 라우팅에 반영되지 않음)
+DEFAULT_MODEL = "default"
+
+# 언어 → 모델 (None이면 해당 언어는 추론하지 않음)
+LANG_MODELS: dict[str, Optional[str]] = {
+    "ko": DEFAULT_MODEL,
+    "en": None,  # 예) "distilbert-base-uncased-finetuned-sst-2-english"
+    "ja": None,
+}
+
+# 모델이 없는 언어를 추론할 모델 (None 이면 SKIP_LABEL 로 남김)
+# 한국어 모델은 다른 언어에 의미 없는 점수를 내므로 기본값은 None, 필요할 때만 DEFAULT_MODEL 로 지정
+FALLBACK_MODEL: Optional[str] = None
+
+SKIP_LABEL = "미분석"
+UNKNOWN_LANG = "unknown"
+
+# 스토어 국가 코드 → 기본 언어 (문자만으로 판별이 안 될 때 사용)
+COUNTRY_LANG_HINTS = {"kr": "ko", "us": "en", "jp": "ja"}
+# 힌트로 쓰는 컬럼 (앞쪽 우선): 구글플레이 수집 언어 → 스토어 국가
+HINT_COLS = ("lang", "country")
+
+SCRIPT_PATTERNS = {
+    "hangul": r"[가-힣ㄱ-ㅎㅏ-ㅣ]",
+    "kana": r"[\u3040-\u30ff]",
+    "han": r"[\u4e00-\u9fff]",
+    "latin": r"[A-Za-z]",
+}
+
+
+# ============================================================
+# 1. 언어 판별
+# ============================================================
+def detect_languages(
+    texts: list[str],
+    hints: Optional[list[str]] = None,
+    min_ratio: float = 0.3,
+) -> list[str]:
+    """
+    문자 체계별 글자 수를 한 번에 세어 언어를 판별한다.
+    - 한글 포함 → ko (영어 단어 / 감탄사가 더 많이 섞인 한국어 리뷰 포함)
+    - 가나 포함 → ja / 한자 비율 ≥ min_ratio → zh
+    - 라틴 비율 ≥ min_ratio → en
+    - 글자가 없거나 판별이 안 되면 hints(언어 코드 또는 국가 코드, language_hints 참고)를 사용,
+      그래도 없으면 unknown
+    """
+    series = pd.Series(texts, dtype="object").fillna("").astype(str)
+    counts = {name: series.str.count(pattern).to_numpy() for name, pattern in SCRIPT_PATTERNS.items()}
+    total = sum(counts.values())
+    denom = np.maximum(total, 1)
+
+    conditions = [
+        counts["hangul"] > 0,
+        counts["kana"] > 0,
+        counts["han"] / denom >= min_ratio,
+        counts["latin"] / denom >= min_ratio,
+    ]
+    langs = np.select(conditions, ["ko", "ja", "zh", "en"], default=UNKNOWN_LANG).astype(object)
+
+    if hints is not None:
+        hint_langs = np.array(
+            [COUNTRY_LANG_HINTS.get(hint.lower(), hint.lower()) if isinstance(hint, str) and hint else UNKNOWN_LANG
+             for hint in hints],
+            dtype=object,
+        )
+        undecided = langs == UNKNOWN_LANG
+        langs[undecided] = hint_langs[undecided]
+
+    return langs.tolist()
+
+
+def language_hints(df: pd.DataFrame) -> Optional[list[str]]:
+    """행별 언어 힌트: 구글플레이 lang 컬럼 값, 없으면 스토어 국가 코드 (컬럼이 하나도 없으면 None)"""
+    cols = [col for col in HINT_COLS if col in df.columns]
+    if not cols:
+        return None
+    hints = pd.Series("", index=df.index, dtype="object")
+    for col in cols:
+        values = df[col].fillna("").astype(str).str.strip()
+        hints = hints.where(hints != "", values)
+    return hints.tolist()
+
+
+# ============================================================
+# 2. 언어별 라우팅 추론
+# ============================================================
+def resolve_model(model_name: Optional[str]) -> Optional[str]:
+    """DEFAULT_MODEL → 현재 sentiment_analysis.MODEL_NAME, 그 외는 그대로"""
+    return sentiment_analysis.MODEL_NAME if model_name == DEFAULT_MODEL else model_name
+
+
+def routed_models(lang_models: Optional[dict[str, Optional[str]]] = None) -> dict[str, str]:
+    """모델이 지정된 언어만 {언어: 실제 모델 이름}"""
+    lang_models = LANG_MODELS if lang_models is None else lang_models
+    return {lang: resolve_model(name) for lang, name in lang_models.items() if name}
+
+
+def route_and_predict(
+    texts: list[str],
+    lang_models: Optional[dict[str, Optional[str]]] = None,
+    hints: Optional[list[str]] = None,
+    batch_size: int = 64,
+    max_len: int = 128,
+    predict_fn=predict_batch,
+    **predict_kwargs,
+) -> tuple[list[str], list[float], list[str]]:
+    """
+    리뷰별 언어를 판별한 뒤 언어별 모델로만 추론한다.
+    - predict_fn: predict_batch 또는 predict_long (predict_kwargs는 그대로 전달)
+    반환: (감정 라벨, 긍정 점수, 판별 언어)
+    모델이 없는 언어는 (SKIP_LABEL, NaN) (FALLBACK_MODEL 을 지정한 경우에만 그 모델로 추론)
+    같은 모델을 쓰는 언어끼리는 모델을 한 번만 로드
+    """
+    lang_models = LANG_MODELS if lang_models is None else lang_models
+    texts = ["" if pd.isna(text) else str(text) for text in texts]
+    langs = detect_languages(texts, hints=hints)
+
+    labels = [SKIP_LABEL] * len(texts)
+    scores = [math.nan] * len(texts)
+
+    by_lang: dict[str, list[int]] = {}
+    for idx, lang in enumerate(langs):
+        by_lang.setdefault(lang, []).append(idx)
+
+    loaded: dict[str, tuple] = {}  # 모델 이름 → (tokenizer, model, device, pos_idx)
+    summary = ", ".join(f"{lang}:{len(idxs)}" for lang, idxs in sorted(by_lang.items()))
+    print(f"[INFO] 언어 판별 결과 - {summary}")
+
+    for lang, idxs in sorted(by_lang.items()):
+        model_name = resolve_model(lang_models.get(lang))
+        if not model_name:
+            model_name = resolve_model(FALLBACK_MODEL)
+            if not model_name:
+                print(f"[INFO] {lang}: 지정된 모델 없음 → {len(idxs):,}건 '{SKIP_LABEL}' 처리")
+                continue
+            print(f"[INFO] {lang}: 지정된 모델 없음 → FALLBACK_MODEL 로 {len(idxs):,}건 추론")
+
+        if model_name not in loaded:
+            tokenizer, model, device = load_model_and_tokenizer(model_name)
+            _, pos_idx = resolve_label_indices(model)
+            loaded[model_name] = (tokenizer, model, device, pos_idx)
+        tokenizer, model, device, pos_idx = loaded[model_name]
+
+        # 길이순 정렬로 배치 내 패딩 최소화
+        idxs = sorted(idxs, key=lambda i: len(texts[i]))
+        lang_labels, lang_scores = predict_fn(
+            [texts[i] for i in idxs],
+            tokenizer=tokenizer,
+            model=model,
+            device=device,
+            pos_idx=pos_idx,
+            batch_size=batch_size,
+            max_len=max_len,
+            **predict_kwargs,
+        )
+        for i, label, score in zip(idxs, lang_labels, lang_scores):
+            labels[i] = label
+            scores[i] = score
+
+    return labels, scores, langs
@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""
+분할 저장된 리뷰 데이터용 지연 실행 쿼리 (조건 / 컬럼 pushdown)
+- 저장: 감정분석 결과 CSV 를 platform / country / sentiment / month 기준 폴더로 나눠 저장
+    BASE_DIR/sentiment_out/partitions/<CSV 이름>/platform=app_store/country=kr/sentiment=부정/month=2024-05/part-00000.csv
+    · _dataset.json: 원본 CSV 지문, 컬럼 목록, 파일별 (분할 값, 행 수, 바이트, 최소/최대 날짜, 내용 해시)
+    · 분할 컬럼 값은 폴더 이름에만 있고 파일에는 없음 (조회할 때 상수 컬럼으로 복원)
+    · 원본 CSV 가 바뀌면 scan() 이 한 번 다시 분할 (청크 단위로 읽으므로 메모리 일정)
+- 쿼리: scan(csv).filter(sentiment="부정", platform=["app_store"], date_from="2024-01-01").select([...]).collect()
+    · filter / select 는 실행 계획만 쌓음 (읽기 없음)
+    · 분할 컬럼 조건 + 날짜 범위 → 파일 목록에서 먼저 제외 (해당 슬라이스의 파일만 읽음)
+    · select → read_csv(usecols=...) 로 필요한 컬럼만 파싱
+    · 나머지 조건은 청크를 읽을 때마다 바로 적용 (걸러진 행은 합치지 않음)
+    · 파일 단위로 스레드 풀에서 병렬 실행, iter_batches() 는 청크 단위 순차 스트림
+    · iter_files() 는 파일(분할 단위)별 스트림 + 내용 해시 → 파일별 결과를 캐시하고 바뀐 파일만 다시 계산
+- 사용처: term_frequency.load_reviews (막대 그래프 / 워드클라우드 / 슬라이스 차트),
+          ngram_sketch (분할 파일별 sketch 캐시), labeling_sampler (성능 테스트.py)
+
+사용 예)
+    python lazy_dataset.py --explain --sentiment 부정 --platform app_store --columns review_text
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Iterator, Optional
+from urllib.parse import quote
+
+import pandas as pd
+
+from term_frequency import CSV_PATH, DATE_COLS, MONTH_COL, SENT_COL, add_month_column, source_fingerprint
+
+# ===== 1. 설정 =====
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+PARTITION_ROOT = BASE_DIR / "sentiment_out" / "partitions"
+MANIFEST_NAME = "_dataset.json"
+
+# 폴더 이름 → 데이터 컬럼
+PARTITION_COLS = {"platform": "platform", "country": "country", "sentiment": SENT_COL, "month": MONTH_COL}
+DAY_COL = "review_day"          # 날짜 범위 조건용 (YYYY-MM-DD, 분할 시 추가)
+NULL_VALUE = "__null__"
+STR_COLS = ("version", "appVersion", "review_id", "reviewId")
+
+PART_ROWS = 200_000             # 분할 파일 하나의 최대 행 수 (넘으면 part-00001 ...)
+CHUNK_ROWS = 50_000             # 읽기 청크 크기
+THREADS = min(8, os.cpu_count() or 2)
+
+
+# ===== 2. 분할 저장 =====
+def dataset_dir(csv_path=CSV_PATH, root: Path = PARTITION_ROOT) -> Path:
+    return root / Path(csv_path).stem
+
+
+def _dir_value(value) -> str:
+    if value is None or pd.isna(value) or str(value) == "":
+        return NULL_VALUE
+    return quote(str(value), safe="")
+
+
+def _add_partition_columns(df: pd.DataFrame) -> pd.DataFrame:
+    if MONTH_COL not in df.columns:
+        add_month_column(df)
+    day = pd.Series("", index=df.index, dtype="object")
+    for col in DATE_COLS:
+        if col in df.columns:
+            parsed = pd.to_datetime(df[col], errors="coerce").dt.strftime("%Y-%m-%d")
+            day = day.where(day != "", parsed.fillna(""))
+    df[DAY_COL] = day
+    for col in PARTITION_COLS.values():
+        if col not in df.columns:
+            df[col] = ""
+    return df
+
+
+def file_digest(path: Path) -> str:
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+class _PartitionWriter:
+    """분할 폴더별 part 파일에 청크를 이어 씀 (파일당 PART_ROWS 행)"""
+
+    def __init__(self, root: Path, columns: list[str]):
+        self.root = root
+        self.columns = columns
+        self.current: dict[tuple[str, ...], dict] = {}
+        self.parts: list[dict] = []
+
+    def _open(self, values: tuple[str, ...]) -> dict:
+        previous = self.current.get(values)
+        index = 0 if previous is None else previous["index"] + 1
+        folder = self.root.joinpath(*(f"{key}={_dir_value(v)}" for key, v in zip(PARTITION_COLS, values)))
+        folder.mkdir(parents=True, exist_ok=True)
+        part = {"index": index, "path": folder / f"part-{index:05d}.csv", "values": values,
+                "rows": 0, "min_day": None, "max_day": None}
+        self.current[values] = part
+        self.parts.append(part)
+        return part
+
+    def write(self, values: tuple[str, ...], frame: pd.DataFrame):
+        part = self.current.get(values)
+        if part is None or part["rows"] >= PART_ROWS:
+            part = self._open(values)
+        frame.reindex(columns=self.columns).to_csv(
+            part["path"], mode="a", header=part["rows"] == 0, index=False, encoding="utf-8"
+        )
+        part["rows"] += len(frame)
+        days = frame[DAY_COL][frame[DAY_COL] != ""]
+        if len(days):
+            part["min_day"] = min(filter(None, (part["min_day"], days.min())))
+            part["max_day"] = max(filter(None, (part["max_day"], days.max())))
+
+    def manifest_files(self) -> list[dict]:
+        return [
+            {
+                "path": str(part["path"].relative_to(self.root)),
+                "partition": dict(zip(PARTITION_COLS, part["values"])),
+                "rows": part["rows"],
+                "bytes": part["path"].stat().st_size,
+                "min_day": part["min_day"],
+                "max_day": part["max_day"],
+                "sha1": file_digest(part["path"]),
+            }
+            for part in self.parts
+        ]
+
+
+def write_partitions(chunks: Iterator[pd.DataFrame], target: Path, source: Optional[dict] = None) -> Path:
+    """DataFrame 청크 스트림 → 분할 폴더 (임시 폴더에 모두 쓴 뒤 교체)"""
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    writer, columns = None, None
+    for chunk in chunks:
+        chunk = _add_partition_columns(chunk)
+        if writer is None:
+            columns = [col for col in chunk.columns if col not in PARTITION_COLS.values()]
+            writer = _PartitionWriter(tmp, columns)
+        keys = [chunk[col].fillna("").astype(str) for col in PARTITION_COLS.values()]
+        for values, frame in chunk.groupby(keys, sort=False):
+            writer.write(tuple(values), frame)
+
+    manifest = {
+        "source": source,
+        "columns": columns or [],
+        "partition_cols": PARTITION_COLS,
+        "files": writer.manifest_files() if writer else [],
+    }
+    (tmp / MANIFEST_NAME).write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+
+    old = target.with_name(f"{target.name}.{os.getpid()}.old")
+    try:
+        if target.exists():
+            target.rename(old)
+        tmp.rename(target)
+    except OSError:
+        # 병렬 단계(막대 그래프 / 워드클라우드)가 같은 데이터를 먼저 분할한 경우 → 그쪽 결과 사용
+        print(f"[INFO] 다른 프로세스가 먼저 분할 저장함 → {target}")
+        shutil.rmtree(tmp, ignore_errors=True)
+    shutil.rmtree(old, ignore_errors=True)
+    rows = sum(f["rows"] for f in manifest["files"])
+    print(f"[SAVE] 분할 저장 → {target} (파일 {len(manifest['files']):,}개, {rows:,}행)")
+    return target
+
+
+def partition_csv(csv_path=CSV_PATH, root: Path = PARTITION_ROOT) -> Path:
+    """CSV → 분할 폴더 (청크 단위로 읽음)"""
+    chunks = pd.read_csv(csv_path, chunksize=CHUNK_ROWS, dtype={col: str for col in STR_COLS})
+    return write_partitions(chunks, dataset_dir(csv_path, root), source_fingerprint(csv_path))
+
+
+# ===== 3. 실행 계획 =====
+def _as_set(value) -> frozenset:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return frozenset(map(str, value))
+    return frozenset([str(value)])
+
+
+@dataclass(frozen=True)
+class LazyFrame:
+    root: Path
+    manifest: dict = field(repr=False, compare=False)
+    columns: Optional[tuple[str, ...]] = None
+    partition_filters: tuple[tuple[str, frozenset], ...] = ()
+    row_filters: tuple[tuple[str, frozenset], ...] = ()
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+
+    @property
+    def schema(self) -> list[str]:
+        return list(self.manifest["columns"]) + list(PARTITION_COLS.values())
+
+    # ----- 계획 -----
+    def filter(self, date_from: Optional[str] = None, date_to: Optional[str] = None, **conditions) -> "LazyFrame":
+        """컬럼=값 (목록이면 그중 하나). 분할 컬럼은 폴더 이름(sentiment)과 컬럼 이름(Sentiment_label) 모두 가능"""
+        by_column = {col: key for key, col in PARTITION_COLS.items()}
+        partition, rows = list(self.partition_filters), list(self.row_filters)
+        for name, value in conditions.items():
+            key = name if name in PARTITION_COLS else by_column.get(name)
+            if key is not None:
+                partition.append((key, _as_set(value)))
+            elif name in self.manifest["columns"]:
+                rows.append((name, _as_set(value)))
+            else:
+                raise KeyError(f"조건 컬럼이 없습니다: {name}")
+        return replace(
+            self,
+            partition_filters=tuple(partition),
+            row_filters=tuple(rows),
+            date_from=max(filter(None, (self.date_from, date_from)), default=None),
+            date_to=min(filter(None, (self.date_to, date_to)), default=None),
+        )
+
+    def select(self, columns: list[str]) -> "LazyFrame":
+        """결과 컬럼 (데이터에 없는 컬럼은 무시)"""
+        wanted = [col for col in dict.fromkeys(columns) if col in self.schema]
+        if self.columns is not None:
+            wanted = [col for col in wanted if col in self.columns]
+        return replace(self, columns=tuple(wanted))
+
+    # ----- pushdown -----
+    def _files(self) -> list[dict]:
+        selected = []
+        for f in self.manifest["files"]:
+            part = f["partition"]
+            if any(part[key] not in values for key, values in self.partition_filters):
+                continue
+            if self.date_from and (f["max_day"] is None or f["max_day"] < self.date_from):
+                continue
+            if self.date_to and (f["min_day"] is None or f["min_day"] > self.date_to):
+                continue
+            selected.append(f)
+        return selected
+
+    def _read_columns(self) -> list[str]:
+        """파일에서 파싱할 컬럼 = 결과 컬럼 + 행 조건 컬럼 (분할 컬럼 제외)"""
+        out_cols = list(self.columns) if self.columns is not None else self.schema
+        needed = [col for col in out_cols if col in self.manifest["columns"]]
+        needed += [col for col, _ in self.row_filters]
+        if self.date_from or self.date_to:
+            needed.append(DAY_COL)
+        return list(dict.fromkeys(needed))
+
+    def _read_file(self, f: dict, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        read_cols = self._read_columns()
+        out_cols = list(self.columns) if self.columns is not None else self.schema
+        dtype = {col: str for col in STR_COLS if col in read_cols}
+        for chunk in pd.read_csv(self.root / f["path"], usecols=read_cols, dtype=dtype, chunksize=chunk_rows):
+            mask = pd.Series(True, index=chunk.index)
+            for col, values in self.row_filters:
+                mask &= chunk[col].astype(str).isin(values)
+            if self.date_from or self.date_to:
+                days = chunk[DAY_COL].fillna("").astype(str)
+                mask &= days != ""
+                if self.date_from:
+                    mask &= days >= self.date_from
+                if self.date_to:
+                    mask &= days <= self.date_to
+            if not mask.all():
+                chunk = chunk[mask]
+            if chunk.empty:
+                continue
+            for key, col in PARTITION_COLS.items():
+                if col in out_cols:
+                    chunk[col] = f["partition"][key]
+            yield chunk[out_cols]
+
+    # ----- 실행 -----
+    def iter_batches(self, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        for f in self._files():
+            yield from self._read_file(f, chunk_rows)
+
+    def iter_files(self, chunk_rows: int = CHUNK_ROWS) -> Iterator[tuple[dict, Iterator[pd.DataFrame]]]:
+        """
+        (파일 정보, 청크 스트림) — 파일 정보의 sha1 은 파일 내용 해시
+        원본 CSV 가 바뀌어 다시 분할돼도 내용이 같은 파일은 해시가 같음 → 파일별 결과 재사용
+        """
+        for f in self._files():
+            if "sha1" not in f:  # 내용 해시 기록 전 매니페스트
+                f = {**f, "sha1": file_digest(self.root / f["path"])}
+            yield f, self._read_file(f, chunk_rows)
+
+    def collect(self, threads: int = THREADS) -> pd.DataFrame:
+        files = self._files()
+        out_cols = list(self.columns) if self.columns is not None else self.schema
+        if not files:
+            return pd.DataFrame(columns=out_cols)
+        with ThreadPoolExecutor(max_workers=max(1, min(threads, len(files)))) as pool:
+            parts = [frame for frames in pool.map(lambda f: list(self._read_file(f)), files) for frame in frames]
+        if not parts:
+            return pd.DataFrame(columns=out_cols)
+        return pd.concat(parts, ignore_index=True)
+
+    def count(self) -> int:
+        """조건이 분할 컬럼뿐이면 매니페스트 행 수만으로 계산"""
+        if not self.row_filters and not self.date_from and not self.date_to:
+            return sum(f["rows"] for f in self._files())
+        return sum(len(batch) for batch in self.select([DAY_COL]).iter_batches())
+
+    def explain(self) -> str:
+        files = self._files()
+        total = self.manifest["files"]
+        return "\n".join([
+            f"scan {self.root}",
+            f"  파일: {len(files):,}/{len(total):,}개, "
+            f"{sum(f['bytes'] for f in files) / 1e6:.1f}/{sum(f['bytes'] for f in total) / 1e6:.1f}MB, "
+            f"{sum(f['rows'] for f in files):,}행 (분할 조건 + 날짜 범위로 제외)",
+            f"  분할 조건: {dict((k, sorted(v)) for k, v in self.partition_filters) or '-'}",
+            f"  날짜 범위: {self.date_from or '-'} ~ {self.date_to or '-'}",
+            f"  파싱 컬럼: {self._read_columns()}",
+            f"  행 조건: {dict((k, sorted(v)) for k, v in self.row_filters) or '-'}",
+        ])
+
+
+def scan(csv_path=CSV_PATH, root: Path = PARTITION_ROOT, refresh: bool = True) -> LazyFrame:
+    """분할 데이터셋 열기. 원본 CSV 가 있고 분할 이후 바뀌었으면 다시 분할 (refresh=False 면 그대로 사용)"""
+    target = dataset_dir(csv_path, root)
+    manifest_path = target / MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else None
+    if Path(csv_path).exists() and refresh:
+        if manifest is None or manifest.get("source") != source_fingerprint(csv_path):
+            partition_csv(csv_path, root)
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    if manifest is None:
+        raise FileNotFoundError(f"분할 데이터도 원본 CSV 도 없습니다: {csv_path}")
+    return LazyFrame(target, manifest)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="분할 리뷰 데이터 조회 (조건 / 컬럼 pushdown)")
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--rebuild", action="store_true", help="원본 CSV 로 다시 분할")
+    for key in PARTITION_COLS:
+        parser.add_argument(f"--{key}", nargs="*", default=None)
+    parser.add_argument("--date-from", default=None)
+    parser.add_argument("--date-to", default=None)
+    parser.add_argument("--columns", nargs="*", default=None)
+    parser.add_argument("--explain", action="store_true", help="실행 계획만 출력")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        partition_csv(args.csv)
+    query = scan(args.csv).filter(
+        date_from=args.date_from,
+        date_to=args.date_to,
+        **{key: getattr(args, key) for key in PARTITION_COLS if getattr(args, key)},
+    )
+    if args.columns:
+        query = query.select(args.columns)
+    print(query.explain())
+    if not args.explain:
+        df = query.collect()
+        print(f"[INFO] {len(df):,}행")
+        print(df.head(20).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""
+선형 모델 캐스케이드 (트랜스포머 앞단의 빠른 1차 판정)
+- 모델: 해시 문자 n-gram(1~3) + 단어 단위 특징 → 로지스틱 회귀 (가중치 벡터 하나, 2^18 차원)
+- 학습: 트랜스포머가 이미 매긴 결과(reviews_with_sentiment.csv)를 그대로 정답으로 쓰는 증류
+    · Sentiment_source == transformer 인 행만 사용 (캐스케이드가 매긴 행으로 다시 학습하면 자기 증류)
+    · 목표값 = Sentiment_score (긍정 확률, soft target), 점수가 없으면 Sentiment_label
+    · '미분석' 등 긍정/부정이 아닌 행과 다른 언어(Review_lang ≠ ko) 행은 제외
+    · 본문 해시로 학습 / 검증 분할 (같은 문장이 양쪽에 들어가지 않음)
+- 추론: 확신도 max(p, 1-p) ≥ 임계값인 리뷰만 선형 모델 결과 사용, 나머지는 트랜스포머로 넘김
+- 보고서: 임계값별 트랜스포머 호출 비율(escalation) ↔ 전체 모델과의 일치율
+    → sentiment_out/cascade_report.csv, 기준 일치율을 만족하는 가장 낮은 호출 비율의 임계값을 모델에 기록
+
+사용 예)
+    python linear_cascade.py train                       # 학습 + 보고서 + 모델 저장
+    python linear_cascade.py report --transformer-ms 9.5 # 저장된 모델로 보고서만 다시 (리뷰당 추론 ms 를 주면 비용 추정)
+"""
+
+import argparse
+import json
+import math
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+import sentiment_analysis
+from sentiment_analysis import CASCADE_SOURCE, MODEL_NAME, OUT_DIR, OUTPUT_PATH, SOURCE_COL, TRANSFORMER_SOURCE
+from term_frequency import NEG_VALUE, POS_VALUE, SENT_COL, TEXT_COL, source_fingerprint
+from text_normalization import nfc
+
+# ============================================================
+# 1. 설정
+# ============================================================
+MODEL_PATH = OUT_DIR / "linear_cascade.npz"
+REPORT_PATH = OUT_DIR / "cascade_report.csv"
+
+N_FEATURES = 1 << 18
+CHAR_NGRAMS = (1, 2, 3)
+MAX_CHARS = 512          # 아주 긴 리뷰도 앞부분만 특징화 (리뷰당 비용 상한)
+L2 = 1e-5
+MAX_ITER = 200
+HOLDOUT_MOD = 5          # crc32(본문) % 5 == 0 → 검증용 (약 20%)
+TRAIN_LANG = "ko"
+
+DEFAULT_THRESHOLD = 0.9
+THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.93, 0.95, 0.97, 0.99)
+TARGET_AGREEMENT = 0.98  # 캐스케이드 전체 결과가 트랜스포머와 이 이상 일치하는 임계값 중 호출 비율 최소를 추천
+
+SCORE_COL = "Sentiment_score"
+LANG_COL = "Review_lang"
+
+
+# ============================================================
+# 2. 특징 (해시 n-gram → CSR)
+# ============================================================
+def _grams(text: str):
+    text = " ".join(nfc(text).lower().split())[:MAX_CHARS]
+    padded = f" {text} "
+    for n in CHAR_NGRAMS:
+        for i in range(len(padded) - n + 1):
+            gram = padded[i:i + n]
+            if not gram.isspace():
+                yield gram
+    for word in text.split(" "):
+        if word:
+            yield "w:" + word
+
+
+def featurize(texts: list[str], n_features: int = N_FEATURES):
+    """
+    부호 있는 특징 해싱 (crc32 → 버킷 + 부호 비트), 값은 log1p(빈도), 행마다 L2 정규화
+    반환: scipy.sparse.csr_matrix (len(texts), n_features)
+    """
+    from scipy.sparse import csr_matrix
+
+    mask = n_features - 1
+    indptr = [0]
+    indices: list[int] = []
+    data: list[float] = []
+    for text in texts:
+        row: Counter = Counter()
+        for gram in _grams(text):
+            h = zlib.crc32(gram.encode("utf-8"))
+            row[h & mask] += 1 if h & 0x80000000 else -1
+        values = [math.copysign(math.log1p(abs(v)), v) for v in row.values() if v]
+        norm = math.sqrt(sum(v * v for v in values)) or 1.0
+        indices.extend(k for k, v in row.items() if v)
+        data.extend(v / norm for v in values)
+        indptr.append(len(indices))
+    return csr_matrix(
+        (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(texts), n_features),
+    )
+
+
+# ============================================================
+# 3. 모델
+# ============================================================
+@dataclass
+class LinearCascade:
+    weights: np.ndarray
+    bias: float
+    meta: dict = field(default_factory=dict)
+
+    @property
+    def threshold(self) -> float:
+        return float(self.meta.get("threshold", DEFAULT_THRESHOLD))
+
+    def predict_proba(self, texts: list[str]) -> np.ndarray:
+        """긍정 확률"""
+        from scipy.special import expit
+
+        X = featurize(texts, len(self.weights))
+        return expit(X @ self.weights + self.bias)
+
+    def predict(self, texts: list[str], threshold: Optional[float] = None) -> tuple[list[str], np.ndarray, np.ndarray]:
+        """반환: (라벨, 긍정 확률, 확신 여부) — 확신하지 못한 리뷰는 트랜스포머로 넘길 대상"""
+        threshold = self.threshold if threshold is None else threshold
+        probs = self.predict_proba(texts)
+        labels = np.where(probs >= 0.5, POS_VALUE, NEG_VALUE).tolist()
+        confident = np.maximum(probs, 1.0 - probs) >= threshold
+        return labels, probs, confident
+
+    def save(self, path: Path = MODEL_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez_compressed(
+            tmp,
+            weights=self.weights.astype(np.float32),
+            bias=np.float64(self.bias),
+            meta=np.array(json.dumps(self.meta, ensure_ascii=False)),
+        )
+        tmp.replace(path)
+        print(f"[SAVE] 선형 캐스케이드 모델 → {path}")
+
+    @classmethod
+    def load(cls, path: Path = MODEL_PATH) -> Optional["LinearCascade"]:
+        path = Path(path)
+        if not path.exists():
+            return None
+        with np.load(path) as npz:
+            return cls(
+                weights=npz["weights"].astype(np.float64),
+                bias=float(npz["bias"]),
+                meta=json.loads(str(npz["meta"])),
+            )
+
+
+def fit_logistic(X, y: np.ndarray, l2: float = L2, max_iter: int = MAX_ITER) -> tuple[np.ndarray, float]:
+    """soft target 로지스틱 회귀 (교차 엔트로피 + L2, L-BFGS)"""
+    from scipy.optimize import minimize
+    from scipy.special import expit
+
+    n, d = X.shape
+
+    def loss_grad(params):
+        w, b = params[:d], params[d]
+        z = X @ w + b
+        diff = (expit(z) - y) / n
+        loss = float(np.mean(np.logaddexp(0.0, z) - y * z)) + 0.5 * l2 * float(w @ w)
+        grad = np.empty_like(params)
+        grad[:d] = X.T @ diff + l2 * w
+        grad[d] = diff.sum()
+        return loss, grad
+
+    result = minimize(loss_grad, np.zeros(d + 1), jac=True, method="L-BFGS-B", options={"maxiter": max_iter})
+    print(f"[INFO] 학습 종료: loss={result.fun:.4f}, 반복 {result.nit}회 ({result.message})")
+    return result.x[:d], float(result.x[d])
+
+
+# ============================================================
+# 4. 학습 데이터 (트랜스포머 결과 증류)
+# ============================================================
+def load_teacher(path: Path = OUTPUT_PATH) -> pd.DataFrame:
+    from lazy_dataset import scan
+
+    query = scan(path)
+    df = query.select([TEXT_COL, SENT_COL, SCORE_COL, LANG_COL, SOURCE_COL]).collect()
+    if SOURCE_COL in df.columns:
+        # 출처가 비어 있는 행(출처 기록 전 저장소에서 재사용한 라벨)도 캐스케이드 결과일 수 있어 제외
+        df = df[df[SOURCE_COL] == TRANSFORMER_SOURCE]
+    elif MODEL_PATH.exists():
+        raise ValueError(
+            f"'{path}' 에 {SOURCE_COL} 컬럼이 없어 캐스케이드 라벨을 가려낼 수 없습니다 "
+            "(python vrew_cli.py sentiment --no-cascade --rescore 로 다시 만든 뒤 학습)."
+        )
+    df = df[df[SENT_COL].isin([POS_VALUE, NEG_VALUE]) & df[TEXT_COL].notna()]
+    if LANG_COL in df.columns:
+        df = df[df[LANG_COL].isna() | (df[LANG_COL] == TRAIN_LANG)]
+    df = df.reset_index(drop=True)
+
+    target = (df[SENT_COL] == POS_VALUE).astype(float)
+    if SCORE_COL in df.columns:
+        score = pd.to_numeric(df[SCORE_COL], errors="coerce")
+        target = score.where(score.between(0.0, 1.0), target)
+    df["target"] = target
+    df["holdout"] = [zlib.crc32(str(t).encode("utf-8")) % HOLDOUT_MOD == 0 for t in df[TEXT_COL]]
+    print(f"[INFO] 증류 데이터: {len(df):,}건 (검증 {int(df['holdout'].sum()):,}건)")
+    return df
+
+
+# ============================================================
+# 5. 임계값별 호출 비율 ↔ 일치율
+# ============================================================
+def tradeoff_report(
+    probs: np.ndarray,
+    teacher_labels: list[str],
+    thresholds=THRESHOLDS,
+    linear_us: Optional[float] = None,
+    transformer_ms: Optional[float] = None,
+) -> pd.DataFrame:
+    """
+    - escalation_rate   : 트랜스포머로 넘어가는 리뷰 비율 (= 남는 추론 비용 비율)
+    - linear_agreement  : 선형 모델이 확정한 리뷰 중 트랜스포머와 같은 라벨 비율
+    - cascade_agreement : 캐스케이드 전체 결과의 일치율 (넘긴 리뷰는 트랜스포머 결과 그대로)
+    - cost_ratio        : 리뷰당 비용 / 전체 트랜스포머 비용 (linear_us, transformer_ms 가 있을 때)
+    """
+    probs = np.asarray(probs, dtype=float)
+    agree = (probs >= 0.5) == (np.asarray(teacher_labels) == POS_VALUE)
+    confidence = np.maximum(probs, 1.0 - probs)
+    n = max(len(probs), 1)
+
+    rows = []
+    for threshold in thresholds:
+        accepted = confidence >= threshold
+        n_acc = int(accepted.sum())
+        escalation = 1.0 - n_acc / n
+        row = {
+            "threshold": threshold,
+            "accepted": n_acc,
+            "escalation_rate": round(escalation, 4),
+            "linear_agreement": round(float(agree[accepted].mean()), 4) if n_acc else math.nan,
+            "cascade_agreement": round((int(agree[accepted].sum()) + (len(probs) - n_acc)) / n, 4),
+        }
+        if linear_us is not None and transformer_ms:
+            row["cost_ratio"] = round((linear_us / 1000 + escalation * transformer_ms) / transformer_ms, 4)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def recommend_threshold(report: pd.DataFrame, target: float = TARGET_AGREEMENT) -> float:
+    ok = report[report["cascade_agreement"] >= target]
+    if ok.empty:
+        return float(report["threshold"].max())
+    return float(ok.sort_values(["escalation_rate", "threshold"]).iloc[0]["threshold"])
+
+
+def evaluate(model: LinearCascade, df: pd.DataFrame, transformer_ms: Optional[float] = None) -> pd.DataFrame:
+    texts = df[TEXT_COL].astype(str).tolist()
+    start = time.perf_counter()
+    probs = model.predict_proba(texts)
+    linear_us = (time.perf_counter() - start) / max(len(texts), 1) * 1e6
+    print(f"[INFO] 선형 모델 추론: 리뷰당 {linear_us:.1f}µs ({len(texts):,}건)")
+
+    report = tradeoff_report(probs, df[SENT_COL].tolist(), linear_us=linear_us, transformer_ms=transformer_ms)
+    REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    report.to_csv(REPORT_PATH, index=False, encoding="utf-8-sig")
+    print(report.to_string(index=False))
+    print(f"[SAVE] 캐스케이드 보고서 → {REPORT_PATH}")
+    return report
+
+
+# ============================================================
+# 6. sentiment_analysis 연동
+# ============================================================
+def apply_cascade(
+    df: pd.DataFrame,
+    todo: pd.Series,
+    threshold: Optional[float] = None,
+    teacher: Optional[str] = None,
+    language_routing: bool = True,
+) -> pd.Series:
+    """
+    todo 행 중 선형 모델이 확신하는 리뷰에 Sentiment_label / Sentiment_score 를 채움
+    반환: 채운 행 mask (나머지 todo 행만 트랜스포머로 추론하면 됨)
+    - 모델이 없거나 다른 트랜스포머로 학습된 모델이면 아무 행도 채우지 않음
+      (teacher 가 없으면 호출 시점의 sentiment_analysis.MODEL_NAME)
+    - language_routing 이면 학습 언어(ko)로 판별된 리뷰만 대상
+    """
+    teacher = teacher or sentiment_analysis.MODEL_NAME
+    done = pd.Series(False, index=df.index)
+    model = LinearCascade.load()
+    if model is None:
+        print("[INFO] 선형 캐스케이드 모델 없음 → 전체 트랜스포머 추론 (학습: python linear_cascade.py train)")
+        return done
+    if model.meta.get("teacher") != teacher:
+        print(f"⚠️ 선형 캐스케이드가 다른 모델({model.meta.get('teacher')})로 학습됨 → 사용 안 함")
+        return done
+
+    idx = df.index[todo]
+    texts = df.loc[idx, TEXT_COL].fillna("").astype(str).tolist()
+    eligible = np.ones(len(texts), dtype=bool)
+    langs = None
+    if language_routing:
+        from lang_routing import detect_languages, language_hints
+
+        hints = language_hints(df.loc[idx])
+        langs = np.asarray(detect_languages(texts, hints=hints))
+        eligible = langs == model.meta.get("lang", TRAIN_LANG)
+
+    labels, probs, confident = model.predict(texts, threshold)
+    accept = confident & eligible
+    accepted_idx = idx[accept]
+    df.loc[accepted_idx, SENT_COL] = np.asarray(labels, dtype=object)[accept]
+    df.loc[accepted_idx, SCORE_COL] = probs[accept]
+    df.loc[accepted_idx, SOURCE_COL] = CASCADE_SOURCE
+    if langs is not None:
+        df.loc[accepted_idx, LANG_COL] = langs[accept]
+    done.loc[accepted_idx] = True
+
+    used = model.threshold if threshold is None else threshold
+    print(f"[INFO] 선형 캐스케이드 (임계값 {used}): {int(accept.sum()):,}건 확정, "
+          f"트랜스포머로 {len(texts) - int(accept.sum()):,}건 ({1 - accept.mean() if len(texts) else 0:.1%})")
+    return done
+
+
+# ============================================================
+# main
+# ============================================================
+def train(transformer_ms: Optional[float] = None) -> LinearCascade:
+    df = load_teacher()
+    train_df, hold_df = df[~df["holdout"]], df[df["holdout"]]
+    if train_df.empty or hold_df.empty:
+        raise ValueError("학습 / 검증 데이터가 부족합니다 (감정분석 결과를 먼저 만드세요).")
+
+    start = time.perf_counter()
+    X = featurize(train_df[TEXT_COL].astype(str).tolist())
+    print(f"[INFO] 특징화: {X.shape[0]:,}건, 비영 {X.nnz:,}개 ({time.perf_counter() - start:.1f}s)")
+    weights, bias = fit_logistic(X, train_df["target"].to_numpy(dtype=float))
+
+    model = LinearCascade(weights, bias, meta={
+        "teacher": MODEL_NAME,
+        "lang": TRAIN_LANG,
+        "n_features": N_FEATURES,
+        "char_ngrams": list(CHAR_NGRAMS),
+        "n_train": len(train_df),
+        "n_holdout": len(hold_df),
+        "source": source_fingerprint(OUTPUT_PATH),
+        "trained_at": datetime.now().isoformat(timespec="seconds"),
+    })
+    report = evaluate(model, hold_df, transformer_ms)
+    model.meta["threshold"] = recommend_threshold(report)
+    model.meta["target_agreement"] = TARGET_AGREEMENT
+    print(f"✅ 추천 임계값: {model.meta['threshold']} (캐스케이드 일치율 ≥ {TARGET_AGREEMENT})")
+    model.save()
+    return model
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="트랜스포머 앞단 선형 모델 캐스케이드")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("train", help="감정분석 결과로 증류 학습 + 보고서")
+    p.add_argument("--transformer-ms", type=float, default=None, help="리뷰당 트랜스포머 추론 시간 (비용 추정용)")
+
+    p = sub.add_parser("report", help="저장된 모델로 임계값별 보고서만 다시 계산")
+    p.add_argument("--transformer-ms", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        train(args.transformer_ms)
+    elif args.command == "report":
+        model = LinearCascade.load()
+        if model is None:
+            print(f"❌ 모델이 없습니다: {MODEL_PATH}")
+            return
+        df = load_teacher()
+        evaluate(model, df[df["holdout"]], args.transformer_ms)
+        print(f"[INFO] 현재 모델 임계값: {model.threshold}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+스트리밍 n-gram 빈출 구문 카운터 (메모리 상한 고정)
+- 입력: 리뷰 토큰 스트림 (term_frequency.tokenize) + 감정 라벨
+- 처리:
+    1) Count-Min Sketch: 모든 n-gram 빈도를 width × depth 고정 크기 표로 근사 (과대추정만 발생)
+       width = ⌈e / ε⌉, depth = ⌈ln(1 / δ)⌉ → 오차 ≤ ε·N 을 확률 1-δ 이상으로 보장
+    2) Space-Saving: 감정별 상위 k개 구문 후보만 유지
+    3) 두 구조 모두 merge 가능 → lazy_dataset 분할 파일마다 sketch 를 만들어 캐시하고 합산
+       (CSV 가 바뀌어도 내용이 같은 분할 파일은 캐시 재사용 → 새 / 바뀐 분할만 다시 셈)
+- 출력: sentiment_out/ngram_sketch.npz (감정별 TOP 구문 → 막대 그래프)
+        sentiment_out/ngram_shards/<해시>.npz (분할 파일별 sketch)
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from term_frequency import CSV_PATH, SENT_COL, TEXT_COL, source_fingerprint, tokenize_many, tokenizer_fingerprint
+
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+SKETCH_PATH = BASE_DIR / "sentiment_out" / "ngram_sketch.npz"
+SHARD_DIR = BASE_DIR / "sentiment_out" / "ngram_shards"
+
+NGRAM_SIZES = (2, 3)
+EPSILON = 1e-4
+DELTA = 1e-3
+TOP_K = 500
+BATCH_ROWS = 10_000
+
+
+# ===== 1. Count-Min Sketch =====
+class CountMinSketch:
+    def __init__(self, epsilon: float = EPSILON, delta: float = DELTA, seed: int = 0,
+                 width: Optional[int] = None, depth: Optional[int] = None):
+        self.width = width or math.ceil(math.e / epsilon)
+        self.depth = depth or math.ceil(math.log(1.0 / delta))
+        self.seed = seed
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        self.total = 0
+
+    def _hashes(self, items: list[str]) -> np.ndarray:
+        """Kirsch–Mitzenmacher 이중 해싱: h_i(x) = h1(x) + i·h2(x)  → shape (depth, n)"""
+        key = self.seed.to_bytes(8, "little")
+        h = np.empty((2, len(items)), dtype=np.uint64)
+        for j, item in enumerate(items):
+            digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16, key=key).digest()
+            h[0, j] = int.from_bytes(digest[:8], "little")
+            h[1, j] = int.from_bytes(digest[8:], "little") | 1
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h[0] + rows * h[1]) % np.uint64(self.width)).astype(np.int64)
+
+    def add_many(self, counts: dict[str, int]):
+        if not counts:
+            return
+        items = list(counts)
+        values = np.fromiter((counts[item] for item in items), dtype=np.int64, count=len(items))
+        cols = self._hashes(items)
+        for row in range(self.depth):
+            np.add.at(self.table[row], cols[row], values)
+        self.total += int(values.sum())
+
+    def estimate_many(self, items: list[str]) -> np.ndarray:
+        if not items:
+            return np.zeros(0, dtype=np.int64)
+        cols = self._hashes(items)
+        return self.table[np.arange(self.depth)[:, None], cols].min(axis=0)
+
+    def merge(self, other: "CountMinSketch"):
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise ValueError("width/depth/seed가 같은 sketch끼리만 합칠 수 있습니다.")
+        self.table += other.table
+        self.total += other.total
+
+
+# ===== 2. Space-Saving =====
+class SpaceSaving:
+    """상위 k개 후보만 유지 (count는 과대추정, count - error 는 하한)"""
+
+    def __init__(self, k: int = TOP_K):
+        self.k = k
+        self.counts: dict[str, int] = {}
+        self.errors: dict[str, int] = {}
+        self._heap: list[tuple[int, str]] = []
+
+    def _min_entry(self) -> tuple[int, str]:
+        # 힙에는 오래된 count가 남아 있을 수 있으므로 현재 값과 맞을 때까지 정리
+        while True:
+            count, item = self._heap[0]
+            current = self.counts.get(item)
+            if current == count:
+                return count, item
+            heapq.heappop(self._heap)
+            if current is not None:
+                heapq.heappush(self._heap, (current, item))
+
+    def update(self, item: str, count: int = 1):
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.k:
+            self.counts[item] = count
+            self.errors[item] = 0
+            heapq.heappush(self._heap, (count, item))
+        else:
+            min_count, min_item = self._min_entry()
+            heapq.heappop(self._heap)
+            del self.counts[min_item]
+            del self.errors[min_item]
+            self.counts[item] = min_count + count
+            self.errors[item] = min_count
+            heapq.heappush(self._heap, (min_count + count, item))
+
+    def min_count(self) -> int:
+        return self._min_entry()[0] if len(self.counts) >= self.k else 0
+
+    def merge(self, other: "SpaceSaving"):
+        """mergeable summaries (Agarwal et al.) — 한쪽에 없는 항목은 상대의 최소 count를 더함"""
+        m_self, m_other = self.min_count(), other.min_count()
+        counts, errors = {}, {}
+        for item in set(self.counts) | set(other.counts):
+            counts[item] = self.counts.get(item, m_self) + other.counts.get(item, m_other)
+            errors[item] = self.errors.get(item, m_self) + other.errors.get(item, m_other)
+        top = heapq.nlargest(self.k, counts, key=counts.get)
+        self.counts = {item: counts[item] for item in top}
+        self.errors = {item: errors[item] for item in top}
+        self._heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def top(self, n: int) -> list[tuple[str, int, int]]:
+        items = heapq.nlargest(n, self.counts, key=self.counts.get)
+        return [(item, self.counts[item], self.errors[item]) for item in items]
+
+
+# ===== 3. 감정별 n-gram 카운터 =====
+def iter_ngrams(tokens: list[str], sizes: Iterable[int] = NGRAM_SIZES):
+    for n in sizes:
+        for i in range(len(tokens) - n + 1):
+            yield " ".join(tokens[i:i + n])
+
+
+class NgramCounter:
+    def __init__(self, sizes=NGRAM_SIZES, epsilon: float = EPSILON, delta: float = DELTA,
+                 k: int = TOP_K, seed: int = 0):
+        self.sizes = tuple(sizes)
+        self.epsilon, self.delta, self.k, self.seed = epsilon, delta, k, seed
+        self.sketches: dict[str, CountMinSketch] = {}
+        self.heavy: dict[str, SpaceSaving] = {}
+
+    def settings(self) -> dict:
+        """sketch 크기 / 정확도를 정하는 파라미터 (캐시 키용, JSON 으로 저장해도 같은 값)"""
+        return {"sizes": list(self.sizes), "epsilon": self.epsilon, "delta": self.delta, "k": self.k, "seed": self.seed}
+
+    def _slot(self, key: str) -> tuple[CountMinSketch, SpaceSaving]:
+        if key not in self.sketches:
+            self.sketches[key] = CountMinSketch(self.epsilon, self.delta, self.seed)
+            self.heavy[key] = SpaceSaving(self.k)
+        return self.sketches[key], self.heavy[key]
+
+    def update_many(self, token_lists: Iterable[list[str]], keys: Iterable[str]):
+        """배치 단위로 n-gram을 모아 sketch / top-k 갱신 (배치 크기만큼만 메모리 사용)"""
+        batch: dict[str, Counter] = {}
+        for tokens, key in zip(token_lists, keys):
+            batch.setdefault(key, Counter()).update(iter_ngrams(tokens, self.sizes))
+        for key, counts in batch.items():
+            sketch, heavy = self._slot(key)
+            sketch.add_many(counts)
+            for item, count in counts.items():
+                heavy.update(item, count)
+
+    def merge(self, other: "NgramCounter"):
+        for key in other.sketches:
+            sketch, heavy = self._slot(key)
+            sketch.merge(other.sketches[key])
+            heavy.merge(other.heavy[key])
+
+    def top(self, key: str, n: int = 30) -> list[tuple[str, int]]:
+        """Space-Saving 후보의 count와 CMS 추정치 중 작은 값 (둘 다 과대추정이므로 더 정확)"""
+        if key not in self.heavy:
+            return []
+        candidates = self.heavy[key].top(max(n * 3, n))
+        items = [item for item, _, _ in candidates]
+        estimates = self.sketches[key].estimate_many(items)
+        scored = [(item, int(min(count, est))) for (item, count, _), est in zip(candidates, estimates)]
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored[:n]
+
+    def memory_bytes(self) -> int:
+        return sum(s.table.nbytes for s in self.sketches.values())
+
+    # ----- 저장 / 로드 -----
+    def save(self, path: Path = SKETCH_PATH, source: Optional[dict] = None, verbose: bool = True):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "sizes": self.sizes, "epsilon": self.epsilon, "delta": self.delta,
+            "k": self.k, "seed": self.seed, "source": source,
+            "keys": list(self.sketches),
+            "totals": {key: s.total for key, s in self.sketches.items()},
+            "heavy": {key: [h.counts, h.errors] for key, h in self.heavy.items()},
+        }
+        arrays = {f"cms_{i}": self.sketches[key].table for i, key in enumerate(self.sketches)}
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        np.savez_compressed(tmp, meta=np.array(json.dumps(meta, ensure_ascii=False)), **arrays)
+        tmp.replace(path)
+        if verbose:
+            print(f"[INFO] n-gram sketch 저장 → {path} ({self.memory_bytes() / 1e6:.1f}MB)")
+
+    @classmethod
+    def load(cls, path: Path = SKETCH_PATH) -> tuple["NgramCounter", Optional[dict]]:
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            counter = cls(meta["sizes"], meta["epsilon"], meta["delta"], meta["k"], meta["seed"])
+            for i, key in enumerate(meta["keys"]):
+                sketch, heavy = counter._slot(key)
+                sketch.table = data[f"cms_{i}"].copy()
+                sketch.total = meta["totals"][key]
+                heavy.counts, heavy.errors = (dict(d) for d in meta["heavy"][key])
+                heavy._heap = [(count, item) for item, count in heavy.counts.items()]
+                heapq.heapify(heavy._heap)
+        return counter, meta.get("source")
+
+
+# ===== 4. 분할 파일별 sketch → 합산 =====
+def build_from_batches(batches: Iterable, **params) -> NgramCounter:
+    """본문 / 감정 컬럼이 있는 청크 스트림 → sketch"""
+    counter = NgramCounter(**params)
+    for chunk in batches:
+        tokens = tokenize_many(chunk[TEXT_COL].tolist())
+        counter.update_many(tokens, chunk[SENT_COL].fillna("").astype(str).tolist())
+    return counter
+
+
+def _shard_name(file_info: dict, settings: dict) -> str:
+    raw = json.dumps({"sha1": file_info["sha1"], "partition": file_info["partition"], **settings}, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:24] + ".npz"
+
+
+def build_from_shards(csv_path=CSV_PATH, shard_dir: Path = SHARD_DIR, batch_rows: int = BATCH_ROWS,
+                      rebuild: bool = False, **params) -> NgramCounter:
+    """
+    lazy_dataset 분할 파일마다 sketch 를 캐시 → 전부 merge
+    - 캐시 이름 = 파일 내용 해시 + 분할 값 + sketch 파라미터 + 토큰화 설정
+    - 이번 데이터셋에 없는 캐시(사라진 / 바뀐 분할)는 삭제
+    """
+    from lazy_dataset import scan
+
+    settings = {"params": NgramCounter(**params).settings(), "tokenizer": tokenizer_fingerprint()}
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    counter = NgramCounter(**params)
+    used, built = set(), 0
+    for file_info, batches in scan(csv_path).select([TEXT_COL, SENT_COL]).iter_files(batch_rows):
+        shard_path = shard_dir / _shard_name(file_info, settings)
+        if not rebuild and shard_path.exists():
+            shard, _ = NgramCounter.load(shard_path)
+        else:
+            shard = build_from_batches(batches, **params)
+            shard.save(shard_path, {"file": file_info["path"], **settings}, verbose=False)
+            built += 1
+        counter.merge(shard)
+        used.add(shard_path.name)
+
+    stale = [path for path in shard_dir.glob("*.npz") if path.name not in used]
+    for path in stale:
+        path.unlink(missing_ok=True)
+    print(f"[INFO] n-gram sketch 분할 {len(used):,}개 합산 (새로 셈 {built:,}개, 재사용 {len(used) - built:,}개,"
+          f" 오래된 캐시 {len(stale):,}개 삭제)")
+    return counter
+
+
+def build_from_csv(csv_path=CSV_PATH, batch_rows: int = BATCH_ROWS, **params) -> NgramCounter:
+    """lazy_dataset 분할 데이터 전체를 한 번에 셈 (분할 캐시 없이)"""
+    from lazy_dataset import scan
+
+    return build_from_batches(scan(csv_path).select([TEXT_COL, SENT_COL]).iter_batches(batch_rows), **params)
+
+
+def get_ngram_counter(csv_path=CSV_PATH, sketch_path: Path = SKETCH_PATH, rebuild: bool = False,
+                      shard_dir: Path = SHARD_DIR, **params) -> NgramCounter:
+    """
+    입력 CSV / sketch 파라미터(n, ε, δ, k, seed) / 토큰화 설정이 모두 같으면 저장된 합산 sketch 재사용
+    하나라도 다르면 분할 파일별 캐시를 합산 (CSV 가 바뀐 경우 새 / 바뀐 분할만 다시 셈)
+    """
+    source = {
+        **source_fingerprint(csv_path),
+        "params": NgramCounter(**params).settings(),
+        "tokenizer": tokenizer_fingerprint(),
+    }
+    if not rebuild and sketch_path.exists():
+        counter, saved_source = NgramCounter.load(sketch_path)
+        if saved_source == source:
+            print(f"[INFO] n-gram sketch 재사용 ← {sketch_path}")
+            return counter
+    counter = build_from_shards(csv_path, shard_dir, rebuild=rebuild, **params)
+    counter.save(sketch_path, source)
+    return counter
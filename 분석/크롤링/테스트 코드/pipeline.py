@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+리뷰 분석 파이프라인 실행기 (DAG + 지문 캐시)
+- 단계: crawl → preprocess → sentiment → (bar, wordcloud, eval)
+- 각 단계는 입력 파일 / 출력 파일 / 코드 파일 / 파라미터(모듈 상수)를 선언
+- 지문 = 입력 파일 내용 해시 + 코드 파일 내용 해시 + 파라미터 JSON 해시
+  → 지난 실행과 같고 출력이 모두 있으면 건너뜀
+- 선행 단계가 끝나 동시에 실행 가능한 단계(막대 그래프 / 워드클라우드 / 평가)는 프로세스 풀로 병렬 실행
+- 상태: BASE_DIR/.pipeline_state.json (단계별 지문 + 파일 해시 캐시)
+- 이력: 실행된 단계의 CSV 출력은 snapshots.py 로 스냅샷 (바뀐 청크만 저장, 실행 간 diff 가능)
+- 경로: 각 스크립트의 BASE_DIR 은 VREW_BASE_DIR 환경변수로 변경 가능
+
+사용 예)
+    python pipeline.py                      # 바뀐 단계만 실행 (crawl 은 출력이 없을 때만)
+    python pipeline.py --force crawl        # 새 리뷰 수집부터 다시
+    python pipeline.py --dry-run            # 실행 계획만 출력
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from vrew_cli import SCRIPT_DIR, SCRIPTS, load_script
+
+# ===== 1. 설정 =====
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+STATE_PATH = BASE_DIR / ".pipeline_state.json"
+MAX_WORKERS = 3
+SNAPSHOT_OUTPUTS = True
+HASH_CHUNK = 1 << 20
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    script: vrew_cli.SCRIPTS 키
+    inputs / outputs / params: 스크립트 모듈 속성 이름 ("모듈.속성" 이면 다른 모듈에서 조회)
+    code: 스크립트 외에 결과에 영향을 주는 파일
+    volatile: 입력이 없는 외부 수집 단계 → 출력이 없거나 --force 일 때만 실행
+    """
+    name: str
+    script: str
+    deps: tuple[str, ...] = ()
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    params: tuple[str, ...] = ()
+    code: tuple[str, ...] = ()
+    entry: str = "main"
+    volatile: bool = False
+
+
+STAGES = (
+    Stage(
+        "crawl", "crawl",
+        outputs=("COMBINED_CSV_PATH",),
+        params=("APPSTORE_URL", "GPLAY_URL", "APPSTORE_COUNTRIES", "GPLAY_LOCALES"),
+        code=("review_store.py", "text_normalization.py"),
+        volatile=True,
+    ),
+    Stage(
+        "preprocess", "preprocess", deps=("crawl",),
+        inputs=("CSV_PATH",),
+        outputs=("CLEAN_PATH", "TOKEN_CSV_PATH"),
+        params=("STOPWORDS", "EXCLUDE_KEYWORDS", "STRING_COLS", "NUMERIC_COLS", "DATE_COLS", "SEED"),
+        code=("text_normalization.py",),
+    ),
+    Stage(
+        "sentiment", "sentiment", deps=("preprocess",),
+        inputs=("INPUT_PATH", "linear_cascade.MODEL_PATH"),
+        outputs=("OUTPUT_PATH",),
+        params=("MODEL_NAME", "MAX_LEN", "BATCH_SIZE", "LONG_TEXT_MODE", "WINDOW_STRIDE",
+                "WINDOW_AGGREGATE", "LANGUAGE_ROUTING", "lang_routing.LANG_MODELS", "lang_routing.FALLBACK_MODEL",
+                "CASCADE_MODE", "CASCADE_THRESHOLD",
+                "STORE_SYNC", "REUSE_STORED_SENTIMENT", "WRITE_PARTITIONS"),
+        code=("lang_routing.py", "linear_cascade.py", "review_cube.py", "review_store.py", "lazy_dataset.py",
+              "text_normalization.py"),
+    ),
+    Stage(
+        "bar", "bar", deps=("sentiment",),
+        inputs=("CSV_PATH",),
+        outputs=("POS_PLOT_PATH", "NEG_PLOT_PATH"),
+        params=("TOP_N", "PLOT_PHRASES", "term_frequency.stopwords"),
+        code=("term_frequency.py", "text_normalization.py", "batch_render.py", "ngram_sketch.py", "lazy_dataset.py"),
+    ),
+    Stage(
+        "wordcloud", "wordcloud", deps=("sentiment",),
+        inputs=("CSV_PATH",),
+        outputs=("POS_CLOUD_PATH", "NEG_CLOUD_PATH"),
+        params=("MAX_WORDS", "FONT_PATH", "term_frequency.stopwords"),
+        code=("term_frequency.py", "text_normalization.py", "batch_render.py", "lazy_dataset.py"),
+    ),
+    Stage(
+        "eval", "eval", deps=("sentiment",),
+        inputs=("LABELING_PATH",),
+        outputs=("evaluation.REPORT_PATH",),
+        params=("evaluation.N_BOOT", "evaluation.LABEL_ALIASES"),
+        code=("evaluation.py", "labeling_sampler.py", "lazy_dataset.py"),
+        entry="evaluate",
+    ),
+)
+STAGE_BY_NAME = {stage.name: stage for stage in STAGES}
+
+
+# ===== 2. 지문 =====
+def _resolve(module, name: str):
+    if "." in name:
+        module_name, attr = name.rsplit(".", 1)
+        return getattr(importlib.import_module(module_name), attr)
+    return getattr(module, name)
+
+
+def _jsonable(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(map(str, value))
+    if isinstance(value, Path):
+        return str(value)
+    return value
+
+
+class FileHasher:
+    """파일 내용 sha256 — (크기, 수정시각)이 같으면 지난 결과 재사용"""
+
+    def __init__(self, cache: dict):
+        self.cache = cache
+
+    def __call__(self, path: Path) -> Optional[str]:
+        if not path.exists():
+            return None
+        stat = path.stat()
+        key = str(path)
+        cached = self.cache.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256()
+        with path.open("rb") as f:
+            for block in iter(lambda: f.read(HASH_CHUNK), b""):
+                digest.update(block)
+        self.cache[key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+
+def stage_paths(stage: Stage, module, names: tuple[str, ...]) -> list[Path]:
+    return [Path(_resolve(module, name)) for name in names]
+
+
+def stage_fingerprint(stage: Stage, module, hasher: FileHasher) -> str:
+    parts = {
+        "inputs": {str(p): hasher(p) for p in stage_paths(stage, module, stage.inputs)},
+        "code": {
+            name: hasher(SCRIPT_DIR / name)
+            for name in (SCRIPTS[stage.script],) + stage.code
+        },
+        "params": {name: _jsonable(_resolve(module, name)) for name in stage.params},
+        "entry": stage.entry,
+    }
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ===== 3. 상태 =====
+def load_state(path: Path = STATE_PATH) -> dict:
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return {"stages": {}, "files": {}}
+
+
+def save_state(state: dict, path: Path = STATE_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+# ===== 4. 실행 =====
+def topological_levels(stages=STAGES) -> list[list[Stage]]:
+    """의존 단계가 모두 앞쪽 묶음에 있는 단계끼리 묶은 실행 순서 (선택되지 않은 의존 단계는 무시)"""
+    remaining = {stage.name: stage for stage in stages}
+    levels = []
+    while remaining:
+        ready = [s for s in remaining.values() if not any(dep in remaining for dep in s.deps)]
+        if not ready:
+            raise ValueError(f"단계 의존성에 순환이 있습니다: {', '.join(remaining)}")
+        levels.append(ready)
+        for stage in ready:
+            del remaining[stage.name]
+    return levels
+
+
+def run_stage(name: str) -> float:
+    """단계 하나 실행 (프로세스 풀 작업자에서도 호출) → 소요 시간(초)"""
+    stage = STAGE_BY_NAME[name]
+    start = time.perf_counter()
+    getattr(load_script(SCRIPTS[stage.script]), stage.entry)()
+    return time.perf_counter() - start
+
+
+def snapshot_outputs(stage: Stage):
+    """단계 CSV 출력 → 스냅샷 (실패해도 파이프라인은 계속)"""
+    from snapshots import snapshot
+
+    module = load_script(SCRIPTS[stage.script])
+    for path in stage_paths(stage, module, stage.outputs):
+        if path.suffix != ".csv" or not path.exists():
+            continue
+        try:
+            snapshot(path, label=stage.name)
+        except Exception as exc:
+            print(f"⚠️ {path.name} 스냅샷 실패: {exc}")
+
+
+def plan(stages: list[Stage], state: dict, hasher: FileHasher, force: set[str]) -> tuple[dict[str, str], dict[str, str]]:
+    """단계별 (지문, 판단 이유) — 이유가 "skip" 이면 건너뜀"""
+    fingerprints, reasons = {}, {}
+    for stage in stages:
+        module = load_script(SCRIPTS[stage.script])
+        outputs_ok = all(p.exists() for p in stage_paths(stage, module, stage.outputs))
+        fingerprint = stage_fingerprint(stage, module, hasher)
+        previous = state["stages"].get(stage.name, {}).get("fingerprint")
+        fingerprints[stage.name] = fingerprint
+
+        if stage.name in force:
+            reasons[stage.name] = "force"
+        elif not outputs_ok:
+            reasons[stage.name] = "출력 없음"
+        elif stage.volatile:
+            reasons[stage.name] = "skip"
+        elif previous != fingerprint:
+            reasons[stage.name] = "변경됨" if previous else "첫 실행"
+        else:
+            reasons[stage.name] = "skip"
+    return fingerprints, reasons
+
+
+def run_pipeline(
+    only: Optional[list[str]] = None,
+    force: Optional[list[str]] = None,
+    dry_run: bool = False,
+    max_workers: int = MAX_WORKERS,
+):
+    state = load_state()
+    hasher = FileHasher(state.setdefault("files", {}))
+    selected = set(only or STAGE_BY_NAME)
+    force = set(force or ())
+    failed: set[str] = set()
+    scheduled: set[str] = set()
+
+    for level in topological_levels([s for s in STAGES if s.name in selected]):
+        # 선행 단계 출력이 바뀌었을 수 있으므로 단계 묶음마다 지문을 다시 계산
+        fingerprints, reasons = plan(level, state, hasher, force)
+        todo = []
+        for stage in level:
+            if any(dep in failed for dep in stage.deps):
+                print(f"[SKIP] {stage.name}: 선행 단계 실패")
+                failed.add(stage.name)
+            elif dry_run and any(dep in scheduled for dep in stage.deps):
+                # 실제 실행 시에는 선행 단계 출력으로 지문을 다시 계산해 판단
+                print(f"[RUN?] {stage.name}: 선행 단계 실행 후 재판단")
+                scheduled.add(stage.name)
+            elif reasons[stage.name] == "skip":
+                print(f"[SKIP] {stage.name}: 변경 없음")
+            else:
+                print(f"[RUN ] {stage.name}: {reasons[stage.name]}")
+                scheduled.add(stage.name)
+                todo.append(stage)
+        if dry_run or not todo:
+            continue
+
+        results: dict[str, Optional[float]] = {}
+        if len(todo) == 1 or max_workers <= 1:
+            for stage in todo:
+                try:
+                    results[stage.name] = run_stage(stage.name)
+                except Exception as exc:
+                    print(f"[ERROR] {stage.name} 실패: {exc}")
+                    results[stage.name] = None
+        else:
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(todo))) as pool:
+                futures = {pool.submit(run_stage, stage.name): stage.name for stage in todo}
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        results[name] = future.result()
+                    except Exception as exc:
+                        print(f"[ERROR] {name} 실패: {exc}")
+                        results[name] = None
+
+        for name, elapsed in results.items():
+            if elapsed is None:
+                failed.add(name)
+                continue
+            state["stages"][name] = {
+                "fingerprint": fingerprints[name],
+                "finished_at": datetime.now().isoformat(timespec="seconds"),
+                "elapsed_sec": round(elapsed, 2),
+            }
+            print(f"✓ {name} 완료 ({elapsed:.1f}s)")
+            if SNAPSHOT_OUTPUTS:
+                snapshot_outputs(STAGE_BY_NAME[name])
+        save_state(state)
+
+    save_state(state)
+    if failed:
+        raise SystemExit(f"실패한 단계: {', '.join(sorted(failed))}")
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="리뷰 분석 파이프라인 (바뀐 단계만 실행)")
+    parser.add_argument("--only", nargs="*", choices=list(STAGE_BY_NAME), default=None, help="실행할 단계만 선택")
+    parser.add_argument("--force", nargs="*", choices=list(STAGE_BY_NAME), default=[], help="지문과 상관없이 실행")
+    parser.add_argument("--dry-run", action="store_true", help="실행 계획만 출력")
+    parser.add_argument("--jobs", type=int, default=MAX_WORKERS, help="병렬 실행 프로세스 수")
+    args = parser.parse_args(argv)
+    run_pipeline(args.only, args.force, args.dry_run, args.jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+리뷰 집계 큐브 (platform × country × version × rating × Sentiment_label)
+- 입력: sentiment_out/reviews_with_sentiment.csv
+- 저장: sentiment_out/review_cube.npz (컬럼형)
+    · 차원: 컬럼별 int32 코드 배열 + 코드 → 값 사전
+    · 측정값: 리뷰 수, Sentiment_score 합/개수, 별점 히스토그램(1~5점), thumbsUpCount / vote_sum 합
+    · 반영된 리뷰: 64bit 키 해시 + 리뷰별 셀 코드 · 측정값 (라벨 등이 바뀐 리뷰는 예전 기여분을 빼고 다시 더함)
+- 조회: rollup(차원 목록, 필터) / drill_down(현재 필터, 다음 차원)
+  → 원본 리뷰를 읽지 않고 큐브 셀만 합산
+
+사용 예)
+    python review_cube.py                                    # 새 리뷰 반영
+    python review_cube.py --by version Sentiment_label --platform googleplay
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import instrumented, set_rows, track_stage
+from keyword_trends import review_key
+from term_frequency import CSV_PATH, SENT_COL
+
+# ===== 1. 설정 =====
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+CUBE_PATH = BASE_DIR / "sentiment_out" / "review_cube.npz"
+
+DIMENSIONS = ("platform", "country", "version", "rating", SENT_COL)
+RATING_LEVELS = (1, 2, 3, 4, 5)
+SCORE_COL = "Sentiment_score"
+SUM_COLS = ("thumbsUpCount", "vote_sum")
+MEASURES = (
+    ("n_reviews", "score_sum", "score_count")
+    + tuple(f"rating_{r}" for r in RATING_LEVELS)
+    + tuple(f"{col}_sum" for col in SUM_COLS)
+)
+UNKNOWN = ""
+# 리뷰 키 규칙 버전 (2: 구글플레이 review_id 0 충돌 수정) — 다르면 저장된 큐브를 다시 집계
+KEY_VERSION = 2
+
+
+# ===== 2. 원본 → 셀 =====
+def read_reviews(path=CSV_PATH) -> pd.DataFrame:
+    """버전 문자열이 숫자로 바뀌지 않도록 (1.10 → 1.1) 문자열로 읽음"""
+    return pd.read_csv(path, dtype={"version": str, "appVersion": str})
+
+
+def key_hashes(df: pd.DataFrame) -> np.ndarray:
+    """리뷰 키(keyword_trends.review_key) → uint64 해시"""
+    return np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(review_key(row).encode("utf-8"), digest_size=8).digest(), "little")
+            for row in df.to_dict("records")
+        ),
+        dtype=np.uint64,
+        count=len(df),
+    )
+
+
+def _dimension_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """큐브 차원 값 정리 (앱스토어 version / 구글플레이 appVersion 통합, 별점은 정수 문자열)"""
+    version = df["version"] if "version" in df.columns else pd.Series(np.nan, index=df.index)
+    if "appVersion" in df.columns:
+        version = version.where(version.notna() & (version.astype(str) != ""), df["appVersion"])
+
+    rating = pd.to_numeric(df["rating"], errors="coerce") if "rating" in df.columns else pd.Series(np.nan, index=df.index)
+    dims = pd.DataFrame({
+        "platform": df.get("platform", pd.Series(UNKNOWN, index=df.index)),
+        "country": df.get("country", pd.Series(UNKNOWN, index=df.index)),
+        "version": version,
+        "rating": rating.round().astype("Int64").astype(str).replace("<NA>", UNKNOWN),
+        SENT_COL: df.get(SENT_COL, pd.Series(UNKNOWN, index=df.index)),
+    }, index=df.index)
+    return dims.fillna(UNKNOWN).astype(str)
+
+
+def _measure_frame(df: pd.DataFrame) -> pd.DataFrame:
+    score = pd.to_numeric(df.get(SCORE_COL, pd.Series(np.nan, index=df.index)), errors="coerce")
+    rating = pd.to_numeric(df.get("rating", pd.Series(np.nan, index=df.index)), errors="coerce").round()
+    measures = pd.DataFrame({
+        "n_reviews": np.ones(len(df), dtype=np.int64),
+        "score_sum": score.fillna(0.0).to_numpy(),
+        "score_count": score.notna().to_numpy().astype(np.int64),
+    }, index=df.index)
+    for r in RATING_LEVELS:
+        measures[f"rating_{r}"] = (rating == r).to_numpy().astype(np.int64)
+    for col in SUM_COLS:
+        values = pd.to_numeric(df[col], errors="coerce") if col in df.columns else pd.Series(0, index=df.index)
+        measures[f"{col}_sum"] = values.fillna(0).to_numpy().astype(np.int64)
+    return measures
+
+
+# ===== 3. 큐브 =====
+class ReviewCube:
+    def __init__(self):
+        self.categories: dict[str, list[str]] = {dim: [] for dim in DIMENSIONS}
+        self.codes: dict[str, np.ndarray] = {dim: np.zeros(0, dtype=np.int32) for dim in DIMENSIONS}
+        self.measures: dict[str, np.ndarray] = {
+            m: np.zeros(0, dtype=np.float64 if m == "score_sum" else np.int64) for m in MEASURES
+        }
+        # 리뷰별 기여분 (seen[i] 리뷰의 셀 코드 / 측정값) — 바뀐 리뷰를 셀에서 빼는 데 사용
+        self.seen = np.zeros(0, dtype=np.uint64)
+        self.seen_codes = np.zeros((0, len(DIMENSIONS)), dtype=np.int32)
+        self.seen_measures = np.zeros((0, len(MEASURES)), dtype=np.float64)
+        self.last_changed = 0
+
+    def __len__(self) -> int:
+        return len(self.measures["n_reviews"])
+
+    def _encode(self, dim: str, values: pd.Series) -> np.ndarray:
+        lookup = {value: code for code, value in enumerate(self.categories[dim])}
+        for value in pd.unique(values):
+            if value not in lookup:
+                lookup[value] = len(self.categories[dim])
+                self.categories[dim].append(value)
+        return values.map(lookup).to_numpy(dtype=np.int32)
+
+    def add(self, df: pd.DataFrame) -> int:
+        """
+        새 리뷰는 셀에 합산, 이미 반영된 리뷰는 차원(라벨 등) / 측정값이 바뀐 경우에만
+        예전 기여분을 빼고 새 값을 더함. 반환: 새로 반영한 리뷰 수
+        """
+        hashes = key_hashes(df)
+        _, first = np.unique(hashes, return_index=True)
+        first = np.sort(first)  # 같은 입력 안의 중복 키는 첫 행만
+        hashes = hashes[first]
+        dims = _dimension_frame(df.iloc[first])
+        codes = np.column_stack([self._encode(dim, dims[dim]) for dim in DIMENSIONS]).astype(np.int32)
+        values = _measure_frame(df.iloc[first])[list(MEASURES)].to_numpy(dtype=np.float64)
+
+        pos = pd.Index(self.seen).get_indexer(hashes)
+        old = pos >= 0
+        changed = old.copy()
+        changed[old] = (
+            (self.seen_codes[pos[old]] != codes[old]).any(axis=1)
+            | ~np.isclose(self.seen_measures[pos[old]], values[old]).all(axis=1)
+        )
+        fresh = ~old
+        self.last_changed = int(changed.sum())
+        if not (fresh.any() or changed.any()):
+            return 0
+
+        # +새 기여분 (신규 + 변경), -예전 기여분 (변경)
+        touched = fresh | changed
+        delta_codes = np.vstack([codes[touched], self.seen_codes[pos[changed]]])
+        delta_values = np.vstack([values[touched], -self.seen_measures[pos[changed]]])
+        delta = pd.concat(
+            [pd.DataFrame(delta_codes, columns=list(DIMENSIONS)), pd.DataFrame(delta_values, columns=list(MEASURES))],
+            axis=1,
+        )
+
+        current = pd.DataFrame({**self.codes, **self.measures})
+        cells = pd.concat([current, delta], ignore_index=True).groupby(list(DIMENSIONS), sort=False).sum()
+        cells = cells[cells["n_reviews"] > 0].reset_index()
+        self.codes = {dim: cells[dim].to_numpy(dtype=np.int32) for dim in DIMENSIONS}
+        self.measures = {
+            m: cells[m].to_numpy(dtype=np.float64) if m == "score_sum" else cells[m].round().to_numpy(dtype=np.int64)
+            for m in MEASURES
+        }
+
+        self.seen_codes[pos[changed]] = codes[changed]
+        self.seen_measures[pos[changed]] = values[changed]
+        self.seen = np.concatenate([self.seen, hashes[fresh]])
+        self.seen_codes = np.vstack([self.seen_codes, codes[fresh]])
+        self.seen_measures = np.vstack([self.seen_measures, values[fresh]])
+        return int(fresh.sum())
+
+    # ----- 조회 -----
+    def _mask(self, filters: dict) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        for dim, value in filters.items():
+            if value is None:
+                continue
+            if dim not in DIMENSIONS:
+                raise ValueError(f"큐브 차원이 아닙니다: {dim} (가능: {', '.join(DIMENSIONS)})")
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            wanted = [code for code, cat in enumerate(self.categories[dim]) if cat in {str(v) for v in values}]
+            mask &= np.isin(self.codes[dim], wanted)
+        return mask
+
+    def rollup(self, by: list[str] = (), **filters) -> pd.DataFrame:
+        """
+        by 차원으로 묶어 측정값 합산 (by가 비면 전체 합계 한 행)
+        filters: 차원=값 또는 차원=[값, ...]
+        """
+        by = list(by)
+        for dim in by:
+            if dim not in DIMENSIONS:
+                raise ValueError(f"큐브 차원이 아닙니다: {dim} (가능: {', '.join(DIMENSIONS)})")
+        mask = self._mask(filters)
+        frame = pd.DataFrame({m: values[mask] for m, values in self.measures.items()})
+        for dim in by:
+            frame[dim] = np.asarray(self.categories[dim], dtype=object)[self.codes[dim][mask]] if mask.any() else []
+
+        result = frame.groupby(by, sort=True).sum().reset_index() if by else frame.sum().to_frame().T
+        result["mean_score"] = result["score_sum"] / result["score_count"].where(result["score_count"] > 0)
+        return result[by + ["n_reviews", "mean_score"] + [m for m in MEASURES if m not in ("n_reviews",)]]
+
+    def drill_down(self, path: dict, next_dim: str) -> pd.DataFrame:
+        """현재 선택(path)을 고정한 채 next_dim 으로 한 단계 더 쪼갬"""
+        return self.rollup([dim for dim in path if dim in DIMENSIONS] + [next_dim], **path)
+
+    # ----- 저장 / 로드 -----
+    def save(self, path: Path = CUBE_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"categories": self.categories, "key_version": KEY_VERSION}
+        arrays = {f"dim_{dim}": codes for dim, codes in self.codes.items()}
+        arrays.update({f"m_{m}": values for m, values in self.measures.items()})
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez_compressed(
+            tmp,
+            meta=np.array(json.dumps(meta, ensure_ascii=False)),
+            seen=self.seen,
+            seen_codes=self.seen_codes,
+            seen_measures=self.seen_measures,
+            **arrays,
+        )
+        tmp.replace(path)
+        print(f"[INFO] 리뷰 큐브 저장 → {path} (셀 {len(self):,}개, 리뷰 {len(self.seen):,}건)")
+
+    @classmethod
+    def load(cls, path: Path = CUBE_PATH) -> Optional["ReviewCube"]:
+        """리뷰별 기여분이 없는 예전 형식(또는 키 규칙 변경 전 큐브)이면 None → 다시 집계"""
+        cube = cls()
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("key_version") != KEY_VERSION or "seen_codes" not in data.files:
+                return None
+            cube.categories = {dim: list(meta["categories"].get(dim, [])) for dim in DIMENSIONS}
+            cube.codes = {dim: data[f"dim_{dim}"] for dim in DIMENSIONS}
+            cube.measures = {m: data[f"m_{m}"] for m in MEASURES}
+            cube.seen = data["seen"]
+            cube.seen_codes = data["seen_codes"]
+            cube.seen_measures = data["seen_measures"]
+        return cube
+
+
+def update_cube(df: pd.DataFrame, path: Path = CUBE_PATH, rebuild: bool = False) -> ReviewCube:
+    """저장된 큐브에 새 리뷰만 더해 다시 저장 (파이프라인 실행마다 호출)"""
+    with track_stage("cube_update", rows_in=len(df)) as stage:
+        cube = ReviewCube.load(path) if path.exists() and not rebuild else None
+        if cube is None:
+            if path.exists() and not rebuild:
+                print("[INFO] 리뷰 큐브 형식 / 키 규칙이 바뀌어 처음부터 다시 집계")
+            cube = ReviewCube()
+        added = cube.add(df)
+        stage.rows_out = added + cube.last_changed
+        print(f"[INFO] 리뷰 큐브 반영: 신규 리뷰 {added:,}건, 라벨 / 값이 바뀐 리뷰 {cube.last_changed:,}건")
+        if added or cube.last_changed or not path.exists():
+            cube.save(path)
+    return cube
+
+
+@instrumented("cube")
+def main():
+    parser = argparse.ArgumentParser(description="리뷰 집계 큐브 (roll-up / drill-down)")
+    parser.add_argument("--input", default=CSV_PATH)
+    parser.add_argument("--by", nargs="*", default=["platform", SENT_COL], help=f"묶을 차원 ({', '.join(DIMENSIONS)})")
+    parser.add_argument("--platform", default=None)
+    parser.add_argument("--country", default=None)
+    parser.add_argument("--version", default=None)
+    parser.add_argument("--sentiment", default=None)
+    parser.add_argument("--rebuild", action="store_true", help="저장된 큐브를 버리고 처음부터 집계")
+    parser.add_argument("--no-update", action="store_true", help="새 리뷰 반영 없이 조회만")
+    args = parser.parse_args()
+
+    if args.no_update:
+        cube = ReviewCube.load()
+        if cube is None:
+            print("❌ 저장된 큐브가 예전 형식입니다. --no-update 없이 다시 집계하세요.")
+            return
+    else:
+        reviews = read_reviews(args.input)
+        set_rows(rows_in=len(reviews))
+        cube = update_cube(reviews, rebuild=args.rebuild)
+
+    filters = {"platform": args.platform, "country": args.country, "version": args.version, SENT_COL: args.sentiment}
+    table = cube.rollup(args.by, **filters)
+    set_rows(rows_out=len(table))
+    print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
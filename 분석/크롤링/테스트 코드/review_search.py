@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+리뷰 역색인 + BM25 검색
+- 입력: sentiment_out/reviews_with_sentiment.csv (+ vrew_reviews_tokens.csv 의 tokens_str)
+- 저장: SQLite (docs: 리뷰 메타데이터 / postings: token → 리뷰별 tf)
+- 처리:
+    1) 새 리뷰 / 바뀐 리뷰만 색인 (리뷰 키 + 본문 해시로 판단)
+    2) 불리언(AND / OR / NOT) + BM25 순위 검색, platform/country/날짜/감정 필터
+       점수 계산 / 정렬 / LIMIT 은 SQL 안에서 (후보 수와 상관없이 바인딩 변수 수는 검색어 크기만큼)
+    3) 색인 토큰과 검색어는 같은 정규화 (clean_text + 소문자)
+- 사용 예)
+    python review_search.py "자막 AND 싱크" --sentiment 부정 --platform googleplay --month 2025-11
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import re
+import sqlite3
+from collections import Counter
+from pathlib import Path
+
+import pandas as pd
+
+from instrumentation import instrumented, set_rows, track_stage
+from keyword_trends import TOKENS_COL, load_scored_reviews, review_key
+from term_frequency import DATE_COLS, SENT_COL, TEXT_COL
+from text_normalization import WORD_PATTERN, clean_text, nfc
+
+# ===== 1. 설정 =====
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+INDEX_PATH = BASE_DIR / "sentiment_out" / "review_index.sqlite"
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 리뷰 키 / 토큰 규칙이 바뀌면 올림 → 예전 색인은 버리고 다시 색인
+# (2: 구글플레이 review_id 0 충돌 수정, 3: 토큰 소문자화)
+SCHEMA_VERSION = 3
+
+# 검색용 토큰은 불용어를 빼지 않는다 (자막/영상 같은 도메인 단어도 검색 대상)
+_SEARCH_TOKEN = WORD_PATTERN
+
+RESULT_COLS = ["doc_id", "score", "platform", "country", "date", "sentiment", "review_text"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id       INTEGER PRIMARY KEY,
+    review_key   TEXT NOT NULL UNIQUE,
+    content_hash TEXT NOT NULL,
+    platform     TEXT,
+    country      TEXT,
+    date         TEXT,
+    sentiment    TEXT,
+    length       INTEGER NOT NULL,
+    review_text  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_docs_filter ON docs (sentiment, platform, country, date);
+CREATE TABLE IF NOT EXISTS postings (
+    token  TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    tf     INTEGER NOT NULL,
+    PRIMARY KEY (token, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc_id);
+CREATE TABLE IF NOT EXISTS stats (
+    name  TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+# ===== 2. 색인 =====
+def connect(path: Path = INDEX_PATH) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        with conn:
+            for table in ("postings", "docs", "stats"):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _row_date(row: dict) -> str:
+    for col in DATE_COLS:
+        value = row.get(col)
+        if isinstance(value, str) and value and value != "NaT":
+            return value[:10]
+    return ""
+
+
+def normalize_tokens(text) -> list[str]:
+    """색인 / 검색어 공용 토큰화: clean_text → 검색 토큰 → 소문자 (Subtitle == subtitle)"""
+    return [token.lower() for token in _SEARCH_TOKEN.findall(clean_text(text))]
+
+
+def _doc_tokens(row: dict) -> list[str]:
+    tokens = row.get(TOKENS_COL)
+    if isinstance(tokens, str) and tokens.strip():
+        return [token.lower() for token in nfc(tokens).split()]
+    return normalize_tokens(row.get(TEXT_COL, ""))
+
+
+def _refresh_stats(conn: sqlite3.Connection):
+    n_docs, total_len = conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs").fetchone()
+    conn.executemany(
+        "INSERT INTO stats (name, value) VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+        [("n_docs", n_docs), ("avg_len", total_len / n_docs if n_docs else 0.0)],
+    )
+
+
+def index_reviews(conn: sqlite3.Connection, df: pd.DataFrame) -> tuple[int, int]:
+    """
+    새 리뷰는 추가, 본문/라벨이 바뀐 리뷰는 postings를 교체한다.
+    반환: (추가 건수, 갱신 건수)
+    """
+    existing = dict(conn.execute("SELECT review_key, content_hash FROM docs"))
+    added = updated = 0
+
+    with conn:
+        for row in df.to_dict("records"):
+            key = review_key(row)
+            tokens = _doc_tokens(row)
+            sentiment = str(row.get(SENT_COL) or "")
+            content_hash = hashlib.sha1(
+                f"{sentiment}\x1f{' '.join(tokens)}\x1f{row.get(TEXT_COL, '')}".encode("utf-8")
+            ).hexdigest()
+
+            previous = existing.get(key)
+            if previous == content_hash:
+                continue
+
+            meta = (
+                content_hash,
+                str(row.get("platform") or ""),
+                str(row.get("country") or ""),
+                _row_date(row),
+                sentiment,
+                len(tokens),
+                str(row.get(TEXT_COL) or ""),
+            )
+            if previous is None:
+                cursor = conn.execute(
+                    "INSERT INTO docs (review_key, content_hash, platform, country, date, sentiment, length, review_text)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key,) + meta,
+                )
+                doc_id = cursor.lastrowid
+                added += 1
+            else:
+                doc_id = conn.execute("SELECT doc_id FROM docs WHERE review_key = ?", (key,)).fetchone()[0]
+                conn.execute(
+                    "UPDATE docs SET content_hash = ?, platform = ?, country = ?, date = ?, sentiment = ?,"
+                    " length = ?, review_text = ? WHERE doc_id = ?",
+                    meta + (doc_id,),
+                )
+                conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+                updated += 1
+            existing[key] = content_hash
+
+            conn.executemany(
+                "INSERT INTO postings (token, doc_id, tf) VALUES (?, ?, ?)",
+                [(token, doc_id, tf) for token, tf in Counter(tokens).items()],
+            )
+        _refresh_stats(conn)
+
+    print(f"[INFO] 색인 반영: 추가 {added:,}건, 갱신 {updated:,}건")
+    return added, updated
+
+
+# ===== 3. 질의 =====
+def parse_query(query: str) -> tuple[list[str], list[list[str]], list[str]]:
+    """
+    "자막 AND 싱크 OR 오류 NOT 광고" 형태 해석
+    - AND(기본): 반드시 포함 / OR: 바로 앞 항과 묶어 하나 이상 포함 / NOT: 제외
+    - 검색어는 색인과 같은 규칙으로 토큰화 (normalize_tokens, 한 단어가 여러 토큰이면 모두 같은 조건)
+    반환: (must, should 그룹 목록, must_not)
+    """
+    groups: list[list[str]] = []
+    must_not: list[str] = []
+    mode = "AND"
+    for word in re.findall(r"\S+", query):
+        upper = word.upper()
+        if upper in ("AND", "OR", "NOT"):
+            mode = upper
+            continue
+        for token in normalize_tokens(word):
+            if mode == "NOT":
+                must_not.append(token)
+            elif mode == "OR" and groups:
+                groups[-1].append(token)
+            else:
+                groups.append([token])
+        mode = "AND"
+    must = [g[0] for g in groups if len(g) == 1]
+    should = [g for g in groups if len(g) > 1]
+    return must, should, must_not
+
+
+def _filter_clause(filters: dict) -> tuple[str, list]:
+    clauses, params = [], []
+    for column in ("platform", "country", "sentiment"):
+        if filters.get(column):
+            clauses.append(f"d.{column} = ?")
+            params.append(filters[column])
+    if filters.get("month"):
+        clauses.append("d.date LIKE ?")
+        params.append(f"{filters['month']}%")
+    if filters.get("start_date"):
+        clauses.append("d.date >= ?")
+        params.append(filters["start_date"])
+    if filters.get("end_date"):
+        clauses.append("d.date <= ?")
+        params.append(filters["end_date"])
+    return " AND ".join(clauses), params
+
+
+def _idf(conn: sqlite3.Connection, token: str, n_docs: float) -> float:
+    df_t = conn.execute("SELECT COUNT(*) FROM postings WHERE token = ?", (token,)).fetchone()[0]
+    return math.log(1 + (n_docs - df_t + 0.5) / (df_t + 0.5))
+
+
+def search(
+    conn: sqlite3.Connection,
+    query: str,
+    limit: int = 20,
+    ranked: bool = True,
+    **filters,
+) -> pd.DataFrame:
+    """
+    불리언 조건을 만족하는 리뷰를 BM25 점수 순으로 반환
+    filters: platform, country, sentiment, month(YYYY-MM), start_date, end_date
+    - 후보 교집합 / 점수 합산 / 정렬 / LIMIT 을 한 SQL 로 (후보 doc_id 를 파이썬으로 가져오지 않음)
+    - 메타데이터는 limit 건만 조회
+    """
+    must, should, must_not = parse_query(query)
+    if not must and not should:
+        raise ValueError("검색어가 비어 있습니다.")
+    where, params = _filter_clause(filters)
+
+    stats = dict(conn.execute("SELECT name, value FROM stats"))
+    n_docs, avg_len = stats.get("n_docs", 0.0), stats.get("avg_len", 0.0) or 1.0
+    terms = list(dict.fromkeys(must + [token for group in should for token in group]))
+    idf = {token: _idf(conn, token, n_docs) if ranked else 0.0 for token in terms}
+
+    # 검색어 토큰별 idf → postings 와 조인해 문서별 BM25 합산
+    # (token, doc_id) 가 PK 라 문서마다 토큰은 한 번 → MAX(token = ?) 로 AND / OR 조건 판정
+    values = ", ".join("(?, ?)" for _ in terms)
+    sql_params: list = [value for token in terms for value in (token, idf[token])]
+    sql_params += [BM25_K1 + 1, BM25_K1, 1 - BM25_B, BM25_B, avg_len]
+    conditions = []
+    if where:
+        conditions.append(where)
+        sql_params += params
+    if must_not:
+        conditions.append(
+            "NOT EXISTS (SELECT 1 FROM postings n WHERE n.doc_id = p.doc_id AND n.token IN ({}))".format(
+                ",".join("?" * len(must_not)))
+        )
+        sql_params += must_not
+    having = ["MAX(p.token = ?) = 1" for _ in must]
+    sql_params += must
+    for group in should:
+        having.append("MAX(p.token IN ({})) = 1".format(",".join("?" * len(group))))
+        sql_params += group
+    order = "s.score DESC, s.doc_id" if ranked else "s.doc_id"
+    sql_params.append(limit)
+
+    sql = f"""
+        WITH q(token, idf) AS (VALUES {values})
+        SELECT s.doc_id, s.score, d.platform, d.country, d.date, d.sentiment, d.review_text
+        FROM (
+            SELECT p.doc_id AS doc_id,
+                   SUM(q.idf * p.tf * ? / (p.tf + ? * (? + ? * d.length / ?))) AS score
+            FROM q
+            JOIN postings p ON p.token = q.token
+            JOIN docs d ON d.doc_id = p.doc_id
+            {"WHERE " + " AND ".join(conditions) if conditions else ""}
+            GROUP BY p.doc_id
+            {"HAVING " + " AND ".join(having) if having else ""}
+        ) s
+        JOIN docs d ON d.doc_id = s.doc_id
+        ORDER BY {order}
+        LIMIT ?
+    """
+    rows = conn.execute(sql, sql_params).fetchall()
+    return pd.DataFrame(
+        [(doc_id, round(score, 4)) + tuple(meta) for doc_id, score, *meta in rows],
+        columns=RESULT_COLS,
+    )
+
+
+@instrumented("search")
+def main():
+    parser = argparse.ArgumentParser(description="리뷰 역색인 BM25 검색")
+    parser.add_argument("query", nargs="?", default=None, help='예) "자막 AND 싱크 NOT 광고"')
+    parser.add_argument("--platform", default=None)
+    parser.add_argument("--country", default=None)
+    parser.add_argument("--sentiment", default=None)
+    parser.add_argument("--month", default=None, help="YYYY-MM")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--no-update", action="store_true", help="색인 갱신 없이 검색만")
+    args = parser.parse_args()
+
+    conn = connect()
+    if not args.no_update:
+        df = load_scored_reviews()
+        added, updated = index_reviews(conn, df)
+        set_rows(rows_in=len(df), rows_out=added + updated)
+
+    if args.query:
+        with track_stage("search_query") as stage:
+            result = search(
+                conn, args.query, limit=args.limit,
+                platform=args.platform, country=args.country, sentiment=args.sentiment, month=args.month,
+            )
+            stage.rows_out = len(result)
+        print(result.to_string(index=False) if not result.empty else "검색 결과가 없습니다.")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
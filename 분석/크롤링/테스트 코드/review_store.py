@@ -0,0 +1,501 @@
+# -*- coding: utf-8 -*-
+"""
+리뷰 저장소 (SQLite, 앱스토어 + 구글플레이 공통 스키마)
+- 기준 데이터: BASE_DIR/vrew_reviews.sqlite — 크롤링 결과를 덮어쓰지 않고 (platform, review_id) 기준 UPSERT
+    · 본문/별점/버전/답변 등이 실제로 바뀐 리뷰만 갱신 (content_hash 비교)
+    · 갱신·추가된 행은 배치마다 1씩 증가하는 row_version 을 받음
+      → changed_since(버전) / read_changes(소비자) 로 바뀐 행만 읽음 (row_version 인덱스, 전체 스캔 없음)
+    · 본문이 바뀐 리뷰는 감정 라벨을 비워 다시 추론 대상이 됨
+- 인덱스: (platform, country, review_date), (version), (sentiment), (row_version)
+- WAL + busy_timeout: 크롤러가 쓰는 동안 분석 단계가 읽을 수 있고, 쓰기끼리는 BEGIN IMMEDIATE 로 직렬화
+- export_csv: 기존 단계가 읽는 vrew_reviews_combined.csv 형식(컬럼명)으로 내보내기
+
+사용 예)
+    python review_store.py                          # 현황 (플랫폼/국가별 리뷰 수, 최신 row_version)
+    python review_store.py --export                 # 저장소 → vrew_reviews_combined.csv
+    python review_store.py --changed-since 12       # row_version 12 이후 바뀐 리뷰
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from keyword_trends import clean_review_id, review_key
+from text_normalization import normalize_many
+
+# ===== 1. 설정 =====
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+STORE_PATH = BASE_DIR / "vrew_reviews.sqlite"
+EXPORT_PATH = BASE_DIR / "vrew_reviews_combined.csv"
+
+UPSERT_BATCH = 5000         # 한 트랜잭션(= 한 row_version)에 넣을 행 수
+BUSY_TIMEOUT_MS = 30000
+# 2: 구글플레이 review_id 0 충돌 행 정리 (예전 키 규칙으로 모든 GP 리뷰가 한 행에 덮어써졌음)
+# 3: sentiment_source 컬럼 추가 (transformer / cascade)
+STORE_SCHEMA_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    platform        TEXT NOT NULL,
+    review_id       TEXT NOT NULL,
+    country         TEXT NOT NULL DEFAULT '',
+    lang            TEXT NOT NULL DEFAULT '',
+    author          TEXT,
+    title           TEXT,
+    content         TEXT,
+    rating          INTEGER,
+    version         TEXT,
+    review_date     TEXT,
+    thumbs_up       INTEGER,
+    vote_sum        INTEGER,
+    vote_count      INTEGER,
+    reply_content   TEXT,
+    replied_at      TEXT,
+    content_hash    TEXT NOT NULL,
+    sentiment       TEXT,
+    sentiment_score REAL,
+    review_lang     TEXT,
+    sentiment_source TEXT,
+    created_version INTEGER NOT NULL,
+    row_version     INTEGER NOT NULL,
+    first_seen      TEXT NOT NULL,
+    updated_at      TEXT NOT NULL,
+    PRIMARY KEY (platform, review_id)
+);
+CREATE INDEX IF NOT EXISTS idx_reviews_platform_country_date ON reviews (platform, country, review_date);
+CREATE INDEX IF NOT EXISTS idx_reviews_version ON reviews (version);
+CREATE INDEX IF NOT EXISTS idx_reviews_sentiment ON reviews (sentiment);
+CREATE INDEX IF NOT EXISTS idx_reviews_row_version ON reviews (row_version);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS consumer_cursors (
+    consumer    TEXT PRIMARY KEY,
+    row_version INTEGER NOT NULL,
+    updated_at  TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# 크롤러 원본 컬럼 → 저장소 컬럼 (앞쪽 후보 우선)
+SOURCE_COLUMNS = {
+    "review_id": ("review_id", "reviewId"),
+    "country": ("country",),
+    "lang": ("lang",),
+    "author": ("author", "userName"),
+    "title": ("title",),
+    "content": ("content", "review_text"),
+    "rating": ("rating", "score"),
+    "version": ("version", "appVersion", "reviewCreatedVersion"),
+    "review_date": ("updated", "at"),
+    "thumbs_up": ("thumbsUpCount",),
+    "vote_sum": ("vote_sum",),
+    "vote_count": ("vote_count",),
+    "reply_content": ("replyContent",),
+    "replied_at": ("repliedAt",),
+}
+INT_COLUMNS = ("rating", "thumbs_up", "vote_sum", "vote_count")
+DATE_COLUMNS = ("review_date", "replied_at")
+# 값이 바뀌면 새 row_version 을 받는 컬럼 (country / lang 은 처음 수집한 로케일 유지)
+TRACKED_COLUMNS = ("author", "title", "content", "rating", "version", "review_date",
+                   "thumbs_up", "vote_sum", "vote_count", "reply_content", "replied_at")
+STORE_COLUMNS = ("platform", "review_id", "country", "lang") + TRACKED_COLUMNS
+
+# 저장소 컬럼 → 기존 CSV 컬럼명 (브류 리뷰 뜯어보기.py / term_frequency.DATE_COLS 가 읽는 이름)
+EXPORT_COLUMNS = {
+    "platform": "platform",
+    "review_id": "review_id",
+    "country": "country",
+    "lang": "lang",
+    "author": "author",
+    "title": "title",
+    "content": "content",
+    "rating": "rating",
+    "version": "version",
+    "review_date": "at",
+    "thumbs_up": "thumbsUpCount",
+    "vote_sum": "vote_sum",
+    "vote_count": "vote_count",
+    "reply_content": "replyContent",
+    "replied_at": "repliedAt",
+    "sentiment": "Sentiment_label",
+    "sentiment_score": "Sentiment_score",
+    "review_lang": "Review_lang",
+    "sentiment_source": "Sentiment_source",
+    "row_version": "row_version",
+}
+
+
+# ===== 2. 연결 =====
+def connect(path: Path = STORE_PATH) -> sqlite3.Connection:
+    """autocommit 연결 (쓰기는 write_transaction 으로 묶음)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, isolation_level=None, timeout=BUSY_TIMEOUT_MS / 1000)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.executescript(SCHEMA)
+    _migrate(conn)
+    return conn
+
+
+def _migrate(conn: sqlite3.Connection):
+    row = conn.execute("SELECT value FROM store_meta WHERE key = 'schema_version'").fetchone()
+    current = row[0] if row else 0
+    if current >= STORE_SCHEMA_VERSION:
+        return
+    removed = 0
+    with write_transaction(conn):
+        if current < 2:
+            removed = conn.execute("DELETE FROM reviews WHERE review_id IN ('', '0', '0.0')").rowcount
+        columns = {info[1] for info in conn.execute("PRAGMA table_info(reviews)")}
+        if "sentiment_source" not in columns:
+            conn.execute("ALTER TABLE reviews ADD COLUMN sentiment_source TEXT")
+        conn.execute(
+            "INSERT INTO store_meta (key, value) VALUES ('schema_version', ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (STORE_SCHEMA_VERSION,),
+        )
+    if removed:
+        print(f"[INFO] 리뷰 저장소: ID 가 0 이던 충돌 행 {removed:,}건 삭제 (다음 크롤링에서 reviewId 기준으로 다시 저장)")
+
+
+@contextmanager
+def write_transaction(conn: sqlite3.Connection):
+    """BEGIN IMMEDIATE: 쓰기 잠금을 먼저 잡아 동시에 쓰는 크롤러끼리 row_version 이 겹치지 않게 함"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _next_version(conn: sqlite3.Connection) -> int:
+    """write_transaction 안에서 호출"""
+    row = conn.execute("SELECT value FROM store_meta WHERE key = 'row_version'").fetchone()
+    version = (row[0] if row else 0) + 1
+    conn.execute(
+        "INSERT INTO store_meta (key, value) VALUES ('row_version', ?) "
+        "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+        (version,),
+    )
+    return version
+
+
+def latest_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT value FROM store_meta WHERE key = 'row_version'").fetchone()
+    return row[0] if row else 0
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+# ===== 3. 원본 → 저장소 행 =====
+def _review_ids(df: pd.DataFrame) -> pd.Series:
+    """review_id → reviewId 순으로 첫 유효 ID (keyword_trends.clean_review_id: 0 / 빈 값 / NaN 은 ID 없음)"""
+    ids = pd.Series("", index=df.index, dtype="object")
+    for col in SOURCE_COLUMNS["review_id"]:
+        if col in df.columns:
+            ids = ids.where(ids != "", df[col].map(clean_review_id))
+    return ids
+
+
+def _clean_version(value) -> str:
+    text = str(value).strip()
+    return text[:-2] if text.endswith(".0") and isinstance(value, float) else text
+
+
+def _first_present(df: pd.DataFrame, candidates: tuple[str, ...]) -> pd.Series:
+    result = pd.Series(pd.NA, index=df.index, dtype="object")
+    for col in candidates:
+        if col in df.columns:
+            values = df[col].where(df[col].astype(str).str.strip() != "")
+            result = result.where(result.notna(), values)
+    return result
+
+
+def _parse_dates(df: pd.DataFrame, candidates: tuple[str, ...]) -> pd.Series:
+    """
+    후보 컬럼(앱스토어 updated / 구글플레이 at)을 따로 파싱한 뒤 합침
+    (합친 뒤 한 번에 파싱하면 첫 값의 형식을 전체에 적용해 다른 형식이 모두 NaT 가 됨)
+    """
+    result = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns, UTC]")
+    for col in candidates:
+        if col in df.columns:
+            parsed = pd.to_datetime(df[col], errors="coerce", utc=True, format="ISO8601")
+            result = result.where(result.notna(), parsed)
+    return result.dt.strftime("%Y-%m-%d %H:%M:%S").where(result.notna(), None)
+
+
+def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """앱스토어 / 구글플레이 원본 컬럼을 저장소 스키마로 통일 (ID 가 없으면 review_key 해시)"""
+    out = pd.DataFrame({"platform": df.get("platform", pd.Series("", index=df.index)).fillna("").astype(str)})
+    out["review_id"] = _review_ids(df)
+    for col, candidates in SOURCE_COLUMNS.items():
+        if col in DATE_COLUMNS:
+            out[col] = _parse_dates(df, candidates)
+        elif col != "review_id":
+            out[col] = _first_present(df, candidates)
+
+    missing = out["review_id"] == ""
+    if missing.any():
+        out.loc[missing, "review_id"] = [review_key(row) for row in df.loc[missing].to_dict("records")]
+
+    for col in INT_COLUMNS:
+        out[col] = pd.to_numeric(out[col], errors="coerce").round().astype("Int64")
+    for col in ("country", "lang"):
+        out[col] = out[col].fillna("").astype(str)
+    # 본문은 NFC 로 통일 (같은 리뷰가 자모 분리형으로 들어와도 content_hash 가 바뀌지 않게)
+    for col in ("title", "content", "reply_content"):
+        present = out[col].notna()
+        out.loc[present, col] = normalize_many(out.loc[present, col], "nfc")
+    out["version"] = out["version"].map(lambda v: None if v is None or pd.isna(v) else _clean_version(v))
+
+    # 같은 배치 안의 중복은 앞쪽(먼저 수집한 로케일) 유지
+    return out.drop_duplicates(subset=["platform", "review_id"], keep="first").reset_index(drop=True)
+
+
+def _content_hash(row: tuple) -> str:
+    raw = "\x1f".join("" if v is None or (not isinstance(v, str) and pd.isna(v)) else str(v) for v in row)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _records(frame: pd.DataFrame) -> list[tuple]:
+    """sqlite 에 넣을 튜플 (pd.NA → None) + content_hash"""
+    values = frame[list(STORE_COLUMNS)].astype(object).where(frame[list(STORE_COLUMNS)].notna(), None)
+    tracked = [STORE_COLUMNS.index(col) for col in TRACKED_COLUMNS]
+    return [row + (_content_hash(tuple(row[i] for i in tracked)),) for row in values.itertuples(index=False, name=None)]
+
+
+# ===== 4. 쓰기 =====
+def upsert_reviews(conn: sqlite3.Connection, df: pd.DataFrame, batch_size: int = UPSERT_BATCH) -> tuple[int, int]:
+    """
+    (platform, review_id) 기준 UPSERT. 내용이 같은 리뷰는 건드리지 않음.
+    반환: (신규, 변경) 리뷰 수
+    """
+    records = _records(normalize_frame(df))
+    columns = STORE_COLUMNS + ("content_hash",)
+    updates = ",\n            ".join(f"{col} = excluded.{col}" for col in TRACKED_COLUMNS + ("content_hash",))
+    sql = f"""
+        INSERT INTO reviews ({", ".join(columns)}, created_version, row_version, first_seen, updated_at)
+        VALUES ({", ".join("?" * len(columns))}, ?, ?, ?, ?)
+        ON CONFLICT (platform, review_id) DO UPDATE SET
+            {updates},
+            sentiment = CASE WHEN reviews.content IS excluded.content THEN reviews.sentiment END,
+            sentiment_score = CASE WHEN reviews.content IS excluded.content THEN reviews.sentiment_score END,
+            sentiment_source = CASE WHEN reviews.content IS excluded.content THEN reviews.sentiment_source END,
+            row_version = excluded.row_version,
+            updated_at = excluded.updated_at
+        WHERE reviews.content_hash != excluded.content_hash
+    """
+
+    inserted = updated = 0
+    for start in range(0, len(records), batch_size):
+        chunk = records[start:start + batch_size]
+        now = _now()
+        with write_transaction(conn):
+            version = _next_version(conn)
+            conn.executemany(sql, [row + (version, version, now, now) for row in chunk])
+            n_new, n_changed = conn.execute(
+                "SELECT COALESCE(SUM(created_version = row_version), 0), COALESCE(SUM(created_version != row_version), 0) "
+                "FROM reviews WHERE row_version = ?",
+                (version,),
+            ).fetchone()
+        inserted += n_new
+        updated += n_changed
+
+    print(f"[INFO] 리뷰 저장소 반영: 입력 {len(records):,}건 → 신규 {inserted:,}건, 변경 {updated:,}건")
+    return inserted, updated
+
+
+def _stage_keys(conn: sqlite3.Connection, frame: pd.DataFrame):
+    """(platform, review_id) 목록을 임시 테이블에 넣어 PK 조인으로 조회/갱신"""
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS _keys (pos INTEGER PRIMARY KEY, platform TEXT, review_id TEXT)")
+    conn.execute("DELETE FROM _keys")
+    conn.executemany(
+        "INSERT INTO _keys (pos, platform, review_id) VALUES (?, ?, ?)",
+        zip(range(len(frame)), frame["platform"], frame["review_id"]),
+    )
+
+
+def _frame_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """normalize_frame 과 같은 규칙의 키 (중복 제거 없이 원래 행 순서 유지)"""
+    keys = pd.DataFrame({
+        "platform": df.get("platform", pd.Series("", index=df.index)).fillna("").astype(str).to_numpy(),
+        "review_id": _review_ids(df).to_numpy(),
+    })
+    missing = (keys["review_id"] == "").to_numpy()
+    if missing.any():
+        keys.loc[missing, "review_id"] = [review_key(row) for row in df.loc[missing].to_dict("records")]
+    return keys
+
+
+def stored_sentiment(conn: sqlite3.Connection, df: pd.DataFrame) -> pd.DataFrame:
+    """df 각 행의 저장된 감정 라벨 / 점수 / 언어 / 라벨 출처 (없으면 NaN), index 는 df 와 동일"""
+    _stage_keys(conn, _frame_keys(df))
+    rows = conn.execute(
+        """
+        SELECT k.pos, r.sentiment, r.sentiment_score, r.review_lang, r.sentiment_source
+        FROM _keys AS k JOIN reviews AS r ON r.platform = k.platform AND r.review_id = k.review_id
+        WHERE r.sentiment IS NOT NULL
+        """
+    ).fetchall()
+    columns = ["pos", "Sentiment_label", "Sentiment_score", "Review_lang", "Sentiment_source"]
+    found = pd.DataFrame(rows, columns=columns).set_index("pos")
+    found = found.reindex(range(len(df)))
+    found.index = df.index
+    return found
+
+
+def update_sentiment(conn: sqlite3.Connection, df: pd.DataFrame) -> int:
+    """
+    감정분석 결과(Sentiment_label / Sentiment_score / Review_lang / Sentiment_source)를 저장소에 기록.
+    반환: 바뀐 리뷰 수
+    """
+    keys = _frame_keys(df)
+    missing = pd.Series(None, index=df.index)
+    langs = df["Review_lang"] if "Review_lang" in df.columns else missing
+    sources = df["Sentiment_source"] if "Sentiment_source" in df.columns else missing
+    params = [
+        (label, None if pd.isna(score) else float(score), None if pd.isna(lang) else str(lang),
+         None if pd.isna(source) else str(source), platform, review_id)
+        for label, score, lang, source, platform, review_id in zip(
+            df["Sentiment_label"], df["Sentiment_score"], langs, sources, keys["platform"], keys["review_id"]
+        )
+    ]
+    now = _now()
+    with write_transaction(conn):
+        version = _next_version(conn)
+        before = conn.total_changes
+        conn.executemany(
+            """
+            UPDATE reviews
+            SET sentiment = ?1, sentiment_score = ?2, review_lang = ?3, sentiment_source = ?4,
+                row_version = ?7, updated_at = ?8
+            WHERE platform = ?5 AND review_id = ?6
+              AND (sentiment IS NOT ?1 OR sentiment_score IS NOT ?2 OR review_lang IS NOT ?3
+                   OR sentiment_source IS NOT ?4)
+            """,
+            [row + (version, now) for row in params],
+        )
+        changed = conn.total_changes - before
+    print(f"[INFO] 리뷰 저장소 감정 라벨 갱신: {changed:,}건 (row_version {version})")
+    return changed
+
+
+# ===== 5. 읽기 =====
+def _select_sql(columns: Optional[list[str]]) -> str:
+    columns = columns or list(EXPORT_COLUMNS)
+    return ", ".join(f'{col} AS "{EXPORT_COLUMNS.get(col, col)}"' for col in columns)
+
+
+def read_reviews(
+    conn: sqlite3.Connection,
+    columns: Optional[list[str]] = None,
+    platform: Optional[str] = None,
+    country: Optional[str] = None,
+    since_date: Optional[str] = None,
+    version: Optional[str] = None,
+    sentiment: Optional[str] = None,
+) -> pd.DataFrame:
+    """조건은 인덱스 컬럼만 사용. 결과 컬럼명은 기존 CSV 이름 (review_date → at 등)"""
+    clauses, params = [], []
+    for col, value in (("platform", platform), ("country", country), ("version", version), ("sentiment", sentiment)):
+        if value is not None:
+            clauses.append(f"{col} = ?")
+            params.append(value)
+    if since_date:
+        clauses.append("review_date >= ?")
+        params.append(since_date)
+    where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+    return pd.read_sql_query(f"SELECT {_select_sql(columns)} FROM reviews{where}", conn, params=params)
+
+
+def changed_since(conn: sqlite3.Connection, version: int, columns: Optional[list[str]] = None) -> pd.DataFrame:
+    """row_version > version 인 리뷰만 (row_version 인덱스 범위 조회)"""
+    columns = list(dict.fromkeys((columns or list(EXPORT_COLUMNS)) + ["row_version"]))
+    return pd.read_sql_query(
+        f"SELECT {_select_sql(columns)} FROM reviews WHERE row_version > ? ORDER BY row_version",
+        conn,
+        params=(version,),
+    )
+
+
+def read_changes(conn: sqlite3.Connection, consumer: str, columns: Optional[list[str]] = None) -> tuple[pd.DataFrame, int]:
+    """소비자(단계) 이름별 커서 이후 바뀐 리뷰. 처리가 끝나면 commit_cursor(conn, consumer, 반환 버전)"""
+    row = conn.execute("SELECT row_version FROM consumer_cursors WHERE consumer = ?", (consumer,)).fetchone()
+    since = row[0] if row else 0
+    changes = changed_since(conn, since, columns)
+    upto = int(changes["row_version"].max()) if not changes.empty else since
+    return changes, upto
+
+
+def commit_cursor(conn: sqlite3.Connection, consumer: str, version: int):
+    conn.execute(
+        "INSERT INTO consumer_cursors (consumer, row_version, updated_at) VALUES (?, ?, ?) "
+        "ON CONFLICT (consumer) DO UPDATE SET row_version = excluded.row_version, updated_at = excluded.updated_at",
+        (consumer, version, _now()),
+    )
+
+
+def export_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """크롤러 원본 → export_csv 와 같은 컬럼/형식 (저장소를 거치지 않는 streaming_pipeline.py 용)"""
+    return normalize_frame(df)[list(STORE_COLUMNS)].rename(columns=EXPORT_COLUMNS)
+
+
+def export_csv(conn: sqlite3.Connection, path: Path = EXPORT_PATH) -> int:
+    """저장소 전체 → 기존 통합 CSV 형식 (감정 컬럼 제외). 반환: 행 수"""
+    df = read_reviews(conn, list(STORE_COLUMNS))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    df.to_csv(tmp, index=False, encoding="utf-8-sig")
+    tmp.replace(path)
+    print(f"[SAVE] 리뷰 저장소 → {path} ({len(df):,}개)")
+    return len(df)
+
+
+def summary(conn: sqlite3.Connection) -> pd.DataFrame:
+    return pd.read_sql_query(
+        """
+        SELECT platform, country, COUNT(*) AS n_reviews,
+               SUM(sentiment IS NOT NULL) AS n_scored, MAX(review_date) AS latest_review
+        FROM reviews GROUP BY platform, country ORDER BY platform, country
+        """,
+        conn,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="리뷰 저장소 (SQLite) 현황 / 내보내기")
+    parser.add_argument("--db", type=Path, default=STORE_PATH)
+    parser.add_argument("--import-csv", type=Path, default=None, help="기존 통합 CSV 를 저장소에 UPSERT")
+    parser.add_argument("--export", action="store_true", help=f"저장소 → {EXPORT_PATH.name}")
+    parser.add_argument("--changed-since", type=int, default=None, help="이 row_version 이후 바뀐 리뷰 출력")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if args.import_csv:
+        upsert_reviews(conn, pd.read_csv(args.import_csv, dtype={"version": str, "appVersion": str}))
+    if args.export:
+        export_csv(conn)
+    if args.changed_since is not None:
+        changes = changed_since(conn, args.changed_since)
+        print(f"[INFO] row_version > {args.changed_since}: {len(changes):,}건")
+        print(changes.head(20).to_string(index=False))
+    print(summary(conn).to_string(index=False))
+    print(f"[INFO] 최신 row_version: {latest_version(conn)}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@
 Vrew 리뷰 감정분석 스크립트
 - 입력: 전처리 완료 CSV (브류 리뷰 뜯어보기.py에서 생성된 vrew_reviews_tokens.csv)
 - 모델: jaehyeong/koelectra-base-v3-generalized-sentiment-analysis
-- 출력: sentiment_out/reviews_with_sentiment.csv
+- 출력: sentiment_out/reviews_with_sentiment.csv (+ 리뷰 저장소 sentiment 컬럼)
 """
 
 import csv
@@ -13,33 +13,74 @@ import os
 from pathlib import Path
 from typing import Optional
 
-BASE_DIR = Path("/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew")
+import numpy as np
+import pandas as pd
+
+from instrumentation import instrumented, set_rows, track_stage
+from text_normalization import normalize_many
+
+# torch / transformers / tqdm 은 실제로 추론할 때만 import (CLI 시작 속도)
+
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
 CACHE_DIR = BASE_DIR / ".cache"
 HF_CACHE_DIR = CACHE_DIR / "huggingface"
-HF_CACHE_DIR.mkdir(parents=True, exist_ok=True)
-(HF_CACHE_DIR / "transformers").mkdir(parents=True, exist_ok=True)
-os.environ.setdefault("HF_HOME", str(HF_CACHE_DIR))
-os.environ.setdefault("HF_HUB_CACHE", str(HF_CACHE_DIR))
-os.environ.setdefault("HUGGINGFACE_HUB_CACHE", str(HF_CACHE_DIR))
-os.environ.setdefault("TRANSFORMERS_CACHE", str(HF_CACHE_DIR / "transformers"))
-os.environ.setdefault("HF_HUB_ENABLE_HF_XET", "0")
-os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "0")
 
-import pandas as pd
-import torch
-from tqdm.auto import tqdm
-from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+def configure_cache():
+    """Hugging Face 캐시 경로 설정 (transformers import 전에 호출)"""
+    HF_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    (HF_CACHE_DIR / "transformers").mkdir(parents=True, exist_ok=True)
+    os.environ.setdefault("HF_HOME", str(HF_CACHE_DIR))
+    os.environ.setdefault("HF_HUB_CACHE", str(HF_CACHE_DIR))
+    os.environ.setdefault("HUGGINGFACE_HUB_CACHE", str(HF_CACHE_DIR))
+    os.environ.setdefault("TRANSFORMERS_CACHE", str(HF_CACHE_DIR / "transformers"))
+    os.environ.setdefault("HF_HUB_ENABLE_HF_XET", "0")
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "0")
+
 
 # ============================================================
 # 1. 경로 및 기본 설정
 # ============================================================
 INPUT_PATH = BASE_DIR / "vrew_reviews_tokens.csv"
 OUT_DIR = BASE_DIR / "sentiment_out"
-OUT_DIR.mkdir(parents=True, exist_ok=True)
 OUTPUT_PATH = OUT_DIR / "reviews_with_sentiment.csv"
 
 MODEL_NAME = "jaehyeong/koelectra-base-v3-generalized-sentiment-analysis"
 
+# 긴 리뷰 처리: True면 max_len 초과 리뷰를 겹치는 윈도우로 나눠 전체를 점수화
+LONG_TEXT_MODE = False
+WINDOW_STRIDE = 64
+WINDOW_AGGREGATE = "mean"  # mean / max_neg / length_weighted
+
+# 언어별 라우팅: True면 lang_routing.LANG_MODELS의 언어별 모델로 추론
+# (모델 없는 언어는 lang_routing.SKIP_LABEL, lang_routing.FALLBACK_MODEL 로 바꿀 수 있음)
+LANGUAGE_ROUTING = True
+
+# 추론 배치 설정 (bench_sentiment.py 측정 결과를 보고 조정)
+BATCH_SIZE = 48
+MAX_LEN = 128
+
+# 선형 캐스케이드: linear_cascade.py 로 학습한 모델이 확신하는 리뷰는 트랜스포머 추론 생략
+# (모델 파일이 없으면 전체 트랜스포머 추론. 임계값 None 이면 학습 보고서의 추천 임계값)
+CASCADE_MODE = True
+CASCADE_THRESHOLD: Optional[float] = None
+
+# 라벨 출처 (linear_cascade 는 transformer 행으로만 학습 → 캐스케이드가 자기 결과로 다시 학습하지 않음)
+SOURCE_COL = "Sentiment_source"
+TRANSFORMER_SOURCE = "transformer"
+CASCADE_SOURCE = "cascade"
+
+# 저장 후 review_cube 집계 큐브에 새 리뷰 반영
+UPDATE_CUBE = True
+
+# 저장 후 lazy_dataset 분할 데이터도 갱신 (차트 / 평가 단계가 필요한 슬라이스 · 컬럼만 읽음)
+WRITE_PARTITIONS = True
+
+# 리뷰 저장소(review_store) 연동: 저장된 라벨이 있는 리뷰는 추론 생략, 새 결과는 저장소에 기록
+# (본문이 바뀐 리뷰는 저장소에서 라벨이 비워짐. 모델/추론 설정을 바꿨다면 REUSE_STORED_SENTIMENT = False)
+STORE_SYNC = True
+REUSE_STORED_SENTIMENT = True
+
 
 # ============================================================
 # 2. 데이터 로드
@@ -60,10 +101,16 @@ def load_dataframe(path: Path) -> pd.DataFrame:
 # ============================================================
 # 3. 모델 및 토크나이저 준비
 # ============================================================
-def load_model_and_tokenizer():
-    print(f"[INFO] 모델 로드: {MODEL_NAME}")
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+def load_model_and_tokenizer(model_name: Optional[str] = None):
+    """model_name 이 없으면 호출 시점의 MODEL_NAME (CLI --model 로 바꾼 값 반영)"""
+    model_name = model_name or MODEL_NAME
+    configure_cache()
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    print(f"[INFO] 모델 로드: {model_name}")
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
 
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     model.to(device)
@@ -114,12 +161,17 @@ def predict_batch(
     pos_idx: int,
     batch_size: int = 64,
     max_len: int = 128,
+    show_progress: bool = True,
 ) -> tuple[list[str], list[float]]:
+    import torch
+    from tqdm.auto import tqdm
+
     labels_kr: list[str] = []
     pos_scores: list[float] = []
     id2label = model.config.id2label
 
-    for start in tqdm(range(0, len(texts), batch_size), desc="predict", unit="batch"):
+    starts = range(0, len(texts), batch_size)
+    for start in tqdm(starts, desc="predict", unit="batch", disable=not show_progress):
         batch = list(map(str, texts[start:start + batch_size]))
 
         inputs = tokenizer(
@@ -142,19 +194,114 @@ def predict_batch(
     return labels_kr, pos_scores
 
 
+WINDOW_AGGREGATIONS = ("mean", "max_neg", "length_weighted")
+
+
+def split_windows(token_ids: list[int], window: int, stride: int) -> list[list[int]]:
+    """토큰 시퀀스를 window 길이, stride 간격의 겹치는 구간으로 분할"""
+    if len(token_ids) <= window:
+        return [token_ids]
+    windows = []
+    start = 0
+    while True:
+        windows.append(token_ids[start:start + window])
+        if start + window >= len(token_ids):
+            break
+        start += stride
+    return windows
+
+
+def aggregate_window_probs(probs, lengths, pos_idx: int, rule: str):
+    """한 리뷰에 속한 윈도우 확률(shape: [n_window, n_label])을 하나로 집계"""
+    if rule == "mean":
+        return probs.mean(axis=0)
+    if rule == "max_neg":
+        return probs[probs[:, pos_idx].argmin()]
+    if rule == "length_weighted":
+        weights = lengths / lengths.sum()
+        return (probs * weights[:, None]).sum(axis=0)
+    raise ValueError(f"지원하지 않는 집계 방식입니다: {rule} (가능: {', '.join(WINDOW_AGGREGATIONS)})")
+
+
+def predict_long(
+    texts: list[str],
+    tokenizer,
+    model,
+    device,
+    pos_idx: int,
+    batch_size: int = 64,
+    max_len: int = 128,
+    stride: int = 64,
+    aggregate: str = "mean",
+    show_progress: bool = True,
+) -> tuple[list[str], list[float]]:
+    """
+    긴 리뷰를 잘라내지 않고 겹치는 윈도우로 나눠 점수를 계산한다.
+    - 모든 리뷰의 윈도우를 한데 모아 길이순으로 정렬한 뒤 공유 배치로 추론
+    - 윈도우 점수는 리뷰 단위로 aggregate 규칙(mean / max_neg / length_weighted)에 따라 집계
+    """
+    import torch
+    from tqdm.auto import tqdm
+
+    if aggregate not in WINDOW_AGGREGATIONS:
+        raise ValueError(f"지원하지 않는 집계 방식입니다: {aggregate} (가능: {', '.join(WINDOW_AGGREGATIONS)})")
+
+    n_special = tokenizer.num_special_tokens_to_add(pair=False)
+    window = max_len - n_special
+    if not 0 < stride <= window:
+        raise ValueError(f"stride는 1 이상 {window} 이하여야 합니다: {stride}")
+
+    encoded = tokenizer(
+        list(map(str, texts)),
+        add_special_tokens=False,
+        truncation=False,
+        return_attention_mask=False,
+        return_token_type_ids=False,
+    )["input_ids"]
+
+    window_ids: list[list[int]] = []
+    owners: list[int] = []
+    for review_idx, ids in enumerate(encoded):
+        for chunk in split_windows(ids, window, stride):
+            window_ids.append(tokenizer.build_inputs_with_special_tokens(chunk))
+            owners.append(review_idx)
+
+    order = sorted(range(len(window_ids)), key=lambda i: len(window_ids[i]))
+    n_labels = model.config.num_labels
+    window_probs = np.zeros((len(window_ids), n_labels), dtype=np.float32)
+
+    starts = range(0, len(order), batch_size)
+    for start in tqdm(starts, desc="predict-long", unit="batch", disable=not show_progress):
+        batch_idx = order[start:start + batch_size]
+        inputs = tokenizer.pad(
+            {"input_ids": [window_ids[i] for i in batch_idx]},
+            padding=True,
+            return_tensors="pt",
+        ).to(device)
+
+        with torch.no_grad():
+            logits = model(**inputs).logits
+            window_probs[batch_idx] = torch.softmax(logits, dim=1).cpu().numpy()
+
+    owners_arr = np.asarray(owners)
+    lengths = np.asarray([len(ids) for ids in window_ids], dtype=np.float32)
+    bounds = np.searchsorted(owners_arr, np.arange(len(texts) + 1))
+    id2label = model.config.id2label
+
+    labels_kr: list[str] = []
+    pos_scores: list[float] = []
+    for review_idx in range(len(texts)):
+        lo, hi = bounds[review_idx], bounds[review_idx + 1]
+        prob = aggregate_window_probs(window_probs[lo:hi], lengths[lo:hi], pos_idx, aggregate)
+        labels_kr.append(map_label(int(prob.argmax()), id2label, pos_idx))
+        pos_scores.append(float(prob[pos_idx]))
+
+    return labels_kr, pos_scores
+
+
 # ============================================================
 # 5. 후처리 및 저장
 # ============================================================
-def sanitize_text(text: str) -> str:
-    sanitized = "" if pd.isna(text) else str(text)
-    return (
-        sanitized.replace("\r\n", " ")
-        .replace("\n", " ")
-        .replace("\t", " ")
-        .replace("\x00", "")
-    )
-
-
 def detect_date_column(df: pd.DataFrame) -> Optional[str]:
     for column in df.columns:
         if "date" in column.lower():
@@ -162,23 +309,36 @@ def detect_date_column(df: pd.DataFrame) -> Optional[str]:
     return None
 
 
-def save_with_sentiment(df: pd.DataFrame, date_col: Optional[str], path: Path):
-    save_cols: list[str] = []
+def output_columns(date_col: Optional[str]) -> list[str]:
+    """결과 CSV 후보 컬럼 (순서 고정, 없는 컬럼은 저장 시 제외)"""
     candidate_cols = [
         "ID",
         "provider",
         "store",
+        "platform",
+        "country",
+        "review_id",
+        "reviewId",
+        "version",
+        "appVersion",
         "rating",
+        "thumbsUpCount",
+        "vote_sum",
         date_col,
+        "at",
         "review_text",
+        "Review_lang",
         "Sentiment_label",
         "Sentiment_score",
+        SOURCE_COL,
     ]
+    return [col for col in dict.fromkeys(candidate_cols) if col]
 
-    for col in candidate_cols:
-        if col and col in df.columns:
-            save_cols.append(col)
 
+def save_with_sentiment(df: pd.DataFrame, date_col: Optional[str], path: Path):
+    save_cols = [col for col in output_columns(date_col) if col in df.columns]
+
+    path.parent.mkdir(parents=True, exist_ok=True)
     df[save_cols].to_csv(
         path,
         index=False,
@@ -192,38 +352,104 @@ def save_with_sentiment(df: pd.DataFrame, date_col: Optional[str], path: Path):
 # ============================================================
 # main
 # ============================================================
+@instrumented("sentiment")
 def main():
     df = load_dataframe(INPUT_PATH)
     print(f"[INFO] 입력 데이터: {len(df):,}건")
+    set_rows(rows_in=len(df))
 
     date_col = detect_date_column(df)
     print(f"[INFO] 날짜 컬럼: {date_col}")
 
-    tokenizer, model, device = load_model_and_tokenizer()
-    neg_idx, pos_idx = resolve_label_indices(model)
+    store_conn = None
+    todo = pd.Series(True, index=df.index)
+    if STORE_SYNC:
+        from review_store import connect as connect_store, stored_sentiment
+
+        store_conn = connect_store()
+        if REUSE_STORED_SENTIMENT:
+            stored = stored_sentiment(store_conn, df)
+            todo = stored["Sentiment_label"].isna()
+            for col in stored.columns:
+                df[col] = stored[col]
+            print(f"[INFO] 저장된 감정 라벨 재사용: {int((~todo).sum()):,}건, 추론 대상: {int(todo.sum()):,}건")
+
+    scored = todo.copy()
+    if CASCADE_MODE and todo.any():
+        from linear_cascade import apply_cascade
+
+        with track_stage("cascade", rows_in=int(todo.sum())) as stage:
+            cascaded = apply_cascade(df, todo, CASCADE_THRESHOLD, MODEL_NAME, LANGUAGE_ROUTING)
+            stage.rows_out = int(cascaded.sum())
+        todo = todo & ~cascaded
+
+    texts = df.loc[todo, "review_text"].fillna("").tolist()
+    predict_fn = predict_long if LONG_TEXT_MODE else predict_batch
+    predict_kwargs = {"stride": WINDOW_STRIDE, "aggregate": WINDOW_AGGREGATE} if LONG_TEXT_MODE else {}
+    if LONG_TEXT_MODE:
+        print(f"[INFO] 긴 리뷰 윈도우 모드 (stride={WINDOW_STRIDE}, aggregate={WINDOW_AGGREGATE})")
 
-    texts = df["review_text"].fillna("").tolist()
     print("[INFO] 감정분석 시작...")
-    labels, scores = predict_batch(
-        texts,
-        tokenizer=tokenizer,
-        model=model,
-        device=device,
-        pos_idx=pos_idx,
-        batch_size=48,
-        max_len=128,
-    )
-
-    df["Sentiment_label"] = labels
-    df["Sentiment_score"] = scores
+    labels, scores = [], []
+    with track_stage("inference", rows_in=len(texts), rows_out=len(texts)):
+        if texts and LANGUAGE_ROUTING:
+            from lang_routing import language_hints, route_and_predict
+
+            hints = language_hints(df.loc[todo])
+            labels, scores, langs = route_and_predict(
+                texts,
+                hints=hints,
+                batch_size=BATCH_SIZE,
+                max_len=MAX_LEN,
+                predict_fn=predict_fn,
+                **predict_kwargs,
+            )
+            df.loc[todo, "Review_lang"] = langs
+        elif texts:
+            tokenizer, model, device = load_model_and_tokenizer(MODEL_NAME)
+            neg_idx, pos_idx = resolve_label_indices(model)
+            labels, scores = predict_fn(
+                texts,
+                tokenizer=tokenizer,
+                model=model,
+                device=device,
+                pos_idx=pos_idx,
+                batch_size=BATCH_SIZE,
+                max_len=MAX_LEN,
+                **predict_kwargs,
+            )
+
+    df.loc[todo, "Sentiment_label"] = labels
+    df.loc[todo, "Sentiment_score"] = scores
+    df.loc[todo, SOURCE_COL] = TRANSFORMER_SOURCE
+    if store_conn is not None:
+        from review_store import update_sentiment
+
+        update_sentiment(store_conn, df.loc[scored])
+        store_conn.close()
     print("[INFO] 감정분석 샘플:")
     print(df[["review_text", "Sentiment_label", "Sentiment_score"]].head().to_string(index=False))
 
-    df["review_text"] = df["review_text"].map(sanitize_text)
-    if date_col:
-        df[date_col] = pd.to_datetime(df[date_col], errors="coerce").dt.date.astype(str)
+    df["review_text"] = normalize_many(df["review_text"], "sanitize")
+    for col in dict.fromkeys([date_col, "at"]):
+        if col and col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce").dt.date.astype(str)
 
     save_with_sentiment(df, date_col, OUTPUT_PATH)
+    set_rows(rows_out=len(df))
+
+    if WRITE_PARTITIONS:
+        from lazy_dataset import dataset_dir, write_partitions
+        from term_frequency import source_fingerprint
+
+        # 방금 쓴 CSV 를 다시 읽지 않고 메모리의 결과로 분할 (지문은 저장된 CSV 기준)
+        save_cols = [col for col in output_columns(date_col) if col in df.columns]
+        write_partitions(iter([df[save_cols].copy()]), dataset_dir(OUTPUT_PATH), source_fingerprint(OUTPUT_PATH))
+
+    if UPDATE_CUBE:
+        from review_cube import read_reviews, update_cube
+
+        update_cube(read_reviews(OUTPUT_PATH))
 
 
 if __name__ == "__main__":
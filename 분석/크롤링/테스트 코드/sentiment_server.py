@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+
+# -*- coding: utf-8 -*-
+"""
+Vrew 리뷰 감정분석 로컬 추론 서버
+- 모델: sentiment_analysis.load_model_and_tokenizer 로 한 번만 로드
+- 처리: 동시에 들어온 요청을 마이크로 배치로 묶어 predict_batch 실행
+        (max_batch_size 에 도달하거나 max_wait_ms 가 지나면 즉시 실행)
+        한 배치는 max_batch_size 문장을 넘지 않음 — 큰 요청은 나눠서 넣고 결과를 순서대로 합침
+        대기 큐는 max_queue 조각까지 (넘치면 503), 시간 초과로 포기한 요청은 큐에 남아 있어도 추론하지 않음
+- 엔드포인트 (localhost 전용)
+    POST /predict  {"text": "..."} 또는 {"texts": ["...", ...]}
+    GET  /stats    지연시간/처리량 통계
+    GET  /health   상태 확인
+
+사용 예)
+    python sentiment_server.py --port 8765
+    curl -s -X POST localhost:8765/predict -d '{"text": "자막 싱크가 안 맞아요"}'
+"""
+
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from sentiment_analysis import MAX_LEN, load_model_and_tokenizer, predict_batch, resolve_label_indices
+
+LOCAL_HOSTS = {"127.0.0.1", "localhost", "::1"}
+
+DEFAULT_PORT = 8765
+MAX_BATCH_SIZE = 48
+MAX_WAIT_MS = 10.0
+MAX_QUEUE = 256             # 대기 큐에 쌓아 둘 요청 조각 수 (조각 = 최대 max_batch_size 문장)
+REQUEST_TIMEOUT_SEC = 30.0
+LATENCY_WINDOW = 2048
+
+
+# ============================================================
+# 1. 마이크로 배치 처리기
+# ============================================================
+class QueueFullError(RuntimeError):
+    """대기 큐가 가득 차 요청을 받을 수 없음 (HTTP 503)"""
+
+
+class _PendingRequest:
+    __slots__ = ("texts", "created", "done", "labels", "scores", "error", "cancelled")
+
+    def __init__(self, texts: list[str]):
+        self.texts = texts
+        self.created = time.perf_counter()
+        self.done = threading.Event()
+        self.labels: list[str] = []
+        self.scores: list[float] = []
+        self.error: Optional[BaseException] = None
+        self.cancelled = False  # 호출한 쪽이 기다리기를 포기함 → 워커가 건너뜀
+
+
+class MicroBatcher:
+    """
+    요청 큐를 하나의 워커 스레드가 소비하면서 마이크로 배치를 만든다.
+    - 첫 요청이 도착한 시점부터 max_wait_ms 안에 들어온 요청을 함께 묶는다.
+    - 누적 문장 수가 max_batch_size 이상이면 기다리지 않고 바로 실행한다.
+    - 배치는 max_batch_size 문장을 넘지 않는다 (넘칠 요청은 다음 배치의 첫 요청으로 넘김).
+    - 큐는 max_queue 조각까지만 받고, 시간 초과로 취소된 요청은 배치에 넣지 않는다.
+    """
+
+    def __init__(
+        self,
+        tokenizer,
+        model,
+        device,
+        pos_idx: int,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait_ms: float = MAX_WAIT_MS,
+        max_len: int = MAX_LEN,
+        max_queue: int = MAX_QUEUE,
+    ):
+        self.tokenizer = tokenizer
+        self.model = model
+        self.device = device
+        self.pos_idx = pos_idx
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_len = max_len
+        self.max_queue = max_queue
+
+        self._queue: "queue.Queue[Optional[_PendingRequest]]" = queue.Queue(maxsize=max_queue)
+        self._carry: Optional[_PendingRequest] = None  # 이전 배치에 넣지 못한 요청 (워커 스레드 전용)
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._stats_lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._batch_latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._started_at = time.time()
+        self._requests = 0
+        self._texts = 0
+        self._batches = 0
+        self._cancelled = 0
+        self._rejected = 0
+        self._busy_sec = 0.0
+
+    def start(self):
+        self._worker.start()
+
+    def stop(self):
+        try:
+            self._queue.put(None, timeout=5)  # 큐가 가득 차 있으면 워커가 비울 때까지 잠시 대기
+        except queue.Full:
+            pass
+        self._worker.join(timeout=5)
+
+    def submit(
+        self,
+        texts: list[str],
+        timeout: float = REQUEST_TIMEOUT_SEC,
+        wait_for_queue: bool = False,
+    ) -> tuple[list[str], list[float]]:
+        """
+        max_batch_size 보다 긴 요청은 조각으로 나눠 큐에 넣고, 결과를 입력 순서대로 합침
+        - 큐가 가득 차면 QueueFullError (wait_for_queue 면 timeout 안에서 자리가 날 때까지 대기)
+        - timeout 이 지나면 아직 실행되지 않은 조각을 취소하고 TimeoutError
+        """
+        step = max(self.max_batch_size, 1)
+        parts = [_PendingRequest(texts[start:start + step]) for start in range(0, len(texts), step)]
+        deadline = time.perf_counter() + timeout
+        try:
+            for pending in parts:
+                if wait_for_queue:
+                    self._queue.put(pending, timeout=max(deadline - time.perf_counter(), 0.0))
+                else:
+                    self._queue.put_nowait(pending)
+        except queue.Full:
+            self._cancel(parts)
+            with self._stats_lock:
+                self._rejected += 1
+            raise QueueFullError(f"대기 중인 요청이 너무 많습니다 (최대 {self.max_queue}건). 잠시 후 다시 시도하세요.")
+
+        labels: list[str] = []
+        scores: list[float] = []
+        for pending in parts:
+            if not pending.done.wait(max(deadline - time.perf_counter(), 0.0)):
+                self._cancel(parts)
+                raise TimeoutError("추론 대기 시간이 초과되었습니다.")
+            if pending.error is not None:
+                self._cancel(parts)
+                raise pending.error
+            labels += pending.labels
+            scores += pending.scores
+        return labels, scores
+
+    @staticmethod
+    def _cancel(parts: list[_PendingRequest]):
+        for pending in parts:
+            pending.cancelled = True
+
+    def _skip(self, item: _PendingRequest) -> bool:
+        """취소된 요청이면 세고 True (배치에 넣지 않음)"""
+        if not item.cancelled:
+            return False
+        with self._stats_lock:
+            self._cancelled += 1
+        return True
+
+    def _collect(self, first: _PendingRequest) -> tuple[list[_PendingRequest], bool]:
+        batch = [first]
+        size = len(first.texts)
+        deadline = first.created + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            if self._skip(item):
+                continue
+            if size + len(item.texts) > self.max_batch_size:
+                self._carry = item
+                break
+            batch.append(item)
+            size += len(item.texts)
+        return batch, False
+
+    def _run(self):
+        while True:
+            first, self._carry = self._carry, None
+            if first is None:
+                first = self._queue.get()
+            if first is None:
+                return
+            if self._skip(first):
+                continue
+            batch, stopping = self._collect(first)
+            self._execute(batch)
+            if stopping:
+                if self._carry is not None:
+                    self._execute([self._carry])
+                return
+
+    def _execute(self, batch: list[_PendingRequest]):
+        # 배치를 모으는 동안(max_wait_ms) 시간 초과된 요청도 제외
+        batch = [item for item in batch if not self._skip(item)]
+        if not batch:
+            return
+        texts = [text for item in batch for text in item.texts]
+        started = time.perf_counter()
+        try:
+            labels, scores = predict_batch(
+                texts,
+                tokenizer=self.tokenizer,
+                model=self.model,
+                device=self.device,
+                pos_idx=self.pos_idx,
+                batch_size=max(len(texts), 1),
+                max_len=self.max_len,
+                show_progress=False,
+            )
+        except Exception as exc:  # 요청 스레드로 예외 전달
+            for item in batch:
+                item.error = exc
+                item.done.set()
+            return
+
+        finished = time.perf_counter()
+        offset = 0
+        for item in batch:
+            n = len(item.texts)
+            item.labels = labels[offset:offset + n]
+            item.scores = scores[offset:offset + n]
+            offset += n
+            item.done.set()
+
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._texts += len(texts)
+            self._busy_sec += finished - started
+            self._batch_latencies.append(finished - started)
+            self._latencies.extend(finished - item.created for item in batch)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            latencies = sorted(self._latencies)
+            batch_latencies = sorted(self._batch_latencies)
+            uptime = time.time() - self._started_at
+            return {
+                "uptime_sec": round(uptime, 3),
+                "requests": self._requests,
+                "texts": self._texts,
+                "batches": self._batches,
+                "cancelled": self._cancelled,
+                "rejected": self._rejected,
+                "avg_batch_size": round(self._texts / self._batches, 2) if self._batches else 0.0,
+                "throughput_texts_per_sec": round(self._texts / uptime, 2) if uptime > 0 else 0.0,
+                "busy_throughput_texts_per_sec": round(self._texts / self._busy_sec, 2) if self._busy_sec else 0.0,
+                "latency_ms": {
+                    "p50": _percentile_ms(latencies, 50),
+                    "p90": _percentile_ms(latencies, 90),
+                    "p99": _percentile_ms(latencies, 99),
+                },
+                "batch_latency_ms": {
+                    "p50": _percentile_ms(batch_latencies, 50),
+                    "p99": _percentile_ms(batch_latencies, 99),
+                },
+                "queue_depth": self._queue.qsize(),
+                "config": {
+                    "max_batch_size": self.max_batch_size,
+                    "max_wait_ms": self.max_wait * 1000.0,
+                    "max_len": self.max_len,
+                    "max_queue": self.max_queue,
+                },
+            }
+
+
+def _percentile_ms(sorted_values: list[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    rank = max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1)
+    return round(sorted_values[rank] * 1000.0, 3)
+
+
+# ============================================================
+# 2. HTTP 핸들러
+# ============================================================
+class SentimentRequestHandler(BaseHTTPRequestHandler):
+    batcher: MicroBatcher
+    max_texts_per_request = 1024
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send_json(200, self.batcher.stats())
+        else:
+            self._send_json(404, {"error": f"알 수 없는 경로입니다: {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {"error": f"알 수 없는 경로입니다: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError):
+            self._send_json(400, {"error": "JSON 본문을 해석할 수 없습니다."})
+            return
+        if not isinstance(payload, dict):
+            self._send_json(400, {"error": "JSON 본문은 객체여야 합니다 ({\"text\": ...} 또는 {\"texts\": [...]})."})
+            return
+
+        if "texts" in payload:
+            texts = payload["texts"]
+        elif "text" in payload:
+            texts = [payload["text"]]
+        else:
+            self._send_json(400, {"error": "'text' 또는 'texts' 필드가 필요합니다."})
+            return
+        if not isinstance(texts, list) or not texts:
+            self._send_json(400, {"error": "'texts'는 비어 있지 않은 리스트여야 합니다."})
+            return
+        if len(texts) > self.max_texts_per_request:
+            self._send_json(413, {"error": f"요청당 최대 {self.max_texts_per_request}건까지 처리합니다."})
+            return
+
+        texts = ["" if text is None else str(text) for text in texts]
+        try:
+            labels, scores = self.batcher.submit(texts)
+        except (TimeoutError, QueueFullError) as exc:
+            self._send_json(503, {"error": str(exc)})
+            return
+        except Exception as exc:
+            self._send_json(500, {"error": f"추론 실패: {exc}"})
+            return
+
+        results = [{"label": label, "score": score} for label, score in zip(labels, scores)]
+        self._send_json(200, {"results": results})
+
+    def log_message(self, format, *args):  # 요청마다 로그가 쏟아지지 않도록 억제
+        pass
+
+
+# ============================================================
+# 3. 서버 실행
+# ============================================================
+def build_server(
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    max_batch_size: int = MAX_BATCH_SIZE,
+    max_wait_ms: float = MAX_WAIT_MS,
+    max_len: int = MAX_LEN,
+    max_queue: int = MAX_QUEUE,
+) -> tuple[ThreadingHTTPServer, MicroBatcher]:
+    if host not in LOCAL_HOSTS:
+        raise ValueError(f"로컬 주소에서만 실행할 수 있습니다: {host}")
+
+    tokenizer, model, device = load_model_and_tokenizer()
+    _, pos_idx = resolve_label_indices(model)
+
+    batcher = MicroBatcher(
+        tokenizer,
+        model,
+        device,
+        pos_idx,
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms,
+        max_len=max_len,
+        max_queue=max_queue,
+    )
+    handler = type("BoundSentimentRequestHandler", (SentimentRequestHandler,), {"batcher": batcher})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, batcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vrew 리뷰 감정분석 로컬 추론 서버")
+    parser.add_argument("--host", default="127.0.0.1", help="바인드 주소 (localhost 전용)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    parser.add_argument("--max-len", type=int, default=MAX_LEN)
+    parser.add_argument("--max-queue", type=int, default=MAX_QUEUE, help="대기 큐 최대 조각 수 (넘치면 503)")
+    args = parser.parse_args()
+
+    server, batcher = build_server(
+        host=args.host,
+        port=args.port,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        max_len=args.max_len,
+        max_queue=args.max_queue,
+    )
+    batcher.start()
+    print(f"[INFO] 감정분석 서버 시작 → http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("[INFO] 서버 종료")
+    finally:
+        server.server_close()
+        batcher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+"""
+단계 출력 CSV 스냅샷 (압축 + 내용 주소 청크 + 빠른 diff)
+- 저장 구조: BASE_DIR/snapshots/
+    · objects/<앞 2자리>/<sha256>.zst   : 청크 본문(CSV 행 원본 바이트) / 행 색인 — 내용 해시가 이름
+    · manifests/<데이터셋>/<스냅샷 ID>.json : 헤더 + 청크 목록 (청크마다 본문 해시, 행 색인 해시, 행 수)
+- 청크 경계: 행 키(platform + review_id, ID 가 없으면 행 해시) 해시로 정함 (content-defined chunking)
+    · 같은 키가 또 나오면 "키#2", "키#3" … 으로 파일 안에서 고유하게 (색인 / diff 에서 행이 합쳐지지 않음)
+    · 해시 하위 비트가 0 인 행에서 청크를 닫음 → 평균 AVG_CHUNK_ROWS 행, MIN/MAX 로 상·하한
+    · 리뷰가 추가/수정/삭제돼도 그 리뷰가 속한 청크만 바뀌고 나머지 청크는 이전 스냅샷과 같은 객체를 공유
+- 압축: zstandard 가 있으면 zstd, 없으면 zlib (객체 확장자로 구분, 읽을 때 자동 판별)
+- 원자적 쓰기: 객체 / 매니페스트 모두 임시 파일 → os.replace, 매니페스트는 모든 객체를 쓴 뒤 마지막에 기록
+  (중간에 실패하면 스냅샷이 없는 것과 같음, 남은 객체는 gc 로 정리)
+- diff: 두 매니페스트의 청크 해시를 비교해 다른 청크의 행 색인만 읽음
+    → 새 리뷰 / 수정된 리뷰 / 삭제된 리뷰 키 (같은 청크는 열어보지 않음)
+    changed_frame(): 새·수정 리뷰 행만 DataFrame 으로 (증분 단계 입력용)
+
+사용 예)
+    python snapshots.py snapshot sentiment_out/reviews_with_sentiment.csv
+    python snapshots.py list reviews_with_sentiment.csv
+    python snapshots.py diff reviews_with_sentiment.csv                 # 직전 스냅샷 → 최신
+    python snapshots.py restore reviews_with_sentiment.csv 20250101_093000 /tmp/old.csv   # ID 앞부분만 써도 됨
+    python snapshots.py gc
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+from keyword_trends import review_key
+
+try:
+    import zstandard
+except ImportError:  # zstd 가 없으면 zlib 로 저장 (읽기는 둘 다 가능)
+    zstandard = None
+
+# ===== 1. 설정 =====
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+SNAPSHOT_DIR = BASE_DIR / "snapshots"
+OBJECT_DIR = SNAPSHOT_DIR / "objects"
+MANIFEST_DIR = SNAPSHOT_DIR / "manifests"
+
+AVG_CHUNK_ROWS = 1024            # 2의 거듭제곱 (경계 판정에 하위 비트 마스크 사용)
+MIN_CHUNK_ROWS = AVG_CHUNK_ROWS // 4
+MAX_CHUNK_ROWS = AVG_CHUNK_ROWS * 4
+ZSTD_LEVEL = 9
+ZLIB_LEVEL = 6
+KEY_COLS = ("review_id", "reviewId")
+ROW_HASH_LEN = 16
+
+
+# ===== 2. 객체 저장소 =====
+def _codec() -> tuple[str, Callable[[bytes], bytes]]:
+    if zstandard is not None:
+        return ".zst", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress
+    return ".zz", lambda data: zlib.compress(data, ZLIB_LEVEL)
+
+
+def _decompress(path: Path) -> bytes:
+    data = path.read_bytes()
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise SystemExit(f"zstandard 가 설치되지 않아 zstd 객체를 읽을 수 없습니다: {path}")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def _object_path(digest: str, suffix: str) -> Path:
+    return OBJECT_DIR / digest[:2] / (digest + suffix)
+
+
+def _find_object(digest: str) -> Path:
+    for suffix in (".zst", ".zz"):
+        path = _object_path(digest, suffix)
+        if path.exists():
+            return path
+    raise FileNotFoundError(f"스냅샷 객체가 없습니다: {digest}")
+
+
+def _atomic_write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def put_object(data: bytes) -> tuple[str, bool]:
+    """내용 해시로 저장 → (해시, 새로 썼는지). 같은 내용은 한 번만 저장"""
+    digest = hashlib.sha256(data).hexdigest()
+    for suffix in (".zst", ".zz"):
+        if _object_path(digest, suffix).exists():
+            return digest, False
+    suffix, compress = _codec()
+    _atomic_write(_object_path(digest, suffix), compress(data))
+    return digest, True
+
+
+def get_object(digest: str) -> bytes:
+    return _decompress(_find_object(digest))
+
+
+# ===== 3. CSV 레코드 / 청크 =====
+def _join_records(lines: Iterable[bytes]) -> Iterator[bytes]:
+    """CSV 논리 행 단위 원본 바이트 (따옴표 안 줄바꿈 포함). 큰따옴표 개수가 짝수가 될 때까지 물리 행을 이음"""
+    pending, quotes = [], 0
+    for line in lines:
+        pending.append(line)
+        quotes += line.count(b'"')
+        if quotes % 2 == 0:
+            yield b"".join(pending)
+            pending, quotes = [], 0
+    if pending:
+        yield b"".join(pending)
+
+
+def iter_records(path: Path) -> Iterator[bytes]:
+    with Path(path).open("rb") as f:
+        yield from _join_records(f)
+
+
+def _parse(record: bytes) -> list[str]:
+    return next(csv.reader(io.StringIO(record.decode("utf-8", errors="replace").lstrip("\ufeff"))), [])
+
+
+class RowKeyer:
+    """
+    리뷰 ID(0 / 빈 값 제외)가 있으면 keyword_trends.review_key, 없으면 행 내용 해시를 키로 사용
+    같은 키가 반복되면 등장 순번을 붙임 → 파일 안에서 키가 항상 고유
+    """
+
+    def __init__(self, header: list[str]):
+        self.header = header
+        self.has_id = any(col in header for col in KEY_COLS)
+        self.seen: dict[str, int] = {}
+
+    def __call__(self, record: bytes, row_hash: str) -> str:
+        key = "r:" + row_hash
+        if self.has_id:
+            id_key = review_key(dict(zip(self.header, _parse(record))))
+            if not id_key.startswith("h:"):  # h: = ID 없음 (본문 해시 대체키)
+                key = id_key
+        count = self.seen[key] = self.seen.get(key, 0) + 1
+        return key if count == 1 else f"{key}#{count}"
+
+
+def _is_boundary(key: str) -> bool:
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") & (AVG_CHUNK_ROWS - 1) == 0
+
+
+def iter_chunks(records: Iterator[bytes], keyer: RowKeyer) -> Iterator[tuple[list[bytes], list[tuple[str, str]]]]:
+    """(행 원본 목록, [(키, 행 해시)]) 청크 — 경계는 키로만 정해지므로 앞쪽 변경이 뒤 청크를 밀지 않음"""
+    rows, index = [], []
+    for record in records:
+        row_hash = hashlib.blake2b(record.rstrip(b"\r\n"), digest_size=ROW_HASH_LEN // 2).hexdigest()
+        key = keyer(record, row_hash)
+        rows.append(record)
+        index.append((key, row_hash))
+        if len(rows) >= MAX_CHUNK_ROWS or (len(rows) >= MIN_CHUNK_ROWS and _is_boundary(key)):
+            yield rows, index
+            rows, index = [], []
+    if rows:
+        yield rows, index
+
+
+# ===== 4. 스냅샷 =====
+@dataclass
+class Manifest:
+    dataset: str
+    snapshot_id: str
+    created_at: str
+    source: str
+    header: str
+    chunks: list[dict] = field(default_factory=list)
+    label: Optional[str] = None
+
+    @property
+    def rows(self) -> int:
+        return sum(chunk["rows"] for chunk in self.chunks)
+
+    def to_json(self) -> str:
+        return json.dumps(self.__dict__, ensure_ascii=False, indent=1)
+
+    @classmethod
+    def load(cls, path: Path) -> "Manifest":
+        return cls(**json.loads(path.read_text(encoding="utf-8")))
+
+
+def snapshot(path: Path, dataset: Optional[str] = None, label: Optional[str] = None) -> Manifest:
+    """CSV 파일 → 스냅샷 (바뀐 청크만 새 객체로 저장). 직전 스냅샷과 내용이 같으면 새로 만들지 않음"""
+    path = Path(path)
+    dataset = dataset or path.name
+    records = iter_records(path)
+    header = next(records, b"")
+    keyer = RowKeyer(_parse(header))
+
+    chunks, new_objects, new_bytes = [], 0, 0
+    for rows, index in iter_chunks(records, keyer):
+        body = b"".join(rows)
+        index_blob = "".join(f"{key}\t{row_hash}\n" for key, row_hash in index).encode("utf-8")
+        data_hash, wrote_data = put_object(body)
+        index_hash, wrote_index = put_object(index_blob)
+        new_objects += wrote_data + wrote_index
+        new_bytes += len(body) if wrote_data else 0
+        chunks.append({"data": data_hash, "index": index_hash, "rows": len(rows)})
+
+    header_text = header.decode("utf-8", errors="replace")
+    previous = latest(dataset)
+    if previous is not None and previous.chunks == chunks and previous.header == header_text:
+        print(f"[INFO] {dataset}: 직전 스냅샷({previous.snapshot_id})과 같음 → 새 스냅샷 생략")
+        return previous
+
+    content_id = hashlib.sha256(json.dumps(chunks).encode("utf-8")).hexdigest()[:8]
+    now = datetime.now()
+    manifest = Manifest(
+        dataset=dataset,
+        snapshot_id=f"{now:%Y%m%d_%H%M%S}{now.microsecond // 1000:03d}_{content_id}",
+        created_at=now.isoformat(timespec="milliseconds"),
+        source=str(path),
+        header=header_text,
+        chunks=chunks,
+        label=label,
+    )
+    _atomic_write(MANIFEST_DIR / dataset / f"{manifest.snapshot_id}.json", manifest.to_json().encode("utf-8"))
+    print(
+        f"[SAVE] 스냅샷 {dataset}@{manifest.snapshot_id}: {manifest.rows:,}행, 청크 {len(chunks):,}개 "
+        f"(새 객체 {new_objects:,}개, 새 본문 {new_bytes / 1e6:.1f}MB)"
+    )
+    return manifest
+
+
+def list_snapshots(dataset: str) -> list[str]:
+    """스냅샷 ID 목록 (오래된 순, ID 가 시각으로 시작)"""
+    folder = MANIFEST_DIR / dataset
+    if not folder.exists():
+        return []
+    return sorted(p.stem for p in folder.glob("*.json"))
+
+
+def load_manifest(dataset: str, snapshot_id: str) -> Manifest:
+    """snapshot_id: 전체 ID, ID 앞부분, 또는 "latest" / "previous" """
+    ids = list_snapshots(dataset)
+    if snapshot_id in ("latest", "previous"):
+        pos = -1 if snapshot_id == "latest" else -2
+        if len(ids) < -pos:
+            raise FileNotFoundError(f"{dataset}: {snapshot_id} 스냅샷이 없습니다.")
+        snapshot_id = ids[pos]
+    matches = [sid for sid in ids if sid.startswith(snapshot_id)]
+    if len(matches) != 1:
+        raise FileNotFoundError(f"{dataset}: 스냅샷 '{snapshot_id}' 를 하나로 특정할 수 없습니다 ({len(matches)}개).")
+    return Manifest.load(MANIFEST_DIR / dataset / f"{matches[0]}.json")
+
+
+def latest(dataset: str) -> Optional[Manifest]:
+    ids = list_snapshots(dataset)
+    return Manifest.load(MANIFEST_DIR / dataset / f"{ids[-1]}.json") if ids else None
+
+
+def restore(manifest: Manifest, output: Path) -> Path:
+    """스냅샷 → CSV (원본과 바이트 단위로 같음), 임시 파일에 쓴 뒤 교체"""
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(f"{output.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        f.write(manifest.header.encode("utf-8"))
+        for chunk in manifest.chunks:
+            f.write(get_object(chunk["data"]))
+    os.replace(tmp, output)
+    print(f"[SAVE] {manifest.dataset}@{manifest.snapshot_id} 복원 → {output}")
+    return output
+
+
+# ===== 5. diff =====
+@dataclass
+class SnapshotDiff:
+    added: list[str]
+    edited: list[str]
+    removed: list[str]
+    chunks_compared: int
+    chunks_total: int
+
+    def summary(self) -> str:
+        return (f"새 리뷰 {len(self.added):,} / 수정 {len(self.edited):,} / 삭제 {len(self.removed):,} "
+                f"(청크 {self.chunks_compared:,}/{self.chunks_total:,}개만 비교)")
+
+
+def _read_index(digest: str) -> dict[str, str]:
+    lines = get_object(digest).decode("utf-8").splitlines()
+    return dict(line.split("\t", 1) for line in lines if line)
+
+
+def _changed_chunks(old: Manifest, new: Manifest) -> tuple[list[dict], list[dict]]:
+    """양쪽에 모두 있는 청크(같은 본문)는 같은 행들이므로 제외"""
+    old_data = {chunk["data"] for chunk in old.chunks}
+    new_data = {chunk["data"] for chunk in new.chunks}
+    return ([c for c in old.chunks if c["data"] not in new_data],
+            [c for c in new.chunks if c["data"] not in old_data])
+
+
+def diff(old: Manifest, new: Manifest) -> SnapshotDiff:
+    old_only, new_only = _changed_chunks(old, new)
+    old_rows, new_rows = {}, {}
+    for chunk in old_only:
+        old_rows.update(_read_index(chunk["index"]))
+    for chunk in new_only:
+        new_rows.update(_read_index(chunk["index"]))
+    # 다른 청크로 옮겨 갔지만 내용이 같은 행은 변경 아님
+    added = [key for key in new_rows if key not in old_rows]
+    removed = [key for key in old_rows if key not in new_rows]
+    edited = [key for key, row_hash in new_rows.items() if key in old_rows and old_rows[key] != row_hash]
+    return SnapshotDiff(added, edited, removed, len(old_only) + len(new_only), len(old.chunks) + len(new.chunks))
+
+
+def changed_frame(old: Manifest, new: Manifest):
+    """새 스냅샷에서 새로 생기거나 수정된 행만 DataFrame 으로 (_change 컬럼: added / edited)"""
+    import pandas as pd
+
+    result = diff(old, new)
+    wanted = {key: "added" for key in result.added}
+    wanted.update({key: "edited" for key in result.edited})
+    _, new_only = _changed_chunks(old, new)
+    parts = []
+    for chunk in new_only:
+        index = [line.split("\t", 1)[0] for line in get_object(chunk["index"]).decode("utf-8").splitlines() if line]
+        records = list(_join_records(io.BytesIO(get_object(chunk["data"]))))
+        picked = [(record, wanted[key]) for key, record in zip(index, records) if key in wanted]
+        if not picked:
+            continue
+        body = new.header.encode("utf-8") + b"".join(record for record, _ in picked)
+        frame = pd.read_csv(io.BytesIO(body), encoding="utf-8-sig")
+        frame["_change"] = [change for _, change in picked]
+        parts.append(frame)
+    if not parts:
+        return pd.DataFrame(columns=_parse(new.header.encode("utf-8")) + ["_change"])
+    return pd.concat(parts, ignore_index=True)
+
+
+# ===== 6. 정리 =====
+def gc(keep: Optional[int] = None) -> int:
+    """keep 이 있으면 데이터셋별 최근 keep 개만 남기고, 어떤 매니페스트도 참조하지 않는 객체 삭제"""
+    referenced = set()
+    for folder in sorted(MANIFEST_DIR.glob("*")) if MANIFEST_DIR.exists() else []:
+        ids = list_snapshots(folder.name)
+        if keep is not None:
+            for sid in ids[:-keep] if keep > 0 else ids:
+                (folder / f"{sid}.json").unlink()
+            ids = list_snapshots(folder.name)
+        for sid in ids:
+            for chunk in Manifest.load(folder / f"{sid}.json").chunks:
+                referenced.update((chunk["data"], chunk["index"]))
+
+    removed = 0
+    for path in OBJECT_DIR.glob("*/*") if OBJECT_DIR.exists() else []:
+        if path.name.endswith(".tmp") or path.name.split(".", 1)[0] not in referenced:
+            path.unlink()
+            removed += 1
+    print(f"[INFO] 스냅샷 gc: 객체 {removed:,}개 삭제, {len(referenced):,}개 유지")
+    return removed
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="단계 출력 CSV 스냅샷 (압축 + 청크 공유 + diff)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("snapshot", help="CSV 파일 스냅샷 저장")
+    p.add_argument("path", type=Path)
+    p.add_argument("--dataset", default=None, help="기본: 파일 이름")
+    p.add_argument("--label", default=None)
+
+    p = sub.add_parser("list", help="스냅샷 목록")
+    p.add_argument("dataset")
+
+    p = sub.add_parser("diff", help="두 스냅샷 사이 새 / 수정 / 삭제 리뷰")
+    p.add_argument("dataset")
+    p.add_argument("old", nargs="?", default="previous")
+    p.add_argument("new", nargs="?", default="latest")
+    p.add_argument("--show", type=int, default=10, help="종류별로 출력할 키 수")
+
+    p = sub.add_parser("restore", help="스냅샷을 CSV 로 복원")
+    p.add_argument("dataset")
+    p.add_argument("snapshot_id")
+    p.add_argument("output", type=Path)
+
+    p = sub.add_parser("gc", help="참조되지 않는 객체 정리")
+    p.add_argument("--keep", type=int, default=None, help="데이터셋별로 남길 최근 스냅샷 수")
+    args = parser.parse_args(argv)
+
+    if args.command == "snapshot":
+        snapshot(args.path, args.dataset, args.label)
+    elif args.command == "list":
+        for sid in list_snapshots(args.dataset):
+            manifest = load_manifest(args.dataset, sid)
+            print(f"{sid}  {manifest.rows:>9,}행  청크 {len(manifest.chunks):>5,}개  {manifest.label or ''}")
+    elif args.command == "diff":
+        result = diff(load_manifest(args.dataset, args.old), load_manifest(args.dataset, args.new))
+        print(f"[DIFF] {args.dataset} {args.old} → {args.new}: {result.summary()}")
+        for name, keys in (("새 리뷰", result.added), ("수정", result.edited), ("삭제", result.removed)):
+            if keys:
+                print(f"  {name}: {', '.join(keys[:args.show])}{' ...' if len(keys) > args.show else ''}")
+    elif args.command == "restore":
+        restore(load_manifest(args.dataset, args.snapshot_id), args.output)
+    elif args.command == "gc":
+        gc(args.keep)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+# -*- coding: utf-8 -*-
+"""
+스트리밍 파이프라인 (크롤링 → 정제 → 토큰화 → 감정분석 → 저장을 페이지 단위로 흘려보냄)
+- 일괄 모드: 크롤링 전체 종료 → 전처리 전체 종료 → 감정분석 시작 (전체 시간 = 단계 시간의 합)
+- 스트리밍 모드: 수집한 페이지가 바로 다음 단계로 넘어감 (전체 시간 ≈ 가장 느린 단계)
+
+    crawl ×국가 ─▶ [raw_q] ─▶ clean ─▶ [clean_q] ─▶ tokenize ×N ─▶ [token_q] ─▶ sentiment ×M ─▶ [scored_q] ─▶ writer
+
+    · crawl    : 크롤러의 iter_app_store_pages / iter_google_play_pages 를 국가별로 동시에 (블로킹 요청은 스레드)
+    · clean    : 원본 페이지를 리뷰 저장소에 UPSERT → 통합 CSV 형식 변환 → clean_frame / exclude_other_services
+                 → (platform, review_id) 중복 제거
+    · tokenize : 프로세스 풀 (워커마다 Okt 를 한 번만 로드)
+    · sentiment: sentiment_server.MicroBatcher 워커 스레드 (모델은 언어별로 한 번만 로드, 크롤링과 동시에 로드)
+    · writer   : 점수가 나온 페이지마다 CSV 에 이어 쓰기 (.partial) + 저장소 감정 라벨 갱신
+                 + drift_detector.DriftDetector 갱신 (새 버전의 감정/별점 이상은 수집 도중 바로 알림)
+- 모든 큐는 크기가 정해져 있어 느린 단계가 앞 단계를 자동으로 늦춤 (backpressure, 메모리 일정)
+- 끝나면 .partial 파일을 일괄 모드 출력 경로(vrew_reviews_tokens.csv / reviews_with_sentiment.csv)로 교체
+  → 차트 / 평가 단계는 그대로 사용
+- LONG_TEXT_MODE(윈도우 추론)는 지원하지 않음 (predict_batch 로 추론)
+
+사용 예)
+    python streaming_pipeline.py
+    python vrew_cli.py stream --queue-size 4 --tokenize-workers 3
+"""
+
+import argparse
+import asyncio
+import csv
+import functools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from instrumentation import count, instrumented, set_rows
+from text_normalization import normalize_many
+from vrew_cli import SCRIPTS, load_script
+
+# ===== 1. 설정 =====
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+
+QUEUE_SIZE = 8                      # 단계 사이 큐에 쌓일 수 있는 페이지 수
+TOKENIZE_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+SENTIMENT_CONCURRENCY = 2           # 동시에 추론 대기하는 페이지 수 (MicroBatcher 가 한 배치로 묶음)
+SUBMIT_TIMEOUT_SEC = 600.0
+PARTIAL_SUFFIX = ".partial"
+
+DONE = object()  # 큐 종료 표시
+
+
+@dataclass
+class StreamStats:
+    started: float = field(default_factory=time.perf_counter)
+    first_result_sec: Optional[float] = None
+    rows: dict = field(default_factory=dict)
+    busy_sec: dict = field(default_factory=dict)
+
+    def add(self, stage: str, rows: int, seconds: float):
+        self.rows[stage] = self.rows.get(stage, 0) + rows
+        self.busy_sec[stage] = self.busy_sec.get(stage, 0.0) + seconds
+
+    def summary(self) -> dict:
+        return {
+            "wall_sec": round(time.perf_counter() - self.started, 2),
+            "first_result_sec": None if self.first_result_sec is None else round(self.first_result_sec, 2),
+            "rows": dict(self.rows),
+            "busy_sec": {stage: round(sec, 2) for stage, sec in self.busy_sec.items()},
+        }
+
+
+# ===== 2. 토큰화 워커 (프로세스 풀) =====
+_TOKENIZER = None
+
+
+def _init_tokenize_worker():
+    global _TOKENIZER
+    _TOKENIZER = load_script(SCRIPTS["preprocess"]).get_tokenizer()
+
+
+def tokenize_texts(texts: list[str]) -> tuple[list[str], list[str]]:
+    """(clean_text, tokens_str) — 브류 리뷰 뜯어보기.add_tokens 와 같은 규칙"""
+    preprocess = load_script(SCRIPTS["preprocess"])
+    cleaned = normalize_many(texts, "clean")
+    tokens = [" ".join(preprocess.tokenize_and_filter(_TOKENIZER, text)) for text in cleaned]
+    return cleaned, tokens
+
+
+# ===== 3. 감정분석 워커 (MicroBatcher 스레드) =====
+class SentimentWorkers:
+    """언어별 MicroBatcher. 같은 모델을 쓰는 언어끼리는 배처를 공유"""
+
+    def __init__(self, routing: bool):
+        from sentiment_server import MicroBatcher
+
+        sentiment = load_script(SCRIPTS["sentiment"])
+        if routing:
+            from lang_routing import FALLBACK_MODEL, resolve_model, routed_models
+
+            models = routed_models()
+            if FALLBACK_MODEL:
+                models["*"] = resolve_model(FALLBACK_MODEL)  # 모델이 없는 언어 (명시적으로 켠 경우만)
+        else:
+            models = {"*": sentiment.MODEL_NAME}
+
+        self.routing = routing
+        self.batch_size = sentiment.BATCH_SIZE
+        self.batchers = {}
+        by_model = {}
+        for lang, model_name in models.items():
+            if model_name not in by_model:
+                tokenizer, model, device = sentiment.load_model_and_tokenizer(model_name)
+                _, pos_idx = sentiment.resolve_label_indices(model)
+                batcher = MicroBatcher(tokenizer, model, device, pos_idx,
+                                       max_batch_size=sentiment.BATCH_SIZE, max_len=sentiment.MAX_LEN)
+                batcher.start()
+                by_model[model_name] = batcher
+            self.batchers[lang] = by_model[model_name]
+
+    def close(self):
+        for batcher in set(self.batchers.values()):
+            batcher.stop()
+
+    async def score(self, df: pd.DataFrame) -> pd.DataFrame:
+        from lang_routing import SKIP_LABEL, detect_languages, language_hints
+        from sentiment_analysis import SOURCE_COL, TRANSFORMER_SOURCE
+
+        texts = df["review_text"].fillna("").astype(str).tolist()
+        if self.routing:
+            langs = detect_languages(texts, hints=language_hints(df))
+            df["Review_lang"] = langs
+        else:
+            langs = ["*"] * len(texts)
+
+        labels = [SKIP_LABEL] * len(texts)
+        scores = [math.nan] * len(texts)
+        by_lang: dict[str, list[int]] = {}
+        for i, text_lang in enumerate(langs):
+            by_lang.setdefault(text_lang, []).append(i)
+        requests = []
+        for lang, idxs in by_lang.items():
+            batcher = self.batchers.get(lang, self.batchers.get("*"))
+            if batcher is None:
+                continue
+            for start in range(0, len(idxs), self.batch_size):
+                chunk = idxs[start:start + self.batch_size]
+                requests.append((chunk, asyncio.to_thread(batcher.submit, [texts[i] for i in chunk], SUBMIT_TIMEOUT_SEC, True)))
+
+        results = await asyncio.gather(*(request for _, request in requests))
+        for (chunk, _), (chunk_labels, chunk_scores) in zip(requests, results):
+            for i, label, score in zip(chunk, chunk_labels, chunk_scores):
+                labels[i] = label
+                scores[i] = score
+
+        df["Sentiment_label"] = labels
+        df["Sentiment_score"] = scores
+        df[SOURCE_COL] = TRANSFORMER_SOURCE
+        return df
+
+
+# ===== 4. 출력 =====
+class StoreWriter:
+    """리뷰 저장소 전용 스레드 (sqlite 연결은 만든 스레드에서만 사용)"""
+
+    def __init__(self):
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="review-store")
+        self._conn = None
+
+    def _call(self, fn, *args):
+        if self._conn is None:
+            from review_store import connect
+
+            self._conn = connect()
+        return fn(self._conn, *args)
+
+    async def run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._pool, self._call, fn, *args)
+
+    async def close(self):
+        if self._conn is not None:
+            await self.run(lambda conn: conn.close())
+        self._pool.shutdown()
+
+
+class CsvAppender:
+    """<path>.partial 에 페이지마다 이어 쓰고, commit() 때 path 로 교체"""
+
+    def __init__(self, path: Path, columns: list[str]):
+        self.path = Path(path)
+        self.partial = self.path.with_name(self.path.name + PARTIAL_SUFFIX)
+        self.columns = columns
+        self.rows = 0
+        self.partial.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(columns=columns).to_csv(self.partial, index=False, encoding="utf-8-sig")
+
+    def append(self, df: pd.DataFrame):
+        df.reindex(columns=self.columns).to_csv(
+            self.partial, mode="a", header=False, index=False, encoding="utf-8",
+            quoting=csv.QUOTE_MINIMAL, lineterminator="\n",
+        )
+        self.rows += len(df)
+
+    def commit(self):
+        self.partial.replace(self.path)
+        print(f"[SAVE] {self.path} ({self.rows:,}건)")
+
+
+# ===== 5. 단계 =====
+async def crawl_stage(pages, raw_q: asyncio.Queue, stats: StreamStats):
+    """블로킹 페이지 제너레이터를 스레드에서 한 페이지씩 진행"""
+    iterator = pages()
+    while True:
+        started = time.perf_counter()
+        page = await asyncio.to_thread(next, iterator, None)
+        if page is None:
+            return
+        stats.add("crawl", len(page), time.perf_counter() - started)
+        count("pages")
+        await raw_q.put(pd.DataFrame(page))
+
+
+async def clean_stage(raw_q: asyncio.Queue, clean_q: asyncio.Queue, store: Optional[StoreWriter], stats: StreamStats):
+    from review_store import export_frame, upsert_reviews
+
+    preprocess = load_script(SCRIPTS["preprocess"])
+    seen: set[tuple[str, str]] = set()
+    while (page := await raw_q.get()) is not DONE:
+        started = time.perf_counter()
+        if store is not None:
+            await store.run(upsert_reviews, page)
+        df = preprocess.exclude_other_services(preprocess.clean_frame(export_frame(page)))
+        keys = list(zip(df["platform"], df["review_id"]))
+        fresh = [key not in seen for key in keys]
+        seen.update(keys)
+        df = df[fresh].reset_index(drop=True)
+        stats.add("clean", len(df), time.perf_counter() - started)
+        if len(df):
+            await clean_q.put(df)
+
+
+async def tokenize_stage(clean_q: asyncio.Queue, token_q: asyncio.Queue, pool: ProcessPoolExecutor, stats: StreamStats):
+    loop = asyncio.get_running_loop()
+    while (df := await clean_q.get()) is not DONE:
+        started = time.perf_counter()
+        df["clean_text"], df["tokens_str"] = await loop.run_in_executor(
+            pool, tokenize_texts, df["review_text"].astype(str).tolist()
+        )
+        stats.add("tokenize", len(df), time.perf_counter() - started)
+        await token_q.put(df)
+
+
+async def sentiment_stage(token_q: asyncio.Queue, scored_q: asyncio.Queue, workers: asyncio.Task, stats: StreamStats):
+    scorer = await workers
+    while (df := await token_q.get()) is not DONE:
+        started = time.perf_counter()
+        df = await scorer.score(df)
+        stats.add("sentiment", len(df), time.perf_counter() - started)
+        await scored_q.put(df)
+
+
+async def write_stage(
+    scored_q: asyncio.Queue,
+    tokens_out: CsvAppender,
+    scored_out: CsvAppender,
+    store: Optional[StoreWriter],
+    stats: StreamStats,
+    detector=None,
+):
+    from review_store import update_sentiment
+
+    while (df := await scored_q.get()) is not DONE:
+        started = time.perf_counter()
+        await asyncio.to_thread(tokens_out.append, df)
+        scored = df.assign(review_text=normalize_many(df["review_text"], "sanitize"))
+        await asyncio.to_thread(scored_out.append, scored)
+        if store is not None:
+            await store.run(update_sentiment, df)
+        if detector is not None:
+            for alert in detector.update(df):
+                print(f"⚠️ [DRIFT] {alert['platform']}/{alert['country']} {alert['baseline_version']} → {alert['version']}: {alert['metric']}")
+        stats.add("write", len(df), time.perf_counter() - started)
+
+        if stats.first_result_sec is None:
+            stats.first_result_sec = time.perf_counter() - stats.started
+            print(f"[STREAM] 첫 결과 저장까지 {stats.first_result_sec:.1f}초")
+
+
+async def _close_after(tasks: list[asyncio.Task], queue: asyncio.Queue, n_consumers: int):
+    """앞 단계 작업이 모두 끝나면 다음 단계 소비자 수만큼 종료 표시"""
+    await asyncio.gather(*tasks)
+    for _ in range(n_consumers):
+        await queue.put(DONE)
+
+
+# ===== 6. 실행 =====
+async def run_streaming(
+    queue_size: int = QUEUE_SIZE,
+    tokenize_workers: int = TOKENIZE_WORKERS,
+    sentiment_concurrency: int = SENTIMENT_CONCURRENCY,
+    routing: Optional[bool] = None,
+    store_sync: bool = True,
+    drift: bool = True,
+) -> dict:
+    from review_store import STORE_COLUMNS, EXPORT_COLUMNS, export_csv
+
+    crawler = load_script(SCRIPTS["crawl"])
+    preprocess = load_script(SCRIPTS["preprocess"])
+    sentiment = load_script(SCRIPTS["sentiment"])
+    routing = sentiment.LANGUAGE_ROUTING if routing is None else routing
+
+    appstore_id = crawler.get_appstore_id_from_url(crawler.APPSTORE_URL)
+    gplay_id = crawler.get_gplay_id_from_url(crawler.GPLAY_URL)
+    sources = [
+        functools.partial(crawler.iter_app_store_pages, appstore_id, country)
+        for country in crawler.APPSTORE_COUNTRIES
+    ] + [
+        functools.partial(crawler.iter_google_play_pages, gplay_id, locale["lang"], locale["country"])
+        for locale in crawler.GPLAY_LOCALES
+    ]
+
+    raw_q, clean_q, token_q, scored_q = (asyncio.Queue(maxsize=queue_size) for _ in range(4))
+    stats = StreamStats()
+    store = StoreWriter() if store_sync else None
+    detector = None
+    if drift:
+        from drift_detector import DriftDetector
+
+        detector = DriftDetector.load()
+    token_cols = [EXPORT_COLUMNS[col] for col in STORE_COLUMNS] + ["review_text", "clean_text", "tokens_str"]
+    scored_cols = [
+        col for col in sentiment.output_columns("at")
+        if col in token_cols or col in ("Review_lang", "Sentiment_label", "Sentiment_score", sentiment.SOURCE_COL)
+    ]
+    if not routing:
+        scored_cols.remove("Review_lang")
+    tokens_out = CsvAppender(Path(preprocess.TOKEN_CSV_PATH), token_cols)
+    scored_out = CsvAppender(sentiment.OUTPUT_PATH, scored_cols)
+
+    # 모델 로드는 크롤링과 동시에 (첫 페이지가 토큰화될 즈음 준비)
+    workers = asyncio.create_task(asyncio.to_thread(SentimentWorkers, routing))
+    pool = ProcessPoolExecutor(max_workers=tokenize_workers, initializer=_init_tokenize_worker)
+
+    crawlers = [asyncio.create_task(crawl_stage(pages, raw_q, stats)) for pages in sources]
+    cleaner = asyncio.create_task(clean_stage(raw_q, clean_q, store, stats))
+    tokenizers = [asyncio.create_task(tokenize_stage(clean_q, token_q, pool, stats)) for _ in range(tokenize_workers)]
+    scorers = [asyncio.create_task(sentiment_stage(token_q, scored_q, workers, stats))
+               for _ in range(sentiment_concurrency)]
+    writer = asyncio.create_task(write_stage(scored_q, tokens_out, scored_out, store, stats, detector))
+    closers = [
+        asyncio.create_task(_close_after(crawlers, raw_q, 1)),
+        asyncio.create_task(_close_after([cleaner], clean_q, len(tokenizers))),
+        asyncio.create_task(_close_after(tokenizers, token_q, len(scorers))),
+        asyncio.create_task(_close_after(scorers, scored_q, 1)),
+    ]
+    tasks = crawlers + [cleaner] + tokenizers + scorers + [writer] + closers + [workers]
+
+    try:
+        await asyncio.gather(*tasks)
+        tokens_out.commit()
+        scored_out.commit()
+        if store is not None:
+            await store.run(export_csv, crawler.COMBINED_CSV_PATH)
+        if detector is not None:
+            detector.save()
+            if store is not None:
+                from drift_detector import mark_store_consumed
+
+                await store.run(mark_store_consumed)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    finally:
+        pool.shutdown(cancel_futures=True)
+        if workers.done() and not workers.cancelled() and workers.exception() is None:
+            workers.result().close()
+        if store is not None:
+            await store.close()
+    return stats.summary()
+
+
+@instrumented("stream")
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="크롤링 → 감정분석 스트리밍 파이프라인")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--tokenize-workers", type=int, default=TOKENIZE_WORKERS)
+    parser.add_argument("--sentiment-concurrency", type=int, default=SENTIMENT_CONCURRENCY)
+    parser.add_argument("--no-lang-routing", action="store_true")
+    parser.add_argument("--fallback-default-model", action="store_true", help="모델이 없는 언어도 기본(한국어) 모델로 추론")
+    parser.add_argument("--no-store", action="store_true", help="리뷰 저장소(SQLite) 반영 없이 CSV 만 기록")
+    parser.add_argument("--no-drift", action="store_true", help="드리프트 / 릴리스 이상 감지 끄기")
+    args = parser.parse_args(argv)
+    if args.fallback_default_model:
+        import lang_routing
+
+        lang_routing.FALLBACK_MODEL = lang_routing.DEFAULT_MODEL
+
+    summary = asyncio.run(run_streaming(
+        queue_size=args.queue_size,
+        tokenize_workers=args.tokenize_workers,
+        sentiment_concurrency=args.sentiment_concurrency,
+        routing=False if args.no_lang_routing else None,
+        store_sync=not args.no_store,
+        drift=not args.no_drift,
+    ))
+    set_rows(rows_in=summary["rows"].get("crawl", 0), rows_out=summary["rows"].get("write", 0))
+    if summary["first_result_sec"] is not None:
+        count("first_result_sec", summary["first_result_sec"])
+    print(f"[STREAM] 완료: {summary}")
+    # 단계별 busy 시간의 합 ≈ 일괄 모드로 순서대로 실행했을 때의 시간
+    print(f"[STREAM] 단계 busy 합계 {sum(summary['busy_sec'].values()):.1f}초 vs 전체 wall {summary['wall_sec']:.1f}초")
+
+    sentiment = load_script(SCRIPTS["sentiment"])
+    if sentiment.UPDATE_CUBE:
+        from review_cube import read_reviews, update_cube
+
+        update_cube(read_reviews(sentiment.OUTPUT_PATH))
+
+
+if __name__ == "__main__":
+    main()
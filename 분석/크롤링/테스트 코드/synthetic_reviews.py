@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""
+합성 리뷰 데이터 생성기 (대용량 테스트용)
+- 출력: 크롤러 통합 CSV(vrew_reviews_combined.csv)와 같은 모양의 CSV
+    · 앱스토어 행: author / title / content / rating / version / vote_sum / vote_count / updated / review_id / country
+    · 구글플레이 행: reviewId / author / userImage / content / rating / thumbsUpCount / reviewCreatedVersion
+                    / at / replyContent / repliedAt / appVersion / lang / country
+    → 브류 리뷰 뜯어보기.py 의 STRING_COLS / NUMERIC_COLS / DATE_COLS 를 모두 포함
+- 텍스트:
+    · 국가별 한국어/영어 비율 (kr 는 대부분 한국어, us 는 대부분 영어)
+    · 길이: 문장 조각 수를 로그정규 분포로 뽑아 짧은 리뷰가 대부분이고 긴 리뷰가 꼬리를 이룸
+    · 별점과 감정 어휘가 연동 (1~2점 → 부정 조각 위주, 4~5점 → 긍정 조각 위주)
+- 잡음:
+    · 같은 리뷰 재수집 (review_id 까지 같은 행), 같은 본문 복붙 (ID 만 다른 행)
+    · 타 서비스 언급 (EXCLUDE_KEYWORDS + 조사) → 전처리에서 제거되는 행
+- 결정적: 같은 (n, seed, chunk_size, 비율 인자) 면 같은 파일. 청크 단위로 생성해 100만 행도 메모리 일정
+
+사용 예)
+    python synthetic_reviews.py -n 100000 --output /tmp/vrew_scale/vrew_reviews_combined.csv
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from vrew_cli import SCRIPTS, load_script
+
+# ===== 1. 설정 =====
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+OUTPUT_PATH = BASE_DIR / "bench_out" / "synthetic" / "vrew_reviews_combined.csv"
+
+CHUNK_SIZE = 100_000
+APPSTORE_SHARE = 0.4
+DUPLICATE_RATE = 0.02        # 재수집 (행 전체 동일)
+COPY_PASTE_RATE = 0.01       # 본문만 동일
+COMPETITOR_RATE = 0.01       # 타 서비스 언급
+REPLY_RATE = 0.15            # 구글플레이 개발자 답변
+
+START_DATE = "2019-06-01"
+END_DATE = "2025-12-31"
+APPSTORE_COUNTRIES = (("kr", 0.7), ("us", 0.2), ("jp", 0.1))
+GPLAY_LOCALES = ((("ko", "kr"), 0.7), (("en", "us"), 0.2), (("ja", "jp"), 0.1))
+KOREAN_SHARE = {"kr": 0.95, "us": 0.1, "jp": 0.3}
+
+# 조각 수 ~ 1 + LogNormal(mu, sigma) → 중앙값 2~3조각, 상위 1% 는 20조각 이상
+LENGTH_MU = 0.6
+LENGTH_SIGMA = 0.9
+MAX_FRAGMENTS = 60
+
+FRAGMENTS = {
+    ("ko", "pos"): [
+        "자막 자동 생성이 정말 편해요", "음성 인식 정확도가 높아요", "편집 시간이 절반으로 줄었어요",
+        "유튜브 영상 만들 때 필수 앱입니다", "무료인데 기능이 많아서 좋아요", "컷 편집이 직관적이에요",
+        "초보자도 쉽게 쓸 수 있어요", "내보내기 속도가 빨라졌네요", "템플릿이 다양해서 만족합니다",
+        "업데이트 후 더 안정적이에요", "AI 목소리가 자연스러워요", "번역 자막 기능 최고예요",
+        "강의 영상 편집에 딱 맞아요", "인터페이스가 깔끔해요", "개발자님들 감사합니다",
+    ],
+    ("ko", "neg"): [
+        "내보내기 하다가 자꾸 튕겨요", "자막 싱크가 계속 밀립니다", "로그인이 안 돼요",
+        "업데이트 후 렉이 심해졌어요", "음성 인식이 자주 틀려요", "저장한 프로젝트가 사라졌어요",
+        "무료 용량이 너무 적어요", "광고가 너무 많아요", "글씨체가 깨져서 나와요",
+        "동영상 불러오기가 느려요", "결제했는데 기능이 안 열려요", "배터리가 너무 빨리 닳아요",
+        "고객센터 답변이 늦어요", "화면이 멈추고 반응이 없어요", "소리가 영상과 안 맞아요",
+    ],
+    ("ko", "neu"): [
+        "아이폰으로 사용 중입니다", "주로 브이로그 편집에 써요", "PC 버전도 같이 쓰고 있어요",
+        "다음 업데이트 기대할게요", "세로 영상 지원도 해주세요", "폰트 종류 추가 부탁드립니다",
+        "가끔 사용합니다", "친구 추천으로 설치했어요",
+    ],
+    ("en", "pos"): [
+        "Auto subtitles save me hours", "Speech recognition is very accurate", "Great app for YouTube editing",
+        "Export is fast and reliable", "Super easy to use for beginners", "The AI voices sound natural",
+        "Love the clean interface", "Best free subtitle editor I have tried",
+    ],
+    ("en", "neg"): [
+        "App crashes when exporting", "Subtitles are out of sync", "Cannot log in after the update",
+        "Too laggy on my phone", "Lost my project after saving", "Speech recognition misses many words",
+        "Fonts look broken in the export", "Way too many ads",
+    ],
+    ("en", "neu"): [
+        "Using it on iPad", "Mostly for vlog editing", "Please add more fonts",
+        "Would like vertical video support", "Installed on a friend's recommendation",
+    ],
+}
+PARTICLES = ("", "은", "는", "이", "가", "을", "를", "에서", "보다")
+AUTHORS = ("영상러", "편집초보", "브이로거", "강의제작", "user", "creator", "민지", "준호", "하늘", "별빛")
+TITLES = {
+    "pos": ("최고예요", "만족합니다", "Great app", "강추", "편해요"),
+    "neg": ("불편해요", "오류 수정 부탁드려요", "Crashes", "별로예요", "튕김"),
+    "neu": ("건의사항", "Feedback", "사용 후기", "요청"),
+}
+REPLIES = ("소중한 의견 감사합니다. 확인 후 개선하겠습니다.", "불편을 드려 죄송합니다. 고객센터로 문의 부탁드립니다.",
+           "Thank you for the feedback! We are looking into it.")
+
+
+def _preprocess_config():
+    """전처리 스크립트의 컬럼 목록 / 타 서비스 키워드 (생성 컬럼이 전처리 기대와 같도록)"""
+    module = load_script(SCRIPTS["preprocess"])
+    return module.STRING_COLS, module.NUMERIC_COLS, module.DATE_COLS, module.EXCLUDE_KEYWORDS
+
+
+def _versions(n_versions: int = 40) -> list[str]:
+    """날짜 순서대로 올라가는 버전 목록 (1.0.0 → 3.x.y)"""
+    return [f"{1 + i // 15}.{(i % 15) // 3}.{i % 3}" for i in range(n_versions)]
+
+
+# ===== 2. 텍스트 =====
+def _sentiment_of(ratings: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """별점 → 주 감정 (3점은 섞임, 일부는 별점과 반대 감정 = 라벨 잡음)"""
+    sentiment = np.where(ratings >= 4, "pos", np.where(ratings <= 2, "neg", "neu")).astype(object)
+    mixed = ratings == 3
+    sentiment[mixed] = rng.choice(["pos", "neg", "neu"], size=int(mixed.sum()))
+    flip = rng.random(len(ratings)) < 0.05
+    sentiment[flip] = np.where(sentiment[flip] == "pos", "neg", "pos")
+    return sentiment
+
+
+def _compose_texts(langs: np.ndarray, sentiments: np.ndarray, rng: np.random.Generator) -> list[str]:
+    n_fragments = np.minimum(1 + rng.lognormal(LENGTH_MU, LENGTH_SIGMA, len(langs)).astype(int), MAX_FRAGMENTS)
+    # 조각 선택: 70% 주 감정, 30% 중립
+    pools = {key: np.asarray(values, dtype=object) for key, values in FRAGMENTS.items()}
+    texts = []
+    draws = rng.random(int(n_fragments.sum()))
+    picks = rng.integers(0, 1 << 30, size=len(draws))
+    pos = 0
+    for lang, sentiment, k in zip(langs, sentiments, n_fragments):
+        main, neutral = pools[(lang, sentiment)], pools[(lang, "neu")]
+        parts = []
+        for j in range(pos, pos + k):
+            pool = main if draws[j] < 0.7 else neutral
+            parts.append(pool[picks[j] % len(pool)])
+        pos += k
+        texts.append(". ".join(parts) + ".")
+    return texts
+
+
+def _inject_competitors(texts: list[str], rng: np.random.Generator, keywords, rate: float) -> np.ndarray:
+    mask = rng.random(len(texts)) < rate
+    for i in np.flatnonzero(mask):
+        keyword = keywords[rng.integers(len(keywords))] + PARTICLES[rng.integers(len(PARTICLES))]
+        texts[i] = f"{keyword} 쓰다가 넘어왔어요. {texts[i]}"
+    return mask
+
+
+# ===== 3. 행 생성 =====
+def _dates(rng: np.random.Generator, n: int) -> pd.DatetimeIndex:
+    start, end = pd.Timestamp(START_DATE), pd.Timestamp(END_DATE)
+    seconds = rng.integers(0, int((end - start).total_seconds()), size=n)
+    return pd.DatetimeIndex(start + pd.to_timedelta(seconds, unit="s"))
+
+
+def _versions_at(dates: pd.DatetimeIndex, versions: list[str]) -> np.ndarray:
+    """날짜가 늦을수록 높은 버전"""
+    start, end = pd.Timestamp(START_DATE), pd.Timestamp(END_DATE)
+    position = np.asarray((dates - start) / (end - start))
+    return np.asarray(versions, dtype=object)[(position * (len(versions) - 1)).astype(int)]
+
+
+def _appstore_rows(rng: np.random.Generator, n: int, offset: int, versions: list[str], keywords) -> pd.DataFrame:
+    countries = rng.choice([c for c, _ in APPSTORE_COUNTRIES], p=[p for _, p in APPSTORE_COUNTRIES], size=n)
+    ratings = rng.choice([1, 2, 3, 4, 5], p=[0.12, 0.06, 0.08, 0.18, 0.56], size=n)
+    sentiments = _sentiment_of(ratings, rng)
+    langs = np.where(rng.random(n) < np.vectorize(KOREAN_SHARE.get)(countries), "ko", "en")
+    texts = _compose_texts(langs, sentiments, rng)
+    _inject_competitors(texts, rng, keywords, COMPETITOR_RATE)
+    dates = _dates(rng, n)
+    vote_count = rng.poisson(0.4, size=n)
+    return pd.DataFrame({
+        "platform": "appstore",
+        "author": [f"{AUTHORS[i % len(AUTHORS)]}{i}" for i in rng.integers(0, 100_000, size=n)],
+        "title": [TITLES[s][i % len(TITLES[s])] for s, i in zip(sentiments, rng.integers(0, 1000, size=n))],
+        "content": texts,
+        "rating": ratings,
+        "version": _versions_at(dates, versions),
+        "vote_sum": rng.binomial(vote_count, 0.7),
+        "vote_count": vote_count,
+        "updated": dates.strftime("%Y-%m-%dT%H:%M:%S-07:00"),
+        "review_id": np.arange(offset, offset + n, dtype=np.int64) + 5_000_000_000,
+        "country": countries,
+    })
+
+
+def _gplay_rows(rng: np.random.Generator, n: int, offset: int, versions: list[str], keywords) -> pd.DataFrame:
+    locale_idx = rng.choice(len(GPLAY_LOCALES), p=[p for _, p in GPLAY_LOCALES], size=n)
+    lang_codes = np.asarray([loc[0] for loc, _ in GPLAY_LOCALES], dtype=object)[locale_idx]
+    countries = np.asarray([loc[1] for loc, _ in GPLAY_LOCALES], dtype=object)[locale_idx]
+    ratings = rng.choice([1, 2, 3, 4, 5], p=[0.15, 0.07, 0.09, 0.17, 0.52], size=n)
+    sentiments = _sentiment_of(ratings, rng)
+    langs = np.where(rng.random(n) < np.vectorize(KOREAN_SHARE.get)(countries), "ko", "en")
+    texts = _compose_texts(langs, sentiments, rng)
+    _inject_competitors(texts, rng, keywords, COMPETITOR_RATE)
+    dates = _dates(rng, n)
+    app_versions = _versions_at(dates, versions)
+    # 일부 사용자는 버전 정보 없음 (구글플레이 실제 데이터처럼 빈 값)
+    app_versions[rng.random(n) < 0.1] = None
+
+    replied = rng.random(n) < REPLY_RATE
+    reply_delay = pd.to_timedelta(rng.integers(3600, 14 * 86400, size=n), unit="s")
+    replied_at = (dates + reply_delay).strftime("%Y-%m-%d %H:%M:%S").to_numpy(dtype=object)
+    replied_at[~replied] = None
+    replies = np.asarray(REPLIES, dtype=object)[rng.integers(0, len(REPLIES), size=n)]
+    replies[~replied] = None
+
+    return pd.DataFrame({
+        "reviewId": [f"gp-{i:012x}" for i in range(offset, offset + n)],
+        "author": [f"{AUTHORS[i % len(AUTHORS)]}{i}" for i in rng.integers(0, 100_000, size=n)],
+        "userImage": "https://play-lh.googleusercontent.com/a/default-user",
+        "content": texts,
+        "rating": ratings,
+        "thumbsUpCount": rng.geometric(0.6, size=n) - 1,
+        "reviewCreatedVersion": app_versions,
+        "at": dates.strftime("%Y-%m-%d %H:%M:%S"),
+        "replyContent": replies,
+        "repliedAt": replied_at,
+        "appVersion": app_versions,
+        "platform": "googleplay",
+        "lang": lang_codes,
+        "country": countries,
+    })
+
+
+def _add_duplicates(df: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
+    """재수집(행 전체 복사)과 복붙 리뷰(본문만 복사)를 섞음. 행 수는 그대로"""
+    n = len(df)
+    if n == 0:
+        return df
+    content = df["content"].to_numpy(dtype=object)
+    copy_paste = rng.random(n) < COPY_PASTE_RATE
+    content[copy_paste] = content[rng.integers(0, n, size=int(copy_paste.sum()))]
+    df["content"] = content
+
+    rows = np.arange(n)
+    recrawled = rng.random(n) < DUPLICATE_RATE
+    rows[recrawled] = rng.integers(0, n, size=int(recrawled.sum()))
+    return df.iloc[rows].reset_index(drop=True)
+
+
+def generate_chunk(n: int, offset: int, seed: int, keywords, columns: list[str]) -> pd.DataFrame:
+    """offset 위치부터 n 행. (seed, offset) 으로 난수를 나눠 청크 순서와 무관하게 재현"""
+    rng = np.random.default_rng(np.random.SeedSequence([seed, offset]))
+    versions = _versions()
+    n_app = int(rng.binomial(n, APPSTORE_SHARE))
+    app = _appstore_rows(rng, n_app, offset, versions, keywords)
+    gplay = _gplay_rows(rng, n - n_app, offset, versions, keywords)
+    df = pd.concat([_add_duplicates(app, rng), _add_duplicates(gplay, rng)], ignore_index=True, sort=False)
+    return df.reindex(columns=columns)
+
+
+def generate_reviews(n: int, seed: int = 42, chunk_size: int = CHUNK_SIZE):
+    """n 행을 chunk_size 단위 DataFrame 으로 순서대로 생성 (제너레이터)"""
+    string_cols, numeric_cols, date_cols, keywords = _preprocess_config()
+    columns = list(dict.fromkeys(["platform"] + list(string_cols) + list(numeric_cols) + list(date_cols)))
+    for offset in range(0, n, chunk_size):
+        yield generate_chunk(min(chunk_size, n - offset), offset, seed, keywords, columns)
+
+
+def dataset_params(n: int, seed: int, chunk_size: int) -> dict:
+    return {
+        "n": n, "seed": seed, "chunk_size": chunk_size,
+        "appstore_share": APPSTORE_SHARE, "duplicate_rate": DUPLICATE_RATE, "copy_paste_rate": COPY_PASTE_RATE,
+        "competitor_rate": COMPETITOR_RATE, "length": [LENGTH_MU, LENGTH_SIGMA, MAX_FRAGMENTS],
+    }
+
+
+def write_synthetic_csv(
+    path: Path = OUTPUT_PATH,
+    n: int = 100_000,
+    seed: int = 42,
+    chunk_size: int = CHUNK_SIZE,
+    force: bool = False,
+) -> Path:
+    """CSV 로 저장 (같은 인자로 이미 만든 파일이 있으면 재사용, <파일>.meta.json 으로 판단)"""
+    path = Path(path)
+    meta_path = path.with_name(path.name + ".meta.json")
+    params = dataset_params(n, seed, chunk_size)
+    if not force and path.exists() and meta_path.exists():
+        if json.loads(meta_path.read_text(encoding="utf-8")) == params:
+            print(f"[INFO] 합성 데이터 재사용 ← {path}")
+            return path
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    written = 0
+    for i, chunk in enumerate(generate_reviews(n, seed, chunk_size)):
+        chunk.to_csv(tmp, mode="w" if i == 0 else "a", header=(i == 0), index=False,
+                     encoding="utf-8-sig" if i == 0 else "utf-8")
+        written += len(chunk)
+        print(f"[INFO] 합성 리뷰 생성: {written:,}/{n:,}")
+    tmp.replace(path)
+    meta_path.write_text(json.dumps(params, indent=1), encoding="utf-8")
+    print(f"✅ 합성 리뷰 {written:,}건 저장 → {path}")
+    return path
+
+
+def describe(path: Path, sample: Optional[int] = 200_000) -> dict:
+    """생성 결과 요약 (길이 분포, 중복/타 서비스 비율) — 실제 데이터와 비교용"""
+    df = pd.read_csv(path, nrows=sample, dtype={"version": str, "appVersion": str})
+    _, _, _, keywords = _preprocess_config()
+    lengths = df["content"].fillna("").str.len()
+    return {
+        "rows": len(df),
+        "platform": df["platform"].value_counts().to_dict(),
+        "chars_p50": int(lengths.quantile(0.5)),
+        "chars_p90": int(lengths.quantile(0.9)),
+        "chars_p99": int(lengths.quantile(0.99)),
+        "dup_content_rate": round(float(df["content"].duplicated().mean()), 4),
+        "competitor_rate": round(float(df["content"].str.contains("|".join(keywords)).mean()), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 리뷰 데이터 생성 (크롤러 통합 CSV 형식)")
+    parser.add_argument("-n", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH)
+    parser.add_argument("--force", action="store_true", help="같은 인자로 만든 파일이 있어도 다시 생성")
+    args = parser.parse_args()
+
+    path = write_synthetic_csv(args.output, args.n, args.seed, args.chunk_size, args.force)
+    print(f"[INFO] 요약: {describe(path)}")
+
+
+if __name__ == "__main__":
+    main()
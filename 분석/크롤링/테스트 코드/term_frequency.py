@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+리뷰 단어 빈도 공용 엔진 (막대 그래프 / 워드클라우드 공용)
+- 입력: sentiment_out/reviews_with_sentiment.csv
+- 처리: 코퍼스를 한 번만 순회하면서 차원(감정, 플랫폼 등)별 Counter 테이블 생성
+        (lazy_dataset 분할 데이터에서 본문 + 차원 컬럼만 읽음)
+- 출력: sentiment_out/term_frequencies.json
+        (입력 CSV와 토큰화 설정(불용어 / 단어 패턴)이 같으면 다시 토큰화하지 않고 저장된 테이블 사용)
+"""
+
+import hashlib
+import json
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Optional, Union
+
+import pandas as pd
+
+from text_normalization import WORD_PATTERN, clean_text, normalize_many, stopword_set
+
+# ===== 1. 설정 =====
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+CSV_PATH = str(BASE_DIR / "sentiment_out" / "reviews_with_sentiment.csv")
+FREQ_PATH = str(BASE_DIR / "sentiment_out" / "term_frequencies.json")
+TEXT_COL = "review_text"
+SENT_COL = "Sentiment_label"
+
+POS_VALUE = "긍정"
+NEG_VALUE = "부정"
+
+# 전체 코퍼스 테이블 키
+ALL_KEY = "__all__"
+
+# 월 단위 슬라이스용 날짜 컬럼 (앱스토어: updated, 구글플레이: at)
+DATE_COLS = ("updated", "at")
+MONTH_COL = "month"
+
+Dimension = Union[str, tuple[str, ...]]
+
+# ===== 2. 불용어 (text_normalization 레지스트리) =====
+stopwords = stopword_set("english", "korean", "domain")
+
+
+# ===== 3. 텍스트 정제 / 토큰 추출 =====
+def _filter_tokens(cleaned: str) -> list[str]:
+    return [t for t in WORD_PATTERN.findall(cleaned) if t.lower() not in stopwords]
+
+
+def tokenize(text):
+    """단어 추출 (한글 2자 이상, 영어 2자 이상, 불용어 제거 — 영어는 소문자로 비교)"""
+    return _filter_tokens(clean_text(text))
+
+
+def tokenize_many(texts) -> list[list[str]]:
+    """tokenize 의 배치 버전 (normalize_many 로 한 번에 정제)"""
+    return [_filter_tokens(cleaned) for cleaned in normalize_many(texts, "clean")]
+
+
+# ===== 4. 데이터 로드 (에러 처리) =====
+def load_reviews(path=CSV_PATH, columns: Optional[list[str]] = None, **filters):
+    """columns / filters 는 lazy_dataset 으로 넘겨 필요한 분할 파일 · 컬럼만 읽음 (None 이면 전체 컬럼)"""
+    from lazy_dataset import scan
+
+    try:
+        query = scan(path)
+        # 필수 컬럼 확인
+        if TEXT_COL not in query.schema or SENT_COL not in query.schema:
+            print(f"❌ 필수 컬럼이 없습니다: {TEXT_COL}, {SENT_COL}")
+            sys.exit(1)
+
+        if filters:
+            query = query.filter(**filters)
+        if columns is not None:
+            query = query.select(columns)
+        df = query.collect()
+        print(f"✓ 데이터 로드 완료: {len(df)}개 행")
+
+    except FileNotFoundError:
+        print(f"❌ 파일을 찾을 수 없습니다: {path}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ 데이터 로드 오류: {e}")
+        sys.exit(1)
+    return df
+
+
+def add_month_column(df: pd.DataFrame, date_cols=DATE_COLS) -> pd.DataFrame:
+    """날짜 컬럼(앞쪽 우선)에서 YYYY-MM 값을 만들어 MONTH_COL에 추가"""
+    month = pd.Series("", index=df.index, dtype="object")
+    for col in date_cols:
+        if col not in df.columns:
+            continue
+        parsed = pd.to_datetime(df[col], errors="coerce").dt.strftime("%Y-%m")
+        month = month.where(month != "", parsed.fillna(""))
+    df[MONTH_COL] = month
+    return df
+
+
+def _dimension_columns(dimensions) -> set[str]:
+    columns = set()
+    for dim in dimensions:
+        columns.update([dim] if isinstance(dim, str) else dim)
+    return columns
+
+
+# ===== 5. 빈도 테이블 =====
+def dimension_name(dimension: Dimension) -> str:
+    """('platform', 'country') → 'platform+country'"""
+    return dimension if isinstance(dimension, str) else "+".join(dimension)
+
+
+def _dimension_values(df: pd.DataFrame, dimension: Dimension) -> list[str]:
+    columns = [dimension] if isinstance(dimension, str) else list(dimension)
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise KeyError(f"빈도 테이블 차원 컬럼이 없습니다: {missing}")
+    parts = [df[c].fillna("").astype(str) for c in columns]
+    joined = parts[0]
+    for part in parts[1:]:
+        joined = joined + "|" + part
+    return joined.tolist()
+
+
+def build_frequency_tables(
+    df: pd.DataFrame,
+    dimensions: tuple[Dimension, ...] = (SENT_COL,),
+) -> dict[str, dict[str, Counter]]:
+    """
+    리뷰를 한 번만 토큰화해서 모든 차원의 Counter를 함께 채운다.
+    반환: {차원명: {값: Counter}} + {ALL_KEY: {ALL_KEY: 전체 Counter}}
+    """
+    keys = {dimension_name(dim): _dimension_values(df, dim) for dim in dimensions}
+    tables: dict[str, dict[str, Counter]] = {name: {} for name in keys}
+    total = Counter()
+
+    for row_idx, tokens in enumerate(tokenize_many(df[TEXT_COL].tolist())):
+        if not tokens:
+            continue
+        counts = Counter(tokens)
+        total.update(counts)
+        for name, values in keys.items():
+            value = values[row_idx]
+            table = tables[name].get(value)
+            if table is None:
+                table = tables[name][value] = Counter()
+            table.update(counts)
+
+    tables[ALL_KEY] = {ALL_KEY: total}
+    return tables
+
+
+def count_reviews(path=CSV_PATH) -> int:
+    """리뷰 수 (lazy_dataset 매니페스트의 행 수 — 빈도 테이블을 재사용할 때도 파일을 읽지 않음)"""
+    from lazy_dataset import scan
+
+    return scan(path).count()
+
+
+def source_fingerprint(path) -> dict:
+    stat = Path(path).stat()
+    return {"path": str(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def tokenizer_fingerprint() -> str:
+    """현재 토큰화 설정 해시 (불용어 집합 + 단어 패턴) — 바뀌면 캐시된 빈도 / 스케치를 다시 계산"""
+    raw = "\n".join([WORD_PATTERN.pattern, *sorted(stopwords)])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def save_frequency_tables(tables: dict[str, dict[str, Counter]], path=FREQ_PATH, source: Optional[dict] = None):
+    payload = {
+        "source": source,
+        "tables": {name: {value: dict(counter) for value, counter in values.items()} for name, values in tables.items()},
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+    print(f"✓ 빈도 테이블 저장 → {path}")
+
+
+def load_frequency_tables(path=FREQ_PATH) -> tuple[dict[str, dict[str, Counter]], Optional[dict]]:
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    tables = {
+        name: {value: Counter(counts) for value, counts in values.items()}
+        for name, values in payload["tables"].items()
+    }
+    return tables, payload.get("source")
+
+
+def get_frequency_tables(
+    csv_path=CSV_PATH,
+    freq_path=FREQ_PATH,
+    dimensions: tuple[Dimension, ...] = (SENT_COL,),
+    rebuild: bool = False,
+) -> dict[str, dict[str, Counter]]:
+    """
+    저장된 테이블이 같은 입력 CSV + 같은 토큰화 설정으로 만들어졌고 필요한 차원이 모두 있으면 재사용,
+    아니면 새로 생성
+    """
+    source = None
+    if Path(csv_path).exists():
+        source = {**source_fingerprint(csv_path), "tokenizer": tokenizer_fingerprint()}
+    needed = {dimension_name(dim) for dim in dimensions}
+
+    if not rebuild and source is not None and Path(freq_path).exists():
+        tables, saved_source = load_frequency_tables(freq_path)
+        if saved_source == source:
+            if needed <= set(tables):
+                print(f"✓ 빈도 테이블 재사용 ← {freq_path}")
+                return tables
+            # 같은 입력으로 만든 기존 차원도 유지한 채 다시 생성
+            saved = tuple(name if "+" not in name else tuple(name.split("+")) for name in tables if name != ALL_KEY)
+            dimensions = tuple(dict.fromkeys(tuple(dimensions) + saved))
+
+    df = load_reviews(csv_path, columns=[TEXT_COL, *sorted(_dimension_columns(dimensions))])
+    if MONTH_COL in _dimension_columns(dimensions) and MONTH_COL not in df.columns:
+        add_month_column(df)
+    tables = build_frequency_tables(df, dimensions)
+    save_frequency_tables(tables, freq_path, source)
+    return tables
+
+
+def top_terms(
+    tables: dict[str, dict[str, Counter]],
+    dimension: Dimension,
+    value: str,
+    n: int = 30,
+) -> list[tuple[str, int]]:
+    counter = tables.get(dimension_name(dimension), {}).get(value)
+    return counter.most_common(n) if counter else []
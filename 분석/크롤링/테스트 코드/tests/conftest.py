@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""
+테스트 공용 설정
+- 분석 스크립트(테스트 코드/*.py)를 모듈로 import 할 수 있게 경로 추가
+- VREW_BASE_DIR 을 임시 폴더로 지정 (스크립트들이 import 시점에 읽음 → 실제 데이터 폴더에 쓰지 않음)
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent.parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+os.environ["VREW_BASE_DIR"] = tempfile.mkdtemp(prefix="vrew_test_")
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""evaluation: 대표 지표는 불확실성 샘플을 빼고 계산, 불확실성 샘플은 따로 보고"""
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("numpy")
+
+import evaluation  # noqa: E402
+from term_frequency import NEG_VALUE, POS_VALUE, SENT_COL, TEXT_COL  # noqa: E402
+
+
+def _gold() -> "pd.DataFrame":
+    """층화 샘플 40건은 전부 정답, 불확실성 샘플 40건은 전부 오답"""
+    n = 40
+    truth = [POS_VALUE, NEG_VALUE] * (n // 2)
+    flipped = [NEG_VALUE if label == POS_VALUE else POS_VALUE for label in truth]
+    return pd.DataFrame({
+        "platform": "appstore",
+        "review_id": range(2 * n),
+        TEXT_COL: "리뷰",
+        evaluation.TRUE_COL: truth + truth,
+        SENT_COL: truth + flipped,
+        evaluation.SELECTION_COL: ["stratified"] * n + [evaluation.UNCERTAINTY_SELECTION] * n,
+    })
+
+
+def test_headline_metrics_exclude_uncertainty_rows(tmp_path):
+    path = tmp_path / "gold.csv"
+    _gold().to_csv(path, index=False)
+
+    report = evaluation.run_report(path, n_boot=50, output_path=tmp_path / "report.csv")
+    overall = report[(report["slice"] == "전체") & (report["metric"] == "accuracy")].set_index("subset")
+
+    assert overall.loc[evaluation.ESTIMATE_SUBSET, "n"] == 40
+    assert overall.loc[evaluation.ESTIMATE_SUBSET, "score"] == 1.0
+    assert overall.loc[evaluation.UNCERTAINTY_SELECTION, "n"] == 40
+    assert overall.loc[evaluation.UNCERTAINTY_SELECTION, "score"] == 0.0
+    assert set(report.loc[report["subset"] == evaluation.UNCERTAINTY_SELECTION, "slice"]) == {"전체"}
+
+
+def test_frame_without_selection_column_is_all_estimate():
+    estimate, uncertain = evaluation.split_by_selection(_gold().drop(columns=evaluation.SELECTION_COL))
+
+    assert len(estimate) == 80
+    assert uncertain.empty
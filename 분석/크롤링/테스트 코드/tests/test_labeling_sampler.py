@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""labeling_sampler: 후보 풀의 리뷰 키는 플랫폼마다 고유해야 한쪽으로 몰리지 않음 + 라벨 병합"""
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("numpy")
+
+from labeling_sampler import KEY_COL, SCORE_COL, merge_labels, prepare_pool, select_candidates  # noqa: E402
+from term_frequency import SENT_COL, TEXT_COL  # noqa: E402
+
+
+def _reviews() -> "pd.DataFrame":
+    """App Store 는 review_id, Google Play 는 review_id 가 0.0 으로 채워지고 reviewId 만 고유"""
+    appstore = pd.DataFrame({
+        "platform": "appstore",
+        "country": "kr",
+        "rating": [5, 1, 4, 2],
+        "review_id": [1001, 1002, 1003, 1004],
+        "reviewId": None,
+        TEXT_COL: ["자막 편해요", "자꾸 튕겨요", "음성 인식 좋아요", "내보내기 느려요"],
+    })
+    googleplay = pd.DataFrame({
+        "platform": "googleplay",
+        "country": "kr",
+        "rating": [5, 3, 1],
+        "review_id": [0.0, 0.0, 0.0],
+        "reviewId": ["gp:aaa", "gp:bbb", "gp:ccc"],
+        TEXT_COL: ["최고예요", "그럭저럭 써요", "결제 오류 나요"],
+    })
+    df = pd.concat([appstore, googleplay], ignore_index=True)
+    df[SENT_COL] = ["긍정", "부정", "긍정", "부정", "긍정", "긍정", "부정"]
+    df[SCORE_COL] = [0.9, 0.2, 0.6, 0.4, 0.95, 0.55, 0.1]
+    return df
+
+
+def test_pool_keeps_per_platform_counts():
+    df = _reviews()
+    pool = prepare_pool(df, exclude_keys=set())
+
+    assert pool["platform"].value_counts().to_dict() == df["platform"].value_counts().to_dict()
+    assert pool[KEY_COL].is_unique
+
+
+def test_pool_uses_review_id_fallback_for_googleplay():
+    pool = prepare_pool(_reviews(), exclude_keys=set())
+    gp_keys = set(pool.loc[pool["platform"] == "googleplay", KEY_COL])
+
+    assert gp_keys == {"googleplay:gp:aaa", "googleplay:gp:bbb", "googleplay:gp:ccc"}
+
+
+def test_pool_excludes_known_keys_and_duplicate_text():
+    df = _reviews()
+    df.loc[len(df)] = df.loc[0].to_dict() | {"review_id": 1005}  # 같은 본문, 다른 ID
+    pool = prepare_pool(df, exclude_keys={"googleplay:gp:aaa"})
+
+    assert "googleplay:gp:aaa" not in set(pool[KEY_COL])
+    assert len(pool) == len(df) - 2
+
+
+def test_candidates_cover_both_platforms():
+    df = _reviews()
+    candidates = select_candidates(df, n=len(df))
+
+    assert set(candidates["platform"]) == {"appstore", "googleplay"}
+
+
+def test_merge_labels_reports_unrecognized_labels(tmp_path, capsys):
+    labeling = tmp_path / "labeling.csv"
+    gold_path = tmp_path / "gold.csv"
+    df = _reviews().assign(**{KEY_COL: lambda d: [f"k{i}" for i in range(len(d))]})
+    df["true_label"] = ["긍정", "NEG", "중립", "중립", "", "??", "positive"]
+    df.to_csv(labeling, index=False)
+
+    gold = merge_labels(labeling, gold_path)
+
+    assert set(gold[KEY_COL]) == {"k0", "k1", "k6"}
+    out = capsys.readouterr().out
+    assert "3건은 정답 세트에서 제외" in out
+    assert "'중립' 2건" in out and "'??' 1건" in out
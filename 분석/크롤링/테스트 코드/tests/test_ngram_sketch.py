@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""ngram_sketch: 분할 파일별 sketch 캐시 → CSV 가 바뀌면 새 / 바뀐 분할만 다시 세고, 합산 결과는 전체 재계산과 같음"""
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("numpy")
+
+import ngram_sketch  # noqa: E402
+from term_frequency import NEG_VALUE, POS_VALUE, SENT_COL, TEXT_COL  # noqa: E402
+
+PHRASES = {
+    POS_VALUE: ["자동 자막 생성 편리함", "음성 인식 정확도 최고", "편집 화면 깔끔함"],
+    NEG_VALUE: ["내보내기 오류 반복", "자막 싱크 밀림 현상", "결제 환불 답변 없음"],
+}
+
+
+def _reviews(month: str, n: int = 30) -> "pd.DataFrame":
+    rows = []
+    for i in range(n):
+        label = POS_VALUE if i % 3 else NEG_VALUE
+        phrases = PHRASES[label]
+        rows.append({
+            "platform": "app_store",
+            "country": "kr",
+            "at": f"{month}-{i % 28 + 1:02d}",
+            TEXT_COL: phrases[i % len(phrases)],
+            SENT_COL: label,
+        })
+    return pd.DataFrame(rows)
+
+
+def _run(csv_path, tmp_path, capsys):
+    counter = ngram_sketch.get_ngram_counter(
+        csv_path, sketch_path=tmp_path / "sketch.npz", shard_dir=tmp_path / "shards", k=200,
+    )
+    return counter, capsys.readouterr().out
+
+
+def test_changed_csv_only_counts_new_partitions(tmp_path, capsys):
+    csv_path = tmp_path / "reviews.csv"
+    _reviews("2025-10").to_csv(csv_path, index=False)
+    _, out = _run(csv_path, tmp_path, capsys)
+    assert "새로 셈 2개, 재사용 0개" in out  # 월 1개 × 감정 2개
+
+    pd.concat([_reviews("2025-10"), _reviews("2025-11")]).to_csv(csv_path, index=False)
+    counter, out = _run(csv_path, tmp_path, capsys)
+    assert "새로 셈 2개, 재사용 2개" in out
+
+    full = ngram_sketch.build_from_csv(csv_path, k=200)
+    for label in (POS_VALUE, NEG_VALUE):
+        assert dict(counter.top(label, 50)) == dict(full.top(label, 50))  # 동점 순서는 무관
+    assert counter.top(NEG_VALUE, 1)[0][1] == 20  # 부정 리뷰는 매달 같은 구문 10건 × 2개월
+
+
+def test_unchanged_csv_reuses_merged_sketch(tmp_path, capsys):
+    csv_path = tmp_path / "reviews.csv"
+    _reviews("2025-10").to_csv(csv_path, index=False)
+    _run(csv_path, tmp_path, capsys)
+
+    _, out = _run(csv_path, tmp_path, capsys)
+    assert "n-gram sketch 재사용" in out
+
+
+def test_stale_shards_are_removed(tmp_path, capsys):
+    csv_path = tmp_path / "reviews.csv"
+    _reviews("2025-10").to_csv(csv_path, index=False)
+    _run(csv_path, tmp_path, capsys)
+
+    _reviews("2025-12").to_csv(csv_path, index=False)
+    _, out = _run(csv_path, tmp_path, capsys)
+    assert "오래된 캐시 2개 삭제" in out
+    assert len(list((tmp_path / "shards").glob("*.npz"))) == 2
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""review_cube.update_cube: 라벨 / 점수가 바뀐 리뷰는 예전 기여분을 빼고 다시 더해 집계가 전체 재계산과 같음"""
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+import review_cube  # noqa: E402
+from term_frequency import NEG_VALUE, POS_VALUE, SENT_COL  # noqa: E402
+
+N = 200
+
+
+def _reviews() -> "pd.DataFrame":
+    rows = []
+    for i in range(N):
+        google = i % 2 == 1
+        rows.append({
+            "platform": "googleplay" if google else "appstore",
+            "country": "kr" if i % 4 < 2 else "us",
+            "review_id": 0 if google else 1000 + i,  # 구글플레이는 review_id 0 + reviewId
+            "reviewId": f"gp:{i}" if google else None,
+            "version": "1.10" if i % 3 else "1.9",
+            "rating": i % 5 + 1,
+            "thumbsUpCount": i % 7,
+            SENT_COL: POS_VALUE if i % 5 >= 2 else NEG_VALUE,
+            "Sentiment_score": 0.9 if i % 5 >= 2 else 0.1,
+        })
+    return pd.DataFrame(rows)
+
+
+def _counts(cube, by=("platform", SENT_COL)) -> dict:
+    table = cube.rollup(list(by))
+    return {tuple(row[list(by)]): row["n_reviews"] for _, row in table.iterrows()}
+
+
+def _assert_same_cube(cube, expected):
+    for by in (["platform", SENT_COL], ["version", "rating"], []):
+        got = cube.rollup(by).sort_values(by).reset_index(drop=True) if by else cube.rollup(by)
+        want = expected.rollup(by).sort_values(by).reset_index(drop=True) if by else expected.rollup(by)
+        pd.testing.assert_frame_equal(got, want, check_dtype=False)
+
+
+def test_relabeled_reviews_are_recounted(tmp_path):
+    path = tmp_path / "cube.npz"
+    df = _reviews()
+    cube = review_cube.update_cube(df, path)
+    assert cube.rollup()["n_reviews"].iloc[0] == N
+    before = _counts(cube)
+
+    # 100건 라벨 뒤집기 (점수도 같이)
+    flipped = df.index[:100]
+    df.loc[flipped, SENT_COL] = df.loc[flipped, SENT_COL].map({POS_VALUE: NEG_VALUE, NEG_VALUE: POS_VALUE})
+    df.loc[flipped, "Sentiment_score"] = 1.0 - df.loc[flipped, "Sentiment_score"]
+    cube = review_cube.update_cube(df, path)  # 저장된 큐브를 불러와 갱신
+
+    assert cube.last_changed == 100
+    assert cube.rollup()["n_reviews"].iloc[0] == N  # 총 리뷰 수는 그대로
+    after = _counts(cube)
+    assert after != before
+    expected = df.groupby(["platform", SENT_COL]).size().to_dict()
+    assert after == expected
+    _assert_same_cube(cube, review_cube.update_cube(df, tmp_path / "fresh.npz"))
+
+
+def test_unchanged_and_reverted_reviews(tmp_path):
+    path = tmp_path / "cube.npz"
+    df = _reviews()
+    original = _counts(review_cube.update_cube(df, path))
+
+    cube = review_cube.update_cube(df, path)
+    assert cube.last_changed == 0
+
+    edited = df.copy()
+    edited.loc[:9, SENT_COL] = POS_VALUE
+    edited.loc[:9, "thumbsUpCount"] = 100
+    review_cube.update_cube(edited, path)
+    cube = review_cube.update_cube(df, path)  # 원래 값으로 되돌림
+    assert cube.last_changed == 10
+    assert _counts(cube) == original
+    assert cube.rollup()["thumbsUpCount_sum"].iloc[0] == df["thumbsUpCount"].sum()
+    _assert_same_cube(cube, review_cube.update_cube(df, tmp_path / "fresh.npz"))
+
+
+def test_new_and_changed_reviews_in_one_update(tmp_path):
+    path = tmp_path / "cube.npz"
+    df = _reviews()
+    review_cube.update_cube(df.iloc[:150], path)
+
+    relabeled = int((df.loc[:19, SENT_COL] == POS_VALUE).sum())
+    df.loc[:19, SENT_COL] = NEG_VALUE
+    cube = review_cube.update_cube(df, path)
+
+    assert cube.last_changed == relabeled
+    assert cube.rollup()["n_reviews"].iloc[0] == N
+    assert _counts(cube, [SENT_COL]) == {(label,): n for label, n in df[SENT_COL].value_counts().items()}
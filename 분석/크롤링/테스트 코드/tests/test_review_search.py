@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""review_search: 증분 색인 / 불리언 질의 / 필터 / 검색어 정규화"""
+
+import sqlite3
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+import review_search  # noqa: E402
+from term_frequency import SENT_COL, TEXT_COL  # noqa: E402
+
+
+def _reviews() -> "pd.DataFrame":
+    return pd.DataFrame({
+        "platform": ["appstore", "appstore", "googleplay", "googleplay", "appstore"],
+        "country": ["kr", "kr", "kr", "us", "kr"],
+        "review_id": [1, 2, 0, 0, 5],
+        "reviewId": [None, None, "gp:a", "gp:b", None],
+        "at": ["2025-11-02", "2025-11-20", "2025-12-01", "2025-11-05", "2025-10-30"],
+        TEXT_COL: [
+            "자막 싱크 밀려요",
+            "자막 생성 최고",
+            "싱크 오류 광고 너무 많아요",
+            "Subtitle export is slow",
+            "광고 없이 자막 편집",
+        ],
+        SENT_COL: ["부정", "긍정", "부정", "부정", "긍정"],
+    })
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = review_search.connect(tmp_path / "index.sqlite")
+    review_search.index_reviews(conn, _reviews())
+    yield conn
+    conn.close()
+
+
+def _texts(result) -> set[str]:
+    return set(result["review_text"])
+
+
+def test_reindex_only_touches_new_and_changed_reviews(conn):
+    df = _reviews()
+    assert review_search.index_reviews(conn, df) == (0, 0)
+
+    df.loc[0, TEXT_COL] = "자막 위치가 이상해요"
+    df.loc[len(df)] = {"platform": "appstore", "country": "kr", "review_id": 6, "reviewId": None,
+                       "at": "2025-11-10", TEXT_COL: "싱크 맞추기 편해요", SENT_COL: "긍정"}
+    assert review_search.index_reviews(conn, df) == (1, 1)
+
+    assert conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0] == len(df)
+    assert "자막 싱크 밀려요" not in _texts(review_search.search(conn, "싱크"))
+    assert "싱크 맞추기 편해요" in _texts(review_search.search(conn, "싱크"))
+
+
+def test_boolean_operators(conn):
+    assert _texts(review_search.search(conn, "자막 AND 싱크")) == {"자막 싱크 밀려요"}
+    assert _texts(review_search.search(conn, "자막 싱크")) == {"자막 싱크 밀려요"}  # AND 기본
+    assert _texts(review_search.search(conn, "생성 OR 오류")) == {"자막 생성 최고", "싱크 오류 광고 너무 많아요"}
+    assert _texts(review_search.search(conn, "자막 NOT 광고")) == {"자막 싱크 밀려요", "자막 생성 최고"}
+    assert review_search.search(conn, "자막 AND 없는단어").empty
+
+
+def test_filters(conn):
+    assert _texts(review_search.search(conn, "자막", sentiment="긍정")) == {"자막 생성 최고", "광고 없이 자막 편집"}
+    assert _texts(review_search.search(conn, "싱크", platform="googleplay")) == {"싱크 오류 광고 너무 많아요"}
+    assert _texts(review_search.search(conn, "자막", month="2025-11")) == {"자막 싱크 밀려요", "자막 생성 최고"}
+    assert _texts(review_search.search(conn, "광고", start_date="2025-11-01", end_date="2025-12-31")) == {
+        "싱크 오류 광고 너무 많아요"}
+    assert review_search.search(conn, "subtitle", country="kr").empty
+
+
+def test_query_terms_use_index_normalization(conn):
+    assert review_search.parse_query("Subtitle! OR Export NOT 광고,") == ([], [["subtitle", "export"]], ["광고"])
+    for query in ("subtitle", "Subtitle", "SUBTITLE", "subtitle?"):
+        assert _texts(review_search.search(conn, query)) == {"Subtitle export is slow"}
+    with pytest.raises(ValueError):
+        review_search.search(conn, "!!")
+
+
+def test_ranking_and_limit(conn):
+    result = review_search.search(conn, "자막 OR 싱크", limit=2)
+
+    assert len(result) == 2
+    assert result["score"].is_monotonic_decreasing
+    assert result.iloc[0]["review_text"] == "자막 싱크 밀려요"  # 두 검색어 모두 포함
+
+
+def test_common_token_does_not_bind_one_variable_per_candidate(tmp_path):
+    conn = review_search.connect(tmp_path / "index.sqlite")
+    if not hasattr(conn, "setlimit"):
+        pytest.skip("sqlite3.Connection.setlimit 필요 (Python 3.11+)")
+    n = 500
+    review_search.index_reviews(conn, pd.DataFrame({
+        "platform": "appstore",
+        "review_id": range(1, n + 1),
+        TEXT_COL: [f"영상 편집 {'좋아요' if i % 2 else '느려요'}" for i in range(n)],
+        SENT_COL: "긍정",
+    }))
+    conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 50)
+
+    result = review_search.search(conn, "영상 NOT 느려요", limit=10)
+    assert len(result) == 10
+    assert all("좋아요" in text for text in result["review_text"])
+    conn.close()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""review_store: UPSERT 변경 감지 / row_version / 소비자 커서 / review_id 0 정리"""
+
+import sqlite3
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+import review_store  # noqa: E402
+
+
+def _reviews() -> "pd.DataFrame":
+    return pd.DataFrame({
+        "platform": ["appstore", "appstore", "googleplay", "googleplay"],
+        "country": ["kr", "kr", "kr", "kr"],
+        "review_id": [101, 102, 0, 0],
+        "reviewId": [None, None, "gp:a", "gp:b"],
+        "content": ["자막 싱크 밀려요", "자막 생성 최고", "광고 너무 많아요", "편집 편해요"],
+        "rating": [2, 5, 1, 4],
+        "updated": ["2025-11-02T10:00:00Z", "2025-11-03T10:00:00Z", None, None],
+        "at": [None, None, "2025-11-04 09:00:00", "2025-11-05 09:00:00"],
+    })
+
+
+def _labels(df: "pd.DataFrame") -> "pd.DataFrame":
+    out = df.copy()
+    out["Sentiment_label"] = ["부정", "긍정", "부정", "긍정"]
+    out["Sentiment_score"] = [0.1, 0.9, 0.2, 0.8]
+    out["Review_lang"] = "ko"
+    out["Sentiment_source"] = "transformer"
+    return out
+
+
+def _row(conn, review_id: str) -> dict:
+    cur = conn.execute("SELECT * FROM reviews WHERE review_id = ?", (review_id,))
+    return dict(zip([d[0] for d in cur.description], cur.fetchone()))
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = review_store.connect(tmp_path / "store.sqlite")
+    yield conn
+    conn.close()
+
+
+def test_upsert_counts_new_changed_and_unchanged(conn):
+    df = _reviews()
+    assert review_store.upsert_reviews(conn, df) == (4, 0)
+    assert review_store.latest_version(conn) == 1
+    assert review_store.upsert_reviews(conn, df) == (0, 0)  # 같은 내용 → 아무 행도 새 버전을 받지 않음
+    assert conn.execute("SELECT MAX(row_version) FROM reviews").fetchone()[0] == 1
+
+    df.loc[1, "rating"] = 4
+    assert review_store.upsert_reviews(conn, df) == (0, 1)
+    assert _row(conn, "102")["row_version"] == 3
+    assert _row(conn, "102")["created_version"] == 1
+    assert _row(conn, "101")["row_version"] == 1
+
+
+def test_google_play_rows_with_id_zero_use_review_id(conn):
+    review_store.upsert_reviews(conn, _reviews())
+
+    ids = {r[0] for r in conn.execute("SELECT review_id FROM reviews WHERE platform = 'googleplay'")}
+    assert ids == {"gp:a", "gp:b"}
+
+
+def test_content_change_clears_sentiment_but_other_changes_keep_it(conn):
+    df = _reviews()
+    review_store.upsert_reviews(conn, df)
+    assert review_store.update_sentiment(conn, _labels(df)) == 4
+    assert review_store.update_sentiment(conn, _labels(df)) == 0  # 같은 라벨 → 변경 없음
+
+    df.loc[0, "content"] = "자막 싱크 고쳐졌어요"
+    df.loc[1, "rating"] = 3
+    assert review_store.upsert_reviews(conn, df) == (0, 2)
+
+    edited, rerated = _row(conn, "101"), _row(conn, "102")
+    assert edited["sentiment"] is None and edited["sentiment_score"] is None and edited["sentiment_source"] is None
+    assert rerated["sentiment"] == "긍정" and rerated["sentiment_source"] == "transformer"
+
+    stored = review_store.stored_sentiment(conn, df)
+    assert stored["Sentiment_label"].isna().tolist() == [True, False, False, False]
+
+
+def test_consumer_cursors_only_return_new_changes(conn):
+    df = _reviews()
+    review_store.upsert_reviews(conn, df)
+
+    changes, upto = review_store.read_changes(conn, "cube")
+    assert len(changes) == 4 and upto == 1
+    review_store.commit_cursor(conn, "cube", upto)
+    changes, upto = review_store.read_changes(conn, "cube")
+    assert changes.empty and upto == 1
+
+    labeled = _labels(df).iloc[[2]]
+    review_store.update_sentiment(conn, labeled)
+    changes, upto = review_store.read_changes(conn, "cube", ["review_id", "sentiment"])
+    assert changes["review_id"].tolist() == ["gp:a"]
+    assert changes["Sentiment_label"].tolist() == ["부정"]
+    assert upto == review_store.latest_version(conn) == 2
+
+    # 다른 소비자의 커서는 독립적
+    assert len(review_store.read_changes(conn, "search")[0]) == 4
+
+
+def test_migration_removes_review_id_zero_rows(tmp_path, capsys):
+    path = tmp_path / "old.sqlite"
+    old = sqlite3.connect(path)
+    old.execute(
+        "CREATE TABLE reviews (platform TEXT NOT NULL, review_id TEXT NOT NULL, country TEXT NOT NULL DEFAULT '', "
+        "lang TEXT NOT NULL DEFAULT '', author TEXT, title TEXT, content TEXT, rating INTEGER, version TEXT, "
+        "review_date TEXT, thumbs_up INTEGER, vote_sum INTEGER, vote_count INTEGER, reply_content TEXT, "
+        "replied_at TEXT, content_hash TEXT NOT NULL, sentiment TEXT, sentiment_score REAL, review_lang TEXT, "
+        "created_version INTEGER NOT NULL, row_version INTEGER NOT NULL, first_seen TEXT NOT NULL, "
+        "updated_at TEXT NOT NULL, PRIMARY KEY (platform, review_id))"
+    )
+    old.executemany(
+        "INSERT INTO reviews (platform, review_id, content, content_hash, created_version, row_version, "
+        "first_seen, updated_at) VALUES (?, ?, ?, 'h', 1, 1, 'now', 'now')",
+        [("googleplay", "0", "덮어써진 리뷰"), ("googleplay", "0.0", "덮어써진 리뷰"), ("appstore", "101", "정상 리뷰")],
+    )
+    old.commit()
+    old.close()
+
+    conn = review_store.connect(path)
+    assert "충돌 행 2건 삭제" in capsys.readouterr().out
+    assert [r[0] for r in conn.execute("SELECT review_id FROM reviews")] == ["101"]
+    assert "sentiment_source" in {info[1] for info in conn.execute("PRAGMA table_info(reviews)")}
+    conn.close()
+
+    review_store.connect(path).close()  # 이미 최신 스키마 → 다시 정리하지 않음
+    assert "충돌 행" not in capsys.readouterr().out
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""sentiment_server.MicroBatcher: 시간 초과로 취소된 요청은 추론하지 않고, 큐가 가득 차면 바로 거절"""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pandas")
+
+import sentiment_server  # noqa: E402
+
+
+@pytest.fixture
+def fake_predict(monkeypatch):
+    """predict_batch 대신 호출된 문장을 기록하고, release 전까지 첫 배치를 붙잡아 둠"""
+    seen: list[str] = []
+    release = threading.Event()
+
+    def predict(texts, **kwargs):
+        seen.extend(texts)
+        release.wait(5)
+        return ["긍정"] * len(texts), [0.9] * len(texts)
+
+    monkeypatch.setattr(sentiment_server, "predict_batch", predict)
+    yield seen, release
+    release.set()
+
+
+def _batcher(**kwargs) -> "sentiment_server.MicroBatcher":
+    batcher = sentiment_server.MicroBatcher(None, None, "cpu", 1, max_batch_size=2, max_wait_ms=1.0, **kwargs)
+    batcher.start()
+    return batcher
+
+
+def _submit_in_background(batcher, texts):
+    thread = threading.Thread(target=batcher.submit, args=(texts,), daemon=True)
+    thread.start()
+    return thread
+
+
+def _wait_until(condition, timeout: float = 5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline, "대기 시간 초과"
+        time.sleep(0.001)
+
+
+def test_timed_out_request_is_not_predicted(fake_predict):
+    seen, release = fake_predict
+    batcher = _batcher()
+    blocker = _submit_in_background(batcher, ["앞 요청", "앞 요청"])  # 워커가 이 배치에서 멈춤
+    _wait_until(lambda: seen)
+
+    with pytest.raises(TimeoutError):
+        batcher.submit(["포기한 요청"], timeout=0.05)
+    release.set()
+    blocker.join(5)
+
+    assert batcher.submit(["다음 요청"]) == (["긍정"], [0.9])
+    assert "포기한 요청" not in seen
+    assert batcher.stats()["cancelled"] == 1
+    batcher.stop()
+
+
+def test_full_queue_rejects_request(fake_predict):
+    seen, release = fake_predict
+    batcher = _batcher(max_queue=1)
+    blocker = _submit_in_background(batcher, ["앞 요청", "앞 요청"])
+    _wait_until(lambda: seen)
+
+    waiting = _submit_in_background(batcher, ["대기 요청"])  # 큐의 한 자리를 차지
+    _wait_until(lambda: batcher.stats()["queue_depth"] == 1)
+    with pytest.raises(sentiment_server.QueueFullError):
+        batcher.submit(["넘친 요청"])
+    assert batcher.stats()["rejected"] == 1
+
+    release.set()
+    blocker.join(5)
+    waiting.join(5)
+    assert "넘친 요청" not in seen
+    assert "대기 요청" in seen
+    batcher.stop()
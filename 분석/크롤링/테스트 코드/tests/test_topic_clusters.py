@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""topic_clusters: 소형 로컬 모델(무작위 가중치 ELECTRA)로 임베딩 캐시 / 군집 / 검색 / 요약 / 배치 입력 확인"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("sklearn")
+
+import topic_clusters  # noqa: E402
+from bench_sentiment import build_tiny_model  # noqa: E402
+from term_frequency import NEG_VALUE, POS_VALUE, SENT_COL, TEXT_COL  # noqa: E402
+
+TEXTS = [
+    "자막 싱크가 자꾸 밀려요",
+    "자막 싱크가 자꾸 밀려요",
+    "내보내기 하면 앱이 꺼져요",
+    "내보내기 도중 멈춰요",
+    "결제했는데 크레딧이 안 들어와요",
+    "환불 문의 답변이 없어요",
+    "음성 인식이 너무 부정확해요",
+    "로그인이 안 돼요",
+]
+
+
+@pytest.fixture(scope="module")
+def tiny_encoder(tmp_path_factory):
+    model_dir = build_tiny_model(tmp_path_factory.mktemp("tiny-model"), TEXTS, vocab_size=500)
+    tokenizer, model = topic_clusters.load_encoder(str(model_dir))
+    return str(model_dir), tokenizer, model
+
+
+def _embed(tiny_encoder, tmp_path, texts=TEXTS):
+    model_name, tokenizer, model = tiny_encoder
+    return topic_clusters.embed_reviews(
+        texts, tokenizer, model, model_name,
+        matrix_path=tmp_path / "emb.f32", cache_path=tmp_path / "cache.sqlite", chunk_rows=3,
+    )[:len(texts)]
+
+
+def test_embeddings_are_normalized_and_cached(tiny_encoder, tmp_path):
+    model_name, tokenizer, model = tiny_encoder
+    matrix = np.asarray(_embed(tiny_encoder, tmp_path))
+
+    assert matrix.shape == (len(TEXTS), model.config.hidden_size)
+    np.testing.assert_allclose(np.linalg.norm(matrix, axis=1), 1.0, rtol=1e-5)
+    np.testing.assert_array_equal(matrix[0], matrix[1])  # 같은 본문 → 같은 벡터
+
+    cache = topic_clusters.EmbeddingCache(model_name, tmp_path / "cache.sqlite")
+    cached = cache.get_many([topic_clusters.text_hash(t) for t in TEXTS])
+    cache.close()
+    assert len(cached) == len(set(TEXTS))
+
+    # 두 번째 실행은 캐시만으로 같은 행렬
+    again = np.asarray(_embed(tiny_encoder, tmp_path))
+    np.testing.assert_allclose(again, matrix, rtol=1e-6)
+
+
+def test_clusters_index_and_summary(tiny_encoder, tmp_path):
+    matrix = _embed(tiny_encoder, tmp_path)
+    kmeans = topic_clusters.fit_clusters(matrix, n_clusters=3, batch_size=4, epochs=2)
+    labels, sims = topic_clusters.assign_clusters(kmeans, matrix, chunk_rows=3)
+    index = topic_clusters.ClusterIndex(matrix, kmeans.cluster_centers_, labels)
+
+    assert labels.shape == (len(TEXTS),) and set(labels) <= {0, 1, 2}
+    assert np.all(sims <= 1.0 + 1e-5)
+    # 모든 군집을 탐색하면 자기 자신(또는 같은 본문)이 가장 가까움
+    (row, score), *_ = index.search(np.asarray(matrix[2]), k=3, n_probe=3)
+    assert TEXTS[row] == TEXTS[2] and score == pytest.approx(1.0, abs=1e-4)
+
+    summary = topic_clusters.summarize_clusters(TEXTS, index, n_reps=2)
+    assert summary["size"].sum() == len(TEXTS)
+    assert list(summary["size"]) == sorted(summary["size"], reverse=True)
+
+
+def test_summary_tokenizes_only_a_sample(monkeypatch):
+    matrix = np.eye(2, dtype=np.float32)[[0] * 50 + [1] * 3]
+    index = topic_clusters.ClusterIndex(matrix, np.eye(2, dtype=np.float32), np.array([0] * 50 + [1] * 3))
+    texts = [f"업데이트 이후 오류 {i}" for i in range(53)]
+
+    seen = []
+    real = topic_clusters.tokenize_many
+    monkeypatch.setattr(topic_clusters, "tokenize_many", lambda batch: seen.append(len(batch)) or real(batch))
+    summary = topic_clusters.summarize_clusters(texts, index, sample_size=10)
+
+    assert seen == [10, 3]
+    assert dict(zip(summary["cluster"], summary["size"])) == {0: 50, 1: 3}
+    assert "오류" in summary.iloc[0]["top_terms"]
+
+
+def _target_csv(tmp_path):
+    csv_path = tmp_path / "reviews_with_sentiment.csv"
+    n = len(TEXTS)
+    pd.DataFrame({
+        "platform": ["appstore"] * n + ["googleplay", "googleplay"],
+        "review_id": [str(i + 1) for i in range(n)] + ["0.0", "0.0"],
+        "reviewId": [""] * n + ["gp:a", "gp:b"],
+        "at": ["2025-01-02"] * n + ["2025-02-01", "2025-02-02"],
+        TEXT_COL: TEXTS + ["좋아요", "최고예요"],
+        SENT_COL: [NEG_VALUE] * n + [POS_VALUE, POS_VALUE],
+    }).to_csv(csv_path, index=False)
+    return csv_path
+
+
+def test_cluster_reviews_streams_batches_into_encode_and_partial_fit(tiny_encoder, tmp_path, monkeypatch):
+    model_name, _, _ = tiny_encoder
+    events = []
+    real_encode = topic_clusters.encode_texts
+    monkeypatch.setattr(topic_clusters, "encode_texts",
+                        lambda texts, *a, **kw: events.append(("encode", len(texts))) or real_encode(texts, *a, **kw))
+    kmeans_cls = type(topic_clusters.new_kmeans(2, 2))
+    real_fit = kmeans_cls.partial_fit
+    monkeypatch.setattr(kmeans_cls, "partial_fit",
+                        lambda self, X, *a, **kw: events.append(("fit", len(X))) or real_fit(self, X, *a, **kw))
+
+    summary = topic_clusters.cluster_reviews(
+        _target_csv(tmp_path), NEG_VALUE, model_name, n_clusters=2, batch_rows=3,
+        out_dir=tmp_path, cache_path=tmp_path / "cache.sqlite", kmeans_batch=3,
+    )
+
+    # 입력 3건씩 → 바로 인코딩 (전체 본문을 한 번에 넘기지 않음), 첫 학습은 모든 배치를 읽기 전에 시작
+    encodes = [n for kind, n in events if kind == "encode"]
+    assert encodes and max(encodes) <= 3
+    assert events.index(("fit", 3)) < max(i for i, (kind, _) in enumerate(events) if kind == "encode")
+
+    clusters = pd.read_csv(tmp_path / topic_clusters.CLUSTERS_PATH.name)
+    assert len(clusters) == len(TEXTS)
+    assert list(clusters[TEXT_COL]) == TEXTS
+    assert list(clusters["review_key"]) == [f"appstore:{i + 1}" for i in range(len(TEXTS))]
+    assert summary["size"].sum() == len(TEXTS)
+
+
+def test_write_assignments_keeps_only_needed_texts(tmp_path):
+    query = topic_clusters.target_query(_target_csv(tmp_path), NEG_VALUE)
+    labels = np.arange(len(TEXTS), dtype=np.int32) % 2
+    sims = np.ones(len(TEXTS), dtype=np.float32)
+
+    texts = topic_clusters.write_assignments(query, labels, sims, {0, 4, 7}, tmp_path / "out.csv", batch_rows=3)
+
+    assert texts == {0: TEXTS[0], 4: TEXTS[4], 7: TEXTS[7]}
+    assert list(pd.read_csv(tmp_path / "out.csv")["cluster"]) == list(labels)
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+리뷰 텍스트 정규화 공용 모듈 (전처리 / 감정분석 / 단어 빈도 / 검색 / 스트리밍 공용)
+- 처리:
+    · nfc      : 유니코드 NFC 정규화 (macOS 등에서 들어오는 자모 분리형 한글 → 완성형)
+    · clean    : nfc + 한글 음절 / 영문 / 숫자 외 문자를 공백으로 바꾸고 공백 정리
+    · sanitize : nfc + 줄바꿈 / 탭 → 공백, NUL 제거 (CSV 저장용, 원문 유지)
+  문자 정제는 미리 컴파일한 정규식 한 번 (re.sub 연쇄 대신), 순수 ASCII / 이미 NFC 인 문장은 정규화 생략
+- normalize_many : 여러 리뷰를 한 번에 정규화 (함수 조회 1회 + 배치 안 중복 문장은 한 번만 계산)
+- 불용어 레지스트리 : STOPWORD_GROUPS 에서 단계마다 필요한 그룹만 골라 씀
+    · 단어 빈도 (term_frequency)   : english + korean + domain
+    · 형태소 토큰 (브류 리뷰 뜯어보기) : morph
+
+마이크로 벤치마크 (리뷰당 정규화 비용, 기존 re.sub 방식과 비교):
+    python text_normalization.py
+    python text_normalization.py --csv vrew_reviews_tokens.csv --limit 50000
+"""
+
+import argparse
+import re
+import time
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+# ===== 1. 단어 패턴 =====
+# 단어 빈도 / 검색 토큰 (한글 2자 이상, 영어 2자 이상)
+WORD_PATTERN = re.compile(r"[가-힣]{2,}|[A-Za-z]{2,}")
+HANGUL_WORD_PATTERN = re.compile(r"[가-힣]{2,}")
+
+
+# ===== 2. 정제 패턴 =====
+# 단어 문자(숫자 / 영문 / 한글 음절) 구간만 찾아 공백 하나로 이어 붙임
+#   = "나머지 문자 → 공백 + 연속 공백 정리 + strip" 을 정규식 한 번으로
+# (str.translate 테이블도 재 봤지만 비ASCII 문자열은 문자마다 dict 를 조회해 기존 re.sub 두 번보다 느렸음)
+_WORD_RUN = re.compile(r"[0-9A-Za-z가-힣]+")
+
+
+# ===== 3. 정규화 함수 =====
+def as_text(value) -> str:
+    """결측값(None / NaN / pd.NA) → "" (pandas 없이 판별)"""
+    if isinstance(value, str):
+        return value
+    if value is None:
+        return ""
+    try:
+        if value != value:  # NaN
+            return ""
+    except TypeError:  # pd.NA
+        return ""
+    return str(value)
+
+
+def nfc(text) -> str:
+    text = as_text(text)
+    if text.isascii() or unicodedata.is_normalized("NFC", text):
+        return text
+    return unicodedata.normalize("NFC", text)
+
+
+def clean_text(text) -> str:
+    """특수문자 제거 및 공백 정리"""
+    return " ".join(_WORD_RUN.findall(nfc(text)))
+
+
+def sanitize_text(text) -> str:
+    """CSV 한 줄에 들어가도록 줄바꿈 / 탭 → 공백, NUL 제거 (없는 문자의 replace 는 memchr 한 번)"""
+    return (
+        nfc(text)
+        .replace("\r\n", " ")
+        .replace("\n", " ")
+        .replace("\r", " ")
+        .replace("\t", " ")
+        .replace("\x00", "")
+    )
+
+
+NORMALIZERS: dict[str, Callable[[object], str]] = {
+    "nfc": nfc,
+    "clean": clean_text,
+    "sanitize": sanitize_text,
+}
+
+
+def normalize_many(texts: Iterable, kind: str = "clean") -> list[str]:
+    """여러 리뷰를 한 번에 정규화 (같은 배치 안의 같은 문장은 한 번만 계산)"""
+    fn = NORMALIZERS[kind]
+    done: dict[str, str] = {}
+    get = done.get
+    out: list[str] = []
+    append = out.append
+    for text in texts:
+        if text.__class__ is not str:
+            text = as_text(text)
+        result = get(text)
+        if result is None:
+            result = done[text] = fn(text)
+        append(result)
+    return out
+
+
+# ===== 4. 불용어 레지스트리 =====
+STOPWORD_GROUPS: dict[str, frozenset[str]] = {
+    # 영어 불용어
+    "english": frozenset("""
+the to of and in is it that for on with as are be was were at by this from
+or but about not into up out over after so than then too can an no all would
+there their what when which who how has had have will your more if my me do
+""".split()),
+    # 한글 불용어 (일반 + 감정 표현)
+    "korean": frozenset("""
+그리고 하지만 그러나 그런 이런 저런 그냥 너무 정말 진짜 거의
+근데 그래서 때문 이건 저건 그건 때 것 거 좀 더 등 듯
+이번 다음 현재 오늘 어제 저희 우리 제가
+있습니다 좋습니다 합니다 됩니다 해요 되는 있어요 되요
+좋아요 감사합니다 감사해요 대단히 정말로
+같은 같이 처럼 보다 만큼 이나 라도 라서 니까
+""".split()),
+    # 도메인 특화 불용어 (필요시 조정)
+    "domain": frozenset("""
+자막 영상 동영상 앱 기능 화면 버전 업데이트 update
+""".split()),
+    # 형태소(Okt 명사) 토큰 불용어 — 조사 · 어미 · 부사 · 타 서비스 단어 포함
+    "morph": frozenset("""
+하다 되다 이다 있다 없다 같다 보다 주다 받다 되 좋다 나쁘다 자다 됨 되고 해서 하면 하는 했다 했던
+같은 든 다시 예 아이고 아휴 하 허 후 의 가 이 은 는 을 를 에 로 도 만 와 과 및 그리고 마다 에서
+으로 에게 까지 때문 때문에 지만 거나 때 거 수 정말 너무 매우 진짜 완전 계속 그냥 좀 잘 더 덜 막 또
+등 라 데 요 니다 그린 이용 사용 서비스 차량 운전 오늘 어제 내일 이번 저번 다른 없고 없다고 없음 없이
+없는 근데 그럼 전에 그렇게 이게 이런 이렇게 처음 바로 지금 결국 무슨 절대 많이 전혀 아니 아니고 아예
+안되고 안되서 안된다고 안됨 안받고 못하고 해도 했더니 대한 저는 제가 내가 회사 고객이 합니다 문이 차가
+차를 차량이 차량을 그린카 그린카는 쏘카 쏘카는 쏘카를 사용하다 갑자기 있어서 이용하다 없어서 거예요 거네요
+거같아요 거같음 아 어 음 헐 휴 우와 에휴 진짜로 흠 아니요 네 응 그래서 그러니까 그런데 그럼에도 그러면
+아니면 때문인지 때문인지도 왜냐면 그렇지만 또한 그리고나서 그래도 그런가 그랬더니 그렇다보니 하게 하면서도
+하려고 하려니 까지는 처럼 정도 대로 뿐 따라 부터 만큼 하면서 그나마 조금 살짝 약간 되게 엄청 너무나
+굉장히 항상 계속해서 매번 대체로 거의 아주 완전히 도대체 좀더 빨리 늦게 처리 제발 문의 요청 답변 불편
+문의했는데 문의드려요 개선 필요 해결 조치 문제 상황 도요 으로는 에는 에게는 라고 이라고 네요 습니다 는데
+는데요 해서요 같아요 해요 하네요 네요. 같음 거에요
+""".split()),
+}
+
+
+@lru_cache(maxsize=None)
+def stopword_set(*groups: str) -> frozenset[str]:
+    """그룹 합집합 (NFC 정규화된 형태로 — 정규화된 토큰과 그대로 비교 가능)"""
+    return frozenset(nfc(word) for group in groups for word in STOPWORD_GROUPS[group])
+
+
+# ===== 5. 마이크로 벤치마크 =====
+_LEGACY_NON_WORD = re.compile(r"[^가-힣A-Za-z0-9\s]")
+_LEGACY_SPACES = re.compile(r"\s+")
+
+SAMPLE_REVIEWS = (
+    "최고예요",
+    "자꾸 튕겨요 ㅠㅠ",
+    "자막 자동 생성이 정말 편해요!! 👍👍",
+    "업데이트 후에 내보내기가 안 됩니다.\n빨리 고쳐주세요...",
+    "Great app for subtitles, but export is slow on my Mac.",
+    "음성 인식 정확도가 높고\t편집도 쉬워요 :) 강추합니다",
+    "한글 자모 분리형 리뷰 (NFD)",
+    "유료 결제했는데 크레딧이 사라졌어요;; 환불 문의 답변도 없네요\r\n별 하나도 아까움",
+)
+
+
+def _legacy_clean(text) -> str:
+    text = _LEGACY_NON_WORD.sub(" ", as_text(text))
+    return _LEGACY_SPACES.sub(" ", text).strip()
+
+
+def _legacy_sanitize(text) -> str:
+    return as_text(text).replace("\r\n", " ").replace("\n", " ").replace("\t", " ").replace("\x00", "")
+
+
+def load_bench_texts(csv_path: Optional[Path], limit: int) -> list[str]:
+    if csv_path is not None and Path(csv_path).exists():
+        import pandas as pd
+
+        head = pd.read_csv(csv_path, nrows=0).columns
+        col = "review_text" if "review_text" in head else "content"
+        return pd.read_csv(csv_path, usecols=[col], nrows=limit)[col].tolist()
+    # 실제 데이터처럼 중복 문장 + 고유 문장 섞기
+    return [
+        SAMPLE_REVIEWS[i % len(SAMPLE_REVIEWS)] + ("" if i % 3 == 0 else f" #{i}")
+        for i in range(limit)
+    ]
+
+
+def _per_review_us(fn: Callable[[list], object], texts: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(texts)
+        best = min(best, time.perf_counter() - start)
+    return best / max(len(texts), 1) * 1e6
+
+
+def benchmark(texts: list, repeat: int = 3) -> list[dict]:
+    cases = {
+        "clean (기존 re.sub)": lambda xs: [_legacy_clean(x) for x in xs],
+        "clean (행별 호출)": lambda xs: [clean_text(x) for x in xs],
+        "clean (normalize_many)": lambda xs: normalize_many(xs, "clean"),
+        "sanitize (기존 replace)": lambda xs: [_legacy_sanitize(x) for x in xs],
+        "sanitize (normalize_many)": lambda xs: normalize_many(xs, "sanitize"),
+    }
+    return [{"case": name, "us_per_review": round(_per_review_us(fn, texts, repeat), 3)} for name, fn in cases.items()]
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="텍스트 정규화 마이크로 벤치마크")
+    parser.add_argument("--csv", type=Path, default=None, help="리뷰 CSV (review_text 또는 content, 없으면 내장 샘플)")
+    parser.add_argument("--limit", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    texts = load_bench_texts(args.csv, args.limit)
+    print(f"[INFO] 벤치마크 입력: {len(texts):,}건 (고유 {len(set(map(as_text, texts))):,}건)")
+    for row in benchmark(texts, args.repeat):
+        print(f"  {row['case']:<28} {row['us_per_review']:>8.3f} µs/리뷰")
+
+    changed = sum(a != b for a, b in zip(normalize_many(texts, "clean"), map(_legacy_clean, texts)))
+    print(f"[INFO] 기존 정제 결과와 다른 리뷰: {changed:,}건 (NFC 정규화로 살아난 한글 등)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,516 @@
+# -*- coding: utf-8 -*-
+"""
+부정 리뷰 토픽 군집화 (문장 임베딩 + 미니배치 K-means)
+- 입력: sentiment_out/reviews_with_sentiment.csv (Sentiment_label 로 대상 리뷰 선택)
+        lazy_dataset 분할 데이터에서 대상 감정 · 필요한 컬럼만 배치로 읽음 (본문 / 키를 파이썬 목록으로 모으지 않음)
+- 처리:
+    1) 입력 배치마다 바로: 캐시 조회 → 없는 본문만 임베딩 → 캐시 저장 → memmap 기록 → partial_fit (첫 에폭)
+       · 문장 임베딩: 길이순으로 정렬한 배치로 CPU 추론 (패딩 낭비 최소화), mean pooling + L2 정규화
+       · 임베딩 캐시: SQLite (모델, 본문 해시) → 벡터. 이미 계산한 리뷰는 다시 추론하지 않음
+       · 임베딩 행렬은 디스크 memmap → 100만 건이어도 메모리는 배치 크기만 사용
+    2) 남은 에폭은 memmap 을 배치로 다시 읽어 partial_fit, 할당도 청크 단위
+    3) IVF 방식 근사 최근접 탐색: 가까운 군집(n_probe개) 안에서만 코사인 유사도 계산
+    4) 입력을 한 번 더 배치로 읽어 리뷰별 군집 CSV 를 이어 쓰고,
+       군집 키워드 표본(군집당 최대 SUMMARY_SAMPLE 건) / 대표 리뷰 / 검색 결과 행의 본문만 모아 요약
+- 출력: sentiment_out/topic_clusters.csv (리뷰별 군집), sentiment_out/topic_summary.csv (군집별 키워드 + 대표 리뷰)
+
+사용 예)
+    python topic_clusters.py --n-clusters 30
+    python topic_clusters.py --model "<bench_out/tiny-koelectra 경로>"   # 오프라인 확인용 소형 모델
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import instrumented, set_rows, track_stage
+from keyword_trends import review_key
+from lazy_dataset import scan
+from term_frequency import CSV_PATH, NEG_VALUE, SENT_COL, TEXT_COL, tokenize_many
+
+# torch / transformers / sklearn 은 실제로 임베딩 / 군집화할 때만 import
+
+# ===== 1. 설정 =====
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+OUT_DIR = BASE_DIR / "sentiment_out"
+EMBED_CACHE_PATH = OUT_DIR / "embedding_cache.sqlite"
+EMBED_MATRIX_PATH = OUT_DIR / "topic_embeddings.f32"
+CLUSTERS_PATH = OUT_DIR / "topic_clusters.csv"
+SUMMARY_PATH = OUT_DIR / "topic_summary.csv"
+
+EMBED_MODEL_NAME = "jhgan/ko-sroberta-multitask"
+EMBED_BATCH_SIZE = 64
+EMBED_MAX_LEN = 128
+CHUNK_ROWS = 20_000        # 입력 배치 / 캐시 조회 / 추론 / memmap 기록 단위
+# 리뷰 키 계산에 필요한 컬럼만 읽음
+READ_COLS = ("platform", "review_id", "reviewId", TEXT_COL)
+
+N_CLUSTERS = 30
+KMEANS_BATCH = 4096
+KMEANS_EPOCHS = 3
+N_PROBE = 3
+N_REPRESENTATIVES = 5
+N_TOPIC_TERMS = 8
+SUMMARY_SAMPLE = 2000      # 군집 키워드용 표본 (군집당)
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model     TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    vector    BLOB NOT NULL,
+    PRIMARY KEY (model, text_hash)
+) WITHOUT ROWID;
+"""
+
+
+# ===== 2. 임베딩 캐시 =====
+def text_hash(text: str) -> str:
+    return hashlib.sha1(str(text).strip().encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """(모델, 본문 해시) → float32 벡터"""
+
+    def __init__(self, model_name: str, path: Path = EMBED_CACHE_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.model_name = model_name
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(CACHE_SCHEMA)
+
+    def get_many(self, hashes: list[str]) -> dict[str, np.ndarray]:
+        found: dict[str, np.ndarray] = {}
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = self.conn.execute(
+                f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                [self.model_name] + chunk,
+            )
+            for key, blob in cursor.fetchall():
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, hashes: list[str], vectors: np.ndarray):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [(self.model_name, key, vec.astype(np.float32).tobytes()) for key, vec in zip(hashes, vectors)],
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+# ===== 3. 문장 임베딩 =====
+def load_encoder(model_name: str = EMBED_MODEL_NAME):
+    """임베딩용 인코더 (분류 헤드 없이 AutoModel). 로컬 디렉터리 경로도 가능"""
+    from sentiment_analysis import configure_cache
+
+    configure_cache()
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    print(f"[INFO] 임베딩 모델 로드: {model_name}")
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name)
+    model.to(torch.device("cpu"))
+    model.eval()
+    return tokenizer, model
+
+
+def encode_texts(
+    texts: list[str],
+    tokenizer,
+    model,
+    batch_size: int = EMBED_BATCH_SIZE,
+    max_len: int = EMBED_MAX_LEN,
+) -> np.ndarray:
+    """
+    길이순 정렬 배치로 인코딩 → mean pooling → L2 정규화
+    반환 순서는 입력 순서와 같다.
+    """
+    import torch
+
+    order = np.argsort([len(t) for t in texts], kind="stable")
+    dim = model.config.hidden_size
+    out = np.empty((len(texts), dim), dtype=np.float32)
+
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            inputs = tokenizer(
+                [texts[i] for i in idx],
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=max_len,
+            )
+            hidden = model(**inputs).last_hidden_state
+            mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1.0)
+            pooled = torch.nn.functional.normalize(pooled, dim=1)
+            out[idx] = pooled.numpy()
+    return out
+
+
+def embed_chunk(chunk: list[str], cache: EmbeddingCache, tokenizer, model) -> tuple[np.ndarray, int, int]:
+    """
+    캐시 조회 → 없는 본문만 추론 → 캐시 저장 (같은 본문이 여러 번 나와도 한 번만 추론)
+    반환: (입력 순서의 벡터, 캐시 적중 수, 신규 추론 수)
+    """
+    hashes = [text_hash(t) for t in chunk]
+    vectors = cache.get_many(list(dict.fromkeys(hashes)))
+    hits = sum(1 for h in hashes if h in vectors)
+
+    missing = {h: t for h, t in zip(hashes, chunk) if h not in vectors}
+    if missing:
+        new_hashes = list(missing)
+        new_vectors = encode_texts([missing[h] for h in new_hashes], tokenizer, model)
+        cache.put_many(new_hashes, new_vectors)
+        vectors.update(zip(new_hashes, new_vectors))
+    return np.stack([vectors[h] for h in hashes]), hits, len(missing)
+
+
+def embed_reviews(
+    texts: list[str],
+    tokenizer,
+    model,
+    model_name: str,
+    matrix_path: Path = EMBED_MATRIX_PATH,
+    cache_path: Path = EMBED_CACHE_PATH,
+    chunk_rows: int = CHUNK_ROWS,
+) -> np.memmap:
+    """본문 목록 → 청크 단위 embed_chunk → memmap 기록"""
+    dim = model.config.hidden_size
+    matrix = np.memmap(matrix_path, dtype=np.float32, mode="w+", shape=(max(len(texts), 1), dim))
+    cache = EmbeddingCache(model_name, cache_path)
+    hits = encoded = 0
+
+    for start in range(0, len(texts), chunk_rows):
+        chunk = texts[start:start + chunk_rows]
+        vectors, chunk_hits, chunk_encoded = embed_chunk(chunk, cache, tokenizer, model)
+        matrix[start:start + len(chunk)] = vectors
+        hits, encoded = hits + chunk_hits, encoded + chunk_encoded
+        print(f"[INFO] 임베딩 {min(start + chunk_rows, len(texts)):,}/{len(texts):,}")
+
+    matrix.flush()
+    cache.close()
+    print(f"[INFO] 임베딩 캐시 적중 {hits:,}건, 신규 추론 {encoded:,}건")
+    return matrix
+
+
+# ===== 4. 미니배치 군집화 =====
+def new_kmeans(n_clusters: int, n_rows: int, batch_size: int = KMEANS_BATCH, seed: int = 42):
+    from sklearn.cluster import MiniBatchKMeans
+
+    return MiniBatchKMeans(n_clusters=min(n_clusters, n_rows), batch_size=batch_size, random_state=seed, n_init=3)
+
+
+def fit_clusters(
+    matrix: np.ndarray,
+    n_clusters: int = N_CLUSTERS,
+    batch_size: int = KMEANS_BATCH,
+    epochs: int = KMEANS_EPOCHS,
+    seed: int = 42,
+    kmeans=None,
+):
+    """memmap을 batch_size씩 읽어 partial_fit (에폭마다 배치 순서만 섞음, kmeans 를 주면 이어서 학습)"""
+    n_rows = len(matrix)
+    if kmeans is None:
+        kmeans = new_kmeans(n_clusters, n_rows, batch_size, seed)
+    n_clusters = kmeans.n_clusters
+    rng = np.random.default_rng(seed)
+    starts = np.arange(0, n_rows, batch_size)
+
+    for _ in range(epochs):
+        for start in rng.permutation(starts):
+            batch = np.asarray(matrix[start:start + batch_size])
+            if len(batch) < n_clusters and not hasattr(kmeans, "cluster_centers_"):
+                # 첫 partial_fit 배치는 군집 수 이상이어야 하므로 앞 구간에서 채움
+                batch = np.asarray(matrix[:max(batch_size, n_clusters)])
+            kmeans.partial_fit(batch)
+    return kmeans
+
+
+def _fit_pending(kmeans, matrix: np.ndarray, fitted: int, written: int, final: bool = False) -> int:
+    """
+    memmap 의 [fitted, written) 구간을 batch_size 씩 partial_fit (final 이면 남은 자투리까지)
+    첫 partial_fit 은 군집 수 이상의 행이 필요 → 그만큼 모일 때까지 기다림. 반환: 학습한 행 끝
+    """
+    while True:
+        need = kmeans.batch_size
+        if not hasattr(kmeans, "cluster_centers_"):
+            need = max(need, kmeans.n_clusters)
+        if written - fitted < need and not (final and written > fitted):
+            return fitted
+        end = min(fitted + need, written)
+        kmeans.partial_fit(np.asarray(matrix[fitted:end]))
+        fitted = end
+
+
+def embed_and_fit(
+    text_batches: Iterable[list[str]],
+    n_rows: int,
+    tokenizer,
+    model,
+    model_name: str,
+    n_clusters: int = N_CLUSTERS,
+    matrix_path: Path = EMBED_MATRIX_PATH,
+    cache_path: Path = EMBED_CACHE_PATH,
+    batch_size: int = KMEANS_BATCH,
+    epochs: int = KMEANS_EPOCHS,
+    seed: int = 42,
+):
+    """
+    입력 배치마다 임베딩(캐시) → memmap 기록 → 쌓인 만큼 partial_fit (첫 에폭을 읽으면서 학습)
+    남은 epochs - 1 에폭은 memmap 을 다시 읽어 학습. 반환: (임베딩 memmap, MiniBatchKMeans)
+    """
+    dim = model.config.hidden_size
+    matrix = np.memmap(matrix_path, dtype=np.float32, mode="w+", shape=(max(n_rows, 1), dim))
+    kmeans = new_kmeans(n_clusters, n_rows, batch_size, seed)
+    cache = EmbeddingCache(model_name, cache_path)
+    written = fitted = hits = encoded = 0
+    try:
+        for texts in text_batches:
+            texts = texts[:n_rows - written]  # 행 수를 센 뒤 늘어난 행은 무시
+            if not texts:
+                continue
+            vectors, chunk_hits, chunk_encoded = embed_chunk(texts, cache, tokenizer, model)
+            matrix[written:written + len(texts)] = vectors
+            written += len(texts)
+            hits, encoded = hits + chunk_hits, encoded + chunk_encoded
+            fitted = _fit_pending(kmeans, matrix, fitted, written)
+            print(f"[INFO] 임베딩 {written:,}/{n_rows:,}")
+        fitted = _fit_pending(kmeans, matrix, fitted, written, final=True)
+    finally:
+        cache.close()
+    matrix.flush()
+    print(f"[INFO] 임베딩 캐시 적중 {hits:,}건, 신규 추론 {encoded:,}건")
+
+    if written < n_rows:
+        print(f"⚠️ 읽은 리뷰 {written:,}건이 예상 {n_rows:,}건보다 적어 읽은 만큼만 군집화")
+        matrix = matrix[:written]
+    if epochs > 1:
+        fit_clusters(matrix, batch_size=batch_size, epochs=epochs - 1, seed=seed, kmeans=kmeans)
+    return matrix, kmeans
+
+
+def assign_clusters(kmeans, matrix: np.ndarray, chunk_rows: int = CHUNK_ROWS) -> tuple[np.ndarray, np.ndarray]:
+    """청크 단위 할당 → (군집 번호, 중심과의 코사인 유사도)"""
+    centers = kmeans.cluster_centers_ / np.linalg.norm(kmeans.cluster_centers_, axis=1, keepdims=True)
+    labels = np.empty(len(matrix), dtype=np.int32)
+    sims = np.empty(len(matrix), dtype=np.float32)
+    for start in range(0, len(matrix), chunk_rows):
+        scores = np.asarray(matrix[start:start + chunk_rows]) @ centers.T
+        labels[start:start + len(scores)] = scores.argmax(axis=1)
+        sims[start:start + len(scores)] = scores.max(axis=1)
+    return labels, sims
+
+
+# ===== 5. IVF 근사 최근접 탐색 =====
+class ClusterIndex:
+    """
+    군집 중심 = coarse quantizer, 군집별 행 번호 목록 = inverted list.
+    질의는 가까운 n_probe개 군집의 행만 읽어 코사인 유사도를 계산한다.
+    """
+
+    def __init__(self, matrix: np.ndarray, centers: np.ndarray, labels: np.ndarray):
+        self.matrix = matrix
+        self.centers = centers / np.linalg.norm(centers, axis=1, keepdims=True)
+        order = np.argsort(labels, kind="stable")
+        bounds = np.searchsorted(labels[order], np.arange(len(centers) + 1))
+        self.lists = [order[bounds[c]:bounds[c + 1]] for c in range(len(centers))]
+
+    def search(self, query: np.ndarray, k: int = 10, n_probe: int = N_PROBE) -> list[tuple[int, float]]:
+        query = query / max(np.linalg.norm(query), 1e-12)
+        probes = np.argsort(self.centers @ query)[::-1][:n_probe]
+        rows = np.concatenate([self.lists[c] for c in probes])
+        if len(rows) == 0:
+            return []
+        rows.sort()  # memmap 순차 읽기
+        scores = np.asarray(self.matrix[rows]) @ query
+        top = np.argsort(scores)[::-1][:k]
+        return [(int(rows[i]), float(scores[i])) for i in top]
+
+    def representatives(self, cluster: int, k: int = N_REPRESENTATIVES) -> list[tuple[int, float]]:
+        """군집 중심과 가장 가까운 리뷰 k개"""
+        rows = np.sort(self.lists[cluster])
+        if len(rows) == 0:
+            return []
+        scores = np.asarray(self.matrix[rows]) @ self.centers[cluster]
+        top = np.argsort(scores)[::-1][:k]
+        return [(int(rows[i]), float(scores[i])) for i in top]
+
+
+# ===== 6. 군집 요약 =====
+def cluster_samples(index: ClusterIndex, sample_size: int = SUMMARY_SAMPLE, seed: int = 42) -> list[np.ndarray]:
+    """군집별 키워드용 표본 행 (군집당 최대 sample_size, 같은 seed 면 같은 표본)"""
+    rng = np.random.default_rng(seed)
+    return [rng.choice(members, sample_size, replace=False) if len(members) > sample_size else members
+            for members in index.lists]
+
+
+def summary_rows(index: ClusterIndex, n_reps: int = N_REPRESENTATIVES,
+                 sample_size: int = SUMMARY_SAMPLE, seed: int = 42) -> set[int]:
+    """summarize_clusters 가 본문을 읽는 행 (키워드 표본 + 대표 리뷰)"""
+    rows = {int(row) for members in cluster_samples(index, sample_size, seed) for row in members}
+    for cluster in range(len(index.lists)):
+        rows.update(row for row, _ in index.representatives(cluster, n_reps))
+    return rows
+
+
+def summarize_clusters(
+    texts: list[str],
+    index: ClusterIndex,
+    n_terms: int = N_TOPIC_TERMS,
+    n_reps: int = N_REPRESENTATIVES,
+    sample_size: int = SUMMARY_SAMPLE,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """
+    군집별 크기 / 키워드(군집당 최대 sample_size 건 표본) / 대표 리뷰
+    texts: 행 번호 → 본문 (전체 목록 또는 summary_rows 의 행만 담은 dict)
+    """
+    term_counts = []
+    for members in cluster_samples(index, sample_size, seed):
+        counts = Counter()
+        for tokens in tokenize_many([texts[row] for row in members]):
+            counts.update(set(tokens))
+        term_counts.append(counts)
+
+    rows = []
+    for cluster in range(len(index.lists)):
+        reps = index.representatives(cluster, n_reps)
+        rows.append({
+            "cluster": cluster,
+            "size": len(index.lists[cluster]),
+            "top_terms": ", ".join(term for term, _ in term_counts[cluster].most_common(n_terms)),
+            "representatives": " || ".join(texts[row] for row, _ in reps),
+        })
+    return pd.DataFrame(rows).sort_values("size", ascending=False)
+
+
+# ===== 7. 입력 / 출력 =====
+def target_query(csv_path=CSV_PATH, sentiment: str = NEG_VALUE):
+    """대상 감정 리뷰의 필요한 컬럼만 읽는 lazy_dataset 쿼리 (sentiment 는 분할 조건 → 해당 파일만 읽음)"""
+    query = scan(csv_path).select(list(READ_COLS))
+    return query.filter(**{SENT_COL: sentiment}) if sentiment else query
+
+
+def iter_texts(query, batch_rows: int = CHUNK_ROWS) -> Iterator[list[str]]:
+    for batch in query.iter_batches(batch_rows):
+        yield batch[TEXT_COL].fillna("").astype(str).tolist()
+
+
+def write_assignments(
+    query,
+    labels: np.ndarray,
+    sims: np.ndarray,
+    needed_rows: set[int],
+    path: Path = CLUSTERS_PATH,
+    batch_rows: int = CHUNK_ROWS,
+) -> dict[int, str]:
+    """
+    입력을 다시 배치로 읽어 리뷰별 (리뷰 키, 군집, 유사도, 본문) CSV 를 이어 씀
+    반환: needed_rows 행의 본문만 {행 번호: 본문} (요약 / 검색 결과 출력용)
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    texts: dict[int, str] = {}
+    start = 0
+    for batch in query.iter_batches(batch_rows):
+        batch = batch.iloc[:len(labels) - start]
+        if batch.empty:
+            break
+        end = start + len(batch)
+        batch_texts = batch[TEXT_COL].fillna("").astype(str).tolist()
+        pd.DataFrame({
+            "review_key": [review_key(row) for row in batch.to_dict("records")],
+            "cluster": labels[start:end],
+            "similarity": np.round(sims[start:end], 4),
+            TEXT_COL: batch_texts,
+        }).to_csv(tmp, mode="a", header=start == 0, index=False, encoding="utf-8-sig" if start == 0 else "utf-8")
+        texts.update((row, batch_texts[row - start]) for row in needed_rows if start <= row < end)
+        start = end
+    tmp.replace(path)
+    return texts
+
+
+def cluster_reviews(
+    csv_path=CSV_PATH,
+    sentiment: str = NEG_VALUE,
+    model_name: str = EMBED_MODEL_NAME,
+    n_clusters: int = N_CLUSTERS,
+    query_text: Optional[str] = None,
+    batch_rows: int = CHUNK_ROWS,
+    out_dir: Path = OUT_DIR,
+    cache_path: Path = EMBED_CACHE_PATH,
+    kmeans_batch: int = KMEANS_BATCH,
+) -> Optional[pd.DataFrame]:
+    """대상 리뷰를 배치로 흘려 임베딩 / 군집화 → 군집 CSV / 요약 CSV 저장. 반환: 요약 (대상이 없으면 None)"""
+    query = target_query(csv_path, sentiment)
+    n_rows = query.count()
+    if not n_rows:
+        print(f"⚠️ '{sentiment}' 리뷰가 없어 군집화를 건너뜁니다.")
+        return None
+    print(f"[INFO] 대상 리뷰: {n_rows:,}건 ({sentiment or '전체'})")
+    set_rows(rows_in=n_rows)
+
+    tokenizer, model = load_encoder(model_name)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with track_stage("embed_cluster", rows_in=n_rows, rows_out=n_rows):
+        matrix, kmeans = embed_and_fit(
+            iter_texts(query, batch_rows), n_rows, tokenizer, model, model_name, n_clusters,
+            matrix_path=out_dir / EMBED_MATRIX_PATH.name, cache_path=cache_path, batch_size=kmeans_batch,
+        )
+        labels, sims = assign_clusters(kmeans, matrix)
+    index = ClusterIndex(matrix, kmeans.cluster_centers_, labels)
+
+    needed = summary_rows(index)
+    hits = []
+    if query_text:
+        hits = index.search(encode_texts([query_text], tokenizer, model)[0], k=10)
+        needed.update(row for row, _ in hits)
+    clusters_path = out_dir / CLUSTERS_PATH.name
+    texts = write_assignments(query, labels, sims, needed, clusters_path, batch_rows)
+
+    summary = summarize_clusters(texts, index)
+    summary_path = out_dir / SUMMARY_PATH.name
+    summary.to_csv(summary_path, index=False, encoding="utf-8-sig")
+    set_rows(rows_out=len(labels))
+    print(summary[["cluster", "size", "top_terms"]].head(15).to_string(index=False))
+    print(f"\n[INFO] 리뷰별 군집 → {clusters_path}")
+    print(f"[INFO] 군집 요약 → {summary_path}")
+
+    if query_text:
+        print(f"\n'{query_text}' 와 비슷한 리뷰:")
+        for row, score in hits:
+            print(f"  [{labels[row]:>3}] {score:.3f}  {texts[row][:80]}")
+    return summary
+
+
+@instrumented("topics")
+def main():
+    parser = argparse.ArgumentParser(description="리뷰 토픽 군집화 (임베딩 + MiniBatchKMeans)")
+    parser.add_argument("--input", default=CSV_PATH)
+    parser.add_argument("--sentiment", default=NEG_VALUE, help="대상 감정 라벨 (빈 문자열이면 전체)")
+    parser.add_argument("--model", default=EMBED_MODEL_NAME, help="임베딩 모델 이름 또는 로컬 경로")
+    parser.add_argument("--n-clusters", type=int, default=N_CLUSTERS)
+    parser.add_argument("--query", default=None, help="비슷한 리뷰를 찾을 문장")
+    args = parser.parse_args()
+
+    cluster_reviews(args.input, args.sentiment, args.model, args.n_clusters, args.query)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+
+# -*- coding: utf-8 -*-
+"""
+Vrew 리뷰 분석 통합 CLI
+- 서브커맨드: crawl / preprocess / sentiment / charts / eval / pipeline / stream / drift
+- 각 단계 스크립트는 서브커맨드가 실행될 때만 불러온다.
+  (torch, transformers, konlpy, matplotlib, wordcloud 등 무거운 모듈도 그때 import)
+
+사용 예)
+    python vrew_cli.py --help
+    python vrew_cli.py sentiment --long-text --batch-size 32
+    python vrew_cli.py charts --only bar
+    python vrew_cli.py pipeline --dry-run
+    python vrew_cli.py stream --tokenize-workers 3
+"""
+
+import argparse
+import importlib
+import importlib.util
+import sys
+from pathlib import Path
+from typing import Optional
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+SCRIPTS = {
+    "crawl": "브류 리뷰 크롤링.py",
+    "preprocess": "브류 리뷰 뜯어보기.py",
+    "sentiment": "sentiment_analysis.py",
+    "bar": "언급량 막대 그래프.py",
+    "wordcloud": "워드 클라우드.py",
+    "eval": "성능 테스트.py",
+}
+
+
+# ============================================================
+# 1. 스크립트 로더
+# ============================================================
+def load_script(filename: str):
+    """
+    파일명에 공백/한글이 있는 스크립트도 모듈로 불러온다.
+    같은 스크립트는 한 번만 로드해 sys.modules에 캐시한다.
+    """
+    path = SCRIPT_DIR / filename
+    if str(SCRIPT_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPT_DIR))
+
+    # sentiment_analysis.py 처럼 모듈명으로 쓸 수 있는 파일은 일반 import (다른 모듈과 같은 객체 공유)
+    if path.stem.isidentifier():
+        return importlib.import_module(path.stem)
+
+    module_name = "vrew_" + path.stem.replace(" ", "_")
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"스크립트를 불러올 수 없습니다: {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# ============================================================
+# 2. 서브커맨드
+# ============================================================
+def cmd_crawl(args):
+    load_script(SCRIPTS["crawl"]).main()
+
+
+def cmd_preprocess(args):
+    load_script(SCRIPTS["preprocess"]).main()
+
+
+def cmd_sentiment(args):
+    module = load_script(SCRIPTS["sentiment"])
+    if args.long_text:
+        module.LONG_TEXT_MODE = True
+    if args.no_lang_routing:
+        module.LANGUAGE_ROUTING = False
+    if args.fallback_default_model:
+        import lang_routing
+
+        lang_routing.FALLBACK_MODEL = lang_routing.DEFAULT_MODEL
+    if args.batch_size:
+        module.BATCH_SIZE = args.batch_size
+    if args.max_len:
+        module.MAX_LEN = args.max_len
+    if args.model:
+        module.MODEL_NAME = args.model
+    if args.rescore:
+        module.REUSE_STORED_SENTIMENT = False
+    if args.no_cascade:
+        module.CASCADE_MODE = False
+    if args.cascade_threshold is not None:
+        module.CASCADE_THRESHOLD = args.cascade_threshold
+    module.main()
+
+
+def cmd_charts(args):
+    if args.slices:
+        import batch_render
+
+        batch_render.main()
+        return
+    if args.only in (None, "bar"):
+        load_script(SCRIPTS["bar"]).main()
+    if args.only in (None, "wordcloud"):
+        load_script(SCRIPTS["wordcloud"]).main()
+
+
+def cmd_eval(args):
+    module = load_script(SCRIPTS["eval"])
+    if args.make_sample:
+        module.make_labeling_sample(args.sample_size)
+    else:
+        module.evaluate()
+
+
+def cmd_pipeline(args):
+    import pipeline
+
+    pipeline.run_pipeline(args.only, args.force, args.dry_run, args.jobs)
+
+
+def cmd_stream(args):
+    import streaming_pipeline
+
+    argv = []
+    if args.queue_size is not None:
+        argv += ["--queue-size", str(args.queue_size)]
+    if args.tokenize_workers is not None:
+        argv += ["--tokenize-workers", str(args.tokenize_workers)]
+    if args.no_lang_routing:
+        argv.append("--no-lang-routing")
+    if args.fallback_default_model:
+        argv.append("--fallback-default-model")
+    if args.no_store:
+        argv.append("--no-store")
+    if args.no_drift:
+        argv.append("--no-drift")
+    streaming_pipeline.main(argv)
+
+
+def cmd_drift(args):
+    import drift_detector
+
+    argv = ["--reset"] if args.reset else []
+    if args.csv:
+        argv += ["--csv", str(args.csv)]
+    drift_detector.main(argv)
+
+
+# ============================================================
+# main
+# ============================================================
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="vrew", description="Vrew 리뷰 분석 파이프라인 CLI")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("crawl", help="앱스토어/구글플레이 리뷰 수집")
+    p.set_defaults(func=cmd_crawl)
+
+    p = sub.add_parser("preprocess", help="정제 + 토큰화 (vrew_reviews_tokens.csv 생성)")
+    p.set_defaults(func=cmd_preprocess)
+
+    p = sub.add_parser("sentiment", help="감정분석 (reviews_with_sentiment.csv 생성)")
+    p.add_argument("--long-text", action="store_true", help="긴 리뷰를 윈도우로 나눠 전체 점수화")
+    p.add_argument("--no-lang-routing", action="store_true", help="언어 판별 없이 전체를 한국어 모델로 추론")
+    p.add_argument("--fallback-default-model", action="store_true",
+                   help="모델이 없는 언어(en/ja/unknown 등)도 기본(한국어) 모델로 추론 (기본: 미분석 처리)")
+    p.add_argument("--batch-size", type=int, default=None)
+    p.add_argument("--max-len", type=int, default=None)
+    p.add_argument("--model", default=None, help="모델 이름 또는 로컬 경로 (기본: MODEL_NAME)")
+    p.add_argument("--rescore", action="store_true", help="리뷰 저장소의 기존 라벨을 쓰지 않고 전체 다시 추론")
+    p.add_argument("--no-cascade", action="store_true", help="선형 캐스케이드 없이 전체를 트랜스포머로 추론")
+    p.add_argument("--cascade-threshold", type=float, default=None, help="선형 모델 확신도 임계값 (기본: 학습 시 추천값)")
+    p.set_defaults(func=cmd_sentiment)
+
+    p = sub.add_parser("charts", help="키워드 막대 그래프 / 워드클라우드")
+    p.add_argument("--only", choices=["bar", "wordcloud"], default=None)
+    p.add_argument("--slices", action="store_true", help="platform × country × 월 × 감정 슬라이스별 차트 일괄 렌더")
+    p.set_defaults(func=cmd_charts)
+
+    p = sub.add_parser("eval", help="라벨링 샘플 생성 / 성능 평가")
+    p.add_argument("--make-sample", action="store_true", help="평가 대신 라벨링용 샘플 생성")
+    p.add_argument("--sample-size", type=int, default=300)
+    p.set_defaults(func=cmd_eval)
+
+    stage_names = ["crawl", "preprocess", "sentiment", "bar", "wordcloud", "eval"]
+    p = sub.add_parser("pipeline", help="전체 단계를 의존 순서대로 실행 (입력/코드/파라미터가 바뀐 단계만)")
+    p.add_argument("--only", nargs="*", choices=stage_names, default=None, help="실행할 단계만 선택")
+    p.add_argument("--force", nargs="*", choices=stage_names, default=[], help="지문과 상관없이 실행")
+    p.add_argument("--dry-run", action="store_true", help="실행 계획만 출력")
+    p.add_argument("--jobs", type=int, default=3, help="병렬 실행 프로세스 수")
+    p.set_defaults(func=cmd_pipeline)
+
+    p = sub.add_parser("stream", help="크롤링 → 정제 → 토큰화 → 감정분석을 페이지 단위로 동시에 실행")
+    p.add_argument("--queue-size", type=int, default=None, help="단계 사이 큐 크기 (페이지 수, 기본 8)")
+    p.add_argument("--tokenize-workers", type=int, default=None, help="토큰화 프로세스 수 (기본: CPU 수 - 1, 최대 4)")
+    p.add_argument("--no-lang-routing", action="store_true")
+    p.add_argument("--fallback-default-model", action="store_true", help="모델이 없는 언어도 기본(한국어) 모델로 추론")
+    p.add_argument("--no-store", action="store_true", help="리뷰 저장소(SQLite) 반영 없이 CSV 만 기록")
+    p.add_argument("--no-drift", action="store_true", help="드리프트 / 릴리스 이상 감지 끄기")
+    p.set_defaults(func=cmd_stream)
+
+    p = sub.add_parser("drift", help="새 버전 감정/별점 이상 감지 (리뷰 저장소 변경분만 반영)")
+    p.add_argument("--csv", type=Path, default=None, help="저장소 대신 점수 CSV 를 배치로 흘려보냄")
+    p.add_argument("--reset", action="store_true", help="저장된 상태를 버리고 처음부터")
+    p.set_defaults(func=cmd_drift)
+
+    return parser
+
+
+def main(argv: Optional[list[str]] = None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,15 +6,42 @@
     1) URL에서 앱 ID 자동 추출
     2) 앱스토어 RSS 리뷰 전체 수집 (페이지네이션 끝까지)
     3) 구글플레이 reviews_all로 전체 리뷰 수집 (continuation_token 활용)
-    4) 각각 CSV 저장 + 통합 CSV 저장
+       (2, 3 은 페이지 단위 제너레이터 iter_*_pages — streaming_pipeline.py 도 같은 함수 사용)
+    4) 각각 CSV 저장 (이번 수집분)
+    5) 리뷰 저장소(review_store, SQLite)에 UPSERT → 저장소 전체를 통합 CSV로 내보내기
+       (일부 마켓 수집이 실패해도 이전에 모은 리뷰가 통합 CSV에서 사라지지 않음)
 """
 
+import os
 import requests
 import pandas as pd
 import time
+from pathlib import Path
+from typing import Iterator
 from urllib.parse import urlparse, parse_qs
 from google_play_scraper import reviews, Sort
 
+from instrumentation import count, instrumented, set_rows
+from review_store import connect as connect_store, export_csv, upsert_reviews
+
+# 저장 위치 (VREW_BASE_DIR 환경변수로 변경 가능, 다음 단계 브류 리뷰 뜯어보기.py 가 읽는 위치)
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+APPSTORE_CSV_PATH = BASE_DIR / "vrew_appstore_reviews.csv"
+GPLAY_CSV_PATH = BASE_DIR / "vrew_googleplay_reviews.csv"
+COMBINED_CSV_PATH = BASE_DIR / "vrew_reviews_combined.csv"
+
+# 크롤링할 앱 URL / 수집 국가 (여기에 다른 앱 URL 넣어도 됨)
+APPSTORE_URL = "https://apps.apple.com/kr/app/vrew-%EB%B8%8C%EB%A3%A8/id1477811799"
+GPLAY_URL = "https://play.google.com/store/apps/details?id=com.voyagerx.vrew.android"
+APPSTORE_COUNTRIES = ["kr", "us", "jp"]
+GPLAY_LOCALES = [
+    {"lang": "ko", "country": "kr"},
+    {"lang": "en", "country": "us"},
+    {"lang": "ja", "country": "jp"},
+]
+# 구글플레이 컬럼명 → 앱스토어와 통일
+GPLAY_RENAME = {"userName": "author", "score": "rating"}
+
 
 # ===============================
 # 1. URL에서 ID 추출 함수
@@ -54,22 +81,17 @@ def get_gplay_id_from_url(url: str) -> str:
 # 2. 앱스토어 리뷰 전체 수집 함수 (개선)
 # ===============================
 
-def fetch_app_store_reviews(app_id: str,
-                            country: str = "kr",
-                            max_pages: int = 1000,
-                            sleep_sec: float = 1.0) -> pd.DataFrame:
+def iter_app_store_pages(app_id: str,
+                         country: str = "kr",
+                         max_pages: int = 1000,
+                         sleep_sec: float = 1.0) -> Iterator[list[dict]]:
     """
-    Apple App Store RSS를 이용해 모든 리뷰 가져오기 (페이지네이션 끝까지)
-    - app_id: 숫자 ID (예: '1477811799')
-    - country: 스토어 국가 코드 (kr, us 등)
-    - max_pages: 최대 페이지 수 (기본 1000, 충분히 큰 값)
-    - sleep_sec: 페이지 간 대기 시간
+    Apple App Store RSS 페이지 단위 제너레이터 (리뷰가 있는 페이지마다 리뷰 dict 목록을 yield)
+    - fetch_app_store_reviews(일괄) / streaming_pipeline.py(스트리밍)가 공통으로 사용
     """
-    all_reviews = []
+    n_collected = 0
     consecutive_empty_pages = 0
     max_consecutive_empty = 3  # 연속 3페이지 비어있으면 종료
-    
-    print(f"[AppStore] 리뷰 수집 시작 (app_id={app_id}, country={country})")
 
     for page in range(1, max_pages + 1):
         url = (
@@ -79,7 +101,10 @@ def fetch_app_store_reviews(app_id: str,
         
         try:
             resp = requests.get(url, timeout=10)
+            count("requests")
+            count("bytes", len(resp.content))
             if resp.status_code != 200:
+                count("request_errors")
                 print(f"[AppStore] page {page} 요청 실패(status={resp.status_code})")
                 consecutive_empty_pages += 1
                 if consecutive_empty_pages >= max_consecutive_empty:
@@ -99,15 +124,14 @@ def fetch_app_store_reviews(app_id: str,
                 continue
 
             entries = data["feed"]["entry"]
-            reviews_this_page = 0
+            page_reviews = []
             
             # 첫 entry는 앱 메타정보인 경우가 많아서 rating 없는 것 제외
             for e in entries:
                 if "im:rating" not in e:
                     continue
                     
-                reviews_this_page += 1
-                all_reviews.append({
+                page_reviews.append({
                     "platform": "appstore",
                     "author": e.get("author", {}).get("name", {}).get("label", ""),
                     "title": e.get("title", {}).get("label", ""),
@@ -118,11 +142,14 @@ def fetch_app_store_reviews(app_id: str,
                     "vote_count": int(e.get("im:voteCount", {}).get("label", "0")),
                     "updated": e.get("updated", {}).get("label", ""),
                     "review_id": e.get("id", {}).get("label", ""),
+                    "country": country,
                 })
 
-            if reviews_this_page > 0:
+            if page_reviews:
                 consecutive_empty_pages = 0
-                print(f"[AppStore] page {page} 수집: {reviews_this_page}개 (누적: {len(all_reviews)}개)")
+                n_collected += len(page_reviews)
+                print(f"[AppStore] page {page} 수집: {len(page_reviews)}개 (누적: {n_collected}개)")
+                yield page_reviews
             else:
                 consecutive_empty_pages += 1
                 print(f"[AppStore] page {page}에 리뷰 없음 (연속 {consecutive_empty_pages}회)")
@@ -134,14 +161,31 @@ def fetch_app_store_reviews(app_id: str,
             time.sleep(sleep_sec)
             
         except Exception as e:
+            count("request_errors")
             print(f"[AppStore] page {page} 에러: {e}")
             consecutive_empty_pages += 1
             if consecutive_empty_pages >= max_consecutive_empty:
                 break
 
+
+def fetch_app_store_reviews(app_id: str,
+                            country: str = "kr",
+                            max_pages: int = 1000,
+                            sleep_sec: float = 1.0) -> pd.DataFrame:
+    """
+    Apple App Store RSS를 이용해 모든 리뷰 가져오기 (페이지네이션 끝까지)
+    - app_id: 숫자 ID (예: '1477811799')
+    - country: 스토어 국가 코드 (kr, us 등)
+    - max_pages: 최대 페이지 수 (기본 1000, 충분히 큰 값)
+    - sleep_sec: 페이지 간 대기 시간
+    """
+    print(f"[AppStore] 리뷰 수집 시작 (app_id={app_id}, country={country})")
+
+    all_reviews = []
+    for page_reviews in iter_app_store_pages(app_id, country, max_pages, sleep_sec):
+        all_reviews.extend(page_reviews)
+
     df = pd.DataFrame(all_reviews)
-    if not df.empty:
-        df["country"] = country
     print(f"[AppStore] 총 수집 리뷰 수: {len(df)}")
     return df
 
@@ -150,22 +194,17 @@ def fetch_app_store_reviews(app_id: str,
 # 3. 구글플레이 리뷰 전체 수집 함수 (개선)
 # ===============================
 
-def fetch_google_play_reviews(app_id: str,
-                              lang: str = "ko",
-                              country: str = "kr",
-                              count_per_request: int = 200) -> pd.DataFrame:
+def iter_google_play_pages(app_id: str,
+                           lang: str = "ko",
+                           country: str = "kr",
+                           count_per_request: int = 200) -> Iterator[list[dict]]:
     """
-    google_play_scraper를 이용해 모든 리뷰 가져오기 (continuation_token 활용)
-    - app_id: 패키지명 (예: 'com.voyagerx.vrew.android')
-    - lang: 리뷰 언어
-    - country: 스토어 국가
-    - count_per_request: 한 번에 가져올 리뷰 수 (최대 200)
+    google_play_scraper 요청 단위 제너레이터 (continuation_token 활용)
+    - 컬럼명은 앱스토어와 맞춰서 yield (userName → author, score → rating)
     """
-    all_reviews = []
     continuation_token = None
     request_count = 0
-    
-    print(f"[GooglePlay] 리뷰 수집 시작 (app_id={app_id})")
+    n_collected = 0
     
     while True:
         request_count += 1
@@ -179,13 +218,23 @@ def fetch_google_play_reviews(app_id: str,
                 count=count_per_request,
                 continuation_token=continuation_token
             )
+            count("requests")
             
             if not result:
                 print(f"[GooglePlay] 더 이상 리뷰 없음, 수집 종료")
                 break
             
-            all_reviews.extend(result)
-            print(f"[GooglePlay] 요청 {request_count}: {len(result)}개 수집 (누적: {len(all_reviews)}개)")
+            n_collected += len(result)
+            print(f"[GooglePlay] 요청 {request_count}: {len(result)}개 수집 (누적: {n_collected}개)")
+            yield [
+                {
+                    **{GPLAY_RENAME.get(key, key): value for key, value in item.items()},
+                    "platform": "googleplay",
+                    "lang": lang,
+                    "country": country,
+                }
+                for item in result
+            ]
             
             # continuation_token이 없으면 마지막 페이지
             if continuation_token is None:
@@ -196,22 +245,31 @@ def fetch_google_play_reviews(app_id: str,
             time.sleep(0.5)
             
         except Exception as e:
+            count("request_errors")
             print(f"[GooglePlay] 요청 {request_count} 에러: {e}")
-            # 에러 발생 시에도 지금까지 수집한 리뷰는 반환
+            # 에러 발생 시에도 지금까지 수집한 리뷰는 유지
             break
+
+
+def fetch_google_play_reviews(app_id: str,
+                              lang: str = "ko",
+                              country: str = "kr",
+                              count_per_request: int = 200) -> pd.DataFrame:
+    """
+    google_play_scraper를 이용해 모든 리뷰 가져오기 (continuation_token 활용)
+    - app_id: 패키지명 (예: 'com.voyagerx.vrew.android')
+    - lang: 리뷰 언어
+    - country: 스토어 국가
+    - count_per_request: 한 번에 가져올 리뷰 수 (최대 200)
+    """
+    print(f"[GooglePlay] 리뷰 수집 시작 (app_id={app_id})")
+
+    all_reviews = []
+    for page_reviews in iter_google_play_pages(app_id, lang, country, count_per_request):
+        all_reviews.extend(page_reviews)
     
     df = pd.DataFrame(all_reviews)
     if not df.empty:
-        # 통일을 위해 컬럼명 일부 맞추기
-        df.rename(columns={
-            "userName": "author",
-            "content": "content",
-            "score": "rating",
-        }, inplace=True)
-        df["platform"] = "googleplay"
-        df["lang"] = lang
-        df["country"] = country
-        
         # 중복 제거 (혹시 모를 중복 방지)
         if "reviewId" in df.columns:
             df.drop_duplicates(subset=["reviewId"], inplace=True)
@@ -225,15 +283,15 @@ def fetch_google_play_reviews(app_id: str,
 # 4. 메인 실행 함수
 # ===============================
 
+@instrumented("crawl")
 def main():
-    # 1) 크롤링할 앱 URL 설정 (여기에 다른 앱 URL 넣어도 됨)
-    appstore_url = "https://apps.apple.com/kr/app/vrew-%EB%B8%8C%EB%A3%A8/id1477811799"
-    gplay_url = "https://play.google.com/store/apps/details?id=com.voyagerx.vrew.android"
+    # 1) 크롤링할 앱 URL은 상단 APPSTORE_URL / GPLAY_URL 에서 설정
+    BASE_DIR.mkdir(parents=True, exist_ok=True)
 
     # 2) URL에서 ID 추출
     try:
-        appstore_id = get_appstore_id_from_url(appstore_url)
-        gplay_id = get_gplay_id_from_url(gplay_url)
+        appstore_id = get_appstore_id_from_url(APPSTORE_URL)
+        gplay_id = get_gplay_id_from_url(GPLAY_URL)
 
         print("=" * 50)
         print("=== ID 추출 결과 ===")
@@ -246,15 +304,8 @@ def main():
         return
 
     # 3) 리뷰 수집
-    appstore_countries = ["kr", "us", "jp"]
-    gplay_locales = [
-        {"lang": "ko", "country": "kr"},
-        {"lang": "en", "country": "us"},
-        {"lang": "ja", "country": "jp"},
-    ]
-
     appstore_frames = []
-    for country in appstore_countries:
+    for country in APPSTORE_COUNTRIES:
         df = fetch_app_store_reviews(
             appstore_id,
             country=country,
@@ -267,7 +318,7 @@ def main():
     appstore_df = pd.concat(appstore_frames, ignore_index=True, sort=False) if appstore_frames else pd.DataFrame()
 
     gplay_frames = []
-    for locale in gplay_locales:
+    for locale in GPLAY_LOCALES:
         df = fetch_google_play_reviews(
             gplay_id,
             lang=locale["lang"],
@@ -284,27 +335,31 @@ def main():
     
     # 4) CSV 개별 저장
     if not appstore_df.empty:
-        appstore_df.to_csv("vrew_appstore_reviews.csv", index=False, encoding="utf-8-sig")
-        print(f"[SAVE] vrew_appstore_reviews.csv 저장 완료 ({len(appstore_df)}개)")
+        appstore_df.to_csv(APPSTORE_CSV_PATH, index=False, encoding="utf-8-sig")
+        print(f"[SAVE] {APPSTORE_CSV_PATH} 저장 완료 ({len(appstore_df)}개)")
     else:
         print("[WARN] 앱스토어 리뷰가 없습니다.")
 
     if not gplay_df.empty:
-        gplay_df.to_csv("vrew_googleplay_reviews.csv", index=False, encoding="utf-8-sig")
-        print(f"[SAVE] vrew_googleplay_reviews.csv 저장 완료 ({len(gplay_df)}개)")
+        gplay_df.to_csv(GPLAY_CSV_PATH, index=False, encoding="utf-8-sig")
+        print(f"[SAVE] {GPLAY_CSV_PATH} 저장 완료 ({len(gplay_df)}개)")
     else:
         print("[WARN] 구글플레이 리뷰가 없습니다.")
 
-    # 5) 통합 데이터프레임 + CSV
+    # 5) 리뷰 저장소 UPSERT + 통합 CSV (저장소 전체 기준)
     if not appstore_df.empty or not gplay_df.empty:
         combined_df = pd.concat([appstore_df, gplay_df], ignore_index=True, sort=False)
-        dedupe_keys = [col for col in ["review_id", "reviewId", "author", "content"] if col in combined_df.columns]
-        if dedupe_keys:
-            combined_df.drop_duplicates(subset=dedupe_keys + ["platform", "country"], inplace=True)
-        combined_df.to_csv("vrew_reviews_combined.csv", index=False, encoding="utf-8-sig")
-        print(f"[SAVE] vrew_reviews_combined.csv 저장 완료 (총 {len(combined_df)}개)")
+        conn = connect_store()
+        try:
+            inserted, updated = upsert_reviews(conn, combined_df)
+            count("store_inserted", inserted)
+            count("store_updated", updated)
+            n_total = export_csv(conn, COMBINED_CSV_PATH)
+        finally:
+            conn.close()
+        set_rows(rows_in=len(combined_df), rows_out=n_total)
     else:
-        print("[WARN] 수집된 리뷰가 없습니다. 통합 CSV는 생성하지 않습니다.")
+        print("[WARN] 수집된 리뷰가 없습니다. 리뷰 저장소와 통합 CSV는 그대로 둡니다.")
     
     print("=" * 50)
     print("✅ 모든 작업 완료!")
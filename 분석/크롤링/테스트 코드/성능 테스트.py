@@ -1,37 +1,36 @@
-import pandas as pd
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix, classification_report
+import os
+from pathlib import Path
 
+from instrumentation import instrumented, set_rows
 
-import pandas as pd
+BASE_DIR = Path(os.environ.get("VREW_BASE_DIR", "/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew"))
+LABELING_PATH = str(BASE_DIR / "reviews_for_labeling.csv")
 
-# 1) 원본 데이터 읽기
-df = pd.read_csv("/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew/reviews_for_labeling.csv")
 
-# 2) 샘플 300개만 뽑기 (원하면 숫자 바꿔도 됨)
-df_sample = df.sample(300, random_state=42).copy()
+@instrumented("labeling_sample")
+def make_labeling_sample(n=300):
+    # 무작위 300건 대신 모델이 헷갈리는 리뷰 + 층화 무작위 리뷰를 섞어서 선정
+    # 기존 라벨링 파일은 덮어쓰지 않고 새 후보만 추가 (채워 둔 true_label 은 정답 세트로 병합)
+    from labeling_sampler import sample_for_labeling
 
-# 3) 사람이 채울 정답 컬럼 추가 (초기값은 빈 값)
-df_sample["true_label"] = ""
+    sample_for_labeling(n, labeling_path=Path(LABELING_PATH))
 
-# 4) 라벨링용 파일로 저장
-df_sample.to_csv("reviews_for_labeling.csv", index=False, encoding="utf-8-sig")
 
-print("✅ 'reviews_for_labeling.csv' 파일 생성 완료 (여기에 true_label 직접 채우면 됨)")
+@instrumented("eval")
+def evaluate():
+    # 라벨 표기 통일(긍정/부정 ↔ POS/NEG) + 슬라이스별 지표 + 부트스트랩 신뢰구간은 evaluation.py 에서 처리
+    from evaluation import run_report
+    from labeling_sampler import GOLD_PATH, merge_labels
 
+    gold = merge_labels(Path(LABELING_PATH), GOLD_PATH)
+    report = run_report(GOLD_PATH)
+    set_rows(rows_in=len(gold), rows_out=len(report))
 
 
-df = pd.read_csv("/Users/seojeong-il/Desktop/내문서/데이터 분석/개인 분석/보이저엑스/vrew/reviews_for_labeling.csv")
+def main():
+    make_labeling_sample()
+    evaluate()
 
-y_true = df["true_label"]
-y_pred = df["pred_label"]
 
-print("Accuracy:", accuracy_score(y_true, y_pred))
-print("Precision:", precision_score(y_true, y_pred, pos_label="NEG"))
-print("Recall:", recall_score(y_true, y_pred, pos_label="NEG"))
-print("F1:", f1_score(y_true, y_pred, pos_label="NEG"))
-
-print("\nClassification Report:")
-print(classification_report(y_true, y_pred))
-
-print("\nConfusion Matrix:")
-print(confusion_matrix(y_true, y_pred))
+if __name__ == "__main__":
+    main()